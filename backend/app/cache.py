@@ -0,0 +1,67 @@
+"""
+Cache em memoria invalidado por watermark de mudancas
+
+O watermark de um conjunto de tabelas e a tupla (total de linhas, maior
+updated_at) de cada uma, obtida em uma unica query barata. Qualquer
+insert, update ou delete altera o watermark, entao um resultado cacheado
+so e reaproveitado enquanto os dados de origem nao mudaram.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def watermark_statement(*modelos):
+    """Monta o SELECT que retorna (count, max(updated_at)) de cada modelo em uma linha"""
+    colunas = []
+    for modelo in modelos:
+        colunas.append(select(func.count()).select_from(modelo).scalar_subquery())
+        colunas.append(select(func.max(modelo.updated_at)).scalar_subquery())
+    return select(*colunas)
+
+
+def obter_watermark(db: Session, *modelos) -> tuple:
+    """Retorna o watermark atual das tabelas dos modelos informados"""
+    return tuple(db.execute(watermark_statement(*modelos)).one())
+
+
+async def obter_watermark_async(db: AsyncSession, *modelos) -> tuple:
+    """Versao async de obter_watermark"""
+    return tuple((await db.execute(watermark_statement(*modelos))).one())
+
+
+class WatermarkCache:
+    """
+    Cache LRU thread-safe cujas entradas valem apenas para um watermark.
+
+    Cada entrada guarda o watermark com que foi calculada; uma leitura com
+    watermark diferente e tratada como miss.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._entradas: "OrderedDict[Hashable, tuple[tuple, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, watermark: tuple) -> Any | None:
+        with self._lock:
+            entrada = self._entradas.get(key)
+            if entrada is None or entrada[0] != watermark:
+                return None
+            self._entradas.move_to_end(key)
+            return entrada[1]
+
+    def set(self, key: Hashable, watermark: tuple, value: Any) -> None:
+        with self._lock:
+            self._entradas[key] = (watermark, value)
+            self._entradas.move_to_end(key)
+            while len(self._entradas) > self.maxsize:
+                self._entradas.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entradas.clear()
@@ -0,0 +1,199 @@
+"""
+Compressao das respostas HTTP (zstd, br, gzip)
+
+Snapshots de versoes e listas completas sao megabytes de JSON muito
+repetitivo; comprimidos ficam 10-20x menores, o que pesa mais que a CPU
+gasta para escritorios remotos com link lento.
+
+- CompressaoMiddleware comprime respostas prontas (corpo em uma mensagem so)
+  de tipos textuais a partir de `minimo` bytes, na codificacao preferida que
+  o cliente aceita. Respostas em streaming (ex: text/event-stream) passam
+  direto, sem buffer.
+- PayloadJSON guarda o corpo JSON junto das variantes comprimidas, geradas
+  uma vez por codificacao (em nivel mais alto, ja que o custo e pago uma vez
+  so). Usado pelos payloads cacheados (dados de referencia, versoes do
+  organograma): a resposta ja sai comprimida e o middleware nao recomprime.
+
+zstd e br dependem dos pacotes opcionais `zstandard` e `brotli`; sem eles
+so gzip e oferecido. Comparativo de CPU x bytes: scripts/benchmark_compressao.py.
+"""
+import gzip
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from .config import get_settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+# Corpo a partir do qual a compressao roda fora do event loop
+LIMITE_THREADPOOL = 64 * 1024
+
+TIPOS_COMPRIMIVEIS = ("application/json", "text/plain", "text/html", "text/css", "application/javascript")
+
+
+@dataclass(frozen=True)
+class Codificacao:
+    nome: str  # Valor de Content-Encoding
+    comprimir: Callable[[bytes, int], bytes]
+    nivel_dinamico: int  # Por requisicao: prioriza CPU
+    nivel_cacheado: int  # Payload cacheado: comprimido uma vez, prioriza bytes
+
+
+def _gzip(corpo: bytes, nivel: int) -> bytes:
+    return gzip.compress(corpo, compresslevel=nivel, mtime=0)
+
+
+def _zstd(corpo: bytes, nivel: int) -> bytes:
+    return zstandard.ZstdCompressor(level=nivel).compress(corpo)
+
+
+def _brotli(corpo: bytes, nivel: int) -> bytes:
+    return brotli.compress(corpo, quality=nivel)
+
+
+# Em ordem de preferencia do servidor (so as disponiveis)
+CODIFICACOES: dict[str, Codificacao] = {}
+if zstandard is not None:
+    CODIFICACOES["zstd"] = Codificacao("zstd", _zstd, nivel_dinamico=3, nivel_cacheado=10)
+if brotli is not None:
+    CODIFICACOES["br"] = Codificacao("br", _brotli, nivel_dinamico=4, nivel_cacheado=6)
+CODIFICACOES["gzip"] = Codificacao("gzip", _gzip, nivel_dinamico=5, nivel_cacheado=9)
+
+
+def escolher_codificacao(accept_encoding: Optional[str]) -> Optional[Codificacao]:
+    """Codificacao preferida do servidor entre as aceitas (q > 0) pelo cliente"""
+    if not accept_encoding:
+        return None
+    aceitas = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        q = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                q = float(parametro[2:])
+            except ValueError:
+                q = 0.0
+        aceitas[nome.strip().lower()] = q
+    for nome, codificacao in CODIFICACOES.items():
+        if aceitas.get(nome, aceitas.get("*", 0.0)) > 0:
+            return codificacao
+    return None
+
+
+def comprimivel(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.split(";")[0].strip() in TIPOS_COMPRIMIVEIS
+
+
+async def _comprimir(codificacao: Codificacao, corpo: bytes, nivel: int) -> bytes:
+    if len(corpo) >= LIMITE_THREADPOOL:
+        return await run_in_threadpool(codificacao.comprimir, corpo, nivel)
+    return codificacao.comprimir(corpo, nivel)
+
+
+def _vary_accept_encoding(headers: MutableHeaders) -> None:
+    vary = headers.get("vary", "")
+    if "accept-encoding" not in vary.lower():
+        headers.add_vary_header("Accept-Encoding")
+
+
+def _cabecalhos_comprimidos(headers: MutableHeaders, codificacao: Codificacao, tamanho: int) -> None:
+    headers["Content-Encoding"] = codificacao.nome
+    headers["Content-Length"] = str(tamanho)
+    _vary_accept_encoding(headers)
+
+
+class PayloadJSON:
+    """Corpo JSON pronto + variantes comprimidas, geradas sob demanda e guardadas"""
+
+    def __init__(self, corpo: bytes):
+        self.corpo = corpo
+        self._variantes: dict[str, bytes] = {}
+
+    async def variante(self, codificacao: Codificacao) -> bytes:
+        comprimido = self._variantes.get(codificacao.nome)
+        if comprimido is None:
+            comprimido = await _comprimir(codificacao, self.corpo, codificacao.nivel_cacheado)
+            self._variantes[codificacao.nome] = comprimido
+        return comprimido
+
+    def resposta(self, status_code: int = 200) -> "RespostaPayload":
+        return RespostaPayload(self, status_code=status_code)
+
+
+class RespostaPayload(Response):
+    """Response de um PayloadJSON: negocia a codificacao e usa a variante guardada"""
+
+    media_type = "application/json"
+
+    def __init__(self, payload: PayloadJSON, status_code: int = 200):
+        self.payload = payload
+        super().__init__(payload.corpo, status_code=status_code)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if len(self.payload.corpo) >= get_settings().compressao_minimo_bytes:
+            codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding"))
+            if codificacao is not None:
+                self.body = await self.payload.variante(codificacao)
+                _cabecalhos_comprimidos(self.headers, codificacao, len(self.body))
+        await super().__call__(scope, receive, send)
+
+
+class CompressaoMiddleware:
+    """Middleware ASGI que comprime respostas textuais prontas a partir de `minimo` bytes"""
+
+    def __init__(self, app, minimo: int = 1024):
+        self.app = app
+        self.minimo = minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding"))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None  # http.response.start retido ate ver o corpo
+        direto = False
+
+        async def enviar(message):
+            nonlocal inicio, direto
+            if direto:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not comprimivel(headers.get("content-type")):
+                    direto = True
+                    await send(message)
+                else:
+                    inicio = message
+                return
+
+            # Primeiro corpo: streaming ou pequeno demais passa sem compressao
+            direto = True
+            corpo = message.get("body", b"")
+            headers = MutableHeaders(raw=inicio["headers"])
+            _vary_accept_encoding(headers)
+            if not message.get("more_body", False) and len(corpo) >= self.minimo:
+                corpo = await _comprimir(codificacao, corpo, codificacao.nivel_dinamico)
+                _cabecalhos_comprimidos(headers, codificacao, len(corpo))
+                message = {**message, "body": corpo}
+            await send(inicio)
+            await send(message)
+
+        await self.app(scope, receive, enviar)
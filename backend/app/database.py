@@ -1,17 +1,100 @@
 """
 Configuração do banco de dados PostgreSQL
+
+Dois engines apontando para o mesmo banco:
+- sync (psycopg2): get_db / SessionLocal, usado pelos routers de escrita;
+- async (asyncpg): get_async_db / AsyncSessionLocal, usado pelos routers de
+  leitura intensiva (dashboards), que rodam no event loop sem ocupar uma
+  thread do threadpool enquanto esperam o Postgres.
+
+Leituras (rotas GET e dashboards) usam get_read_db / get_async_read_db.
+Com read_database_url configurada elas vao para a replica, por um segundo
+par de engines com as conexoes em modo somente leitura; sem ela os engines
+de leitura sao os mesmos do primario. Depois de uma escrita o cliente le do
+primario por alguns segundos (read-your-writes, ver replica.py).
+
+Os parametros de pool vem de Settings (db_pool_*) e os pools sao
+instrumentados (ver metricas.py), expostos em /metrics/db-pool; os comandos
+SQL de cada requisicao entram nas metricas por rota de /metrics.
 """
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import get_settings
+from .metricas import PoolMedido, PoolMedidoAsync, instrumentar, instrumentar_consultas
+from .replica import ler_do_primario
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url)
+_pool_kwargs = dict(
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+)
+
+engine = create_engine(
+    settings.database_url,
+    poolclass=PoolMedido,
+    connect_args={"connect_timeout": settings.db_connect_timeout},
+    **_pool_kwargs,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    settings.async_url,
+    poolclass=PoolMedidoAsync,
+    connect_args={"timeout": settings.db_connect_timeout},
+    **_pool_kwargs,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+replica_configurada = bool(settings.read_database_url)
+
+if replica_configurada:
+    # Somente leitura na conexao: uma escrita por engano numa rota GET falha
+    # ja no teste local (mesmo banco com outra URL), nao so na replica real
+    read_engine = create_engine(
+        settings.read_database_url,
+        poolclass=PoolMedido,
+        connect_args={
+            "connect_timeout": settings.db_connect_timeout,
+            "options": "-c default_transaction_read_only=on",
+        },
+        **_pool_kwargs,
+    )
+    async_read_engine = create_async_engine(
+        settings.read_async_url,
+        poolclass=PoolMedidoAsync,
+        connect_args={
+            "timeout": settings.db_connect_timeout,
+            "server_settings": {"default_transaction_read_only": "on"},
+        },
+        **_pool_kwargs,
+    )
+else:
+    read_engine, async_read_engine = engine, async_engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+pool_metricas = {
+    "sync": instrumentar(engine.pool, "sync"),
+    "async": instrumentar(async_engine.sync_engine.pool, "async"),
+}
+instrumentar_consultas(engine)
+instrumentar_consultas(async_engine.sync_engine)
+if replica_configurada:
+    pool_metricas["sync_replica"] = instrumentar(read_engine.pool, "sync_replica")
+    pool_metricas["async_replica"] = instrumentar(async_read_engine.sync_engine.pool, "async_replica")
+    instrumentar_consultas(read_engine)
+    instrumentar_consultas(async_read_engine.sync_engine)
+
 
 def get_db():
     """Dependency para injetar sessão do banco"""
@@ -20,3 +103,42 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency para injetar sessão async do banco"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request):
+    """Dependency de sessão de leitura: réplica, ou primário logo após uma escrita do cliente"""
+    db = (SessionLocal if ler_do_primario(request) else ReadSessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    """Versão async de get_read_db"""
+    fabrica = AsyncSessionLocal if ler_do_primario(request) else AsyncReadSessionLocal
+    async with fabrica() as db:
+        yield db
+
+
+def detalhe_integridade(exc: IntegrityError) -> str:
+    """Mensagem amigável (HTTP 400) para uma violação de constraint do banco"""
+    error_msg = str(exc.orig).lower() if exc.orig else str(exc).lower()
+
+    if "foreign key constraint" in error_msg or "violates foreign key" in error_msg:
+        return (
+            "Operacao bloqueada: este registro possui dependencias. "
+            "Remova as dependencias antes de deletar."
+        )
+    if "ex_alocacoes_ativa_periodo" in error_msg:
+        return "Colaborador ja possui alocacao ativa neste projeto em periodo sobreposto."
+    if "unique constraint" in error_msg or "duplicate key" in error_msg:
+        return "Registro duplicado: ja existe um registro com estes dados."
+    # Fallback generico (nao expor detalhes internos)
+    return "Operacao invalida devido a restricoes de integridade do banco de dados."
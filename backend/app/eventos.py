@@ -0,0 +1,223 @@
+"""
+Eventos de mudanca para os clientes (Server-Sent Events)
+
+Dashboard e organograma faziam polling a cada poucos segundos, em cada
+navegador aberto, recalculando tudo. Agora as rotas de escrita publicam
+eventos (entidade, acao, id, watermark) e os clientes conectados em
+GET /api/v1/eventos/ refazem so as consultas afetadas.
+
+- publicar / publicar_async: pg_notify no canal CANAL, na transacao da
+  escrita (o Postgres so entrega no commit; rollback descarta). Um comando
+  SQL por escrita, qualquer que seja o numero de eventos. O watermark vem da
+  sequence eventos_seq (migracao 017) e vira o id do evento SSE.
+- BrokerEventos: um por worker. Uma conexao asyncpg dedicada (fora do pool)
+  faz LISTEN e repassa cada notificacao as filas dos clientes do worker;
+  como todo worker escuta o canal, a escrita feita em qualquer um chega a
+  todos. Guarda os ultimos eventos para reenviar na reconexao do cliente
+  (header Last-Event-ID); se o id nao esta mais no historico, ou se o
+  cliente ficou para tras (fila cheia) ou o LISTEN caiu, o cliente recebe
+  `resync` e deve recarregar tudo.
+
+Teste de carga com conexoes ociosas: scripts/soak_eventos.py.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import AsyncIterator, Optional, Union
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+CANAL = "aztech_eventos"
+
+# Acoes
+CRIADO = "criado"
+ATUALIZADO = "atualizado"
+REMOVIDO = "removido"
+
+PUBLICAR_STATEMENT = text("""
+    SELECT pg_notify(:canal, json_build_object(
+        'entidade', e.entidade, 'acao', e.acao, 'id', e.id, 'watermark', nextval('eventos_seq')
+    )::text)
+    FROM unnest(CAST(:entidades AS text[]), CAST(:acoes AS text[]), CAST(:ids AS integer[])) AS e(entidade, acao, id)
+""")
+
+# Intervalo entre tentativas de reabrir o LISTEN e de conferir que a conexao esta viva
+ESPERA_RECONEXAO = 2.0
+INTERVALO_PING = 30.0
+
+RESYNC = "event: resync\ndata: {}\n\n"
+
+Evento = tuple[str, str, int]  # (entidade, acao, id)
+
+
+def _parametros(eventos: tuple[Evento, ...]) -> dict:
+    return {
+        "canal": CANAL,
+        "entidades": [e[0] for e in eventos],
+        "acoes": [e[1] for e in eventos],
+        "ids": [e[2] for e in eventos],
+    }
+
+
+def publicar(db: Union[Session, Connection], *eventos: Evento) -> None:
+    """Publica os eventos na transacao atual; chamar antes do commit (ids ja gerados: flush)"""
+    if eventos:
+        db.execute(PUBLICAR_STATEMENT, _parametros(eventos))
+
+
+async def publicar_async(db: AsyncSession, *eventos: Evento) -> None:
+    """Versao async de publicar"""
+    if eventos:
+        await db.execute(PUBLICAR_STATEMENT, _parametros(eventos))
+
+
+def _bloco_sse(payload: str) -> tuple[int, str, str]:
+    """(watermark, entidade, bloco SSE) de uma notificacao"""
+    evento = json.loads(payload)
+    return (
+        evento["watermark"],
+        evento["entidade"],
+        f"id: {evento['watermark']}\nevent: {evento['entidade']}\ndata: {payload}\n\n",
+    )
+
+
+class _Assinante:
+    __slots__ = ("entidades", "fila")
+
+    def __init__(self, entidades: Optional[frozenset[str]], tamanho_fila: int):
+        self.entidades = entidades
+        self.fila: asyncio.Queue[str] = asyncio.Queue(tamanho_fila)
+
+    def entregar(self, entidade: str, bloco: str) -> None:
+        if self.entidades is None or entidade in self.entidades:
+            self.colocar(bloco)
+
+    def colocar(self, bloco: str) -> None:
+        try:
+            self.fila.put_nowait(bloco)
+        except asyncio.QueueFull:
+            # Cliente nao acompanha: descarta o atrasado e pede recarga completa
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.fila.put_nowait(RESYNC)
+
+
+class BrokerEventos:
+    """Repassa as notificacoes do canal aos clientes SSE deste worker"""
+
+    def __init__(self, dsn: str, historico: int = 1000, tamanho_fila: int = 256, batimento: float = 15.0):
+        self.dsn = dsn
+        self.tamanho_fila = tamanho_fila
+        self.batimento = batimento
+        self._historico: deque[tuple[int, str, str]] = deque(maxlen=historico)
+        self._assinantes: set[_Assinante] = set()
+        self._tarefa: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def conectados(self) -> int:
+        return len(self._assinantes)
+
+    def _garantir_listener(self) -> None:
+        # Iniciado no primeiro cliente, no loop do servidor (de novo se o loop mudou)
+        loop = asyncio.get_running_loop()
+        if self._tarefa is None or self._tarefa.done() or self._loop is not loop:
+            self._loop = loop
+            self._tarefa = loop.create_task(self._escutar())
+
+    async def _escutar(self) -> None:
+        primeira = True
+        while True:
+            conexao = None
+            try:
+                conexao = await asyncpg.connect(self.dsn)
+                await conexao.add_listener(CANAL, self._receber)
+                if not primeira:
+                    # Notificacoes do intervalo sem LISTEN se perderam
+                    self._historico.clear()
+                    self._distribuir_todos(RESYNC)
+                primeira = False
+                while True:
+                    await asyncio.sleep(INTERVALO_PING)
+                    await conexao.fetchval("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("LISTEN %s interrompido (%s); reconectando", CANAL, e)
+                primeira = False
+            finally:
+                if conexao is not None and not conexao.is_closed():
+                    conexao.terminate()
+            await asyncio.sleep(ESPERA_RECONEXAO)
+
+    def _receber(self, conexao, pid, canal, payload: str) -> None:
+        try:
+            watermark, entidade, bloco = _bloco_sse(payload)
+        except (ValueError, KeyError):
+            logger.warning("Evento invalido no canal %s: %r", CANAL, payload[:200])
+            return
+        self._historico.append((watermark, entidade, bloco))
+        for assinante in self._assinantes:
+            assinante.entregar(entidade, bloco)
+
+    def _distribuir_todos(self, bloco: str) -> None:
+        for assinante in self._assinantes:
+            assinante.colocar(bloco)
+
+    def _pendentes(self, ultimo_id: Optional[str], assinante: _Assinante) -> list[str]:
+        """Eventos do historico depois de Last-Event-ID (ou resync se ele nao esta mais la)"""
+        if not ultimo_id:
+            return []
+        try:
+            ultimo = int(ultimo_id)
+        except ValueError:
+            return [RESYNC]
+        # Ordem de entrega (commit), nao de watermark: procura a posicao do id
+        historico = list(self._historico)
+        for posicao, (watermark, _, _) in enumerate(historico):
+            if watermark == ultimo:
+                return [
+                    bloco for _, entidade, bloco in historico[posicao + 1:]
+                    if assinante.entidades is None or entidade in assinante.entidades
+                ]
+        return [RESYNC]
+
+    async def assinar(
+        self, entidades: Optional[frozenset[str]] = None, ultimo_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Blocos SSE para um cliente, com comentario de batimento quando ocioso"""
+        self._garantir_listener()
+        assinante = _Assinante(entidades, self.tamanho_fila)
+        self._assinantes.add(assinante)
+        try:
+            for bloco in self._pendentes(ultimo_id, assinante):
+                yield bloco
+            while True:
+                try:
+                    yield await asyncio.wait_for(assinante.fila.get(), self.batimento)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+        finally:
+            self._assinantes.discard(assinante)
+
+
+def _dsn_asyncpg(url: str) -> str:
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+_settings = get_settings()
+broker = BrokerEventos(
+    _dsn_asyncpg(_settings.async_url),
+    historico=_settings.eventos_historico,
+    tamanho_fila=_settings.eventos_fila,
+    batimento=_settings.eventos_batimento_segundos,
+)
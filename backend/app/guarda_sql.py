@@ -0,0 +1,157 @@
+"""
+Guarda de N+1 (modo dev/teste)
+
+Com SQL_GUARD=warn ou SQL_GUARD=strict, cada requisicao HTTP guarda os
+comandos SQL executados (via metricas.ConsultasRequisicao) e, ao responder:
+
+- sinaliza formatos de comando repetidos (mesmo SQL normalizado executado
+  SQL_GUARD_REPETICOES vezes ou mais), o padrao tipico de N+1;
+- confere o orcamento declarado com @orcamento_sql(n) no endpoint.
+
+Em `warn` a violacao vai para o log e para o header X-SQL-Guard; em `strict`
+a resposta vira 500 com o detalhe, para que testes e scripts de verificacao
+falhem (ver scripts/verificar_orcamento_sql.py). Todas as respostas levam
+X-SQL-Statements com o total de comandos.
+
+Desligado por padrao (SQL_GUARD=off): o middleware nem e registrado.
+"""
+import json
+import logging
+import re
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+from .metricas import consultas_atuais
+
+logger = logging.getLogger(__name__)
+
+ATRIBUTO_ORCAMENTO = "__orcamento_sql__"
+
+_PLACEHOLDER = r"(?:\$\d+(?:::\w+)?|%\(\w+\)s|\?)"
+_LISTA_PLACEHOLDERS = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_PLACEHOLDER_RE = re.compile(_PLACEHOLDER)
+_NUMERO = re.compile(r"\b\d+\b")
+_ESPACOS = re.compile(r"\s+")
+
+
+def orcamento_sql(maximo: int):
+    """
+    Declara o maximo de comandos SQL por requisicao do endpoint.
+
+    @router.get("/dashboard/timeline/")
+    @orcamento_sql(1)
+    async def get_timeline(...): ...
+    """
+    def decorator(endpoint):
+        setattr(endpoint, ATRIBUTO_ORCAMENTO, maximo)
+        return endpoint
+    return decorator
+
+
+def normalizar_comando(sql: str) -> str:
+    """Formato do comando: placeholders, listas IN e literais numericos viram `?`"""
+    sql = _LISTA_PLACEHOLDERS.sub("(?)", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _NUMERO.sub("?", sql)
+    return _ESPACOS.sub(" ", sql).strip()
+
+
+@dataclass
+class Violacao:
+    metodo: str
+    rota: str
+    comandos: int
+    orcamento: int | None
+    repetidos: list[tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def orcamento_excedido(self) -> bool:
+        return self.orcamento is not None and self.comandos > self.orcamento
+
+    def descricao(self) -> str:
+        partes = []
+        if self.orcamento_excedido:
+            partes.append(f"{self.comandos} comandos SQL (orcamento {self.orcamento})")
+        for formato, vezes in self.repetidos:
+            partes.append(f"{vezes}x o mesmo comando: {formato[:160]}")
+        return f"{self.metodo} {self.rota}: " + "; ".join(partes)
+
+
+def avaliar(metodo: str, rota: str, endpoint, formas: Counter, repeticoes: int) -> Violacao | None:
+    """Retorna a violacao da requisicao, ou None se esta dentro do esperado"""
+    por_formato: Counter = Counter()
+    for sql, vezes in formas.items():
+        por_formato[normalizar_comando(sql)] += vezes
+    violacao = Violacao(
+        metodo=metodo,
+        rota=rota,
+        comandos=sum(por_formato.values()),
+        orcamento=getattr(endpoint, ATRIBUTO_ORCAMENTO, None),
+        repetidos=[(f, n) for f, n in por_formato.most_common() if n >= repeticoes],
+    )
+    if violacao.orcamento_excedido or violacao.repetidos:
+        return violacao
+    return None
+
+
+# Ultimas violacoes do processo (inspecao em dev)
+violacoes: deque[Violacao] = deque(maxlen=200)
+
+
+class GuardaSqlMiddleware:
+    """
+    Deve ficar dentro do MetricasMiddleware, que abre o acumulador de SQL
+    da requisicao.
+    """
+
+    def __init__(self, app, modo: str = "warn", repeticoes: int = 5):
+        self.app = app
+        self.estrito = modo == "strict"
+        self.repeticoes = repeticoes
+
+    async def __call__(self, scope, receive, send):
+        consultas = consultas_atuais() if scope["type"] == "http" else None
+        if consultas is None:
+            await self.app(scope, receive, send)
+            return
+
+        consultas.formas = Counter()
+        substituida = False
+
+        async def enviar(message):
+            nonlocal substituida
+            if substituida:
+                return
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                violacao = avaliar(
+                    scope["method"],
+                    getattr(route, "path", scope["path"]),
+                    getattr(route, "endpoint", None),
+                    consultas.formas,
+                    self.repeticoes,
+                )
+                headers = [*message.get("headers", []), (b"x-sql-statements", str(consultas.comandos).encode())]
+                if violacao is not None:
+                    violacoes.append(violacao)
+                    logger.warning("Guarda SQL: %s", violacao.descricao())
+                    if self.estrito:
+                        substituida = True
+                        corpo = json.dumps({"detail": f"Guarda SQL: {violacao.descricao()}"}).encode()
+                        await send({
+                            "type": "http.response.start",
+                            "status": 500,
+                            "headers": [
+                                (b"content-type", b"application/json"),
+                                (b"content-length", str(len(corpo)).encode()),
+                                (b"x-sql-guard", b"violation"),
+                                (b"x-sql-statements", str(consultas.comandos).encode()),
+                            ],
+                        })
+                        await send({"type": "http.response.body", "body": corpo})
+                        return
+                    headers.append((b"x-sql-guard", b"violation"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,274 @@
+"""
+Jobs em segundo plano para operacoes pesadas
+
+Aprovacao de versao, alocacoes em lote, sugestao de equipes e commit de
+cenario rodavam inteiros dentro da requisicao: em bases grandes estouravam o
+timeout do proxy e seguravam uma conexao do pool o tempo todo. Com
+`?async=true` a rota so grava um job (tabela jobs, migracao 018) e responde
+202 com o id; GET /api/v1/jobs/{id} acompanha progresso e resultado.
+
+- tarefa(tipo, resposta): registra a funcao que executa um tipo de job, no
+  modulo da rota e com a mesma logica da chamada sincrona. Ela recebe um
+  ContextoJob e os parametros gravados no job; o retorno e serializado com
+  `resposta` (o response_model da rota) e vira o resultado do job.
+- ExecutorJobs: pool de threads por worker (jobs_workers). Funcoes async
+  rodam num event loop proprio da thread, com sessoes de um engine async
+  sem pool (conexoes asyncpg nao passam de um loop para outro).
+- Progresso e cancelamento: ContextoJob.progresso grava fracao e mensagem
+  (so a fracao, sem etapa nova, no maximo a cada INTERVALO_PROGRESSO) e, na
+  mesma query, le o pedido de cancelamento; se houver, levanta JobCancelado
+  e a transacao do job e desfeita. Job pendente cancelado nem comeca;
+  depois do ultimo ponto de progresso (ja no commit) termina normalmente.
+- Erros: HTTPException vira erro {status_code, detail}; IntegrityError, a
+  mesma mensagem do handler da API (400); o resto, 500 (detalhe no log).
+- Retencao: jobs terminados criados ha mais de jobs_retencao_horas sao
+  removidos por uma limpeza que roda no pool junto com um job novo, no
+  maximo a cada INTERVALO_LIMPEZA por processo.
+
+O pool e local ao processo: um job cujo worker morreu fica em `executando`
+(a coluna worker diz qual processo o pegou).
+"""
+import asyncio
+import inspect
+import logging
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from .config import get_settings
+from .database import SessionLocal, detalhe_integridade
+from .models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# Status
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+CANCELADO = "cancelado"
+TERMINAIS = frozenset({CONCLUIDO, FALHOU, CANCELADO})
+
+# Intervalo minimo entre gravacoes de progresso sem mensagem nova
+INTERVALO_PROGRESSO = 0.5
+
+# Intervalo minimo (segundos) entre limpezas de jobs terminados, por processo
+INTERVALO_LIMPEZA = 600
+
+Progresso = Callable[..., None]
+
+_settings = get_settings()
+
+# Engine dos jobs async: sem pool, cada sessao abre e fecha a conexao no loop da thread
+_async_engine = create_async_engine(
+    _settings.async_url,
+    poolclass=NullPool,
+    connect_args={"timeout": _settings.db_connect_timeout},
+)
+_AsyncJobSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+
+
+def sem_progresso(fracao: float, mensagem: Optional[str] = None) -> None:
+    """Progresso das chamadas sincronas (rota sem ?async): nada a reportar"""
+
+
+class JobCancelado(Exception):
+    """Cancelamento pedido: interrompe o job no proximo ponto de progresso"""
+
+
+class _Tarefa:
+    __slots__ = ("funcao", "resposta")
+
+    def __init__(self, funcao: Callable, resposta: Any):
+        self.funcao = funcao
+        self.resposta = TypeAdapter(resposta) if resposta is not None else None
+
+    def serializar(self, resultado: Any) -> Any:
+        if self.resposta is None:
+            return resultado
+        return self.resposta.dump_python(
+            self.resposta.validate_python(resultado, from_attributes=True), mode="json"
+        )
+
+
+_tarefas: dict[str, _Tarefa] = {}
+
+
+def tarefa(tipo: str, resposta: Any = None):
+    """Registra a funcao que executa os jobs de `tipo`; `resposta` = response_model da rota"""
+    def registrar(funcao: Callable) -> Callable:
+        _tarefas[tipo] = _Tarefa(funcao, resposta)
+        return funcao
+    return registrar
+
+
+class ContextoJob:
+    """Passado a funcao do job: sessoes do banco e progresso/cancelamento"""
+
+    def __init__(self, job_id: uuid.UUID):
+        self.job_id = job_id
+        self._ultima_gravacao = 0.0
+
+    def sessao(self) -> Session:
+        return SessionLocal()
+
+    def sessao_async(self) -> AsyncSession:
+        return _AsyncJobSessionLocal()
+
+    def progresso(self, fracao: float, mensagem: Optional[str] = None) -> None:
+        """Grava o progresso (0..1) e levanta JobCancelado se o cancelamento foi pedido"""
+        agora = time.monotonic()
+        # Mudanca de etapa (com mensagem) sempre grava; so a fracao e limitada
+        if mensagem is None and agora - self._ultima_gravacao < INTERVALO_PROGRESSO:
+            return
+        self._ultima_gravacao = agora
+        valores = {"progresso": min(max(fracao, 0.0), 1.0), "updated_at": datetime.utcnow()}
+        if mensagem is not None:
+            valores["mensagem"] = mensagem
+        with SessionLocal() as db:
+            cancelar = db.execute(
+                update(Job).where(Job.id == self.job_id).values(**valores).returning(Job.cancelamento_solicitado)
+            ).scalar()
+            db.commit()
+        if cancelar:
+            raise JobCancelado()
+
+
+class ExecutorJobs:
+    """Pool de threads que executa os jobs gravados por este worker"""
+
+    def __init__(self, workers: int = 2, retencao_horas: int = 168):
+        self.workers = workers
+        self.retencao = timedelta(hours=retencao_horas)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+        self._ultima_limpeza = float("-inf")
+
+    def enfileirar(self, db: Session, tipo: str, parametros: dict) -> JSONResponse:
+        """Grava o job (commit da sessao da rota), agenda e devolve a resposta 202"""
+        job = self._novo(tipo, parametros)
+        db.add(job)
+        db.commit()
+        self._submeter(job.id)
+        return self._aceito(job.id)
+
+    async def enfileirar_async(self, db: AsyncSession, tipo: str, parametros: dict) -> JSONResponse:
+        """Versao async de enfileirar"""
+        job = self._novo(tipo, parametros)
+        db.add(job)
+        await db.commit()
+        self._submeter(job.id)
+        return self._aceito(job.id)
+
+    def _novo(self, tipo: str, parametros: dict) -> Job:
+        if tipo not in _tarefas:
+            raise KeyError(f"Tipo de job sem tarefa registrada: {tipo}")
+        agora = datetime.utcnow()
+        return Job(
+            id=uuid.uuid4(), tipo=tipo, status=PENDENTE, parametros=parametros,
+            progresso=0.0, created_at=agora, updated_at=agora,
+        )
+
+    def _aceito(self, job_id: uuid.UUID) -> JSONResponse:
+        url = f"{_settings.api_prefix}/jobs/{job_id}"
+        return JSONResponse(
+            status_code=202,
+            content={"id": str(job_id), "status": PENDENTE, "url": url},
+            headers={"Location": url},
+        )
+
+    def _submeter(self, job_id: uuid.UUID) -> None:
+        agora = time.monotonic()
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+            limpar = agora - self._ultima_limpeza >= INTERVALO_LIMPEZA
+            if limpar:
+                self._ultima_limpeza = agora
+        self._pool.submit(self._executar, job_id)
+        if limpar:
+            self._pool.submit(self._limpar)
+
+    def _limpar(self) -> None:
+        """Remove jobs terminados antigos (indice idx_jobs_status_created)"""
+        limite = datetime.utcnow() - self.retencao
+        try:
+            with SessionLocal() as db:
+                removidos = db.execute(
+                    delete(Job).where(Job.status.in_(TERMINAIS), Job.created_at < limite)
+                ).rowcount
+                db.commit()
+        except Exception:
+            logger.exception("Limpeza de jobs terminados falhou")
+            return
+        if removidos:
+            logger.info("Limpeza de jobs: %d job(s) terminado(s) removido(s)", removidos)
+
+    def _executar(self, job_id: uuid.UUID) -> None:
+        try:
+            self._rodar(job_id)
+        except Exception:
+            # Falha ao gravar o proprio estado (banco fora): so resta o log
+            logger.exception("Job %s: falha ao registrar o estado", job_id)
+
+    def _rodar(self, job_id: uuid.UUID) -> None:
+        agora = datetime.utcnow()
+        with SessionLocal() as db:
+            # Pega o job so se ainda esta pendente (cancelado antes de comecar = nao roda)
+            job = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == PENDENTE)
+                .values(status=EXECUTANDO, started_at=agora, updated_at=agora,
+                        worker=f"{socket.gethostname()}:{os.getpid()}")
+                .returning(Job.tipo, Job.parametros)
+            ).one_or_none()
+            db.commit()
+        if job is None:
+            return
+
+        registrada = _tarefas[job.tipo]
+        contexto = ContextoJob(job_id)
+        try:
+            if inspect.iscoroutinefunction(registrada.funcao):
+                resultado = asyncio.run(registrada.funcao(contexto, **job.parametros))
+            else:
+                resultado = registrada.funcao(contexto, **job.parametros)
+            resultado = registrada.serializar(resultado)
+        except JobCancelado:
+            self._finalizar(job_id, CANCELADO, mensagem="Cancelado")
+        except HTTPException as e:
+            self._finalizar(job_id, FALHOU, erro={"status_code": e.status_code, "detail": e.detail})
+        except IntegrityError as e:
+            self._finalizar(job_id, FALHOU, erro={"status_code": 400, "detail": detalhe_integridade(e)})
+        except Exception:
+            logger.exception("Job %s (%s) falhou", job_id, job.tipo)
+            self._finalizar(job_id, FALHOU, erro={"status_code": 500, "detail": "Erro interno ao executar o job"})
+        else:
+            self._finalizar(job_id, CONCLUIDO, progresso=1.0, resultado=resultado)
+
+    def _finalizar(self, job_id: uuid.UUID, status: str, **valores) -> None:
+        agora = datetime.utcnow()
+        with SessionLocal() as db:
+            db.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(status=status, finished_at=agora, updated_at=agora, **valores)
+            )
+            db.commit()
+
+
+executor = ExecutorJobs(_settings.jobs_workers, _settings.jobs_retencao_horas)
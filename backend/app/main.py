@@ -1,13 +1,20 @@
 """
 AZ TECH API - Aplicação Principal
 """
+from time import perf_counter
+
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
+from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 
+from .compressao import CompressaoMiddleware
 from .config import get_settings
-from .database import engine, Base
+from .database import detalhe_integridade, engine, pool_metricas, replica_configurada
+from .guarda_sql import GuardaSqlMiddleware
+from .metricas import MetricasMiddleware, exportar_prometheus
+from .replica import ReplicaStickyMiddleware
 from .routers import (
     # Estrutura Organizacional
     setores_router,
@@ -19,14 +26,19 @@ from .routers import (
     projetos_planejamento_router,
     # Alocacao (Dashboard)
     alocacoes_router,
+    cenarios_router,
+    # Eventos
+    eventos_router,
+    # Jobs
+    jobs_router,
     # Legacy
     tipos_projeto_router,
 )
 
 settings = get_settings()
 
-# Criar tabelas
-Base.metadata.create_all(bind=engine)
+# O schema é gerenciado pelo runner de migrações (python -m app.migrate upgrade),
+# executado uma vez por deploy; o app não roda DDL na importação.
 
 # Criar app
 app = FastAPI(
@@ -35,6 +47,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     redirect_slashes=False,  # Não fazer redirect automático com/sem trailing slash
+    # orjson no lugar do json.dumps; listas grandes usam app.serializacao
+    default_response_class=ORJSONResponse,
 )
 
 # CORS
@@ -44,8 +58,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Janela de leitura no primario apos uma escrita (app.replica), lida pelo SPA
+    expose_headers=["X-Ler-Primario"],
 )
 
+# Guarda de N+1 (so em dev/teste); precisa ficar dentro do MetricasMiddleware
+if settings.sql_guard != "off":
+    app.add_middleware(GuardaSqlMiddleware, modo=settings.sql_guard, repeticoes=settings.sql_guard_repeticoes)
+
+# Read-your-writes: apos uma escrita o cliente le do primario por alguns segundos
+if replica_configurada:
+    app.add_middleware(ReplicaStickyMiddleware, segundos=settings.replica_sticky_segundos)
+
+# Compressao (gzip/zstd/br); dentro do MetricasMiddleware, que mede os bytes enviados
+app.add_middleware(CompressaoMiddleware, minimo=settings.compressao_minimo_bytes)
+
+# Metricas por rota (latencia, SQL, bytes); adicionado por ultimo = mais externo
+app.add_middleware(MetricasMiddleware)
+
 
 # Handler global para IntegrityError (violacoes de constraint do banco)
 @app.exception_handler(IntegrityError)
@@ -54,31 +84,7 @@ async def integrity_error_handler(request: Request, exc: IntegrityError):
     Captura violacoes de constraint do banco de dados e retorna
     erro 400 com mensagem amigavel ao inves de erro 500 generico.
     """
-    error_msg = str(exc.orig).lower() if exc.orig else str(exc).lower()
-
-    if "foreign key constraint" in error_msg or "violates foreign key" in error_msg:
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "detail": "Operacao bloqueada: este registro possui dependencias. "
-                          "Remova as dependencias antes de deletar."
-            }
-        )
-    elif "unique constraint" in error_msg or "duplicate key" in error_msg:
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "detail": "Registro duplicado: ja existe um registro com estes dados."
-            }
-        )
-    else:
-        # Fallback generico (nao expor detalhes internos)
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "detail": "Operacao invalida devido a restricoes de integridade do banco de dados."
-            }
-        )
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": detalhe_integridade(exc)})
 
 
 # Routers - Estrutura Organizacional
@@ -93,6 +99,13 @@ app.include_router(projetos_planejamento_router, prefix=settings.api_prefix)
 
 # Routers - Alocacao (Dashboard)
 app.include_router(alocacoes_router, prefix=settings.api_prefix)
+app.include_router(cenarios_router, prefix=settings.api_prefix)
+
+# Eventos de mudanca (SSE)
+app.include_router(eventos_router, prefix=settings.api_prefix)
+
+# Jobs em segundo plano (?async=true nas rotas pesadas)
+app.include_router(jobs_router, prefix=settings.api_prefix)
 
 # Legacy (manter por compatibilidade)
 app.include_router(tipos_projeto_router, prefix=settings.api_prefix)
@@ -106,8 +119,52 @@ def root():
 
 @app.get("/health")
 def health():
-    """Health check detalhado"""
+    """Health check detalhado: ping real no banco com latencia medida"""
+    inicio = perf_counter()
+    try:
+        with engine.connect() as conn:
+            # SET nao aceita parametros; set_config(..., true) = SET LOCAL com valor bind
+            conn.execute(
+                text("SELECT set_config('statement_timeout', :ms, true)"),
+                {"ms": str(int(settings.health_timeout * 1000))},
+            )
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "status": "unhealthy",
+                "database": "unavailable",
+                "erro": type(e).__name__,
+                "latencia_ms": round((perf_counter() - inicio) * 1000, 2),
+            },
+        )
     return {
         "status": "healthy",
         "database": "connected",
+        "latencia_ms": round((perf_counter() - inicio) * 1000, 2),
     }
+
+
+@app.get("/metrics/db-pool")
+def metrics_db_pool():
+    """Estado e histogramas (espera e uso de conexao) dos pools sync e async"""
+    return {
+        "config": {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "pool_recycle": settings.db_pool_recycle,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+        },
+        "pools": {nome: metricas.snapshot() for nome, metricas in pool_metricas.items()},
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Metricas por rota e dos pools no formato texto do Prometheus"""
+    return PlainTextResponse(
+        exportar_prometheus(pool_metricas),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
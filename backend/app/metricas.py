@@ -0,0 +1,366 @@
+"""
+Metricas em processo
+
+Histogramas cumulativos (estilo Prometheus) e:
+- as metricas do pool de conexoes dos engines: conexoes em uso, overflow,
+  tempo de espera por uma conexao livre e tempo que cada conexao fica
+  emprestada;
+- as metricas por rota: latencia, tempo de banco, quantidade de comandos SQL
+  e bytes de resposta, coletadas pelo MetricasMiddleware e pelos eventos
+  before/after_cursor_execute dos engines.
+
+Tudo fica em memoria, por processo, e e exportado em /metrics no formato
+texto do Prometheus.
+"""
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Limites superiores dos buckets, em segundos
+BUCKETS_ESPERA = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_USO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histograma:
+    """Histograma thread-safe com buckets fixos"""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self._contagens = [0] * (len(buckets) + 1)  # ultimo = +Inf
+        self._soma = 0.0
+        self._lock = Lock()
+
+    def observar(self, valor: float) -> None:
+        with self._lock:
+            self._contagens[bisect_left(self.buckets, valor)] += 1
+            self._soma += valor
+
+    def snapshot(self) -> dict:
+        """Buckets cumulativos (le = limite superior), total e soma"""
+        with self._lock:
+            contagens = list(self._contagens)
+            soma = self._soma
+        cumulativos, acumulado = {}, 0
+        for limite, n in zip((*self.buckets, float("inf")), contagens):
+            acumulado += n
+            if limite == float("inf"):
+                chave = "+Inf"
+            else:
+                chave = str(limite) if isinstance(limite, int) else f"{limite:g}"
+            cumulativos[chave] = acumulado
+        return {"buckets": cumulativos, "count": acumulado, "sum": round(soma, 6)}
+
+
+class MetricasPool:
+    """Contadores e histogramas de um pool de conexoes"""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.pool = None
+        self.espera = Histograma(BUCKETS_ESPERA)
+        self.uso = Histograma(BUCKETS_USO)
+        self.checkouts = 0
+        self.conexoes_abertas = 0
+        self.invalidacoes = 0
+        self.timeouts = 0
+        self.pico_checked_out = 0
+        self.pico_overflow = 0
+        self._lock = Lock()
+
+    def registrar_espera(self, segundos: float, timeout: bool = False) -> None:
+        self.espera.observar(segundos)
+        if timeout:
+            with self._lock:
+                self.timeouts += 1
+
+    def registrar_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if self.pool is not None:
+                self.pico_checked_out = max(self.pico_checked_out, self.pool.checkedout())
+                self.pico_overflow = max(self.pico_overflow, self.pool.overflow())
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            dados = {
+                "checkouts": self.checkouts,
+                "conexoes_abertas": self.conexoes_abertas,
+                "invalidacoes": self.invalidacoes,
+                "timeouts": self.timeouts,
+                "pico_checked_out": self.pico_checked_out,
+                "pico_overflow": self.pico_overflow,
+            }
+        return {
+            "pool_size": pool.size() if pool is not None else None,
+            "checked_out": pool.checkedout() if pool is not None else None,
+            "checked_in": pool.checkedin() if pool is not None else None,
+            # Negativo enquanto o pool ainda nao abriu todas as pool_size conexoes
+            "overflow": pool.overflow() if pool is not None else None,
+            **dados,
+            "espera_segundos": self.espera.snapshot(),
+            "uso_segundos": self.uso.snapshot(),
+        }
+
+
+class _PoolMedidoMixin:
+    """Mede o tempo de _do_get (espera por uma conexao livre ou abertura de uma nova)"""
+
+    metricas: MetricasPool | None = None
+
+    def _do_get(self):
+        inicio = perf_counter()
+        try:
+            conexao = super()._do_get()
+        except Exception as e:
+            if self.metricas is not None:
+                self.metricas.registrar_espera(perf_counter() - inicio, timeout=isinstance(e, exc.TimeoutError))
+            raise
+        if self.metricas is not None:
+            self.metricas.registrar_espera(perf_counter() - inicio)
+        return conexao
+
+    def recreate(self):
+        # engine.dispose() recria o pool; as metricas continuam no novo
+        novo = super().recreate()
+        novo.metricas = self.metricas
+        if self.metricas is not None:
+            self.metricas.pool = novo
+        return novo
+
+
+class PoolMedido(_PoolMedidoMixin, QueuePool):
+    pass
+
+
+class PoolMedidoAsync(_PoolMedidoMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrumentar(pool, nome: str) -> MetricasPool:
+    """Liga as metricas a um PoolMedido/PoolMedidoAsync via eventos do pool"""
+    metricas = MetricasPool(nome)
+    metricas.pool = pool
+    pool.metricas = metricas
+
+    @event.listens_for(pool, "connect")
+    def _connect(dbapi_connection, connection_record):
+        with metricas._lock:
+            metricas.conexoes_abertas += 1
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_em"] = perf_counter()
+        metricas.registrar_checkout()
+
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        inicio = connection_record.info.pop("checkout_em", None)
+        if inicio is not None:
+            metricas.uso.observar(perf_counter() - inicio)
+
+    @event.listens_for(pool, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        with metricas._lock:
+            metricas.invalidacoes += 1
+
+    return metricas
+
+
+# ============ METRICAS POR ROTA ============
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_DB = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKETS_COMANDOS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+ROTA_NAO_MAPEADA = "<nao_mapeada>"
+
+
+@dataclass
+class ConsultasRequisicao:
+    """Acumulador de SQL da requisicao atual (compartilhado com o threadpool)"""
+    comandos: int = 0
+    tempo_db: float = 0.0
+    formas: Counter | None = None  # SQL -> execucoes; so com a guarda de N+1 ligada
+
+
+_consultas_atuais: ContextVar[ConsultasRequisicao | None] = ContextVar("consultas_atuais", default=None)
+
+
+def consultas_atuais() -> ConsultasRequisicao | None:
+    return _consultas_atuais.get()
+
+
+class MetricasRota:
+    def __init__(self):
+        self.latencia = Histograma(BUCKETS_LATENCIA)
+        self.tempo_db = Histograma(BUCKETS_DB)
+        self.comandos = Histograma(BUCKETS_COMANDOS)
+        self.bytes = Histograma(BUCKETS_BYTES)
+
+
+class RegistroRotas:
+    """Metricas agregadas por (metodo, rota, status)"""
+
+    def __init__(self):
+        self._rotas: dict[tuple[str, str, int], MetricasRota] = {}
+        self._lock = Lock()
+
+    def observar(
+        self, metodo: str, rota: str, status: int, duracao: float, consultas: ConsultasRequisicao, nbytes: int
+    ) -> None:
+        chave = (metodo, rota, status)
+        metricas = self._rotas.get(chave)
+        if metricas is None:
+            with self._lock:
+                metricas = self._rotas.setdefault(chave, MetricasRota())
+        metricas.latencia.observar(duracao)
+        metricas.tempo_db.observar(consultas.tempo_db)
+        metricas.comandos.observar(consultas.comandos)
+        metricas.bytes.observar(nbytes)
+
+    def itens(self) -> list[tuple[tuple[str, str, int], MetricasRota]]:
+        with self._lock:
+            return sorted(self._rotas.items())
+
+
+rotas = RegistroRotas()
+
+
+def instrumentar_consultas(engine) -> None:
+    """Soma comandos e tempo de banco na requisicao atual (engine sync ou async.sync_engine)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and _consultas_atuais.get() is not None:
+            context._metricas_inicio = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        consultas = _consultas_atuais.get()
+        if consultas is None:
+            return
+        consultas.comandos += 1
+        if consultas.formas is not None:
+            consultas.formas[statement] += 1
+        inicio = getattr(context, "_metricas_inicio", None)
+        if inicio is not None:
+            consultas.tempo_db += perf_counter() - inicio
+
+
+class MetricasMiddleware:
+    """
+    Middleware ASGI que mede cada requisicao HTTP e registra em `rotas`.
+
+    A rota e o template do path (ex: /api/v1/colaboradores/{colaborador_id}),
+    nao o path concreto, para manter a cardinalidade baixa.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        consultas = ConsultasRequisicao()
+        token = _consultas_atuais.set(consultas)
+        inicio = perf_counter()
+        status = 500
+        nbytes = 0
+
+        async def enviar(message):
+            nonlocal status, nbytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                nbytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _consultas_atuais.reset(token)
+            rota = getattr(scope.get("route"), "path", None) or ROTA_NAO_MAPEADA
+            rotas.observar(scope["method"], rota, status, perf_counter() - inicio, consultas, nbytes)
+
+
+# ============ EXPORTACAO PROMETHEUS ============
+
+def _rotulos(**rotulos) -> str:
+    partes = []
+    for nome, valor in rotulos.items():
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        partes.append(f'{nome}="{valor}"')
+    return ",".join(partes)
+
+
+def _linhas_histograma(nome: str, snapshot: dict, **rotulos) -> list[str]:
+    base = _rotulos(**rotulos)
+    sep = "," if base else ""
+    linhas = [f'{nome}_bucket{{{base}{sep}le="{le}"}} {n}' for le, n in snapshot["buckets"].items()]
+    linhas.append(f"{nome}_sum{{{base}}} {snapshot['sum']}")
+    linhas.append(f"{nome}_count{{{base}}} {snapshot['count']}")
+    return linhas
+
+
+def exportar_prometheus(pools: dict[str, MetricasPool]) -> str:
+    """Todas as metricas no formato texto do Prometheus (exposition format 0.0.4)"""
+    linhas: list[str] = []
+    itens = rotas.itens()
+
+    familias_rota = (
+        ("aztech_http_request_duration_seconds", "Latencia das requisicoes HTTP", "latencia"),
+        ("aztech_http_request_db_seconds", "Tempo gasto em SQL por requisicao", "tempo_db"),
+        ("aztech_http_request_db_statements", "Comandos SQL executados por requisicao", "comandos"),
+        ("aztech_http_response_size_bytes", "Tamanho do corpo da resposta", "bytes"),
+    )
+    for nome, ajuda, atributo in familias_rota:
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} histogram")
+        for (metodo, rota, status), metricas in itens:
+            linhas.extend(_linhas_histograma(
+                nome, getattr(metricas, atributo).snapshot(), method=metodo, route=rota, status=status
+            ))
+
+    snapshots = {nome: metricas.snapshot() for nome, metricas in pools.items()}
+    gauges = (
+        ("aztech_db_pool_size", "Tamanho configurado do pool", "pool_size"),
+        ("aztech_db_pool_checked_out", "Conexoes emprestadas agora", "checked_out"),
+        ("aztech_db_pool_checked_in", "Conexoes ociosas no pool", "checked_in"),
+        ("aztech_db_pool_overflow", "Conexoes de overflow (negativo = pool ainda nao cheio)", "overflow"),
+    )
+    for nome, ajuda, chave in gauges:
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} gauge")
+        for pool, snapshot in snapshots.items():
+            linhas.append(f"{nome}{{{_rotulos(pool=pool)}}} {snapshot[chave]}")
+    contadores = (
+        ("aztech_db_pool_checkouts_total", "Conexoes entregues pelo pool", "checkouts"),
+        ("aztech_db_pool_connects_total", "Conexoes novas abertas", "conexoes_abertas"),
+        ("aztech_db_pool_invalidations_total", "Conexoes invalidadas", "invalidacoes"),
+        ("aztech_db_pool_timeouts_total", "Esperas por conexao que estouraram pool_timeout", "timeouts"),
+    )
+    for nome, ajuda, chave in contadores:
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} counter")
+        for pool, snapshot in snapshots.items():
+            linhas.append(f"{nome}{{{_rotulos(pool=pool)}}} {snapshot[chave]}")
+    for nome, ajuda, chave in (
+        ("aztech_db_pool_wait_seconds", "Espera para obter uma conexao do pool", "espera_segundos"),
+        ("aztech_db_pool_hold_seconds", "Tempo que cada conexao fica emprestada", "uso_segundos"),
+    ):
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} histogram")
+        for pool, snapshot in snapshots.items():
+            linhas.extend(_linhas_histograma(nome, snapshot[chave], pool=pool))
+
+    return "\n".join(linhas) + "\n"
@@ -0,0 +1,351 @@
+"""
+Runner de migrações SQL versionadas (backend/migrations/NNN_nome.sql)
+
+Roda uma vez por deploy, via CLI, antes de subir os workers; o app em si não
+executa DDL na importação nem no startup.
+
+Uso (a partir de backend/):
+    python -m app.migrate upgrade            # aplica as pendentes, em ordem
+    python -m app.migrate upgrade --dry-run  # só lista o que seria aplicado
+    python -m app.migrate status
+    python -m app.migrate verify             # falha se algum arquivo aplicado mudou
+    python -m app.migrate baseline 012       # marca até 012 como aplicadas sem executar
+
+Regras:
+- Cada migração aplicada é registrada em schema_migrations com o SHA-256 do
+  arquivo. Alterar um arquivo já aplicado é erro: crie uma migração nova.
+- Por padrão o arquivo inteiro roda em uma transação, junto com o registro.
+- Arquivos com a linha `-- migrate: no-transaction` rodam em autocommit,
+  comando a comando, o que permite CREATE INDEX CONCURRENTLY. Esses comandos
+  devem ser idempotentes (IF NOT EXISTS), pois uma falha no meio deixa os
+  anteriores aplicados. Índices inválidos deixados por um CONCURRENTLY
+  interrompido são removidos antes de recriar.
+- Um advisory lock impede dois runners simultâneos (ex: deploy com várias
+  réplicas).
+"""
+import argparse
+import hashlib
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.pool import NullPool
+
+from .config import get_settings
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Chave arbitrária (fixa) do pg_advisory_lock do runner
+ADVISORY_LOCK_ID = 7_311_903_204
+
+NO_TRANSACTION = re.compile(r"^--\s*migrate:\s*no-transaction\s*$", re.MULTILINE | re.IGNORECASE)
+NOME_ARQUIVO = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+INDEX_CONCURRENTLY = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?\"?(\w+)\"?",
+    re.IGNORECASE,
+)
+
+# Tabelas que o create_all antigo criava e o init.sql não
+TABELAS_LEGADAS = ("cargos", "projetos_planejamento", "alocacoes")
+
+CREATE_SCHEMA_MIGRATIONS = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    versao VARCHAR(20) PRIMARY KEY,
+    nome VARCHAR(200) NOT NULL,
+    checksum CHAR(64) NOT NULL,
+    aplicada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    duracao_ms INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+class MigracaoErro(Exception):
+    pass
+
+
+@dataclass
+class Migracao:
+    versao: str
+    nome: str
+    caminho: Path
+    sql: str
+    checksum: str
+
+    @property
+    def transacional(self) -> bool:
+        return NO_TRANSACTION.search(self.sql) is None
+
+
+def descobrir(diretorio: Path = MIGRATIONS_DIR) -> list[Migracao]:
+    """Lista as migrações do diretório ordenadas pela versão numérica"""
+    migracoes = []
+    for caminho in diretorio.glob("*.sql"):
+        match = NOME_ARQUIVO.match(caminho.name)
+        if not match:
+            raise MigracaoErro(f"Nome de migração inválido: {caminho.name} (esperado NNN_nome.sql)")
+        conteudo = caminho.read_bytes()
+        migracoes.append(Migracao(
+            versao=match.group(1),
+            nome=match.group(2),
+            caminho=caminho,
+            sql=conteudo.decode("utf-8"),
+            checksum=hashlib.sha256(conteudo).hexdigest(),
+        ))
+    migracoes.sort(key=lambda m: int(m.versao))
+    versoes = [int(m.versao) for m in migracoes]
+    if len(set(versoes)) != len(versoes):
+        raise MigracaoErro("Há mais de uma migração com a mesma versão")
+    return migracoes
+
+
+def dividir_comandos(sql: str) -> list[str]:
+    """
+    Divide um script em comandos no `;`, respeitando strings, identificadores
+    entre aspas, dollar quotes ($$ ... $$) e comentários.
+    """
+    comandos, atual = [], []
+    i, n = 0, len(sql)
+    while i < n:
+        c = sql[i]
+        if sql.startswith("--", i):
+            fim = sql.find("\n", i)
+            fim = n if fim == -1 else fim
+            atual.append(sql[i:fim])
+            i = fim
+        elif sql.startswith("/*", i):
+            fim = sql.find("*/", i + 2)
+            fim = n if fim == -1 else fim + 2
+            atual.append(sql[i:fim])
+            i = fim
+        elif c in ("'", '"'):
+            fim = i + 1
+            while fim < n:
+                if sql[fim] == c:
+                    if fim + 1 < n and sql[fim + 1] == c:  # aspas escapadas ('' ou "")
+                        fim += 2
+                        continue
+                    break
+                fim += 1
+            atual.append(sql[i:fim + 1])
+            i = fim + 1
+        elif c == "$" and (tag := re.match(r"\$(\w*)\$", sql[i:])):
+            delimitador = tag.group(0)
+            fim = sql.find(delimitador, i + len(delimitador))
+            fim = n if fim == -1 else fim + len(delimitador)
+            atual.append(sql[i:fim])
+            i = fim
+        elif c == ";":
+            comandos.append("".join(atual))
+            atual = []
+            i += 1
+        else:
+            atual.append(c)
+            i += 1
+    comandos.append("".join(atual))
+    return [cmd.strip() for cmd in comandos if _tem_codigo(cmd)]
+
+
+def _tem_codigo(comando: str) -> bool:
+    sem_comentarios = re.sub(r"--[^\n]*|/\*.*?\*/", "", comando, flags=re.DOTALL)
+    return bool(sem_comentarios.strip())
+
+
+# ============ EXECUÇÃO ============
+
+def _executar_script(conn: Connection, sql: str) -> None:
+    # Cursor DBAPI direto: o script vai inteiro, sem interpretação de parâmetros
+    # (evita que `%` em LIKE/ILIKE seja tratado como placeholder)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(sql)
+    finally:
+        cursor.close()
+
+
+def _aplicadas(conn: Connection) -> dict[str, tuple[str, str]]:
+    rows = conn.execute(text("SELECT versao, nome, checksum FROM schema_migrations")).all()
+    return {versao: (nome, checksum) for versao, nome, checksum in rows}
+
+
+def _registrar(conn: Connection, migracao: Migracao, duracao_ms: int) -> None:
+    conn.execute(
+        text(
+            "INSERT INTO schema_migrations (versao, nome, checksum, duracao_ms) "
+            "VALUES (:versao, :nome, :checksum, :duracao_ms)"
+        ),
+        {"versao": migracao.versao, "nome": migracao.nome, "checksum": migracao.checksum, "duracao_ms": duracao_ms},
+    )
+
+
+def _remover_indices_invalidos(conn: Connection, migracao: Migracao) -> None:
+    """Dropa índices que um CONCURRENTLY interrompido deixou inválidos"""
+    for nome in INDEX_CONCURRENTLY.findall(migracao.sql):
+        invalido = conn.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :nome AND NOT i.indisvalid"
+            ),
+            {"nome": nome},
+        ).first()
+        if invalido:
+            print(f"  removendo índice inválido {nome}")
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{nome}"'))
+
+
+def _aplicar(conn: Connection, migracao: Migracao) -> int:
+    inicio = time.perf_counter()
+    if migracao.transacional:
+        with conn.begin():
+            _executar_script(conn, migracao.sql)
+            duracao_ms = int((time.perf_counter() - inicio) * 1000)
+            _registrar(conn, migracao, duracao_ms)
+        return duracao_ms
+
+    conn.execution_options(isolation_level="AUTOCOMMIT")
+    try:
+        _remover_indices_invalidos(conn, migracao)
+        for comando in dividir_comandos(migracao.sql):
+            _executar_script(conn, comando)
+        duracao_ms = int((time.perf_counter() - inicio) * 1000)
+        _registrar(conn, migracao, duracao_ms)
+    finally:
+        conn.rollback()  # encerra a transação lógica (no-op em autocommit)
+        conn.execution_options(isolation_level="READ COMMITTED")
+    return duracao_ms
+
+
+def _tem_tabelas_legadas(conn: Connection) -> bool:
+    # O init.sql do Docker cria só a estrutura organizacional; estas tabelas
+    # em um banco sem histórico indicam um schema criado fora do runner
+    return bool(conn.execute(
+        text("SELECT 1 FROM information_schema.tables WHERE table_name IN :nomes").bindparams(
+            bindparam("nomes", expanding=True)
+        ),
+        {"nomes": list(TABELAS_LEGADAS)},
+    ).first())
+
+
+def _divergentes(migracoes: list[Migracao], aplicadas: dict) -> list[Migracao]:
+    return [m for m in migracoes if m.versao in aplicadas and aplicadas[m.versao][1] != m.checksum]
+
+
+class Runner:
+    def __init__(self, database_url: str, diretorio: Path = MIGRATIONS_DIR):
+        self.engine = create_engine(database_url, poolclass=NullPool)
+        self.diretorio = diretorio
+
+    def _conectar(self):
+        """Conexão em autocommit com o advisory lock do runner"""
+        conn = self.engine.connect()
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+        conn.execute(text(CREATE_SCHEMA_MIGRATIONS))
+        conn.rollback()
+        # Cada migração transacional abre sua própria transação
+        conn.execution_options(isolation_level="READ COMMITTED")
+        return conn
+
+    def upgrade(self, ate: str | None = None, dry_run: bool = False) -> list[Migracao]:
+        migracoes = descobrir(self.diretorio)
+        with self._conectar() as conn:
+            aplicadas = _aplicadas(conn)
+            legado = not aplicadas and _tem_tabelas_legadas(conn)
+            conn.commit()
+            if legado:
+                raise MigracaoErro(
+                    "Banco já tem tabelas mas nenhum histórico em schema_migrations "
+                    "(criado pelo create_all antigo ou com migrações aplicadas à mão). "
+                    "Registre o que já está aplicado com `baseline <versão>` antes do upgrade."
+                )
+            divergentes = _divergentes(migracoes, aplicadas)
+            if divergentes:
+                raise MigracaoErro(
+                    "Migrações já aplicadas foram alteradas (checksum diferente): "
+                    + ", ".join(m.caminho.name for m in divergentes)
+                    + ". Crie uma nova migração em vez de editar uma aplicada."
+                )
+            pendentes = [
+                m for m in migracoes
+                if m.versao not in aplicadas and (ate is None or int(m.versao) <= int(ate))
+            ]
+            for migracao in pendentes:
+                if dry_run:
+                    print(f"pendente  {migracao.caminho.name}")
+                    continue
+                modo = "" if migracao.transacional else " (sem transação)"
+                print(f"aplicando {migracao.caminho.name}{modo}...", flush=True)
+                try:
+                    duracao_ms = _aplicar(conn, migracao)
+                except Exception as e:
+                    raise MigracaoErro(f"Falha em {migracao.caminho.name}: {e}") from e
+                print(f"  ok em {duracao_ms} ms")
+            return pendentes
+
+    def baseline(self, ate: str) -> list[Migracao]:
+        """Registra as migrações até `ate` como aplicadas, sem executá-las"""
+        migracoes = [m for m in descobrir(self.diretorio) if int(m.versao) <= int(ate)]
+        with self._conectar() as conn:
+            aplicadas = _aplicadas(conn)
+            conn.commit()
+            novas = [m for m in migracoes if m.versao not in aplicadas]
+            with conn.begin():
+                for migracao in novas:
+                    _registrar(conn, migracao, 0)
+            return novas
+
+    def status(self) -> list[tuple[Migracao, str]]:
+        migracoes = descobrir(self.diretorio)
+        with self._conectar() as conn:
+            aplicadas = _aplicadas(conn)
+            conn.commit()
+        resultado = []
+        for m in migracoes:
+            if m.versao not in aplicadas:
+                resultado.append((m, "pendente"))
+            elif aplicadas[m.versao][1] != m.checksum:
+                resultado.append((m, "ALTERADA"))
+            else:
+                resultado.append((m, "aplicada"))
+        return resultado
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrate", description="Runner de migrações SQL")
+    parser.add_argument("--database-url", help="padrão: DATABASE_URL das Settings")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_upgrade = sub.add_parser("upgrade", help="aplica as migrações pendentes")
+    p_upgrade.add_argument("--ate", help="aplica só até esta versão")
+    p_upgrade.add_argument("--dry-run", action="store_true")
+    sub.add_parser("status", help="lista migrações e estado")
+    sub.add_parser("verify", help="falha se há pendentes ou arquivos aplicados alterados")
+    p_baseline = sub.add_parser("baseline", help="marca migrações como aplicadas sem executar")
+    p_baseline.add_argument("ate", help="última versão já presente no banco")
+    args = parser.parse_args(argv)
+
+    runner = Runner(args.database_url or get_settings().database_url)
+    try:
+        if args.comando == "upgrade":
+            aplicadas = runner.upgrade(ate=args.ate, dry_run=args.dry_run)
+            if not aplicadas:
+                print("Banco atualizado, nada a aplicar.")
+        elif args.comando == "baseline":
+            for m in runner.baseline(args.ate):
+                print(f"registrada {m.caminho.name}")
+        else:
+            estados = runner.status()
+            for m, estado in estados:
+                print(f"{estado:<9} {m.caminho.name}")
+            if args.comando == "verify" and any(estado != "aplicada" for _, estado in estados):
+                return 1
+    except MigracaoErro as e:
+        print(f"ERRO: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
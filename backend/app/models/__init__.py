@@ -14,6 +14,20 @@ from .projeto_planejamento import ProjetoPlanejamento, StatusProjeto
 # Alocacao (Dashboard)
 from .alocacao import Alocacao, StatusAlocacao, FuncaoAlocacao
 
+# Jobs em segundo plano
+from .job import Job
+
+# Servicos
+from .servico import (
+    Empresa,
+    Cliente,
+    CategoriaServico,
+    TipoServico,
+    Servico,
+    ServicoRequisitoEquipe,
+    ServicoEquipeAtribuida,
+)
+
 # Legacy
 from .tipo_projeto import TipoProjeto
 
@@ -33,6 +47,16 @@ __all__ = [
     "Alocacao",
     "StatusAlocacao",
     "FuncaoAlocacao",
+    # Jobs em segundo plano
+    "Job",
+    # Servicos
+    "Empresa",
+    "Cliente",
+    "CategoriaServico",
+    "TipoServico",
+    "Servico",
+    "ServicoRequisitoEquipe",
+    "ServicoEquipeAtribuida",
     # Legacy
     "TipoProjeto",
 ]
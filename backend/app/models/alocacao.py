@@ -5,7 +5,8 @@ Vincula colaboradores a projetos de planejamento com funcao,
 periodo e dedicacao.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Computed, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import TSRANGE
 from sqlalchemy.orm import relationship
 import enum
 
@@ -57,6 +58,17 @@ class Alocacao(Base):
     data_inicio = Column(DateTime, nullable=False)
     data_fim = Column(DateTime, nullable=True)  # null = sem previsao de fim
 
+    # Gerado pelo banco; base da constraint de exclusao ex_alocacoes_ativa_periodo
+    # (migracao 016): ativas do mesmo colaborador e projeto nao se sobrepoem
+    periodo = Column(
+        TSRANGE,
+        Computed(
+            "CASE WHEN data_fim < data_inicio THEN 'empty'::tsrange "
+            "ELSE tsrange(data_inicio, data_fim, '[]') END",
+            persisted=True,
+        ),
+    )
+
     # Dedicacao
     horas_semanais = Column(Float, default=44.0, nullable=False)  # Padrao: 44h/semana
 
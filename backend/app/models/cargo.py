@@ -2,7 +2,8 @@
 Model de Cargo - Funções/Cargos disponíveis na empresa
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -18,6 +19,12 @@ class Cargo(Base):
     nivel_id = Column(Integer, ForeignKey("niveis_hierarquicos.id"), nullable=True)
     setor_id = Column(Integer, ForeignKey("setores.id"), nullable=True)
     ordem = Column(Integer, nullable=False, default=0)
+    # Funções que o cargo pode exercer em serviços (ver FUNCOES_SERVICO)
+    funcoes_servico = Column(ARRAY(Text), default=list)
+    # Projetos simultâneos que uma pessoa com o cargo pode assumir
+    capacidade_projetos = Column(Integer, nullable=False, default=3)
+    # True = participa de projetos mas não conta na capacidade (ex: supervisores)
+    nao_mensurar_capacidade = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
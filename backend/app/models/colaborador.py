@@ -15,6 +15,7 @@ class Colaborador(Base):
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(200), nullable=False)
     cargo = Column(String(200), nullable=False)
+    cargo_id = Column(Integer, ForeignKey("cargos.id"), nullable=True)
     setor_id = Column(Integer, ForeignKey("setores.id"), nullable=False)
     subsetor_id = Column(Integer, ForeignKey("subsetores.id"), nullable=True)
     nivel_id = Column(Integer, ForeignKey("niveis_hierarquicos.id"), nullable=False)
@@ -0,0 +1,35 @@
+"""
+Modelo de Job
+Operação pesada executada em segundo plano (ver app/jobs.py).
+"""
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, Float, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from ..database import Base
+
+
+class Job(Base):
+    """Job em segundo plano com progresso, resultado e cancelamento"""
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    tipo = Column(String(100), nullable=False)
+
+    # Status: pendente, executando, concluido, falhou, cancelado
+    status = Column(String(20), default="pendente", nullable=False)
+
+    parametros = Column(JSONB, nullable=False, default=dict)
+    progresso = Column(Float, default=0.0, nullable=False)
+    mensagem = Column(Text, nullable=True)
+
+    # Corpo da resposta da rota síncrona equivalente, ou o erro {"status_code", "detail"}
+    resultado = Column(JSONB, nullable=True)
+    erro = Column(JSONB, nullable=True)
+
+    cancelamento_solicitado = Column(Boolean, default=False, nullable=False)
+    worker = Column(String(200), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
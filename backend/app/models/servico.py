@@ -0,0 +1,172 @@
+"""
+Modelos da estrutura de Serviços
+
+Mapeiam as tabelas criadas pelas migrations 002, 003, 007, 009 e 012:
+empresas, clientes, categorias_servico, tipos_servico, servicos,
+servico_requisitos_equipe e servico_equipe_atribuida.
+"""
+from datetime import datetime
+from sqlalchemy import (
+    Column, Integer, String, Text, Numeric, Date, DateTime, Boolean, ForeignKey, UniqueConstraint
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+
+# Funções de equipe usadas em equipe_minima e cargos.funcoes_servico
+FUNCOES_SERVICO = ["comercial", "suprimentos", "engenheiro", "planejamento", "execucao", "assistente"]
+
+# Status de serviço que ainda demandam equipe
+STATUS_SERVICO_ATIVOS = ["planejado", "em_andamento", "execucao"]
+
+
+class Empresa(Base):
+    """Empresas executoras (quem executa o serviço)"""
+    __tablename__ = "empresas"
+
+    id = Column(Integer, primary_key=True, index=True)
+    codigo = Column(String(20), nullable=False, unique=True)
+    nome = Column(String(100), nullable=False)
+    nome_completo = Column(String(200), nullable=True)
+    cnpj = Column(String(20), nullable=True)
+    cor = Column(String(20), default="#3B82F6")
+    cor_texto = Column(String(20), default="#ffffff")
+    ativa = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class Cliente(Base):
+    """Clientes (para quem é feito o serviço)"""
+    __tablename__ = "clientes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    codigo = Column(String(20), nullable=False, unique=True)
+    nome = Column(String(100), nullable=False)
+    nome_completo = Column(String(200), nullable=True)
+    cnpj = Column(String(20), nullable=True)
+    contato = Column(String(200), nullable=True)
+    email = Column(String(200), nullable=True)
+    telefone = Column(String(50), nullable=True)
+    cor = Column(String(20), default="#10B981")
+    ativo = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CategoriaServico(Base):
+    """Categorias de serviço (área de atuação)"""
+    __tablename__ = "categorias_servico"
+
+    id = Column(Integer, primary_key=True, index=True)
+    codigo = Column(String(20), nullable=False, unique=True)
+    nome = Column(String(100), nullable=False)
+    descricao = Column(String(500), nullable=True)
+    empresa_id = Column(Integer, ForeignKey("empresas.id"), nullable=False)
+    setor_id = Column(Integer, ForeignKey("setores.id"), nullable=True)
+    cor = Column(String(20), default="#8B5CF6")
+    cor_texto = Column(String(20), default="#ffffff")
+    ordem = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relacionamentos
+    empresa = relationship("Empresa")
+
+
+class TipoServico(Base):
+    """Tipos de serviço (subcategoria específica)"""
+    __tablename__ = "tipos_servico"
+
+    id = Column(Integer, primary_key=True, index=True)
+    codigo = Column(String(20), nullable=False, unique=True)
+    nome = Column(String(100), nullable=False)
+    descricao = Column(String(500), nullable=True)
+    categoria_id = Column(Integer, ForeignKey("categorias_servico.id"), nullable=False)
+    valor_hora_base = Column(Numeric(10, 2), nullable=True)
+    prazo_medio_dias = Column(Integer, nullable=True)
+    cor = Column(String(20), default="#F59E0B")
+    ordem = Column(Integer, default=0)
+    # Equipe mínima por função. Ex: {"engenheiro": 2, "execucao": 3}
+    equipe_minima = Column(JSONB, nullable=False, default=dict)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relacionamentos
+    categoria = relationship("CategoriaServico")
+
+
+class Servico(Base):
+    """Serviços/Projetos executados pelas empresas"""
+    __tablename__ = "servicos"
+
+    id = Column(Integer, primary_key=True, index=True)
+    codigo = Column(String(30), nullable=False, unique=True)
+    nome = Column(String(200), nullable=False)
+    descricao = Column(Text, nullable=True)
+    tipo_servico_id = Column(Integer, ForeignKey("tipos_servico.id"), nullable=False)
+    cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
+    valor_estimado = Column(Numeric(15, 2), nullable=True)
+    valor_contratado = Column(Numeric(15, 2), nullable=True)
+    data_inicio = Column(Date, nullable=True)
+    data_fim_prevista = Column(Date, nullable=True)
+    data_fim_real = Column(Date, nullable=True)
+    status = Column(String(20), default="planejado")
+    responsavel_id = Column(Integer, ForeignKey("colaboradores.id"), nullable=True)
+    observacoes = Column(Text, nullable=True)
+
+    # Equipe do serviço (migration 003)
+    comercial_id = Column(Integer, ForeignKey("colaboradores.id", ondelete="SET NULL"), nullable=True)
+    suprimentos_id = Column(Integer, ForeignKey("colaboradores.id", ondelete="SET NULL"), nullable=True)
+    engenheiro_id = Column(Integer, ForeignKey("colaboradores.id", ondelete="SET NULL"), nullable=True)
+    planejamento_id = Column(Integer, ForeignKey("colaboradores.id", ondelete="SET NULL"), nullable=True)
+    execucao_id = Column(Integer, ForeignKey("colaboradores.id", ondelete="SET NULL"), nullable=True)
+    assistente_id = Column(Integer, ForeignKey("colaboradores.id", ondelete="SET NULL"), nullable=True)
+
+    # Gestão (migration 012)
+    prioridade = Column(Integer, nullable=False, default=3)  # 1=Crítica ... 5=Muito Baixa
+    prazo_rigido = Column(Boolean, nullable=False, default=False)
+    percentual_conclusao = Column(Integer, nullable=False, default=0)
+    proximo_marco = Column(String(200), nullable=True)
+    dias_ate_prazo = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relacionamentos
+    tipo_servico = relationship("TipoServico")
+    cliente = relationship("Cliente")
+
+
+class ServicoRequisitoEquipe(Base):
+    """Equipe mínima necessária por serviço, por cargo"""
+    __tablename__ = "servico_requisitos_equipe"
+    __table_args__ = (UniqueConstraint("servico_id", "cargo_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    servico_id = Column(Integer, ForeignKey("servicos.id", ondelete="CASCADE"), nullable=False)
+    cargo_id = Column(Integer, ForeignKey("cargos.id", ondelete="RESTRICT"), nullable=False)
+    quantidade = Column(Integer, nullable=False, default=1)
+    obrigatorio = Column(Boolean, nullable=False, default=True)
+    observacoes = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ServicoEquipeAtribuida(Base):
+    """Colaboradores efetivamente alocados em cada serviço"""
+    __tablename__ = "servico_equipe_atribuida"
+    __table_args__ = (UniqueConstraint("servico_id", "colaborador_id", "cargo_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    servico_id = Column(Integer, ForeignKey("servicos.id", ondelete="CASCADE"), nullable=False)
+    colaborador_id = Column(Integer, ForeignKey("colaboradores.id", ondelete="RESTRICT"), nullable=False)
+    cargo_id = Column(Integer, ForeignKey("cargos.id", ondelete="RESTRICT"), nullable=False)
+    data_inicio = Column(Date, nullable=True)
+    data_fim = Column(Date, nullable=True)
+    percentual_alocacao = Column(Integer, nullable=False, default=100)
+    ativo = Column(Boolean, nullable=False, default=True)
+    observacoes = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,336 @@
+"""
+Edicao colaborativa de rascunhos do organograma (WebSocket)
+
+O editor do organograma gravava o snapshot inteiro (PUT /versions/{id}) a
+cada arraste; com mais de uma pessoa no mesmo rascunho, a ultima gravacao
+apagava a da outra. Agora cada editor abre WS /api/v1/versions/{id}/ws e
+envia operacoes pequenas (mover, editar; schemas OperacaoRascunho*):
+
+- GerenciadorRascunhos mantem uma SessaoRascunho (services/edicao_rascunho)
+  por rascunho aberto: o estado autoritativo em memoria. Cada operacao e
+  validada contra ele, recebe um seq e volta como `ack` para quem enviou e
+  como `delta` para os demais editores. Operacao invalida volta como `erro`
+  e nao altera nada.
+- Gravacao em lote com debounce: o snapshot so vai ao banco depois de
+  rascunho_debounce_segundos sem operacoes novas (ou a cada
+  rascunho_espera_maxima_segundos em edicao continua), quando o ultimo
+  editor sai e antes de aprovar. Um UPDATE por lote, com o updated_at lido
+  como marcador otimista; publica o evento SSE da versao.
+- Aprovacao: fechar() recusa operacoes novas (voltam como `erro`) e so
+  entao grava o pendente, esperando uma gravacao do debounce em andamento;
+  o snapshot no banco passa a ser o final. Depois, encerrar() desconecta
+  os editores (ou reabrir(), se a aprovacao falhou).
+- Se outra escrita mudou a versao (PUT, outro worker), a gravacao nao casa
+  com o marcador: a sessao recarrega do banco, reaplica as operacoes ainda
+  nao gravadas e manda o `estado` completo aos editores. Versao aprovada,
+  arquivada ou removida encerra a sessao (`encerrado`).
+
+As sessoes vivem no worker que aceitou a conexao (como os cenarios): editores
+do mesmo rascunho em workers diferentes convergem pelo marcador otimista, mas
+so veem as operacoes uns dos outros a cada gravacao.
+
+Mensagens do servidor: estado, editores, ack, delta, erro, salvo, encerrado
+(campo `tipo`).
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Optional, Protocol
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import update
+
+from .config import get_settings
+from .database import AsyncSessionLocal
+from .eventos import ATUALIZADO, publicar_async
+from .models import OrganoVersion
+from .schemas import OperacaoRascunho
+from .services.edicao_rascunho import (
+    RascunhoErro,
+    SessaoRascunho,
+    calculate_changes,
+    get_current_snapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+# Codigos de fechamento (RFC 6455)
+FECHAMENTO_NORMAL = 1000
+FECHAMENTO_POLITICA = 1008
+
+# Espera antes de tentar de novo uma gravacao que falhou
+ESPERA_NOVA_TENTATIVA = 5.0
+
+_operacao = TypeAdapter(OperacaoRascunho)
+
+
+class Conexao(Protocol):
+    """O que o gerenciador usa da conexao (starlette.websockets.WebSocket)"""
+
+    async def send_json(self, data: Any) -> None: ...
+
+    async def close(self, code: int = FECHAMENTO_NORMAL) -> None: ...
+
+
+class VersaoIndisponivel(Exception):
+    """Versao inexistente ou fora de rascunho: a conexao e recusada"""
+
+
+class _Sala:
+    """Sessao de um rascunho com seus editores conectados e o agendamento da gravacao"""
+
+    def __init__(self, sessao: SessaoRascunho):
+        self.sessao = sessao
+        self.editores: dict[Conexao, str] = {}
+        self.contador = 0
+        self.gravacao = asyncio.Lock()
+        self.timer: Optional[asyncio.Task] = None
+        self.primeira_pendente: Optional[float] = None
+        # fechada: sem operacoes novas (aprovacao); encerrada: descarta o pendente
+        self.fechada = False
+        self.encerrada = False
+
+    def presenca(self) -> dict:
+        return {"tipo": "editores", "editores": sorted(self.editores.values())}
+
+
+class GerenciadorRascunhos:
+    """Sessoes de edicao colaborativa deste worker, por id de versao"""
+
+    def __init__(self, debounce: float = 2.0, espera_maxima: float = 10.0):
+        self.debounce = debounce
+        self.espera_maxima = espera_maxima
+        self._salas: dict[int, _Sala] = {}
+        self._abrindo = asyncio.Lock()
+
+    def ativa(self, version_id: int) -> bool:
+        return version_id in self._salas
+
+    # ---------- conexao ----------
+
+    async def entrar(self, version_id: int, conexao: Conexao, nome: Optional[str] = None) -> None:
+        """Registra o editor (carregando o rascunho se for o primeiro) e envia o estado"""
+        async with self._abrindo:
+            sala = self._salas.get(version_id)
+            if sala is None:
+                sala = _Sala(await self._carregar(version_id))
+                self._salas[version_id] = sala
+            elif sala.fechada:
+                raise VersaoIndisponivel("Versao em aprovacao")
+            sala.contador += 1
+            editor = f"{nome or 'editor'}#{sala.contador}"
+            sala.editores[conexao] = editor
+
+        await self._enviar(conexao, {
+            "tipo": "estado",
+            "seq": sala.sessao.seq,
+            "editor": editor,
+            "editores": sorted(sala.editores.values()),
+            "snapshot": sala.sessao.snapshot,
+        })
+        await self._transmitir(sala, sala.presenca(), exceto=conexao)
+
+    async def sair(self, version_id: int, conexao: Conexao) -> None:
+        """Remove o editor; o ultimo a sair grava o que estiver pendente e fecha a sessao"""
+        sala = self._salas.get(version_id)
+        if sala is None or sala.editores.pop(conexao, None) is None:
+            return
+        if sala.editores:
+            await self._transmitir(sala, sala.presenca())
+            return
+        self._cancelar_timer(sala)
+        await self._gravar(sala)
+        if not sala.editores and self._salas.get(version_id) is sala:
+            del self._salas[version_id]
+
+    async def receber(self, version_id: int, conexao: Conexao, mensagem: str) -> None:
+        """Aplica uma operacao enviada pelo editor e a repassa aos demais"""
+        sala = self._salas.get(version_id)
+        if sala is None or sala.encerrada:
+            return
+        editor = sala.editores.get(conexao)
+        try:
+            op = _operacao.validate_json(mensagem)
+        except ValidationError as e:
+            await self._enviar(conexao, {"tipo": "erro", "ref": None, "detail": e.errors(include_url=False)})
+            return
+        if sala.fechada:
+            await self._enviar(conexao, {"tipo": "erro", "ref": op.ref, "detail": "Versao em aprovacao"})
+            return
+        try:
+            seq = sala.sessao.aplicar(op)
+        except RascunhoErro as e:
+            await self._enviar(conexao, {"tipo": "erro", "ref": op.ref, "detail": str(e)})
+            return
+
+        await self._enviar(conexao, {"tipo": "ack", "ref": op.ref, "seq": seq})
+        await self._transmitir(sala, {
+            "tipo": "delta",
+            "seq": seq,
+            "editor": editor,
+            "op": op.model_dump(exclude={"ref"}),
+        }, exceto=conexao)
+        self._agendar(sala)
+
+    # ---------- gravacao ----------
+
+    async def fechar(self, version_id: int) -> None:
+        """
+        Fecha a sessao para operacoes novas e grava o pendente (antes de
+        aprovar): nenhuma operacao confirmada com `ack` fica de fora do
+        snapshot gravado, e nenhuma gravacao do debounce chega depois dele.
+        """
+        sala = self._salas.get(version_id)
+        if sala is not None:
+            sala.fechada = True
+            self._cancelar_timer(sala)
+            await self._gravar(sala)
+
+    def reabrir(self, version_id: int) -> None:
+        """Aprovacao falhou: a sessao volta a aceitar operacoes"""
+        sala = self._salas.get(version_id)
+        if sala is not None:
+            sala.fechada = False
+
+    async def encerrar(self, version_id: int, motivo: str) -> None:
+        """Versao saiu de rascunho: avisa e desconecta os editores, descartando o pendente"""
+        sala = self._salas.pop(version_id, None)
+        if sala is None:
+            return
+        sala.encerrada = True
+        self._cancelar_timer(sala)
+        conexoes = list(sala.editores)
+        sala.editores.clear()
+        for conexao in conexoes:
+            await self._enviar(conexao, {"tipo": "encerrado", "motivo": motivo})
+            try:
+                await conexao.close(FECHAMENTO_NORMAL)
+            except Exception:
+                pass
+
+    def _agendar(self, sala: _Sala) -> None:
+        # Debounce com teto: cada operacao adia a gravacao, mas nao alem de espera_maxima
+        agora = time.monotonic()
+        if sala.primeira_pendente is None:
+            sala.primeira_pendente = agora
+        atraso = min(self.debounce, sala.primeira_pendente + self.espera_maxima - agora)
+        if sala.gravacao.locked():
+            # Gravando agora: _gravar reagenda se sobrou operacao
+            return
+        self._cancelar_timer(sala)
+        sala.timer = asyncio.get_running_loop().create_task(self._gravar_depois(sala, max(atraso, 0.0)))
+
+    def _cancelar_timer(self, sala: _Sala) -> None:
+        # So cancela a espera: o timer zera sala.timer antes de comecar a gravar
+        if sala.timer is not None:
+            sala.timer.cancel()
+        sala.timer = None
+
+    async def _gravar_depois(self, sala: _Sala, atraso: float) -> None:
+        await asyncio.sleep(atraso)
+        sala.timer = None
+        await self._gravar(sala)
+
+    async def _gravar(self, sala: _Sala) -> None:
+        async with sala.gravacao:
+            sessao = sala.sessao
+            if sala.encerrada or sessao.seq == sessao.seq_salvo:
+                sala.primeira_pendente = None
+                return
+            seq, snapshot, marcador = sessao.seq, sessao.snapshot, sessao.updated_at
+            sala.primeira_pendente = None
+            try:
+                gravado = await self._escrever(sessao.version_id, snapshot, marcador)
+            except Exception:
+                logger.exception("Falha ao gravar rascunho %s; nova tentativa", sessao.version_id)
+                self._repetir(sala)
+                return
+
+            if gravado is not None:
+                sessao.confirmar_gravacao(seq, gravado)
+                await self._transmitir(sala, {"tipo": "salvo", "seq": seq})
+            else:
+                await self._conflito(sala)
+
+        if sala.editores and sessao.seq != sessao.seq_salvo:
+            self._agendar(sala)
+
+    def _repetir(self, sala: _Sala) -> None:
+        if sala.editores:
+            sala.primeira_pendente = None
+            sala.timer = asyncio.get_running_loop().create_task(self._gravar_depois(sala, ESPERA_NOVA_TENTATIVA))
+
+    async def _escrever(self, version_id: int, snapshot: list[dict], marcador: Optional[datetime]) -> Optional[datetime]:
+        """UPDATE condicionado ao marcador; devolve o novo updated_at ou None se a versao mudou"""
+        agora = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            official = await get_current_snapshot(db)
+            resultado = await db.execute(
+                update(OrganoVersion)
+                .where(
+                    OrganoVersion.id == version_id,
+                    OrganoVersion.status == "draft",
+                    OrganoVersion.updated_at.is_(None) if marcador is None else OrganoVersion.updated_at == marcador,
+                )
+                .values(snapshot=snapshot, changes_summary=calculate_changes(official, snapshot), updated_at=agora)
+                .execution_options(synchronize_session=False)
+            )
+            if resultado.rowcount != 1:
+                await db.rollback()
+                return None
+            await publicar_async(db, ("organo_versions", ATUALIZADO, version_id))
+            await db.commit()
+        return agora
+
+    async def _conflito(self, sala: _Sala) -> None:
+        sessao = sala.sessao
+        try:
+            atual = await self._carregar(sessao.version_id)
+        except VersaoIndisponivel as e:
+            await self.encerrar(sessao.version_id, str(e))
+            return
+        descartadas = sessao.rebase(atual.snapshot, atual.updated_at)
+        logger.info(
+            "Rascunho %s alterado fora da sessao; recarregado (%d operacoes descartadas)",
+            sessao.version_id, descartadas,
+        )
+        for conexao, editor in list(sala.editores.items()):
+            await self._enviar(conexao, {
+                "tipo": "estado",
+                "seq": sessao.seq,
+                "editor": editor,
+                "editores": sorted(sala.editores.values()),
+                "snapshot": sessao.snapshot,
+                "descartadas": descartadas,
+            })
+
+    # ---------- auxiliares ----------
+
+    async def _carregar(self, version_id: int) -> SessaoRascunho:
+        async with AsyncSessionLocal() as db:
+            version = await db.get(OrganoVersion, version_id)
+            if version is None:
+                raise VersaoIndisponivel("Versao nao encontrada")
+            if version.status != "draft":
+                raise VersaoIndisponivel("Versao nao esta em rascunho")
+            return SessaoRascunho(version_id, version.snapshot or [], version.updated_at)
+
+    async def _enviar(self, conexao: Conexao, mensagem: dict) -> None:
+        try:
+            await conexao.send_json(mensagem)
+        except Exception:
+            # Conexao caindo: o endpoint dela chama sair()
+            pass
+
+    async def _transmitir(self, sala: _Sala, mensagem: dict, exceto: Optional[Conexao] = None) -> None:
+        destinos = [c for c in sala.editores if c is not exceto]
+        if destinos:
+            await asyncio.gather(*(self._enviar(c, mensagem) for c in destinos))
+
+
+_settings = get_settings()
+rascunhos = GerenciadorRascunhos(
+    debounce=_settings.rascunho_debounce_segundos,
+    espera_maxima=_settings.rascunho_espera_maxima_segundos,
+)
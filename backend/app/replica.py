@@ -0,0 +1,69 @@
+"""
+Read-your-writes para as leituras roteadas a replica
+
+Com READ_DATABASE_URL configurada, as rotas GET usam sessoes da replica
+(get_read_db / get_async_read_db em database.py). A replica fica alguns
+instantes atras do primario: quem acabou de salvar e recarrega a tela nao
+pode ver o dado antigo.
+
+- ReplicaStickyMiddleware: toda escrita bem sucedida (metodo diferente de
+  GET/HEAD/OPTIONS com status < 400) devolve o cookie `ler_primario` com o
+  instante ate o qual esse cliente le do primario (replica_sticky_segundos),
+  e o header `X-Ler-Primario` com a duracao em segundos.
+- ler_do_primario: o cookie ainda valido, ou o header `X-Ler-Primario: 1`,
+  manda a leitura para o primario.
+
+O SPA chama a API de outra origem: envia o cookie com credentials:
+'include' (vale apos recarregar a tela) e, como o cookie SameSite=Lax nao
+vai em requisicoes entre sites diferentes, tambem reenvia `X-Ler-Primario:
+1` durante a janela recebida na resposta da escrita (src/services/api.ts).
+"""
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+COOKIE = "ler_primario"
+HEADER = "x-ler-primario"
+
+METODOS_LEITURA = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def ler_do_primario(conexao: HTTPConnection) -> bool:
+    """True se a requisicao deve ler do primario (escrita recente do cliente)"""
+    if conexao.headers.get(HEADER, "").strip().lower() in ("1", "true"):
+        return True
+    valor = conexao.cookies.get(COOKIE)
+    if not valor:
+        return False
+    try:
+        return float(valor) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaStickyMiddleware:
+    """Middleware ASGI que marca o cliente para ler do primario apos uma escrita"""
+
+    def __init__(self, app, segundos: int = 5):
+        self.app = app
+        self.segundos = segundos
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in METODOS_LEITURA:
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message = {**message, "headers": list(message.get("headers", []))}
+                ate = time.time() + self.segundos
+                headers = MutableHeaders(raw=message["headers"])
+                headers.append(
+                    "set-cookie",
+                    f"{COOKIE}={ate:.3f}; Max-Age={self.segundos}; Path=/; HttpOnly; SameSite=Lax",
+                )
+                headers.append(HEADER, str(self.segundos))
+            await send(message)
+
+        await self.app(scope, receive, enviar)
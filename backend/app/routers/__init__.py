@@ -13,6 +13,13 @@ from .projetos_planejamento import router as projetos_planejamento_router
 
 # Alocacao (Dashboard)
 from .alocacoes import router as alocacoes_router
+from .cenarios import router as cenarios_router
+
+# Eventos de mudanca (SSE)
+from .eventos import router as eventos_router
+
+# Jobs em segundo plano
+from .jobs import router as jobs_router
 
 # Legacy (manter por compatibilidade, será removido)
 from .tipos_projeto import router as tipos_projeto_router
@@ -28,6 +35,11 @@ __all__ = [
     "projetos_planejamento_router",
     # Alocacao (Dashboard)
     "alocacoes_router",
+    "cenarios_router",
+    # Eventos
+    "eventos_router",
+    # Jobs
+    "jobs_router",
     # Legacy
     "tipos_projeto_router",
 ]
@@ -3,18 +3,28 @@ Router: Alocacoes
 
 Endpoints para CRUD de alocacoes e dashboard.
 """
+from datetime import date
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, select
 
-from ..database import get_db
+from ..cache import WatermarkCache, obter_watermark_async
+from ..database import get_async_read_db, get_db, get_read_db
+from ..eventos import ATUALIZADO, CRIADO, REMOVIDO, publicar
+from ..guarda_sql import orcamento_sql
+from .. import jobs
 from ..models.alocacao import Alocacao, StatusAlocacao as ModelStatusAlocacao
 from ..models.colaborador import Colaborador
 from ..models.projeto_planejamento import ProjetoPlanejamento, StatusProjeto
 from ..models.setor import Setor
+from ..serializacao import SerializadorJSON
+from ..schemas.job import JobAceito
 from ..schemas.alocacao import (
     AlocacaoCreate,
+    AlocacaoLoteCreate,
     AlocacaoUpdate,
     AlocacaoResponse,
     AlocacaoComDetalhes,
@@ -23,62 +33,138 @@ from ..schemas.alocacao import (
     TimelineItemDashboard,
     DisponibilidadeColaborador,
     SobrecargaMensal,
+    GapProjetoDashboard,
+    PrevisaoContratacaoMensal,
+    CapacidadeDashboard,
+    DashboardCombinado,
+    HeatmapDashboard,
     StatusAlocacao,
 )
+from ..services import alocacao_mes as alocacao_mes_service
+from ..services import capacidade
+from ..services import dashboard as dashboard_service
+from ..services import gaps as gaps_service
+from ..services import heatmap as heatmap_service
+from ..services import previsao_contratacoes as previsao_service
+from ..services.timeline import inicio_da_semana
 
 router = APIRouter(
     prefix="/alocacoes",
     tags=["Alocacoes"],
 )
 
-# ============ CONSTANTES ============
+# Cache da matriz de gaps (invalidado pelo watermark de projetos + alocacoes)
+_gaps_cache = WatermarkCache(maxsize=32)
 
-# Limite maximo de projetos simultaneos por setor
-LIMITE_PROJETOS_POR_SETOR = {
-    "Comercial": 10,
-    "Engenharia": 3,
-    "Suprimentos": 10,  # "Compras"
-    # Setores tipo "Assistentes" (Staff, RH, P&D, Manutencao, etc.)
-    "default": 8
-}
+_alocacoes_json = SerializadorJSON(List[AlocacaoComDetalhes])
+_heatmap_json = SerializadorJSON(HeatmapDashboard)
+_dashboard_json = SerializadorJSON(DashboardCombinado)
 
 # ============ FUNCOES AUXILIARES ============
 
-def _validar_limite_projetos(colaborador_id: int, db: Session) -> None:
+def _validar_limite_projetos(colaborador: Colaborador, db: Session, projeto_id: int) -> None:
     """
     Valida se colaborador pode ser alocado em mais um projeto.
-    Lanca HTTPException 400 se exceder o limite do setor.
+    Lanca HTTPException 400 se exceder o limite do cargo (ou do setor,
+    para colaboradores sem cargo cadastrado). Outro periodo ativo no
+    proprio projeto_id nao conta como projeto a mais.
     """
-    # Buscar colaborador e seu setor
-    colaborador = db.query(Colaborador).filter(Colaborador.id == colaborador_id).first()
-    if not colaborador:
-        raise HTTPException(status_code=400, detail="Colaborador nao encontrado")
-
-    setor = db.query(Setor).filter(Setor.id == colaborador.setor_id).first()
-    if not setor:
-        raise HTTPException(status_code=400, detail="Setor do colaborador nao encontrado")
-
-    # Determinar limite baseado no setor (case-insensitive e sem espacos)
-    nome_setor_normalizado = setor.nome.strip().title()
-    limite = LIMITE_PROJETOS_POR_SETOR.get(nome_setor_normalizado, LIMITE_PROJETOS_POR_SETOR["default"])
+    limite = capacidade.resolver.lookup(db).resolver(colaborador.cargo_id, colaborador.setor_id)
+    if limite.limite is None:
+        return  # Cargo nao mensurado
 
     # Contar projetos ATIVOS (distintos) do colaborador
     projetos_ativos = (
         db.query(func.count(func.distinct(Alocacao.projeto_id)))
         .filter(
-            Alocacao.colaborador_id == colaborador_id,
+            Alocacao.colaborador_id == colaborador.id,
+            Alocacao.projeto_id != projeto_id,
             Alocacao.status == ModelStatusAlocacao.ATIVA,
         )
         .scalar() or 0
     )
 
     # Validar limite
-    if projetos_ativos >= limite:
+    if projetos_ativos >= limite.limite:
         raise HTTPException(
             status_code=400,
-            detail=f"{colaborador.nome} ({setor.nome}) ja possui {projetos_ativos} projetos ativos. Limite: {limite} projetos simultaneos."
+            detail=f"{colaborador.nome} ({limite.descricao}) ja possui {projetos_ativos} projetos ativos. Limite: {limite.limite} projetos simultaneos."
         )
 
+# ============ DASHBOARD COMBINADO ============
+# Registrado antes de /{alocacao_id}/, que tambem casaria com /dashboard/
+
+@router.get("/dashboard/", response_model=DashboardCombinado, response_model_exclude_none=True)
+@orcamento_sql(5)
+async def get_dashboard(
+    widgets: Optional[str] = Query(
+        None,
+        description="Widgets separados por virgula (padrao: todos): resumo-geral, "
+                    "resumo-empresas, timeline, disponibilidade, sobrecarga-temporal",
+    ),
+    ano: Optional[int] = Query(None, description="Filtro da timeline e ano da sobrecarga temporal"),
+    empresa: Optional[str] = Query(None, description="Filtro da timeline"),
+    setor_id: Optional[int] = Query(None, description="Filtro da disponibilidade"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Retorna os widgets pedidos do dashboard em uma resposta, no formato das
+    rotas individuais (/dashboard/resumo-geral/, /dashboard/timeline/, ...).
+
+    Projetos, alocacoes ativas (uma varredura agregada) e colaboradores sao
+    lidos uma vez so, em uma sessao e uma transacao REPEATABLE READ: todos os
+    widgets saem do mesmo snapshot e a rota ocupa uma unica conexao do pool.
+    Os widgets sao montados em memoria a partir dessa carga.
+    """
+    try:
+        pedidos = dashboard_service.widgets_pedidos(widgets)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    precisa = set(pedidos)
+    # Mesmo padrao da rota /dashboard/sobrecarga-temporal/
+    ano_sobrecarga = ano or 2026
+
+    # Mesmo snapshot para todas as consultas (antes do primeiro comando)
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    async def ler(statement):
+        return (await db.execute(statement)).all()
+
+    com_colaboradores = dashboard_service.DISPONIBILIDADE in precisa
+    projetos = alocacoes = colaboradores = total_colaboradores = por_mes = None
+    if precisa & dashboard_service.PRECISA_PROJETOS:
+        projetos = await ler(dashboard_service.projetos_statement())
+    if precisa & dashboard_service.PRECISA_ALOCACOES:
+        alocacoes = await ler(dashboard_service.ALOCACOES_STATEMENT)
+    if com_colaboradores:
+        colaboradores = await ler(dashboard_service.colaboradores_statement())
+        # setor_id e obrigatorio: o JOIN com setores devolve todos os colaboradores
+        total_colaboradores = len(colaboradores)
+    elif precisa & dashboard_service.PRECISA_TOTAL_COLABORADORES:
+        total_colaboradores = await db.scalar(dashboard_service.total_colaboradores_statement())
+    if dashboard_service.SOBRECARGA_TEMPORAL in precisa:
+        por_mes = await _sobrecarga_por_mes(db, ano_sobrecarga)
+
+    def montar_resposta():
+        # Agregacao e serializacao em thread (run_in_threadpool): fora do event loop
+        ativas = dashboard_service.AlocacoesAtivas(alocacoes) if alocacoes is not None else None
+        montar = {
+            dashboard_service.RESUMO_GERAL:
+                lambda: dashboard_service.resumo_geral(projetos, ativas, total_colaboradores),
+            dashboard_service.RESUMO_EMPRESAS:
+                lambda: dashboard_service.resumo_empresas(projetos, ativas),
+            dashboard_service.TIMELINE:
+                lambda: dashboard_service.timeline(projetos, ativas, ano, empresa),
+            dashboard_service.DISPONIBILIDADE:
+                lambda: dashboard_service.disponibilidade(colaboradores, ativas, setor_id),
+            dashboard_service.SOBRECARGA_TEMPORAL:
+                lambda: dashboard_service.sobrecarga_mensal(ano_sobrecarga, por_mes, total_colaboradores),
+        }
+        return _dashboard_json.resposta({widget.replace("-", "_"): montar[widget]() for widget in pedidos})
+
+    return await run_in_threadpool(montar_resposta)
+
+
 # ============ CRUD BASICO ============
 
 @router.get("/", response_model=List[AlocacaoComDetalhes])
@@ -86,12 +172,24 @@ def list_alocacoes(
     projeto_id: Optional[int] = Query(None),
     colaborador_id: Optional[int] = Query(None),
     status: Optional[StatusAlocacao] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Lista alocacoes com filtros"""
+    # Colunas na ordem dos campos de AlocacaoComDetalhes: as linhas vao
+    # direto para o serializador, sem montar modelos
     query = (
-        db.query(
-            Alocacao,
+        select(
+            Alocacao.id,
+            Alocacao.colaborador_id,
+            Alocacao.projeto_id,
+            Alocacao.funcao,
+            Alocacao.data_inicio,
+            Alocacao.data_fim,
+            Alocacao.horas_semanais,
+            Alocacao.status,
+            Alocacao.observacoes,
+            Alocacao.created_at,
+            Alocacao.updated_at,
             Colaborador.nome.label("colaborador_nome"),
             Colaborador.cargo.label("colaborador_cargo"),
             ProjetoPlanejamento.codigo.label("projeto_codigo"),
@@ -103,36 +201,13 @@ def list_alocacoes(
     )
 
     if projeto_id:
-        query = query.filter(Alocacao.projeto_id == projeto_id)
+        query = query.where(Alocacao.projeto_id == projeto_id)
     if colaborador_id:
-        query = query.filter(Alocacao.colaborador_id == colaborador_id)
+        query = query.where(Alocacao.colaborador_id == colaborador_id)
     if status:
-        query = query.filter(Alocacao.status == status.value)
-
-    results = query.all()
+        query = query.where(Alocacao.status == status.value)
 
-    return [
-        AlocacaoComDetalhes(
-            id=r.Alocacao.id,
-            colaborador_id=r.Alocacao.colaborador_id,
-            projeto_id=r.Alocacao.projeto_id,
-            funcao=r.Alocacao.funcao,
-            data_inicio=r.Alocacao.data_inicio,
-            data_fim=r.Alocacao.data_fim,
-            horas_semanais=r.Alocacao.horas_semanais,
-            # percentual_dedicacao removido - calculado via horas_semanais se necessário
-            status=r.Alocacao.status,
-            observacoes=r.Alocacao.observacoes,
-            created_at=r.Alocacao.created_at,
-            updated_at=r.Alocacao.updated_at,
-            colaborador_nome=r.colaborador_nome,
-            colaborador_cargo=r.colaborador_cargo,
-            projeto_codigo=r.projeto_codigo,
-            projeto_nome=r.projeto_nome,
-            projeto_empresa=r.projeto_empresa,
-        )
-        for r in results
-    ]
+    return _alocacoes_json.resposta(db.execute(query).all())
 
 
 @router.post("/", response_model=AlocacaoResponse, status_code=201)
@@ -148,34 +223,120 @@ def create_alocacao(alocacao: AlocacaoCreate, db: Session = Depends(get_db)):
     if not projeto:
         raise HTTPException(status_code=400, detail="Projeto nao encontrado")
 
-    # Verificar se ja existe alocacao ativa do colaborador no projeto
-    existing = (
-        db.query(Alocacao)
-        .filter(
-            Alocacao.colaborador_id == alocacao.colaborador_id,
-            Alocacao.projeto_id == alocacao.projeto_id,
-            Alocacao.status == ModelStatusAlocacao.ATIVA,
-        )
-        .first()
-    )
-    if existing:
-        raise HTTPException(
-            status_code=400,
-            detail="Colaborador ja possui alocacao ativa neste projeto"
-        )
-
-    # Validar limite de projetos simultaneos por setor
-    _validar_limite_projetos(alocacao.colaborador_id, db)
+    # Validar limite de projetos simultaneos do cargo. Sobreposicao com outra
+    # alocacao ativa no mesmo projeto e barrada pelo banco (constraint de
+    # exclusao, migracao 016) e vira 400 no handler de IntegrityError
+    if alocacao.status == StatusAlocacao.ATIVA:
+        _validar_limite_projetos(colaborador, db, alocacao.projeto_id)
 
     db_alocacao = Alocacao(**alocacao.model_dump())
     db.add(db_alocacao)
+    db.flush()
+    publicar(db, ("alocacoes", CRIADO, db_alocacao.id))
     db.commit()
     db.refresh(db_alocacao)
     return db_alocacao
 
 
+@router.post(
+    "/lote/", response_model=List[AlocacaoResponse], status_code=201,
+    responses={202: {"model": JobAceito, "description": "Com ?async=true: job criado"}},
+)
+def create_alocacoes_lote(
+    lote: AlocacaoLoteCreate,
+    assincrono: bool = Query(False, alias="async", description="Executa em segundo plano (202 + job)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Cria varias alocacoes de uma vez (tudo ou nada).
+
+    Aplica as mesmas validacoes da criacao individual, incluindo o limite
+    de projetos simultaneos do cargo, considerando tambem os projetos
+    novos do proprio lote. Usa 4 queries independente do tamanho do lote.
+    """
+    if assincrono:
+        return jobs.executor.enfileirar(db, "alocacoes.lote", lote.model_dump(mode="json"))
+    return _criar_lote(lote, db)
+
+
+@jobs.tarefa("alocacoes.lote", resposta=List[AlocacaoResponse])
+def _job_criar_lote(contexto: jobs.ContextoJob, **parametros):
+    with contexto.sessao() as db:
+        return _criar_lote(AlocacaoLoteCreate.model_validate(parametros), db, contexto.progresso)
+
+
+def _criar_lote(lote: AlocacaoLoteCreate, db: Session, progresso: jobs.Progresso = jobs.sem_progresso):
+    """Corpo de create_alocacoes_lote, executado na requisicao ou no job"""
+    itens = lote.alocacoes
+    progresso(0.0, f"Validando {len(itens)} alocacoes")
+    colaborador_ids = {a.colaborador_id for a in itens}
+    projeto_ids = {a.projeto_id for a in itens}
+
+    colaboradores = {
+        c.id: c for c in db.query(Colaborador).filter(Colaborador.id.in_(colaborador_ids)).all()
+    }
+    projetos_existentes = {
+        p.id for p in db.query(ProjetoPlanejamento.id).filter(ProjetoPlanejamento.id.in_(projeto_ids)).all()
+    }
+
+    # Projetos com alocacao ativa de cada colaborador do lote
+    projetos_ativos: dict[int, set[int]] = {}
+    for colaborador_id, projeto_id in (
+        db.query(Alocacao.colaborador_id, Alocacao.projeto_id)
+        .filter(
+            Alocacao.colaborador_id.in_(colaborador_ids),
+            Alocacao.status == ModelStatusAlocacao.ATIVA,
+        )
+        .distinct()
+        .all()
+    ):
+        projetos_ativos.setdefault(colaborador_id, set()).add(projeto_id)
+
+    lookup = capacidade.resolver.lookup(db)
+    erros = []
+    for i, a in enumerate(itens, start=1):
+        colaborador = colaboradores.get(a.colaborador_id)
+        if not colaborador:
+            erros.append(f"Alocacao {i}: Colaborador nao encontrado")
+            continue
+        if a.projeto_id not in projetos_existentes:
+            erros.append(f"Alocacao {i}: Projeto nao encontrado")
+            continue
+        if a.status != StatusAlocacao.ATIVA:
+            continue
+
+        # Outro periodo no mesmo projeto nao soma ao limite; sobreposicao de
+        # periodos fica com a constraint de exclusao do banco
+        ativos = projetos_ativos.setdefault(a.colaborador_id, set())
+        if a.projeto_id in ativos:
+            continue
+
+        limite = lookup.resolver(colaborador.cargo_id, colaborador.setor_id)
+        if limite.limite is not None and len(ativos) >= limite.limite:
+            erros.append(
+                f"Alocacao {i}: {colaborador.nome} ({limite.descricao}) ja possui {len(ativos)} projetos ativos. "
+                f"Limite: {limite.limite} projetos simultaneos."
+            )
+            continue
+        ativos.add(a.projeto_id)
+
+    if erros:
+        raise HTTPException(status_code=400, detail="; ".join(erros))
+
+    # Ultimo ponto de cancelamento: daqui em diante o lote e gravado
+    progresso(0.5, f"Gravando {len(itens)} alocacoes")
+    db_alocacoes = [Alocacao(**a.model_dump()) for a in itens]
+    db.add_all(db_alocacoes)
+    db.flush()
+    publicar(db, *(("alocacoes", CRIADO, a.id) for a in db_alocacoes))
+    db.commit()
+    for db_alocacao in db_alocacoes:
+        db.refresh(db_alocacao)
+    return db_alocacoes
+
+
 @router.get("/{alocacao_id}/", response_model=AlocacaoResponse)
-def get_alocacao(alocacao_id: int, db: Session = Depends(get_db)):
+def get_alocacao(alocacao_id: int, db: Session = Depends(get_read_db)):
     """Busca uma alocacao por ID"""
     db_alocacao = db.query(Alocacao).filter(Alocacao.id == alocacao_id).first()
     if not db_alocacao:
@@ -199,11 +360,12 @@ def update_alocacao(
     # SE esta mudando status para ATIVA, validar limite
     if "status" in update_data and update_data["status"] == ModelStatusAlocacao.ATIVA:
         if db_alocacao.status != ModelStatusAlocacao.ATIVA:  # Nao estava ativa antes
-            _validar_limite_projetos(db_alocacao.colaborador_id, db)
+            _validar_limite_projetos(db_alocacao.colaborador, db, db_alocacao.projeto_id)
 
     for field, value in update_data.items():
         setattr(db_alocacao, field, value)
 
+    publicar(db, ("alocacoes", ATUALIZADO, alocacao_id))
     db.commit()
     db.refresh(db_alocacao)
     return db_alocacao
@@ -217,37 +379,49 @@ def delete_alocacao(alocacao_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Alocacao nao encontrada")
 
     db.delete(db_alocacao)
+    publicar(db, ("alocacoes", REMOVIDO, alocacao_id))
     db.commit()
     return None
 
 
 # ============ ENDPOINTS DE DASHBOARD ============
+# Leitura intensiva: async (AsyncSession), sem ocupar thread do threadpool
+
+async def _contar(db: AsyncSession, modelo, *filtros) -> int:
+    return await db.scalar(select(func.count()).select_from(modelo).where(*filtros)) or 0
+
+
+def _contagens_projetos():
+    """Total, por status e valor da carteira em uma unica agregacao (COUNT FILTER)"""
+    status = ProjetoPlanejamento.status
+    return (
+        func.count().label("total"),
+        func.count().filter(status == StatusProjeto.EM_ANDAMENTO).label("em_andamento"),
+        func.count().filter(status == StatusProjeto.PLANEJADO).label("planejados"),
+        func.count().filter(status == StatusProjeto.CONCLUIDO).label("concluidos"),
+        func.coalesce(func.sum(ProjetoPlanejamento.valor_estimado), 0).label("valor"),
+    )
+
 
 @router.get("/dashboard/resumo-geral/", response_model=ResumoGeralDashboard)
-def get_resumo_geral(db: Session = Depends(get_db)):
+@orcamento_sql(2)
+async def get_resumo_geral(db: AsyncSession = Depends(get_async_read_db)):
     """Retorna resumo geral para o dashboard"""
-    # Projetos
-    total_projetos = db.query(ProjetoPlanejamento).count()
-    projetos_andamento = db.query(ProjetoPlanejamento).filter(
-        ProjetoPlanejamento.status == StatusProjeto.EM_ANDAMENTO
-    ).count()
-    projetos_planejados = db.query(ProjetoPlanejamento).filter(
-        ProjetoPlanejamento.status == StatusProjeto.PLANEJADO
-    ).count()
-    projetos_concluidos = db.query(ProjetoPlanejamento).filter(
-        ProjetoPlanejamento.status == StatusProjeto.CONCLUIDO
-    ).count()
-
-    # Valor total
-    valor_total = db.query(func.sum(ProjetoPlanejamento.valor_estimado)).scalar() or 0
-
-    # Colaboradores
-    total_colaboradores = db.query(Colaborador).count()
-    colaboradores_alocados = (
-        db.query(func.count(func.distinct(Alocacao.colaborador_id)))
-        .filter(Alocacao.status == ModelStatusAlocacao.ATIVA)
-        .scalar() or 0
-    )
+    # Projetos: contagens e valor total (1 query)
+    projetos = (await db.execute(select(*_contagens_projetos()))).one()
+    total_projetos = projetos.total
+    projetos_andamento = projetos.em_andamento
+    projetos_planejados = projetos.planejados
+    projetos_concluidos = projetos.concluidos
+    valor_total = projetos.valor
+
+    # Colaboradores (1 query)
+    total_colaboradores, colaboradores_alocados = (await db.execute(select(
+        select(func.count()).select_from(Colaborador).scalar_subquery(),
+        select(func.count(func.distinct(Alocacao.colaborador_id)))
+        .where(Alocacao.status == ModelStatusAlocacao.ATIVA)
+        .scalar_subquery(),
+    ))).one()
 
     percentual_equipe = (colaboradores_alocados / total_colaboradores * 100) if total_colaboradores > 0 else 0
 
@@ -263,89 +437,73 @@ def get_resumo_geral(db: Session = Depends(get_db)):
 
 
 @router.get("/dashboard/resumo-empresas/", response_model=List[ResumoEmpresaDashboard])
-def get_resumo_empresas(db: Session = Depends(get_db)):
-    """Retorna resumo por empresa"""
-    empresas = db.query(ProjetoPlanejamento.empresa).distinct().all()
-
-    result = []
-    for (empresa,) in empresas:
-        projetos_empresa = db.query(ProjetoPlanejamento).filter(
-            ProjetoPlanejamento.empresa == empresa
-        )
+@orcamento_sql(2)
+async def get_resumo_empresas(db: AsyncSession = Depends(get_async_read_db)):
+    """Retorna resumo por empresa (2 queries agrupadas, independente do numero de empresas)"""
+    por_empresa = (await db.execute(
+        select(ProjetoPlanejamento.empresa, *_contagens_projetos())
+        .group_by(ProjetoPlanejamento.empresa)
+    )).all()
+
+    # Colaboradores distintos alocados em projetos de cada empresa
+    alocados = dict((await db.execute(
+        select(ProjetoPlanejamento.empresa, func.count(func.distinct(Alocacao.colaborador_id)))
+        .join(Alocacao, Alocacao.projeto_id == ProjetoPlanejamento.id)
+        .where(Alocacao.status == ModelStatusAlocacao.ATIVA)
+        .group_by(ProjetoPlanejamento.empresa)
+    )).all())
 
-        total = projetos_empresa.count()
-        em_andamento = projetos_empresa.filter(
-            ProjetoPlanejamento.status == StatusProjeto.EM_ANDAMENTO
-        ).count()
-        concluidos = projetos_empresa.filter(
-            ProjetoPlanejamento.status == StatusProjeto.CONCLUIDO
-        ).count()
-
-        valor = (
-            db.query(func.sum(ProjetoPlanejamento.valor_estimado))
-            .filter(ProjetoPlanejamento.empresa == empresa)
-            .scalar() or 0
+    return [
+        ResumoEmpresaDashboard(
+            empresa=r.empresa,
+            total_projetos=r.total,
+            projetos_em_andamento=r.em_andamento,
+            projetos_concluidos=r.concluidos,
+            valor_total=r.valor,
+            colaboradores_alocados=alocados.get(r.empresa, 0),
         )
-
-        # Colaboradores alocados em projetos desta empresa
-        projeto_ids = [p.id for p in projetos_empresa.all()]
-        alocados = (
-            db.query(func.count(func.distinct(Alocacao.colaborador_id)))
-            .filter(
-                Alocacao.projeto_id.in_(projeto_ids),
-                Alocacao.status == ModelStatusAlocacao.ATIVA,
-            )
-            .scalar() or 0
-        ) if projeto_ids else 0
-
-        result.append(ResumoEmpresaDashboard(
-            empresa=empresa,
-            total_projetos=total,
-            projetos_em_andamento=em_andamento,
-            projetos_concluidos=concluidos,
-            valor_total=valor,
-            colaboradores_alocados=alocados,
-        ))
-
-    return result
+        for r in por_empresa
+    ]
 
 
 @router.get("/dashboard/timeline/", response_model=List[TimelineItemDashboard])
-def get_timeline(
+@orcamento_sql(1)
+async def get_timeline(
     ano: Optional[int] = Query(None),
     empresa: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Retorna projetos para visualizacao em timeline/Gantt"""
-    query = db.query(ProjetoPlanejamento)
+    # Alocacoes ativas por projeto via subquery agrupada (antes: 1 COUNT por projeto)
+    alocados = (
+        select(Alocacao.projeto_id, func.count().label("total"))
+        .where(Alocacao.status == ModelStatusAlocacao.ATIVA)
+        .group_by(Alocacao.projeto_id)
+        .subquery()
+    )
+    query = (
+        select(ProjetoPlanejamento, func.coalesce(alocados.c.total, 0))
+        .outerjoin(alocados, alocados.c.projeto_id == ProjetoPlanejamento.id)
+    )
 
     if empresa:
-        query = query.filter(ProjetoPlanejamento.empresa == empresa)
+        query = query.where(ProjetoPlanejamento.empresa == empresa)
 
     if ano:
         from datetime import datetime
         inicio_ano = datetime(ano, 1, 1)
         fim_ano = datetime(ano, 12, 31, 23, 59, 59)
-        query = query.filter(
+        query = query.where(
             (ProjetoPlanejamento.data_inicio_prevista >= inicio_ano) |
             (ProjetoPlanejamento.data_fim_prevista <= fim_ano) |
             ((ProjetoPlanejamento.data_inicio_prevista < inicio_ano) &
              (ProjetoPlanejamento.data_fim_prevista > fim_ano))
         )
 
-    projetos = query.order_by(ProjetoPlanejamento.data_inicio_prevista).all()
+    projetos = (await db.execute(query.order_by(ProjetoPlanejamento.data_inicio_prevista))).all()
 
     result = []
-    for p in projetos:
-        alocados = (
-            db.query(func.count(Alocacao.id))
-            .filter(
-                Alocacao.projeto_id == p.id,
-                Alocacao.status == ModelStatusAlocacao.ATIVA,
-            )
-            .scalar() or 0
-        )
-
+    for p, total_alocados in projetos:
         result.append(TimelineItemDashboard(
             projeto_id=p.id,
             codigo=p.codigo,
@@ -356,16 +514,16 @@ def get_timeline(
             data_fim=p.data_fim_prevista,
             status=p.status.value,
             percentual_conclusao=p.percentual_conclusao,
-            total_alocados=alocados,
+            total_alocados=total_alocados,
         ))
 
     return result
 
 
 @router.get("/dashboard/disponibilidade/", response_model=List[DisponibilidadeColaborador])
-def get_disponibilidade(
+async def get_disponibilidade(
     setor_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Retorna disponibilidade de colaboradores.
@@ -375,7 +533,7 @@ def get_disponibilidade(
     """
     # QUERY 1: Colaboradores com JOIN de setor (1 query)
     query = (
-        db.query(
+        select(
             Colaborador.id,
             Colaborador.nome,
             Colaborador.cargo,
@@ -386,9 +544,9 @@ def get_disponibilidade(
     )
 
     if setor_id:
-        query = query.filter(Colaborador.setor_id == setor_id)
+        query = query.where(Colaborador.setor_id == setor_id)
 
-    colaboradores_com_setor = query.all()
+    colaboradores_com_setor = (await db.execute(query)).all()
 
     # QUERY 2: TODAS as alocacoes ativas de uma vez (1 query)
     colaborador_ids = [c.id for c in colaboradores_com_setor]
@@ -396,13 +554,13 @@ def get_disponibilidade(
         return []
 
     alocacoes_ativas = (
-        db.query(Alocacao)
-        .filter(
-            Alocacao.colaborador_id.in_(colaborador_ids),
-            Alocacao.status == ModelStatusAlocacao.ATIVA,
+        await db.scalars(
+            select(Alocacao).where(
+                Alocacao.colaborador_id.in_(colaborador_ids),
+                Alocacao.status == ModelStatusAlocacao.ATIVA,
+            )
         )
-        .all()
-    )
+    ).all()
 
     # Agrupar alocacoes por colaborador (em memoria)
     alocacoes_por_colab = {}
@@ -432,82 +590,162 @@ def get_disponibilidade(
 
 
 @router.get("/dashboard/sobrecarga-temporal/", response_model=List[SobrecargaMensal])
-def get_sobrecarga_temporal(
+async def get_sobrecarga_temporal(
     ano: int = Query(2026),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Retorna sobrecarga temporal mensal (ocupacao da equipe ao longo dos meses).
     Para cada mes do ano, calcula quantas pessoas estao alocadas e o percentual medio de ocupacao.
 
-    OTIMIZADO: Busca todas alocacoes do ano em 1 query e processa em memoria (antes: 12+ queries).
+    Agrega os fatos mensais (alocacao_mes, mantidos por trigger) com GROUP BY
+    no indice por mes; anos alem do horizonte dos fatos usam o calculo direto
+    sobre as alocacoes, com a mesma regra (mes de inicio ao mes de fim).
     """
-    from datetime import datetime, timedelta
+    total_colaboradores = await _contar(db, Colaborador)
+    por_mes = await _sobrecarga_por_mes(db, ano)
+    return dashboard_service.sobrecarga_mensal(ano, por_mes, total_colaboradores)
 
-    MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
 
-    # QUERY 1: Total de colaboradores (1 query)
-    total_colaboradores = db.query(Colaborador).count()
+async def _sobrecarga_por_mes(db: AsyncSession, ano: int) -> dict:
+    """Agregados do ano por mes: fatos alocacao_mes ou, alem do horizonte, calculo direto"""
+    inicio_ano = date(ano, 1, 1)
+    fim_ano = date(ano, 12, 1)
+    linhas = (
+        await db.execute(alocacao_mes_service.MESES_STATEMENT, {"inicio": inicio_ano, "fim": fim_ano})
+    ).all()
 
-    # QUERY 2: TODAS as alocacoes do ano de uma vez (1 query)
-    inicio_ano = datetime(ano, 1, 1)
-    fim_ano = datetime(ano, 12, 31, 23, 59, 59)
+    if linhas and alocacao_mes_service.cobre(linhas[0].horizonte, fim_ano):
+        return alocacao_mes_service.agregados(linhas)
 
     alocacoes_ano = (
-        db.query(Alocacao)
-        .filter(
-            or_(
-                # Comeca dentro do ano
-                Alocacao.data_inicio.between(inicio_ano, fim_ano),
-                # Termina dentro do ano
-                Alocacao.data_fim.between(inicio_ano, fim_ano),
-                # Cobre o ano inteiro
-                ((Alocacao.data_inicio < inicio_ano) & (
-                    or_(Alocacao.data_fim.is_(None), Alocacao.data_fim > fim_ano)
-                ))
+        await db.execute(
+            select(
+                Alocacao.colaborador_id, Alocacao.data_inicio, Alocacao.data_fim, Alocacao.horas_semanais
+            ).where(
+                Alocacao.data_inicio < date(ano + 1, 1, 1),
+                or_(Alocacao.data_fim.is_(None), Alocacao.data_fim >= inicio_ano),
             )
         )
-        .all()
-    )
+    ).all()
+    return await run_in_threadpool(alocacao_mes_service.agregar_direto, alocacoes_ano, inicio_ano, 12)
 
-    # Processar em memoria (Python)
-    result = []
-    for mes in range(1, 13):
-        inicio_mes = datetime(ano, mes, 1)
-        if mes == 12:
-            fim_mes = datetime(ano + 1, 1, 1) - timedelta(days=1)
-        else:
-            fim_mes = datetime(ano, mes + 1, 1) - timedelta(days=1)
-
-        # Filtrar alocacoes do mes (em memoria)
-        alocacoes_mes = [
-            a for a in alocacoes_ano
-            if a.data_inicio <= fim_mes and (a.data_fim is None or a.data_fim >= inicio_mes)
-        ]
-
-        # Calcular metricas
-        colaboradores_unicos = set(a.colaborador_id for a in alocacoes_mes)
-        total_pessoas = len(colaboradores_unicos)
-        total_alocacoes = len(alocacoes_mes)
-
-        if total_colaboradores > 0:
-            ocupacao_por_colab = {}
-            for a in alocacoes_mes:
-                if a.colaborador_id not in ocupacao_por_colab:
-                    ocupacao_por_colab[a.colaborador_id] = 0
-                ocupacao_por_colab[a.colaborador_id] += (a.horas_semanais / 44.0) * 100
-
-            percentual_ocupacao = sum(ocupacao_por_colab.values()) / total_colaboradores
-        else:
-            percentual_ocupacao = 0.0
-
-        result.append(SobrecargaMensal(
-            mes=mes,
-            nome_mes=MESES[mes - 1],
-            total_alocacoes=total_alocacoes,
-            total_pessoas=total_pessoas,
-            percentual_ocupacao=round(percentual_ocupacao, 1),
-            sobrecarga=percentual_ocupacao > 100,
-        ))
 
+@router.get("/dashboard/gaps/", response_model=List[GapProjetoDashboard])
+async def get_gaps(
+    empresa: Optional[str] = Query(None),
+    status: Optional[StatusProjeto] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Retorna a matriz de gaps de alocacao (projeto x funcao).
+
+    Para cada projeto indica, por funcao, se ela e necessaria e se esta
+    coberta por alocacao ativa na janela prevista do projeto.
+
+    OTIMIZADO: 1 query de watermark; em cache miss, mais 2 queries
+    (projetos + cobertura agregada por projeto/funcao).
+    """
+    watermark = await obter_watermark_async(db, ProjetoPlanejamento, Alocacao)
+    cache_key = (empresa, status)
+
+    cached = _gaps_cache.get(cache_key, watermark)
+    if cached is not None:
+        return cached
+
+    projetos = (await db.execute(gaps_service.projetos_statement(empresa, status))).all()
+    cobertura = (await db.execute(gaps_service.cobertura_statement(empresa, status))).all()
+
+    result = await run_in_threadpool(gaps_service.calcular_gaps, projetos, cobertura)
+    _gaps_cache.set(cache_key, watermark, result)
     return result
+
+
+@router.get("/dashboard/previsao-contratacoes/", response_model=List[PrevisaoContratacaoMensal])
+async def get_previsao_contratacoes(
+    inicio: Optional[date] = Query(None, description="Mes inicial (padrao: mes atual)"),
+    meses: int = Query(12, ge=1, le=60),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Retorna a previsao mensal de contratacoes por funcao de servico.
+
+    Demanda = equipe_minima dos tipos de servico ativos/planejados;
+    capacidade = colaboradores habilitados pelo cargo menos as horas ja
+    alocadas. Processado em memoria com timeline vetorizada (3 queries).
+    """
+    mes_inicial = (inicio or date.today()).replace(day=1)
+    inicio_horizonte, fim_horizonte = previsao_service.limites_horizonte(mes_inicial, meses)
+
+    servicos = (await db.execute(previsao_service.servicos_statement())).all()
+    colaboradores = (await db.execute(previsao_service.colaboradores_statement())).all()
+    alocacoes = (
+        await db.execute(previsao_service.alocacoes_statement(inicio_horizonte, fim_horizonte))
+    ).all()
+
+    return await run_in_threadpool(
+        previsao_service.calcular_previsao, servicos, colaboradores, alocacoes, mes_inicial, meses
+    )
+
+
+@router.get("/dashboard/capacidade/", response_model=CapacidadeDashboard)
+async def get_capacidade(
+    setor_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Retorna a utilizacao da capacidade de projetos simultaneos por
+    colaborador e agregada por cargo.
+
+    O limite vem de cargos.capacidade_projetos (cargos nao mensurados nao
+    entram nos totais); colaboradores sem cargo usam o limite do setor.
+    """
+    lookup = await capacidade.resolver.lookup_async(db)
+
+    query = (
+        select(
+            Colaborador.id,
+            Colaborador.nome,
+            Colaborador.cargo,
+            Colaborador.cargo_id,
+            Colaborador.setor_id,
+            Setor.nome.label("setor_nome"),
+        )
+        .join(Setor, Colaborador.setor_id == Setor.id)
+    )
+    if setor_id:
+        query = query.where(Colaborador.setor_id == setor_id)
+    colaboradores = (await db.execute(query.order_by(Colaborador.nome))).all()
+
+    ativos_por_colab = dict((await db.execute(capacidade.projetos_ativos_statement())).all())
+
+    return await run_in_threadpool(capacidade.montar_dashboard, lookup, colaboradores, ativos_por_colab)
+
+
+@router.get("/dashboard/heatmap/", response_model=HeatmapDashboard)
+@orcamento_sql(2)
+async def get_heatmap(
+    setor_id: Optional[int] = Query(None),
+    inicio: Optional[date] = Query(None, description="Primeira semana (padrao: semana atual)"),
+    semanas: int = Query(52, ge=1, le=104),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Retorna o mapa de calor de carga: horas semanais comprometidas por
+    colaborador x semana, em formato colunar.
+
+    Uma busca de colaboradores e uma das alocacoes ativas da janela; a
+    matriz e montada com arrays de diferenca por pessoa (NumPy).
+    """
+    origem = inicio_da_semana(inicio or date.today())
+    colaboradores = (await db.execute(heatmap_service.colaboradores_statement(setor_id))).all()
+    alocacoes = (
+        await db.execute(heatmap_service.alocacoes_statement(origem, semanas, setor_id))
+    ).all() if colaboradores else []
+
+    return await run_in_threadpool(_heatmap_resposta, colaboradores, alocacoes, origem, semanas)
+
+
+def _heatmap_resposta(colaboradores: list, alocacoes: list, origem: date, semanas: int):
+    """Matriz (NumPy) e serializacao do mapa, em thread: fora do event loop"""
+    return _heatmap_json.resposta(heatmap_service.montar(colaboradores, alocacoes, origem, semanas))
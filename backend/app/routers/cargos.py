@@ -3,23 +3,29 @@ Router de Cargos - CRUD completo
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..guarda_sql import orcamento_sql
 from ..models.cargo import Cargo
 from ..schemas.cargo import CargoCreate, CargoUpdate, CargoResponse
+from ..schemas.reordenacao import ReorderRequest, MoverRequest
+from ..services import reordenacao
+from ..services.referencia import referencia
 
 router = APIRouter(prefix="/cargos", tags=["Cargos"])
 
 
 @router.get("/", response_model=list[CargoResponse])
-def list_cargos(db: Session = Depends(get_db)):
-    """Lista todos os cargos ordenados por ordem"""
-    return db.query(Cargo).order_by(Cargo.ordem).all()
+@orcamento_sql(2)
+def list_cargos(db: Session = Depends(get_read_db)):
+    """Lista todos os cargos ordenados por ordem (cache de referência, JSON pronto)"""
+    return referencia.obter(db).lista_cargos()
 
 
 @router.get("/{cargo_id}", response_model=CargoResponse)
-def get_cargo(cargo_id: int, db: Session = Depends(get_db)):
+@orcamento_sql(2)
+def get_cargo(cargo_id: int, db: Session = Depends(get_read_db)):
     """Busca um cargo por ID"""
-    cargo = db.query(Cargo).filter(Cargo.id == cargo_id).first()
+    cargo = referencia.obter(db).cargos.get(cargo_id)
     if not cargo:
         raise HTTPException(status_code=404, detail="Cargo não encontrado")
     return cargo
@@ -75,3 +81,32 @@ def delete_cargo(cargo_id: int, db: Session = Depends(get_db)):
 
     db.delete(db_cargo)
     db.commit()
+
+
+# Reordenação
+@router.patch("/reorder/", status_code=200)
+@orcamento_sql(1)
+def reorder_cargos(request: ReorderRequest, db: Session = Depends(get_db)):
+    """Reordena cargos (um único UPDATE para a lista inteira)"""
+    try:
+        reordenacao.reordenar(db, Cargo, request.ordered_ids)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"message": "Cargos reordenados com sucesso"}
+
+
+@router.patch("/{cargo_id}/mover/", status_code=200)
+@orcamento_sql(2)
+def mover_cargo(cargo_id: int, request: MoverRequest, db: Session = Depends(get_db)):
+    """Move um cargo para depois de outro (em geral atualiza só a linha movida)"""
+    try:
+        reordenacao.mover(db, Cargo, cargo_id, request.depois_de)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Cargo não encontrado")
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"message": "Cargo movido com sucesso"}
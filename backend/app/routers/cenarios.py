@@ -0,0 +1,208 @@
+"""
+Router: Cenarios
+
+Simulacao what-if de alocacoes em memoria: cria um cenario a partir do
+estado atual, aplica operacoes hipoteticas, consulta os indicadores
+recalculados e, se desejado, aplica o cenario no banco de uma vez.
+"""
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..cache import obter_watermark
+from ..database import get_db
+from ..eventos import ATUALIZADO, CRIADO, REMOVIDO, publicar
+from .. import jobs
+from ..models.alocacao import Alocacao
+from ..models.colaborador import Colaborador
+from ..models.projeto_planejamento import ProjetoPlanejamento
+from ..schemas.cenario import (
+    CenarioCreate,
+    CenarioOperacoes,
+    CenarioResultado,
+    CenarioResponse,
+    CenarioCommitResponse,
+)
+from ..schemas.job import JobAceito
+from ..services import capacidade
+from ..services import cenarios as cenarios_service
+from ..services.cenarios import Cenario, CenarioErro
+
+router = APIRouter(
+    prefix="/cenarios",
+    tags=["Cenarios"],
+)
+
+# Tabelas cujo estado o cenario reflete (commit recusado se mudarem)
+_MODELOS_ORIGEM = (Alocacao, ProjetoPlanejamento, Colaborador)
+
+
+def _obter_cenario(cenario_id: str) -> Cenario:
+    cenario = cenarios_service.store.obter(cenario_id)
+    if cenario is None:
+        raise HTTPException(status_code=404, detail="Cenario nao encontrado ou expirado")
+    return cenario
+
+
+def _response(cenario: Cenario, ano: Optional[int] = None) -> dict:
+    return {**cenario.resumo(), "resultado": cenario.resultado(ano)}
+
+
+@router.post("/", response_model=CenarioResponse, status_code=201)
+def create_cenario(dados: CenarioCreate, db: Session = Depends(get_db)):
+    """Cria um cenario carregando as alocacoes atuais em memoria"""
+    watermark = obter_watermark(db, *_MODELOS_ORIGEM)
+    cenario = Cenario.carregar(
+        alocacoes=db.execute(cenarios_service.alocacoes_statement()).all(),
+        colaboradores=db.execute(cenarios_service.colaboradores_statement()).all(),
+        projetos=db.execute(cenarios_service.projetos_statement()).all(),
+        lookup=capacidade.resolver.lookup(db),
+        watermark=watermark,
+        ano=dados.ano or date.today().year,
+        nome=dados.nome,
+    )
+    cenarios_service.store.adicionar(cenario)
+    return _response(cenario)
+
+
+@router.get("/{cenario_id}/", response_model=CenarioResponse)
+def get_cenario(cenario_id: str, ano: Optional[int] = Query(None)):
+    """Retorna o cenario com os indicadores recalculados"""
+    cenario = _obter_cenario(cenario_id)
+    with cenario.lock:
+        return _response(cenario, ano)
+
+
+@router.post("/{cenario_id}/operacoes/", response_model=CenarioResultado)
+def aplicar_operacoes(
+    cenario_id: str,
+    dados: CenarioOperacoes,
+    ano: Optional[int] = Query(None),
+):
+    """
+    Aplica operacoes em ordem e devolve os indicadores recalculados.
+
+    Se alguma operacao for invalida, nenhuma do lote e aplicada.
+    """
+    cenario = _obter_cenario(cenario_id)
+    with cenario.lock:
+        try:
+            cenario.aplicar(dados.operacoes)
+        except CenarioErro as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return cenario.resultado(ano)
+
+
+@router.post(
+    "/{cenario_id}/commit/", response_model=CenarioCommitResponse,
+    responses={202: {"model": JobAceito, "description": "Com ?async=true: job criado"}},
+)
+def commit_cenario(
+    cenario_id: str,
+    assincrono: bool = Query(False, alias="async", description="Executa em segundo plano (202 + job)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Aplica o cenario no banco em uma unica transacao.
+
+    Retorna 409 se projetos, colaboradores ou alocacoes mudaram desde a
+    criacao do cenario, e 400 se o cenario deixa algum colaborador alterado
+    acima do limite de projetos ou com alocacao ativa duplicada.
+    """
+    if assincrono:
+        # O cenario vive na memoria deste worker, onde o job tambem roda
+        _obter_cenario(cenario_id)
+        return jobs.executor.enfileirar(db, "cenarios.commit", {"cenario_id": cenario_id})
+    return _commit_cenario(cenario_id, db)
+
+
+@jobs.tarefa("cenarios.commit", resposta=CenarioCommitResponse)
+def _job_commit_cenario(contexto: jobs.ContextoJob, cenario_id: str):
+    with contexto.sessao() as db:
+        return _commit_cenario(cenario_id, db, contexto.progresso)
+
+
+def _commit_cenario(
+    cenario_id: str, db: Session, progresso: jobs.Progresso = jobs.sem_progresso
+) -> CenarioCommitResponse:
+    """Corpo de commit_cenario, executado na requisicao ou no job"""
+    cenario = _obter_cenario(cenario_id)
+    with cenario.lock:
+        progresso(0.0, "Validando limites do cenario")
+        afetados = cenario.colaboradores_afetados()
+        erros = [
+            f"{v['nome']} ({v['limite_descricao']}) ficaria com {v['projetos_ativos']} projetos ativos. "
+            f"Limite: {v['limite']} projetos simultaneos."
+            for v in cenario.violacoes(afetados)
+        ]
+        erros += [
+            f"Colaborador {c} ficaria com mais de uma alocacao ativa no projeto {p}"
+            for c, p in cenario.duplicidades(afetados)
+        ]
+        if erros:
+            raise HTTPException(status_code=400, detail="; ".join(erros))
+
+        # Bloqueia escritas concorrentes nas tabelas do watermark (_MODELOS_ORIGEM)
+        # ate o fim da transacao e confere o watermark
+        db.execute(text(
+            "LOCK TABLE alocacoes, projetos_planejamento, colaboradores IN SHARE ROW EXCLUSIVE MODE"
+        ))
+        if obter_watermark(db, *_MODELOS_ORIGEM) != cenario.watermark:
+            db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="Os dados mudaram desde a criacao do cenario. Crie um novo cenario.",
+            )
+
+        # Ultimo ponto de cancelamento: daqui em diante o cenario e gravado
+        progresso(0.3, "Gravando o cenario")
+
+        # Projetos hipoteticos -> reais
+        projetos_criados = {}
+        for projeto_id, dados in cenario.projetos_hipoteticos.items():
+            db_projeto = ProjetoPlanejamento(**dados)
+            db.add(db_projeto)
+            db.flush()
+            projetos_criados[projeto_id] = db_projeto.id
+
+        if cenario.removidas:
+            db.query(Alocacao).filter(Alocacao.id.in_(cenario.removidas)).delete(synchronize_session=False)
+
+        if cenario.editadas:
+            for db_alocacao in db.query(Alocacao).filter(Alocacao.id.in_(cenario.editadas)).all():
+                for field, value in cenario.editadas[db_alocacao.id].items():
+                    setattr(db_alocacao, field, value)
+
+        novas = []
+        for payload in cenario.novas.values():
+            projeto_id = payload["projeto_id"]
+            novas.append(Alocacao(**{**payload, "projeto_id": projetos_criados.get(projeto_id, projeto_id)}))
+        db.add_all(novas)
+        db.flush()
+
+        publicar(
+            db,
+            *(("projetos_planejamento", CRIADO, i) for i in projetos_criados.values()),
+            *(("alocacoes", REMOVIDO, i) for i in cenario.removidas),
+            *(("alocacoes", ATUALIZADO, i) for i in cenario.editadas),
+            *(("alocacoes", CRIADO, a.id) for a in novas),
+        )
+        db.commit()
+        cenarios_service.store.remover(cenario_id)
+
+    return CenarioCommitResponse(
+        projetos_criados=projetos_criados,
+        alocacoes_criadas=len(novas),
+        alocacoes_atualizadas=len(cenario.editadas),
+        alocacoes_removidas=len(cenario.removidas),
+    )
+
+
+@router.delete("/{cenario_id}/", status_code=204)
+def delete_cenario(cenario_id: str):
+    """Descarta um cenario"""
+    if cenarios_service.store.remover(cenario_id) is None:
+        raise HTTPException(status_code=404, detail="Cenario nao encontrado ou expirado")
+    return None
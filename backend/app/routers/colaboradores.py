@@ -1,22 +1,35 @@
 """
 Endpoints de Colaboradores
 """
-from typing import Set
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from ..database import get_db
-from ..models import Colaborador, Setor, NivelHierarquico, Subnivel
+from sqlalchemy import delete, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db, get_async_read_db
+from ..eventos import ATUALIZADO, CRIADO, REMOVIDO, publicar_async
+from ..guarda_sql import orcamento_sql
+from ..models import Colaborador
 from ..models.alocacao import Alocacao
 from ..schemas import ColaboradorCreate, ColaboradorUpdate, ColaboradorResponse
+from ..serializacao import SerializadorJSON
+from ..services.referencia import referencia
 
 router = APIRouter(prefix="/colaboradores", tags=["Colaboradores"])
 
+# Colunas na ordem dos campos de ColaboradorResponse, para serializar as
+# linhas direto (sem instanciar ORM nem modelos)
+COLUNAS_RESPOSTA = [
+    func.coalesce(Colaborador.permissoes, literal([], JSONB)).label("permissoes")
+    if campo == "permissoes" else getattr(Colaborador, campo)
+    for campo in ColaboradorResponse.model_fields
+]
+_lista_json = SerializadorJSON(list[ColaboradorResponse])
 
-def check_hierarchy_cycle(
-    db: Session,
+
+async def check_hierarchy_cycle(
+    db: AsyncSession,
     colaborador_id: int,
     new_superior_id: int | None,
-    visited: Set[int] | None = None
 ) -> bool:
     """
     Verifica se atribuir new_superior_id como superior de colaborador_id criaria um ciclo.
@@ -27,6 +40,10 @@ def check_hierarchy_cycle(
     - A é superior de B
     - B é superior de C
     - Tentar fazer C superior de A criaria ciclo: A -> B -> C -> A
+
+    A cadeia de superiores é percorrida em uma única query recursiva (antes:
+    1 query por nível). O UNION descarta linhas repetidas, então a recursão
+    termina mesmo se o banco já tiver um ciclo.
     """
     if new_superior_id is None:
         return False
@@ -35,67 +52,66 @@ def check_hierarchy_cycle(
     if colaborador_id == new_superior_id:
         return True
 
-    if visited is None:
-        visited = set()
-
-    # Verifica se o novo superior já está na cadeia de subordinação
-    # Ou seja, se new_superior_id é subordinado (direto ou indireto) de colaborador_id
-    current_id = new_superior_id
-    while current_id is not None:
-        if current_id in visited:
-            return True  # Ciclo detectado
-        if current_id == colaborador_id:
-            return True  # Novo superior é subordinado do colaborador
-
-        visited.add(current_id)
-        superior = db.query(Colaborador).filter(Colaborador.id == current_id).first()
-        if superior is None:
-            break
-        current_id = superior.superior_id
-
-    return False
+    # Cadeia de superiores a partir do novo superior
+    cadeia = (
+        select(Colaborador.id, Colaborador.superior_id)
+        .where(Colaborador.id == new_superior_id)
+        .cte("cadeia", recursive=True)
+    )
+    cadeia = cadeia.union(
+        select(Colaborador.id, Colaborador.superior_id)
+        .join(cadeia, Colaborador.id == cadeia.c.superior_id)
+    )
+
+    # Ciclo se o colaborador está na cadeia (novo superior é subordinado dele)
+    # ou se a cadeia já tem um ciclo (nenhum elo chega ao topo, superior NULL)
+    return bool(await db.scalar(select(
+        exists().where(cadeia.c.id == colaborador_id)
+        | (exists().select_from(cadeia) & ~exists().where(cadeia.c.superior_id.is_(None)))
+    )))
 
 
 @router.get("/", response_model=list[ColaboradorResponse])
-def list_colaboradores(
+async def list_colaboradores(
     setor_id: int | None = Query(None, description="Filtrar por setor"),
     nivel_id: int | None = Query(None, description="Filtrar por nível"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Lista todos os colaboradores com filtros opcionais"""
-    query = db.query(Colaborador)
+    query = select(*COLUNAS_RESPOSTA)
 
     if setor_id:
-        query = query.filter(Colaborador.setor_id == setor_id)
+        query = query.where(Colaborador.setor_id == setor_id)
     if nivel_id:
-        query = query.filter(Colaborador.nivel_id == nivel_id)
+        query = query.where(Colaborador.nivel_id == nivel_id)
 
-    return query.all()
+    return _lista_json.resposta((await db.execute(query)).all())
 
 
 @router.get("/{colaborador_id}", response_model=ColaboradorResponse)
-def get_colaborador(colaborador_id: int, db: Session = Depends(get_db)):
+async def get_colaborador(colaborador_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Busca um colaborador por ID"""
-    colaborador = db.query(Colaborador).filter(Colaborador.id == colaborador_id).first()
+    colaborador = await db.get(Colaborador, colaborador_id)
     if not colaborador:
         raise HTTPException(status_code=404, detail="Colaborador não encontrado")
     return colaborador
 
 
 @router.post("/", response_model=ColaboradorResponse, status_code=201)
-def create_colaborador(colaborador: ColaboradorCreate, db: Session = Depends(get_db)):
+async def create_colaborador(colaborador: ColaboradorCreate, db: AsyncSession = Depends(get_async_db)):
     """Cria um novo colaborador"""
+    # Setor, nível e subnível: lookups no cache de referência
+    ref = await referencia.obter_async(db)
+
     # Validar setor_id
-    setor = db.query(Setor).filter(Setor.id == colaborador.setor_id).first()
-    if not setor:
+    if colaborador.setor_id not in ref.setores:
         raise HTTPException(
             status_code=400,
             detail=f"Setor com ID {colaborador.setor_id} não encontrado"
         )
 
     # Validar nivel_id
-    nivel = db.query(NivelHierarquico).filter(NivelHierarquico.id == colaborador.nivel_id).first()
-    if not nivel:
+    if colaborador.nivel_id not in ref.niveis:
         raise HTTPException(
             status_code=400,
             detail=f"Nível hierárquico com ID {colaborador.nivel_id} não encontrado"
@@ -103,7 +119,7 @@ def create_colaborador(colaborador: ColaboradorCreate, db: Session = Depends(get
 
     # Validar subnivel_id se especificado
     if colaborador.subnivel_id is not None:
-        subnivel = db.query(Subnivel).filter(Subnivel.id == colaborador.subnivel_id).first()
+        subnivel = ref.subniveis.get(colaborador.subnivel_id)
         if not subnivel:
             raise HTTPException(
                 status_code=400,
@@ -111,15 +127,15 @@ def create_colaborador(colaborador: ColaboradorCreate, db: Session = Depends(get
             )
 
         # Verificar se o subnível pertence ao nível hierárquico correto
-        if subnivel.nivel_id != colaborador.nivel_id:
+        if subnivel["nivel_id"] != colaborador.nivel_id:
             raise HTTPException(
                 status_code=400,
-                detail=f"Subnível {subnivel.nome} não pertence ao nível hierárquico selecionado"
+                detail=f"Subnível {subnivel['nome']} não pertence ao nível hierárquico selecionado"
             )
 
     # Validar que o superior existe (se especificado)
     if colaborador.superior_id is not None:
-        superior = db.query(Colaborador).filter(Colaborador.id == colaborador.superior_id).first()
+        superior = await db.get(Colaborador, colaborador.superior_id)
         if not superior:
             raise HTTPException(
                 status_code=400,
@@ -128,45 +144,48 @@ def create_colaborador(colaborador: ColaboradorCreate, db: Session = Depends(get
 
     db_colaborador = Colaborador(**colaborador.model_dump())
     db.add(db_colaborador)
-    db.commit()
-    db.refresh(db_colaborador)
+    await db.flush()
+    await publicar_async(db, ("colaboradores", CRIADO, db_colaborador.id))
+    await db.commit()
+    await db.refresh(db_colaborador)
     return db_colaborador
 
 
 @router.put("/{colaborador_id}", response_model=ColaboradorResponse)
-def update_colaborador(
+@orcamento_sql(8)  # colaborador + cache de referência (versão + recarga) + superior + ciclo + UPDATE + evento + refresh
+async def update_colaborador(
     colaborador_id: int,
     colaborador: ColaboradorUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Atualiza um colaborador"""
-    db_colaborador = db.query(Colaborador).filter(Colaborador.id == colaborador_id).first()
+    db_colaborador = await db.get(Colaborador, colaborador_id)
     if not db_colaborador:
         raise HTTPException(status_code=404, detail="Colaborador não encontrado")
 
     update_data = colaborador.model_dump(exclude_unset=True)
 
+    # Setor, nível e subnível: lookups no cache de referência
+    if update_data.keys() & {"setor_id", "nivel_id", "subnivel_id"}:
+        ref = await referencia.obter_async(db)
+
     # Validar setor_id se está sendo alterado
     if "setor_id" in update_data:
         setor_id = update_data["setor_id"]
-        if setor_id is not None:
-            setor = db.query(Setor).filter(Setor.id == setor_id).first()
-            if not setor:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Setor com ID {setor_id} não encontrado"
-                )
+        if setor_id is not None and setor_id not in ref.setores:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Setor com ID {setor_id} não encontrado"
+            )
 
     # Validar nivel_id se está sendo alterado
     if "nivel_id" in update_data:
         nivel_id = update_data["nivel_id"]
-        if nivel_id is not None:
-            nivel = db.query(NivelHierarquico).filter(NivelHierarquico.id == nivel_id).first()
-            if not nivel:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Nível hierárquico com ID {nivel_id} não encontrado"
-                )
+        if nivel_id is not None and nivel_id not in ref.niveis:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Nível hierárquico com ID {nivel_id} não encontrado"
+            )
 
     # Validar subnivel_id se está sendo alterado
     if "subnivel_id" in update_data:
@@ -176,7 +195,7 @@ def update_colaborador(
             nivel_id = update_data.get("nivel_id", db_colaborador.nivel_id)
 
             # Verificar se o subnível existe
-            subnivel = db.query(Subnivel).filter(Subnivel.id == subnivel_id).first()
+            subnivel = ref.subniveis.get(subnivel_id)
             if not subnivel:
                 raise HTTPException(
                     status_code=400,
@@ -184,10 +203,10 @@ def update_colaborador(
                 )
 
             # Verificar se o subnível pertence ao nível hierárquico correto
-            if subnivel.nivel_id != nivel_id:
+            if subnivel["nivel_id"] != nivel_id:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Subnível {subnivel.nome} não pertence ao nível hierárquico selecionado"
+                    detail=f"Subnível {subnivel['nome']} não pertence ao nível hierárquico selecionado"
                 )
 
     # Validação anti-ciclo se superior_id está sendo alterado
@@ -196,7 +215,7 @@ def update_colaborador(
 
         # Validar que o superior existe (se especificado)
         if new_superior_id is not None:
-            superior = db.query(Colaborador).filter(Colaborador.id == new_superior_id).first()
+            superior = await db.get(Colaborador, new_superior_id)
             if not superior:
                 raise HTTPException(
                     status_code=400,
@@ -204,7 +223,7 @@ def update_colaborador(
                 )
 
             # Validação anti-ciclo
-            if check_hierarchy_cycle(db, colaborador_id, new_superior_id):
+            if await check_hierarchy_cycle(db, colaborador_id, new_superior_id):
                 raise HTTPException(
                     status_code=400,
                     detail="Alteração criaria ciclo na hierarquia. O superior especificado é subordinado deste colaborador."
@@ -213,20 +232,23 @@ def update_colaborador(
     for field, value in update_data.items():
         setattr(db_colaborador, field, value)
 
-    db.commit()
-    db.refresh(db_colaborador)
+    await publicar_async(db, ("colaboradores", ATUALIZADO, colaborador_id))
+    await db.commit()
+    await db.refresh(db_colaborador)
     return db_colaborador
 
 
 @router.delete("/{colaborador_id}", status_code=204)
-def delete_colaborador(colaborador_id: int, db: Session = Depends(get_db)):
+async def delete_colaborador(colaborador_id: int, db: AsyncSession = Depends(get_async_db)):
     """Remove um colaborador"""
-    db_colaborador = db.query(Colaborador).filter(Colaborador.id == colaborador_id).first()
+    db_colaborador = await db.get(Colaborador, colaborador_id)
     if not db_colaborador:
         raise HTTPException(status_code=404, detail="Colaborador não encontrado")
 
     # Validar dependencias antes de deletar
-    subordinados_count = db.query(Colaborador).filter(Colaborador.superior_id == colaborador_id).count()
+    subordinados_count = await db.scalar(
+        select(func.count()).select_from(Colaborador).where(Colaborador.superior_id == colaborador_id)
+    )
     if subordinados_count > 0:
         raise HTTPException(
             status_code=400,
@@ -234,7 +256,9 @@ def delete_colaborador(colaborador_id: int, db: Session = Depends(get_db)):
                    f"Realoque os subordinados antes de deletar."
         )
 
-    alocacao_count = db.query(Alocacao).filter(Alocacao.colaborador_id == colaborador_id).count()
+    alocacao_count = await db.scalar(
+        select(func.count()).select_from(Alocacao).where(Alocacao.colaborador_id == colaborador_id)
+    )
     if alocacao_count > 0:
         raise HTTPException(
             status_code=400,
@@ -242,11 +266,14 @@ def delete_colaborador(colaborador_id: int, db: Session = Depends(get_db)):
                    f"Remova as alocacoes antes de deletar."
         )
 
-    db.delete(db_colaborador)
-    db.commit()
+    # DELETE direto: dependencias ja validadas (evita carregar as colecoes
+    # subordinados/alocacoes, que nao podem ser lazy-loaded na sessao async)
+    await db.execute(delete(Colaborador).where(Colaborador.id == colaborador_id))
+    await publicar_async(db, ("colaboradores", REMOVIDO, colaborador_id))
+    await db.commit()
 
 
 @router.get("/{colaborador_id}/subordinados", response_model=list[ColaboradorResponse])
-def list_subordinados(colaborador_id: int, db: Session = Depends(get_db)):
+async def list_subordinados(colaborador_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Lista subordinados diretos de um colaborador"""
-    return db.query(Colaborador).filter(Colaborador.superior_id == colaborador_id).all()
+    return (await db.scalars(select(Colaborador).where(Colaborador.superior_id == colaborador_id))).all()
@@ -0,0 +1,43 @@
+"""
+Router: Eventos
+
+Stream Server-Sent Events com as mudancas publicadas pelas rotas de escrita
+(alocacoes, colaboradores, projetos, versoes do organograma). Cada evento
+tem `event: <entidade>`, `id: <watermark>` e data JSON com entidade, acao
+(criado/atualizado/removido), id e watermark; o cliente refaz so as
+consultas da entidade que mudou. `event: resync` pede recarga completa.
+Ver app/eventos.py.
+"""
+from typing import Optional
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+
+from ..eventos import broker
+
+router = APIRouter(
+    prefix="/eventos",
+    tags=["Eventos"],
+)
+
+# Reconexao do EventSource apos queda (ms)
+RETRY_MS = 3000
+
+
+@router.get("/")
+async def stream_eventos(
+    entidades: Optional[str] = Query(None, description="Filtro, separado por virgula (ex: alocacoes,colaboradores)"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """Stream SSE de eventos de mudanca; sem consultas ao banco"""
+    filtro = frozenset(e.strip() for e in entidades.split(",") if e.strip()) if entidades else None
+
+    async def stream():
+        yield f"retry: {RETRY_MS}\n\n"
+        async for bloco in broker.assinar(filtro, last_event_id):
+            yield bloco
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,82 @@
+"""
+Router: Jobs
+
+Acompanhamento e cancelamento dos jobs criados pelas rotas pesadas chamadas
+com ?async=true (ver app/jobs.py). Le sempre do primario: o estado muda a
+cada ponto de progresso e a replica mostraria um passo atrasado.
+"""
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..jobs import CANCELADO, EXECUTANDO, PENDENTE, TERMINAIS
+from ..models.job import Job
+from ..schemas.job import JobResponse
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"],
+)
+
+
+@router.get("/", response_model=List[JobResponse])
+def list_jobs(
+    status: Optional[str] = Query(None, description="pendente, executando, concluido, falhou ou cancelado"),
+    tipo: Optional[str] = Query(None),
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    """Lista os jobs mais recentes (sem o resultado)"""
+    stmt = (
+        select(*(getattr(Job, campo) for campo in JobResponse.model_fields if campo != "resultado"))
+        .order_by(Job.created_at.desc())
+        .limit(limite)
+    )
+    if status:
+        stmt = stmt.where(Job.status == status)
+    if tipo:
+        stmt = stmt.where(Job.tipo == tipo)
+    return [linha._asdict() for linha in db.execute(stmt).all()]
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: UUID, db: Session = Depends(get_db)):
+    """Estado, progresso e resultado (ou erro) de um job"""
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job nao encontrado")
+    return job
+
+
+@router.post("/{job_id}/cancelar", response_model=JobResponse)
+def cancelar_job(job_id: UUID, db: Session = Depends(get_db)):
+    """
+    Cancela um job. Pendente: cancelado na hora. Em execucao: para no
+    proximo ponto de progresso, desfazendo o que nao foi gravado.
+    """
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job nao encontrado")
+    if job.status in TERMINAIS:
+        raise HTTPException(status_code=409, detail=f"Job ja terminou ({job.status})")
+
+    agora = datetime.utcnow()
+    # Condicional ao status: o executor pode ter pego o job entre a leitura e aqui
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == PENDENTE)
+        .values(status=CANCELADO, cancelamento_solicitado=True, mensagem="Cancelado",
+                finished_at=agora, updated_at=agora)
+    )
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == EXECUTANDO)
+        .values(cancelamento_solicitado=True, updated_at=agora)
+    )
+    db.commit()
+    db.refresh(job)
+    return job
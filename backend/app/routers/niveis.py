@@ -3,24 +3,28 @@ Endpoints de Níveis Hierárquicos
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..guarda_sql import orcamento_sql
 from ..models import NivelHierarquico, Subnivel, Colaborador
-from ..schemas import NivelCreate, NivelUpdate, NivelResponse, SubnivelResponse
+from ..schemas import NivelCreate, NivelUpdate, NivelResponse, SubnivelResponse, ReorderRequest, MoverRequest
+from ..services import reordenacao
+from ..services.referencia import referencia
 
 router = APIRouter(prefix="/niveis", tags=["Níveis Hierárquicos"])
 
 
 @router.get("/", response_model=list[NivelResponse])
-def list_niveis(db: Session = Depends(get_db)):
-    """Lista todos os níveis hierárquicos"""
-    return db.query(NivelHierarquico).order_by(NivelHierarquico.ordem).all()
+@orcamento_sql(2)
+def list_niveis(db: Session = Depends(get_read_db)):
+    """Lista todos os níveis hierárquicos com subníveis, por ordem (cache de referência, JSON pronto)"""
+    return referencia.obter(db).lista_niveis()
 
 
 @router.get("/{nivel_id}", response_model=NivelResponse)
-def get_nivel(nivel_id: int, db: Session = Depends(get_db)):
+@orcamento_sql(2)
+def get_nivel(nivel_id: int, db: Session = Depends(get_read_db)):
     """Busca um nível por ID"""
-    nivel = db.query(NivelHierarquico).filter(NivelHierarquico.id == nivel_id).first()
+    nivel = referencia.obter(db).niveis.get(nivel_id)
     if not nivel:
         raise HTTPException(status_code=404, detail="Nível não encontrado")
     return nivel
@@ -81,42 +85,32 @@ def delete_nivel(nivel_id: int, db: Session = Depends(get_db)):
 
 
 # Reordenação
-class ReorderRequest(BaseModel):
-    """Request para reordenar níveis"""
-    ordered_ids: list[int]
-
-
 @router.patch("/reorder/", status_code=200)
+@orcamento_sql(1)
 def reorder_niveis(request: ReorderRequest, db: Session = Depends(get_db)):
-    """Reordena níveis hierárquicos"""
-    # Validar que todos os IDs existem
-    niveis_existentes = db.query(NivelHierarquico.id).filter(
-        NivelHierarquico.id.in_(request.ordered_ids)
-    ).all()
-    niveis_ids = {n.id for n in niveis_existentes}
-
-    if len(niveis_ids) != len(request.ordered_ids):
-        raise HTTPException(
-            status_code=400,
-            detail="Alguns níveis não foram encontrados"
-        )
-
-    # Verificar duplicados
-    if len(request.ordered_ids) != len(set(request.ordered_ids)):
-        raise HTTPException(
-            status_code=400,
-            detail="IDs duplicados na lista de reordenação"
-        )
+    """Reordena níveis hierárquicos (um único UPDATE para a lista inteira)"""
+    try:
+        reordenacao.reordenar(db, NivelHierarquico, request.ordered_ids)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"message": "Níveis reordenados com sucesso"}
 
-    # Reordenar
-    for index, nivel_id in enumerate(request.ordered_ids):
-        db_nivel = db.query(NivelHierarquico).filter(
-            NivelHierarquico.id == nivel_id
-        ).first()
-        db_nivel.ordem = index + 1
 
+@router.patch("/{nivel_id}/mover/", status_code=200)
+@orcamento_sql(2)
+def mover_nivel(nivel_id: int, request: MoverRequest, db: Session = Depends(get_db)):
+    """Move um nível para depois de outro (em geral atualiza só a linha movida)"""
+    try:
+        reordenacao.mover(db, NivelHierarquico, nivel_id, request.depois_de)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Nível não encontrado")
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     db.commit()
-    return {"message": "Níveis reordenados com sucesso"}
+    return {"message": "Nível movido com sucesso"}
 
 
 @router.patch("/{nivel_id}/toggle/", response_model=NivelResponse)
@@ -134,6 +128,8 @@ def toggle_nivel_ativo(nivel_id: int, db: Session = Depends(get_db)):
 
 # Subníveis
 @router.get("/{nivel_id}/subniveis", response_model=list[SubnivelResponse])
-def list_subniveis(nivel_id: int, db: Session = Depends(get_db)):
+@orcamento_sql(2)
+def list_subniveis(nivel_id: int, db: Session = Depends(get_read_db)):
     """Lista subníveis de um nível"""
-    return db.query(Subnivel).filter(Subnivel.nivel_id == nivel_id).all()
+    nivel = referencia.obter(db).niveis.get(nivel_id)
+    return nivel["subniveis"] if nivel else []
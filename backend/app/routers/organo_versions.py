@@ -1,91 +1,49 @@
 """
 Endpoints de Versões do Organograma
 Permite criar rascunhos, editar e aprovar mudanças no organograma.
+Edição colaborativa de um rascunho: WS /{version_id}/ws (ver app/rascunhos.py).
 """
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..cache import WatermarkCache, obter_watermark_async
+from ..compressao import PayloadJSON
+from ..database import get_async_db, get_async_read_db
+from ..eventos import ATUALIZADO, CRIADO, REMOVIDO, publicar_async
+from ..guarda_sql import orcamento_sql
+from .. import jobs
 from ..models import OrganoVersion, Colaborador
+from ..rascunhos import FECHAMENTO_POLITICA, VersaoIndisponivel, rascunhos
+from ..serializacao import SerializadorJSON
+from ..services.edicao_rascunho import calculate_changes, get_current_snapshot
 from ..schemas import (
+    JobAceito,
     OrganoVersionCreate,
     OrganoVersionUpdate,
     OrganoVersionResponse,
     OrganoVersionListResponse,
+    OrganoVersionAprovada,
 )
 
 router = APIRouter(prefix="/versions", tags=["Versões do Organograma"])
 
+# Campos do snapshot aplicados aos colaboradores na aprovação
+CAMPOS_APROVACAO = ("id", "nome", "cargo", "setor_id", "subsetor_id", "nivel_id", "subnivel_id", "superior_id")
 
-def get_current_snapshot(db: Session) -> list[dict]:
-    """Gera snapshot atual dos colaboradores do banco"""
-    colaboradores = db.query(Colaborador).all()
-    return [
-        {
-            "id": c.id,
-            "nome": c.nome,
-            "cargo": c.cargo,
-            "setor_id": c.setor_id,
-            "subsetor_id": c.subsetor_id,
-            "nivel_id": c.nivel_id,
-            "subnivel_id": c.subnivel_id,
-            "superior_id": c.superior_id,
-            "permissoes": c.permissoes or [],
-            "foto_url": c.foto_url,
-            "email": c.email,
-            "telefone": c.telefone,
-        }
-        for c in colaboradores
-    ]
-
-
-def calculate_changes(official: list[dict], draft: list[dict]) -> dict:
-    """Calcula diferenças entre snapshot oficial e rascunho"""
-    official_map = {c["id"]: c for c in official}
-    draft_map = {c["id"]: c for c in draft}
-
-    hierarchy_changes = []
-    data_changes = []
-
-    # Verificar mudanças em colaboradores existentes
-    for colab_id, draft_colab in draft_map.items():
-        if colab_id in official_map:
-            official_colab = official_map[colab_id]
-
-            # Mudança de hierarquia
-            if draft_colab.get("superior_id") != official_colab.get("superior_id"):
-                hierarchy_changes.append({
-                    "colaborador_id": colab_id,
-                    "colaborador_nome": draft_colab.get("nome", ""),
-                    "change_type": "hierarchy",
-                    "field": "superior_id",
-                    "old_value": official_colab.get("superior_id"),
-                    "new_value": draft_colab.get("superior_id"),
-                })
-
-            # Mudanças de dados
-            for field in ["nome", "cargo", "setor_id", "nivel_id"]:
-                if draft_colab.get(field) != official_colab.get(field):
-                    data_changes.append({
-                        "colaborador_id": colab_id,
-                        "colaborador_nome": draft_colab.get("nome", ""),
-                        "change_type": "data",
-                        "field": field,
-                        "old_value": official_colab.get(field),
-                        "new_value": draft_colab.get(field),
-                    })
-
-    return {
-        "total_changes": len(hierarchy_changes) + len(data_changes),
-        "hierarchy_changes": hierarchy_changes,
-        "data_changes": data_changes,
-    }
+
+_versao_json = SerializadorJSON(OrganoVersionResponse)
+
+# JSON das versões (com as variantes comprimidas) por id, válido enquanto a
+# versão não muda; "current" vale enquanto o watermark dos colaboradores não muda
+_payloads = WatermarkCache(maxsize=8)
 
 
 @router.get("/", response_model=list[OrganoVersionListResponse])
-def list_versions(db: Session = Depends(get_db)):
+async def list_versions(db: AsyncSession = Depends(get_async_read_db)):
     """Lista todas as versões/rascunhos do organograma"""
-    versions = db.query(OrganoVersion).order_by(OrganoVersion.updated_at.desc()).all()
+    versions = (await db.scalars(select(OrganoVersion).order_by(OrganoVersion.updated_at.desc()))).all()
 
     result = []
     for v in versions:
@@ -107,42 +65,62 @@ def list_versions(db: Session = Depends(get_db)):
 
 
 @router.get("/current", response_model=OrganoVersionResponse)
-def get_current_version(db: Session = Depends(get_db)):
+async def get_current_version(db: AsyncSession = Depends(get_async_read_db)):
     """
     Retorna snapshot da versão oficial atual (estado do banco).
     Útil para criar um rascunho baseado no estado atual.
     """
-    snapshot = get_current_snapshot(db)
-    return {
-        "id": 0,
-        "nome": "Versão Oficial",
-        "descricao": "Estado atual do organograma",
-        "status": "official",
-        "snapshot": snapshot,
-        "changes_summary": None,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
-        "approved_at": None,
-    }
+    watermark = await obter_watermark_async(db, Colaborador)
+    payload = _payloads.get("current", watermark)
+    if payload is None:
+        # Datas = momento em que o snapshot foi gerado
+        agora = datetime.utcnow()
+        payload = PayloadJSON(_versao_json.dumps({
+            "id": 0,
+            "nome": "Versão Oficial",
+            "descricao": "Estado atual do organograma",
+            "status": "official",
+            "snapshot": await get_current_snapshot(db),
+            "changes_summary": None,
+            "created_at": agora,
+            "updated_at": agora,
+            "approved_at": None,
+        }))
+        _payloads.set("current", watermark, payload)
+    return payload.resposta()
 
 
 @router.get("/{version_id}", response_model=OrganoVersionResponse)
-def get_version(version_id: int, db: Session = Depends(get_db)):
+async def get_version(version_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Busca uma versão específica por ID"""
-    version = db.query(OrganoVersion).filter(OrganoVersion.id == version_id).first()
-    if not version:
+    # Só as colunas pequenas; o snapshot é lido apenas se o cache não vale
+    estado = (await db.execute(
+        select(OrganoVersion.updated_at, OrganoVersion.status, OrganoVersion.approved_at)
+        .where(OrganoVersion.id == version_id)
+    )).one_or_none()
+    if estado is None:
         raise HTTPException(status_code=404, detail="Versão não encontrada")
-    return version
+
+    watermark = tuple(estado)
+    payload = _payloads.get(version_id, watermark)
+    if payload is None:
+        version = await db.get(OrganoVersion, version_id)
+        # Snapshot grande: serializado direto, sem revalidar pelo response_model
+        payload = PayloadJSON(_versao_json.dumps(
+            {campo: getattr(version, campo) for campo in OrganoVersionResponse.model_fields}
+        ))
+        _payloads.set(version_id, watermark, payload)
+    return payload.resposta()
 
 
 @router.post("/", response_model=OrganoVersionResponse, status_code=201)
-def create_version(version_data: OrganoVersionCreate, db: Session = Depends(get_db)):
+async def create_version(version_data: OrganoVersionCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Cria uma nova versão/rascunho baseado no estado atual do banco.
     O snapshot é copiado automaticamente do estado oficial.
     """
     # Criar snapshot do estado atual
-    snapshot = get_current_snapshot(db)
+    snapshot = await get_current_snapshot(db)
 
     db_version = OrganoVersion(
         nome=version_data.nome,
@@ -153,22 +131,24 @@ def create_version(version_data: OrganoVersionCreate, db: Session = Depends(get_
     )
 
     db.add(db_version)
-    db.commit()
-    db.refresh(db_version)
+    await db.flush()
+    await publicar_async(db, ("organo_versions", CRIADO, db_version.id))
+    await db.commit()
+    await db.refresh(db_version)
     return db_version
 
 
 @router.put("/{version_id}", response_model=OrganoVersionResponse)
-def update_version(
+async def update_version(
     version_id: int,
     version_data: OrganoVersionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Atualiza uma versão/rascunho.
     Permite atualizar nome, descrição e snapshot (mudanças no organograma).
     """
-    db_version = db.query(OrganoVersion).filter(OrganoVersion.id == version_id).first()
+    db_version = await db.get(OrganoVersion, version_id)
     if not db_version:
         raise HTTPException(status_code=404, detail="Versão não encontrada")
 
@@ -186,27 +166,72 @@ def update_version(
 
     # Se snapshot foi atualizado, recalcular mudanças
     if version_data.snapshot is not None:
+        # Com editores conectados, o snapshot inteiro apagaria as operações deles
+        if rascunhos.ativa(version_id):
+            raise HTTPException(
+                status_code=409,
+                detail="Rascunho em edição colaborativa; altere pelo canal /ws"
+            )
         new_snapshot = [s.model_dump() for s in version_data.snapshot]
         db_version.snapshot = new_snapshot
 
         # Calcular diff em relação ao estado oficial atual
-        official_snapshot = get_current_snapshot(db)
+        official_snapshot = await get_current_snapshot(db)
         db_version.changes_summary = calculate_changes(official_snapshot, new_snapshot)
 
     db_version.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(db_version)
+    await publicar_async(db, ("organo_versions", ATUALIZADO, version_id))
+    await db.commit()
+    await db.refresh(db_version)
     return db_version
 
 
-@router.post("/{version_id}/approve", response_model=OrganoVersionResponse)
-def approve_version(version_id: int, db: Session = Depends(get_db)):
+@router.post(
+    "/{version_id}/approve", response_model=OrganoVersionResponse,
+    responses={202: {"model": JobAceito, "description": "Com ?async=true: job criado"}},
+)
+@orcamento_sql(7)
+async def approve_version(
+    version_id: int,
+    assincrono: bool = Query(False, alias="async", description="Executa em segundo plano (202 + job)"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Aprova uma versão, tornando-a oficial.
     Aplica todas as mudanças do snapshot ao banco de colaboradores.
     """
-    db_version = db.query(OrganoVersion).filter(OrganoVersion.id == version_id).first()
+    # Edição colaborativa: recusa operações novas e grava as pendentes; o
+    # snapshot aprovado é o gravado agora
+    await rascunhos.fechar(version_id)
+
+    if assincrono:
+        await rascunhos.encerrar(version_id, "Aprovação em andamento")
+        return await jobs.executor.enfileirar_async(db, "versoes.aprovar", {"version_id": version_id})
+
+    try:
+        db_version = await _aprovar(version_id, db)
+    except BaseException:
+        rascunhos.reabrir(version_id)
+        raise
+    await rascunhos.encerrar(version_id, "Versão aprovada")
+    return db_version
+
+
+# Resultado enxuto: o snapshot inteiro (varios MB) ja esta na versao
+@jobs.tarefa("versoes.aprovar", resposta=OrganoVersionAprovada)
+async def _job_aprovar(contexto: jobs.ContextoJob, version_id: int):
+    async with contexto.sessao_async() as db:
+        return await _aprovar(version_id, db, contexto.progresso)
+
+
+async def _aprovar(
+    version_id: int, db: AsyncSession, progresso: jobs.Progresso = jobs.sem_progresso
+) -> OrganoVersion:
+    """Corpo de approve_version, executado na requisição ou no job"""
+    # Trava a versão até o commit: uma gravação do rascunho (outro worker)
+    # espera e depois não casa mais com status draft
+    db_version = await db.get(OrganoVersion, version_id, with_for_update=True)
     if not db_version:
         raise HTTPException(status_code=404, detail="Versão não encontrada")
 
@@ -216,31 +241,49 @@ def approve_version(version_id: int, db: Session = Depends(get_db)):
     if db_version.status == "archived":
         raise HTTPException(status_code=400, detail="Não é possível aprovar versão arquivada")
 
-    # Aplicar mudanças ao banco
+    # Aplicar mudanças ao banco: colaboradores do snapshot em 1 query e
+    # um único UPDATE em lote (executemany) só para os que mudaram
+    progresso(0.0, f"Comparando {len(db_version.snapshot)} colaboradores")
+    ids = [colab_data["id"] for colab_data in db_version.snapshot]
+    atuais = {
+        c.id: c for c in (await db.execute(
+            select(*(getattr(Colaborador, campo) for campo in CAMPOS_APROVACAO))
+            .where(Colaborador.id.in_(ids))
+        )).all()
+    }
+    alteracoes = []
     for colab_data in db_version.snapshot:
-        db_colab = db.query(Colaborador).filter(Colaborador.id == colab_data["id"]).first()
-        if db_colab:
-            db_colab.nome = colab_data.get("nome", db_colab.nome)
-            db_colab.cargo = colab_data.get("cargo", db_colab.cargo)
-            db_colab.setor_id = colab_data.get("setor_id", db_colab.setor_id)
-            db_colab.subsetor_id = colab_data.get("subsetor_id", db_colab.subsetor_id)
-            db_colab.nivel_id = colab_data.get("nivel_id", db_colab.nivel_id)
-            db_colab.subnivel_id = colab_data.get("subnivel_id", db_colab.subnivel_id)
-            db_colab.superior_id = colab_data.get("superior_id")
+        atual = atuais.get(colab_data["id"])
+        if atual is None:
+            continue
+        novo = {campo: colab_data.get(campo, getattr(atual, campo)) for campo in CAMPOS_APROVACAO}
+        novo["superior_id"] = colab_data.get("superior_id")
+        if novo != atual._asdict():
+            alteracoes.append(novo)
+    # Último ponto de cancelamento: daqui em diante a aprovação é gravada
+    progresso(0.5, f"Aplicando {len(alteracoes)} alterações")
+    if alteracoes:
+        await db.execute(update(Colaborador), alteracoes)
 
     # Marcar versão como aprovada
     db_version.status = "approved"
     db_version.approved_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(db_version)
+    # Versao aprovada e colaboradores alterados em um unico pg_notify
+    await publicar_async(
+        db,
+        ("organo_versions", ATUALIZADO, version_id),
+        *(("colaboradores", ATUALIZADO, c["id"]) for c in alteracoes),
+    )
+    await db.commit()
+    await db.refresh(db_version)
     return db_version
 
 
 @router.delete("/{version_id}", status_code=204)
-def delete_version(version_id: int, db: Session = Depends(get_db)):
+async def delete_version(version_id: int, db: AsyncSession = Depends(get_async_db)):
     """Remove uma versão/rascunho"""
-    db_version = db.query(OrganoVersion).filter(OrganoVersion.id == version_id).first()
+    db_version = await db.get(OrganoVersion, version_id)
     if not db_version:
         raise HTTPException(status_code=404, detail="Versão não encontrada")
 
@@ -250,20 +293,52 @@ def delete_version(version_id: int, db: Session = Depends(get_db)):
             detail="Não é possível deletar uma versão aprovada. Use arquivar."
         )
 
-    db.delete(db_version)
-    db.commit()
+    await db.delete(db_version)
+    await publicar_async(db, ("organo_versions", REMOVIDO, version_id))
+    await db.commit()
+    await rascunhos.encerrar(version_id, "Versão removida")
 
 
 @router.post("/{version_id}/archive", response_model=OrganoVersionResponse)
-def archive_version(version_id: int, db: Session = Depends(get_db)):
+async def archive_version(version_id: int, db: AsyncSession = Depends(get_async_db)):
     """Arquiva uma versão (não pode mais ser editada ou aprovada)"""
-    db_version = db.query(OrganoVersion).filter(OrganoVersion.id == version_id).first()
+    db_version = await db.get(OrganoVersion, version_id)
     if not db_version:
         raise HTTPException(status_code=404, detail="Versão não encontrada")
 
     db_version.status = "archived"
     db_version.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(db_version)
+    await publicar_async(db, ("organo_versions", ATUALIZADO, version_id))
+    await db.commit()
+    await rascunhos.encerrar(version_id, "Versão arquivada")
+    await db.refresh(db_version)
     return db_version
+
+
+@router.websocket("/{version_id}/ws")
+async def editar_rascunho(
+    websocket: WebSocket,
+    version_id: int,
+    editor: Optional[str] = Query(None, max_length=64, description="Nome exibido aos outros editores"),
+):
+    """
+    Canal de edição colaborativa de um rascunho.
+    Recebe operações JSON (`mover`, `editar`) e envia estado, deltas dos
+    outros editores, acks e confirmações de gravação.
+    """
+    await websocket.accept()
+    try:
+        await rascunhos.entrar(version_id, websocket, editor)
+    except VersaoIndisponivel as e:
+        await websocket.send_json({"tipo": "erro", "ref": None, "detail": str(e)})
+        await websocket.close(FECHAMENTO_POLITICA)
+        return
+
+    try:
+        while True:
+            await rascunhos.receber(version_id, websocket, await websocket.receive_text())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await rascunhos.sair(version_id, websocket)
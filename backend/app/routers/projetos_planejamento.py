@@ -3,19 +3,27 @@ Router: Projetos de Planejamento
 
 Endpoints para CRUD de projetos de planejamento.
 """
+from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..eventos import ATUALIZADO, CRIADO, REMOVIDO, publicar
+from .. import jobs
 from ..models.projeto_planejamento import ProjetoPlanejamento, StatusProjeto
-from ..models.alocacao import Alocacao
+from ..models.alocacao import Alocacao, FuncaoAlocacao
 from ..schemas.projeto_planejamento import (
     ProjetoPlanejamentoCreate,
     ProjetoPlanejamentoUpdate,
     ProjetoPlanejamentoResponse,
     ProjetoPlanejamentoListResponse,
 )
+from ..schemas.job import JobAceito
+from ..schemas.sugestao import SugestoesProjeto, SugestaoLoteRequest, SugestaoLoteResponse
+from ..services import capacidade
+from ..services import gaps as gaps_service
+from ..services import sugestoes as sugestoes_service
 
 router = APIRouter(
     prefix="/projetos-planejamento",
@@ -29,7 +37,7 @@ def list_projetos(
     cliente: Optional[str] = Query(None),
     categoria: Optional[str] = Query(None),
     status: Optional[StatusProjeto] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Lista todos os projetos com filtros opcionais"""
     query = db.query(ProjetoPlanejamento)
@@ -47,7 +55,7 @@ def list_projetos(
 
 
 @router.get("/{projeto_id}/", response_model=ProjetoPlanejamentoResponse)
-def get_projeto(projeto_id: int, db: Session = Depends(get_db)):
+def get_projeto(projeto_id: int, db: Session = Depends(get_read_db)):
     """Retorna um projeto pelo ID"""
     projeto = db.query(ProjetoPlanejamento).filter(ProjetoPlanejamento.id == projeto_id).first()
     if not projeto:
@@ -65,6 +73,8 @@ def create_projeto(projeto: ProjetoPlanejamentoCreate, db: Session = Depends(get
 
     db_projeto = ProjetoPlanejamento(**projeto.model_dump())
     db.add(db_projeto)
+    db.flush()
+    publicar(db, ("projetos_planejamento", CRIADO, db_projeto.id))
     db.commit()
     db.refresh(db_projeto)
     return db_projeto
@@ -92,6 +102,7 @@ def update_projeto(
     for field, value in update_data.items():
         setattr(db_projeto, field, value)
 
+    publicar(db, ("projetos_planejamento", ATUALIZADO, projeto_id))
     db.commit()
     db.refresh(db_projeto)
     return db_projeto
@@ -114,6 +125,7 @@ def delete_projeto(projeto_id: int, db: Session = Depends(get_db)):
         )
 
     db.delete(db_projeto)
+    publicar(db, ("projetos_planejamento", REMOVIDO, projeto_id))
     db.commit()
     return None
 
@@ -121,7 +133,7 @@ def delete_projeto(projeto_id: int, db: Session = Depends(get_db)):
 # ============ ENDPOINTS AUXILIARES ============
 
 @router.get("/resumo/empresas/")
-def get_resumo_empresas(db: Session = Depends(get_db)):
+def get_resumo_empresas(db: Session = Depends(get_read_db)):
     """Retorna resumo de projetos por empresa"""
     from sqlalchemy import func
 
@@ -146,7 +158,7 @@ def get_resumo_empresas(db: Session = Depends(get_db)):
 
 
 @router.get("/resumo/clientes/")
-def get_resumo_clientes(db: Session = Depends(get_db)):
+def get_resumo_clientes(db: Session = Depends(get_read_db)):
     """Retorna resumo de projetos por cliente"""
     from sqlalchemy import func
 
@@ -171,7 +183,7 @@ def get_resumo_clientes(db: Session = Depends(get_db)):
 
 
 @router.get("/resumo/categorias/")
-def get_resumo_categorias(db: Session = Depends(get_db)):
+def get_resumo_categorias(db: Session = Depends(get_read_db)):
     """Retorna resumo de projetos por categoria"""
     from sqlalchemy import func
 
@@ -196,21 +208,153 @@ def get_resumo_categorias(db: Session = Depends(get_db)):
 
 
 @router.get("/opcoes/empresas/")
-def get_opcoes_empresas(db: Session = Depends(get_db)):
+def get_opcoes_empresas(db: Session = Depends(get_read_db)):
     """Retorna lista de empresas unicas"""
     resultados = db.query(ProjetoPlanejamento.empresa).distinct().all()
     return [r.empresa for r in resultados]
 
 
 @router.get("/opcoes/clientes/")
-def get_opcoes_clientes(db: Session = Depends(get_db)):
+def get_opcoes_clientes(db: Session = Depends(get_read_db)):
     """Retorna lista de clientes unicos"""
     resultados = db.query(ProjetoPlanejamento.cliente).distinct().all()
     return [r.cliente for r in resultados]
 
 
 @router.get("/opcoes/categorias/")
-def get_opcoes_categorias(db: Session = Depends(get_db)):
+def get_opcoes_categorias(db: Session = Depends(get_read_db)):
     """Retorna lista de categorias unicas"""
     resultados = db.query(ProjetoPlanejamento.categoria).distinct().all()
     return [r.categoria for r in resultados]
+
+
+# ============ SUGESTOES DE ALOCACAO ============
+
+def _grade_capacidade(db: Session, inicio, fim) -> sugestoes_service.GradeCapacidade:
+    """Carrega a grade semanal de capacidade de todas as pessoas (4 queries)"""
+    return sugestoes_service.GradeCapacidade(
+        colaboradores=db.execute(sugestoes_service.colaboradores_statement()).all(),
+        alocacoes=db.execute(sugestoes_service.alocacoes_statement(inicio, fim)).all(),
+        historico=db.execute(sugestoes_service.historico_statement()).all(),
+        projetos_ativos=dict(db.execute(capacidade.projetos_ativos_statement()).all()),
+        lookup=capacidade.resolver.lookup(db),
+        inicio=inicio,
+        fim=fim,
+    )
+
+
+@router.get("/{projeto_id}/sugestoes/", response_model=SugestoesProjeto)
+def get_sugestoes(
+    projeto_id: int,
+    funcao: FuncaoAlocacao = Query(...),
+    limite: int = Query(10, ge=1, le=100),
+    incluir_indisponiveis: bool = Query(False),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Ranqueia candidatos para uma funcao do projeto.
+
+    Considera horas livres na janela prevista do projeto (data_inicio_prevista
+    a data_fim_prevista), o limite de projetos simultaneos do cargo e a
+    aderencia do cargo/historico a funcao. Quem ja esta alocado no projeto
+    nao aparece.
+    """
+    projeto = db.query(ProjetoPlanejamento).filter(ProjetoPlanejamento.id == projeto_id).first()
+    if not projeto:
+        raise HTTPException(status_code=404, detail="Projeto nao encontrado")
+
+    inicio, fim = sugestoes_service.janela_projeto(projeto.data_inicio_prevista, projeto.data_fim_prevista)
+    grade = _grade_capacidade(db, inicio, fim)
+    alocados = {c for _, c in db.execute(sugestoes_service.alocados_statement([projeto_id])).all()}
+
+    return {
+        "projeto_id": projeto.id,
+        "codigo": projeto.codigo,
+        "funcao": funcao,
+        "data_inicio": datetime.combine(inicio, datetime.min.time()),
+        "data_fim": datetime.combine(fim, datetime.min.time()),
+        "candidatos": sugestoes_service.ranquear_candidatos(
+            grade, funcao, inicio, fim, alocados, limite, incluir_indisponiveis
+        ),
+    }
+
+
+@router.post(
+    "/sugestoes/lote/", response_model=SugestaoLoteResponse,
+    responses={202: {"model": JobAceito, "description": "Com ?async=true: job criado"}},
+)
+def sugerir_equipes(
+    dados: SugestaoLoteRequest,
+    assincrono: bool = Query(False, alias="async", description="Executa em segundo plano (202 + job)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Propoe uma equipe completa para varios projetos (nada e gravado).
+
+    Cada funcao necessaria e ainda nao coberta (mesmo criterio de
+    /alocacoes/dashboard/gaps/) vira uma vaga; as vagas sao preenchidas por
+    um otimizador guloso que desconta a capacidade ja sugerida. O resultado
+    pode ser enviado para POST /alocacoes/lote/.
+    """
+    if assincrono:
+        return jobs.executor.enfileirar(db, "projetos.sugestoes_lote", dados.model_dump(mode="json"))
+    return _sugerir_equipes(dados, db)
+
+
+@jobs.tarefa("projetos.sugestoes_lote", resposta=SugestaoLoteResponse)
+def _job_sugerir_equipes(contexto: jobs.ContextoJob, **parametros):
+    with contexto.sessao() as db:
+        return _sugerir_equipes(SugestaoLoteRequest.model_validate(parametros), db, contexto.progresso)
+
+
+def _sugerir_equipes(dados: SugestaoLoteRequest, db: Session, progresso: jobs.Progresso = jobs.sem_progresso):
+    """Corpo de sugerir_equipes, executado na requisicao ou no job"""
+    progresso(0.0, "Calculando gaps")
+    stmt = gaps_service.projetos_statement(dados.empresa)
+    if dados.projeto_ids:
+        stmt = stmt.where(ProjetoPlanejamento.id.in_(dados.projeto_ids))
+    else:
+        stmt = stmt.where(ProjetoPlanejamento.status.in_(dados.status))
+    projetos = db.execute(stmt).all()
+    if not projetos:
+        return {"alocacoes": [], "nao_preenchidas": [], "total_vagas": 0}
+
+    ids = {p.id for p in projetos}
+    cobertura = [
+        c for c in db.execute(gaps_service.cobertura_statement(dados.empresa)).all()
+        if c.projeto_id in ids
+    ]
+
+    vagas = []
+    for p, gaps in zip(projetos, gaps_service.calcular_gaps(projetos, cobertura)):
+        inicio, fim = sugestoes_service.janela_projeto(p.data_inicio_prevista, p.data_fim_prevista)
+        for f in gaps["funcoes"]:
+            if f["gap"]:
+                vagas.append({
+                    "projeto_id": p.id,
+                    "codigo": p.codigo,
+                    "funcao": FuncaoAlocacao(f["funcao"]),
+                    "inicio": inicio,
+                    "fim": fim,
+                })
+    if not vagas:
+        return {"alocacoes": [], "nao_preenchidas": [], "total_vagas": 0}
+
+    progresso(0.3, f"Carregando capacidade para {len(vagas)} vagas")
+    grade = _grade_capacidade(db, min(v["inicio"] for v in vagas), max(v["fim"] for v in vagas))
+    alocados: dict[int, set[int]] = {}
+    for projeto_id, colaborador_id in db.execute(sugestoes_service.alocados_statement(list(ids))).all():
+        alocados.setdefault(projeto_id, set()).add(colaborador_id)
+
+    progresso(0.6, f"Preenchendo {len(vagas)} vagas")
+    sugeridas, nao_preenchidas = sugestoes_service.preencher_gaps(
+        grade, vagas, alocados, dados.horas_semanais
+    )
+    return {
+        "alocacoes": sugeridas,
+        "nao_preenchidas": [
+            {"projeto_id": v["projeto_id"], "codigo": v["codigo"], "funcao": v["funcao"]}
+            for v in nao_preenchidas
+        ],
+        "total_vagas": len(vagas),
+    }
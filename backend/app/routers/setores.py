@@ -3,23 +3,28 @@ Endpoints de Setores
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..guarda_sql import orcamento_sql
 from ..models import Setor, Subsetor, Colaborador
-from ..schemas import SetorCreate, SetorUpdate, SetorResponse, SubsetorResponse
+from ..schemas import SetorCreate, SetorUpdate, SetorResponse, SubsetorResponse, ReorderRequest, MoverRequest
+from ..services import reordenacao
+from ..services.referencia import referencia
 
 router = APIRouter(prefix="/setores", tags=["Setores"])
 
 
 @router.get("/", response_model=list[SetorResponse])
-def list_setores(db: Session = Depends(get_db)):
-    """Lista todos os setores"""
-    return db.query(Setor).all()
+@orcamento_sql(2)
+def list_setores(db: Session = Depends(get_read_db)):
+    """Lista todos os setores com subsetores (cache de referencia, JSON pronto)"""
+    return referencia.obter(db).lista_setores()
 
 
 @router.get("/{setor_id}", response_model=SetorResponse)
-def get_setor(setor_id: int, db: Session = Depends(get_db)):
+@orcamento_sql(2)
+def get_setor(setor_id: int, db: Session = Depends(get_read_db)):
     """Busca um setor por ID"""
-    setor = db.query(Setor).filter(Setor.id == setor_id).first()
+    setor = referencia.obter(db).setores.get(setor_id)
     if not setor:
         raise HTTPException(status_code=404, detail="Setor não encontrado")
     return setor
@@ -79,8 +84,39 @@ def delete_setor(setor_id: int, db: Session = Depends(get_db)):
     db.commit()
 
 
+# Reordenação
+@router.patch("/reorder/", status_code=200)
+@orcamento_sql(1)
+def reorder_setores(request: ReorderRequest, db: Session = Depends(get_db)):
+    """Reordena setores (um único UPDATE para a lista inteira)"""
+    try:
+        reordenacao.reordenar(db, Setor, request.ordered_ids)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"message": "Setores reordenados com sucesso"}
+
+
+@router.patch("/{setor_id}/mover/", status_code=200)
+@orcamento_sql(2)
+def mover_setor(setor_id: int, request: MoverRequest, db: Session = Depends(get_db)):
+    """Move um setor para depois de outro (em geral atualiza só a linha movida)"""
+    try:
+        reordenacao.mover(db, Setor, setor_id, request.depois_de)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Setor não encontrado")
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"message": "Setor movido com sucesso"}
+
+
 # Subsetores
 @router.get("/{setor_id}/subsetores", response_model=list[SubsetorResponse])
-def list_subsetores(setor_id: int, db: Session = Depends(get_db)):
+@orcamento_sql(2)
+def list_subsetores(setor_id: int, db: Session = Depends(get_read_db)):
     """Lista subsetores de um setor"""
-    return db.query(Subsetor).filter(Subsetor.setor_id == setor_id).all()
+    setor = referencia.obter(db).setores.get(setor_id)
+    return setor["subsetores"] if setor else []
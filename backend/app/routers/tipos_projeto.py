@@ -3,21 +3,24 @@ Router de Tipos de Projeto - CRUD completo
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..guarda_sql import orcamento_sql
 from ..models.tipo_projeto import TipoProjeto
+from ..schemas.reordenacao import ReorderRequest, MoverRequest
 from ..schemas.tipo_projeto import TipoProjetoCreate, TipoProjetoUpdate, TipoProjetoResponse
+from ..services import reordenacao
 
 router = APIRouter(prefix="/tipos-projeto", tags=["Tipos de Projeto"])
 
 
 @router.get("/", response_model=list[TipoProjetoResponse])
-def list_tipos_projeto(db: Session = Depends(get_db)):
+def list_tipos_projeto(db: Session = Depends(get_read_db)):
     """Lista todos os tipos de projeto ordenados por ordem"""
     return db.query(TipoProjeto).order_by(TipoProjeto.ordem).all()
 
 
 @router.get("/{tipo_id}", response_model=TipoProjetoResponse)
-def get_tipo_projeto(tipo_id: int, db: Session = Depends(get_db)):
+def get_tipo_projeto(tipo_id: int, db: Session = Depends(get_read_db)):
     """Busca um tipo de projeto por ID"""
     tipo = db.query(TipoProjeto).filter(TipoProjeto.id == tipo_id).first()
     if not tipo:
@@ -75,3 +78,32 @@ def delete_tipo_projeto(tipo_id: int, db: Session = Depends(get_db)):
 
     db.delete(db_tipo)
     db.commit()
+
+
+# Reordenação
+@router.patch("/reorder/", status_code=200)
+@orcamento_sql(1)
+def reorder_tipos_projeto(request: ReorderRequest, db: Session = Depends(get_db)):
+    """Reordena tipos de projeto (um único UPDATE para a lista inteira)"""
+    try:
+        reordenacao.reordenar(db, TipoProjeto, request.ordered_ids)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"message": "Tipos de projeto reordenados com sucesso"}
+
+
+@router.patch("/{tipo_id}/mover/", status_code=200)
+@orcamento_sql(2)
+def mover_tipo_projeto(tipo_id: int, request: MoverRequest, db: Session = Depends(get_db)):
+    """Move um tipo de projeto para depois de outro (em geral atualiza só a linha movida)"""
+    try:
+        reordenacao.mover(db, TipoProjeto, tipo_id, request.depois_de)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Tipo de projeto não encontrado")
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return {"message": "Tipo de projeto movido com sucesso"}
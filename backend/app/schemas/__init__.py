@@ -6,6 +6,7 @@ from .setor import SetorBase, SetorCreate, SetorUpdate, SetorResponse, SubsetorR
 from .nivel import NivelBase, NivelCreate, NivelUpdate, NivelResponse, SubnivelResponse
 from .colaborador import ColaboradorBase, ColaboradorCreate, ColaboradorUpdate, ColaboradorResponse
 from .cargo import CargoBase, CargoCreate, CargoUpdate, CargoResponse
+from .reordenacao import ReorderRequest, MoverRequest
 from .organo_version import (
     ColaboradorSnapshot,
     VersionChange,
@@ -14,6 +15,10 @@ from .organo_version import (
     OrganoVersionUpdate,
     OrganoVersionResponse,
     OrganoVersionListResponse,
+    OrganoVersionAprovada,
+    OperacaoRascunhoMover,
+    OperacaoRascunhoEditar,
+    OperacaoRascunho,
 )
 
 # Planejamento
@@ -27,6 +32,7 @@ from .projeto_planejamento import (
 # Alocacao (Dashboard)
 from .alocacao import (
     AlocacaoCreate,
+    AlocacaoLoteCreate,
     AlocacaoUpdate,
     AlocacaoResponse,
     AlocacaoComDetalhes,
@@ -34,10 +40,46 @@ from .alocacao import (
     ResumoEmpresaDashboard,
     TimelineItemDashboard,
     DisponibilidadeColaborador,
+    GapFuncaoProjeto,
+    GapProjetoDashboard,
+    PrevisaoContratacaoFuncao,
+    PrevisaoContratacaoMensal,
+    CapacidadeColaborador,
+    CapacidadeCargo,
+    CapacidadeDashboard,
+    DashboardCombinado,
+    HeatmapColaboradores,
+    HeatmapDashboard,
     StatusAlocacao,
     FuncaoAlocacao,
 )
 
+# Cenarios (simulacao what-if)
+from .cenario import (
+    ProjetoHipotetico,
+    AlocacaoHipotetica,
+    OperacaoCenario,
+    CenarioCreate,
+    CenarioOperacoes,
+    ViolacaoLimite,
+    CenarioResultado,
+    CenarioResponse,
+    CenarioCommitResponse,
+)
+
+# Sugestoes de alocacao
+from .sugestao import (
+    CandidatoSugerido,
+    SugestoesProjeto,
+    SugestaoLoteRequest,
+    AlocacaoSugerida,
+    VagaNaoPreenchida,
+    SugestaoLoteResponse,
+)
+
+# Jobs em segundo plano
+from .job import JobAceito, JobResponse
+
 # Legacy
 from .tipo_projeto import TipoProjetoBase, TipoProjetoCreate, TipoProjetoUpdate, TipoProjetoResponse
 
@@ -47,15 +89,31 @@ __all__ = [
     "NivelBase", "NivelCreate", "NivelUpdate", "NivelResponse", "SubnivelResponse",
     "ColaboradorBase", "ColaboradorCreate", "ColaboradorUpdate", "ColaboradorResponse",
     "CargoBase", "CargoCreate", "CargoUpdate", "CargoResponse",
+    "ReorderRequest", "MoverRequest",
     "ColaboradorSnapshot", "VersionChange", "ChangesSummary",
     "OrganoVersionCreate", "OrganoVersionUpdate", "OrganoVersionResponse", "OrganoVersionListResponse",
+    "OrganoVersionAprovada",
+    "OperacaoRascunhoMover", "OperacaoRascunhoEditar", "OperacaoRascunho",
     # Planejamento
     "ProjetoPlanejamentoCreate", "ProjetoPlanejamentoUpdate",
     "ProjetoPlanejamentoResponse", "ProjetoPlanejamentoListResponse",
     # Alocacao (Dashboard)
-    "AlocacaoCreate", "AlocacaoUpdate", "AlocacaoResponse", "AlocacaoComDetalhes",
+    "AlocacaoCreate", "AlocacaoLoteCreate", "AlocacaoUpdate", "AlocacaoResponse", "AlocacaoComDetalhes",
     "ResumoGeralDashboard", "ResumoEmpresaDashboard", "TimelineItemDashboard",
-    "DisponibilidadeColaborador", "StatusAlocacao", "FuncaoAlocacao",
+    "DisponibilidadeColaborador", "GapFuncaoProjeto", "GapProjetoDashboard",
+    "PrevisaoContratacaoFuncao", "PrevisaoContratacaoMensal",
+    "CapacidadeColaborador", "CapacidadeCargo", "CapacidadeDashboard",
+    "DashboardCombinado", "HeatmapColaboradores", "HeatmapDashboard",
+    "StatusAlocacao", "FuncaoAlocacao",
+    # Cenarios (simulacao what-if)
+    "ProjetoHipotetico", "AlocacaoHipotetica", "OperacaoCenario",
+    "CenarioCreate", "CenarioOperacoes", "ViolacaoLimite",
+    "CenarioResultado", "CenarioResponse", "CenarioCommitResponse",
+    # Sugestoes de alocacao
+    "CandidatoSugerido", "SugestoesProjeto", "SugestaoLoteRequest",
+    "AlocacaoSugerida", "VagaNaoPreenchida", "SugestaoLoteResponse",
+    # Jobs em segundo plano
+    "JobAceito", "JobResponse",
     # Legacy
     "TipoProjetoBase", "TipoProjetoCreate", "TipoProjetoUpdate", "TipoProjetoResponse",
 ]
@@ -1,7 +1,7 @@
 """
 Schemas Pydantic: Alocacao
 """
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -42,6 +42,11 @@ class AlocacaoCreate(AlocacaoBase):
     pass
 
 
+class AlocacaoLoteCreate(BaseModel):
+    """Schema para criacao em lote (tudo ou nada)"""
+    alocacoes: List[AlocacaoCreate] = Field(..., min_length=1, max_length=500)
+
+
 class AlocacaoUpdate(BaseModel):
     """Schema para atualizacao (todos opcionais)"""
     funcao: Optional[FuncaoAlocacao] = None
@@ -149,3 +154,110 @@ class SobrecargaMensal(BaseModel):
     total_pessoas: int  # Numero de pessoas com alocacao ativa
     percentual_ocupacao: float  # Media de ocupacao considerando TODOS os colaboradores da empresa
     sobrecarga: bool  # True se ocupacao > 100%
+
+
+class GapFuncaoProjeto(BaseModel):
+    """Situacao de uma funcao dentro de um projeto"""
+    funcao: FuncaoAlocacao
+    necessaria: bool  # False se estiver em funcoes_nao_necessarias
+    coberta: bool  # True se ha alocacao ativa na janela do projeto
+    cobertura_integral: bool  # True se as alocacoes cobrem do inicio ao fim previsto
+    total_alocados: int  # Colaboradores distintos alocados na funcao
+    gap: bool  # Necessaria e nao coberta
+
+
+class GapProjetoDashboard(BaseModel):
+    """Matriz de gaps de alocacao de um projeto (uma linha por funcao)"""
+    projeto_id: int
+    codigo: str
+    nome: str
+    empresa: str
+    status: str
+    data_inicio: Optional[datetime]
+    data_fim: Optional[datetime]
+    total_gaps: int
+    funcoes: List[GapFuncaoProjeto]
+
+
+class PrevisaoContratacaoFuncao(BaseModel):
+    """Demanda x capacidade de uma funcao de servico em um mes"""
+    funcao: str  # comercial, suprimentos, engenheiro, planejamento, execucao, assistente
+    demanda: float  # Soma de equipe_minima dos servicos ativos no mes
+    capacidade_disponivel: float  # Pessoas habilitadas menos horas ja alocadas (44h = 1 pessoa)
+    gap: float  # demanda - capacidade_disponivel (negativo = sobra)
+    contratacoes: int  # Pessoas a contratar no mes (gap arredondado para cima)
+
+
+class PrevisaoContratacaoMensal(BaseModel):
+    """Previsao de contratacoes de um mes"""
+    ano: int
+    mes: int  # 1-12
+    nome_mes: str  # "Jan", "Fev", etc
+    funcoes: List[PrevisaoContratacaoFuncao]
+    total_contratacoes: int
+
+
+class CapacidadeColaborador(BaseModel):
+    """Utilizacao da capacidade de projetos simultaneos de um colaborador"""
+    colaborador_id: int
+    nome: str
+    cargo_id: Optional[int]
+    cargo: str
+    setor: str
+    limite_projetos: Optional[int]  # None = cargo nao mensurado
+    origem_limite: str  # "cargo" | "setor" (colaborador sem cargo cadastrado)
+    projetos_ativos: int
+    percentual_utilizacao: Optional[float]
+    sobrecarregado: bool  # True se projetos_ativos > limite
+
+
+class CapacidadeCargo(BaseModel):
+    """Capacidade agregada por cargo (colaboradores sem cargo ficam com cargo_id None)"""
+    cargo_id: Optional[int]
+    cargo: str
+    capacidade_projetos: Optional[int]
+    nao_mensurar_capacidade: bool
+    total_colaboradores: int
+    capacidade_total: int  # Soma dos limites dos colaboradores mensurados
+    projetos_ativos: int  # Soma dos projetos ativos dos colaboradores mensurados
+    percentual_utilizacao: Optional[float]
+
+
+class CapacidadeDashboard(BaseModel):
+    """Utilizacao de capacidade por pessoa e por cargo"""
+    colaboradores: List[CapacidadeColaborador]
+    cargos: List[CapacidadeCargo]
+
+
+class DashboardCombinado(BaseModel):
+    """
+    Widgets pedidos em GET /alocacoes/dashboard/?widgets=... (os nao pedidos
+    ficam de fora), no mesmo formato das rotas individuais
+    """
+    resumo_geral: Optional[ResumoGeralDashboard] = None
+    resumo_empresas: Optional[List[ResumoEmpresaDashboard]] = None
+    timeline: Optional[List[TimelineItemDashboard]] = None
+    disponibilidade: Optional[List[DisponibilidadeColaborador]] = None
+    sobrecarga_temporal: Optional[List[SobrecargaMensal]] = None
+
+
+class HeatmapColaboradores(BaseModel):
+    """Colunas dos colaboradores, na ordem das linhas de `horas`"""
+    id: List[int]
+    nome: List[str]
+    setor_id: List[Optional[int]]
+
+
+class HeatmapDashboard(BaseModel):
+    """
+    Mapa de calor de carga (formato colunar)
+
+    horas[i][s] = horas semanais comprometidas (alocacoes ativas) do
+    colaborador i na semana s; cada alocacao conta inteira em toda semana
+    que toca. Ocupacao = horas / horas_semana_cheia.
+    """
+    inicio: date  # Segunda-feira da primeira semana
+    semanas: List[date]  # Segunda-feira de cada semana (colunas de `horas`)
+    horas_semana_cheia: float  # 44h = 100%
+    colaboradores: HeatmapColaboradores
+    horas: List[List[float]]
@@ -1,7 +1,7 @@
 """
 Schemas Pydantic para Cargo
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CargoBase(BaseModel):
@@ -11,6 +11,8 @@ class CargoBase(BaseModel):
     nivel_id: int | None = None
     setor_id: int | None = None
     ordem: int = 0
+    capacidade_projetos: int = Field(3, ge=1)
+    nao_mensurar_capacidade: bool = False
 
 
 class CargoCreate(CargoBase):
@@ -24,6 +26,8 @@ class CargoUpdate(BaseModel):
     nivel_id: int | None = None
     setor_id: int | None = None
     ordem: int | None = None
+    capacidade_projetos: int | None = Field(None, ge=1)
+    nao_mensurar_capacidade: bool | None = None
 
 
 class CargoResponse(CargoBase):
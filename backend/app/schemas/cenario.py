@@ -0,0 +1,127 @@
+"""
+Schemas Pydantic: Cenarios (simulacao what-if de alocacoes)
+"""
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional, Union
+from pydantic import BaseModel, Field
+
+from .alocacao import (
+    AlocacaoUpdate,
+    DisponibilidadeColaborador,
+    FuncaoAlocacao,
+    SobrecargaMensal,
+    StatusAlocacao,
+)
+
+
+class ProjetoHipotetico(BaseModel):
+    """Projeto que ainda nao existe no banco (recebe id negativo no cenario)"""
+    codigo: str = Field(..., min_length=1, max_length=50)
+    nome: str = Field(..., min_length=1, max_length=200)
+    empresa: str = Field(..., min_length=1, max_length=100)
+    cliente: str = Field(..., min_length=1, max_length=100)
+    categoria: str = Field(..., min_length=1, max_length=100)
+    data_inicio_prevista: Optional[datetime] = None
+    data_fim_prevista: Optional[datetime] = None
+
+
+class AlocacaoHipotetica(BaseModel):
+    """Alocacao nova; projeto_id negativo referencia um projeto hipotetico"""
+    colaborador_id: int
+    projeto_id: int
+    funcao: FuncaoAlocacao = FuncaoAlocacao.TECNICO
+    data_inicio: datetime
+    data_fim: Optional[datetime] = None
+    horas_semanais: float = Field(44.0, ge=1, le=60)
+    status: StatusAlocacao = StatusAlocacao.ATIVA
+    observacoes: Optional[str] = Field(None, max_length=500)
+
+
+class OperacaoAdicionarProjeto(BaseModel):
+    tipo: Literal["adicionar_projeto"]
+    projeto: ProjetoHipotetico
+
+
+class OperacaoAdicionar(BaseModel):
+    tipo: Literal["adicionar"]
+    alocacao: AlocacaoHipotetica
+
+
+class OperacaoRemover(BaseModel):
+    tipo: Literal["remover"]
+    alocacao_id: int
+
+
+class OperacaoEditar(BaseModel):
+    tipo: Literal["editar"]
+    alocacao_id: int
+    campos: AlocacaoUpdate
+
+
+class OperacaoDesalocar(BaseModel):
+    """Remove as alocacoes de um colaborador (opcionalmente so de uma categoria/projeto)"""
+    tipo: Literal["desalocar"]
+    colaborador_id: int
+    categoria: Optional[str] = None  # Ex: "CIVIL"
+    projeto_id: Optional[int] = None
+
+
+OperacaoCenario = Annotated[
+    Union[
+        OperacaoAdicionarProjeto,
+        OperacaoAdicionar,
+        OperacaoRemover,
+        OperacaoEditar,
+        OperacaoDesalocar,
+    ],
+    Field(discriminator="tipo"),
+]
+
+
+class CenarioCreate(BaseModel):
+    """Schema para criar um cenario a partir do estado atual"""
+    nome: Optional[str] = Field(None, max_length=200)
+    ano: Optional[int] = None  # Ano da sobrecarga temporal (padrao: ano atual)
+
+
+class CenarioOperacoes(BaseModel):
+    """Lote de operacoes aplicadas em ordem"""
+    operacoes: List[OperacaoCenario] = Field(..., min_length=1)
+
+
+class ViolacaoLimite(BaseModel):
+    """Colaborador acima do limite de projetos simultaneos no cenario"""
+    colaborador_id: int
+    nome: str
+    limite_descricao: str  # Cargo (ou setor) que define o limite
+    limite: int
+    projetos_ativos: int
+
+
+class CenarioResultado(BaseModel):
+    """Indicadores recalculados em memoria para o cenario"""
+    ano: int
+    total_alocacoes: int
+    sobrecarga: List[SobrecargaMensal]
+    disponibilidade: List[DisponibilidadeColaborador]
+    violacoes_limite: List[ViolacaoLimite]
+    tempo_calculo_ms: float
+
+
+class CenarioResponse(BaseModel):
+    """Estado de um cenario"""
+    id: str
+    nome: Optional[str]
+    criado_em: datetime
+    expira_em: datetime
+    total_operacoes: int
+    projetos_hipoteticos: dict[int, str]  # id negativo -> codigo
+    resultado: CenarioResultado
+
+
+class CenarioCommitResponse(BaseModel):
+    """Resumo da aplicacao do cenario no banco"""
+    projetos_criados: dict[int, int]  # id hipotetico -> id real
+    alocacoes_criadas: int
+    alocacoes_atualizadas: int
+    alocacoes_removidas: int
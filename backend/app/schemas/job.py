@@ -0,0 +1,36 @@
+"""
+Schemas de Jobs em segundo plano
+"""
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class JobAceito(BaseModel):
+    """Resposta 202 das rotas chamadas com ?async=true"""
+    id: UUID
+    status: str
+    url: str
+
+
+class JobResponse(BaseModel):
+    """
+    Estado de um job; resultado = corpo que a rota sincrona devolveria (na
+    aprovacao de versao, so o resumo OrganoVersionAprovada, sem o snapshot)
+    """
+    id: UUID
+    tipo: str
+    status: str
+    progresso: float
+    mensagem: Optional[str] = None
+    resultado: Optional[Any] = None
+    erro: Optional[dict] = None
+    cancelamento_solicitado: bool = False
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -2,8 +2,8 @@
 Schemas de Versão do Organograma
 """
 from datetime import datetime
-from typing import Any
-from pydantic import BaseModel
+from typing import Annotated, Any, Literal, Union
+from pydantic import BaseModel, Field
 
 
 class ColaboradorSnapshot(BaseModel):
@@ -80,3 +80,38 @@ class OrganoVersionListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class OrganoVersionAprovada(BaseModel):
+    """Resultado do job de aprovação: sem o snapshot (a versão completa está em GET /versions/{id})"""
+    id: int
+    nome: str
+    status: str
+    approved_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+# ============ EDIÇÃO COLABORATIVA (WebSocket) ============
+
+class OperacaoRascunhoMover(BaseModel):
+    """Move um colaborador na hierarquia do rascunho (superior_id None = raiz)"""
+    op: Literal["mover"]
+    colaborador_id: int
+    superior_id: int | None = None
+    ref: str | None = Field(None, max_length=64, description="Id do cliente, devolvido no ack/erro")
+
+
+class OperacaoRascunhoEditar(BaseModel):
+    """Altera campos de um colaborador do rascunho (exceto id e superior_id)"""
+    op: Literal["editar"]
+    colaborador_id: int
+    campos: dict[str, Any] = Field(..., min_length=1)
+    ref: str | None = Field(None, max_length=64, description="Id do cliente, devolvido no ack/erro")
+
+
+OperacaoRascunho = Annotated[
+    Union[OperacaoRascunhoMover, OperacaoRascunhoEditar],
+    Field(discriminator="op"),
+]
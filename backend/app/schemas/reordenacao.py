@@ -0,0 +1,14 @@
+"""
+Schemas Pydantic para reordenacao de tabelas de referencia
+"""
+from pydantic import BaseModel
+
+
+class ReorderRequest(BaseModel):
+    """Ordem nova: ids na sequencia desejada (os fora da lista vao para o fim, na ordem atual)"""
+    ordered_ids: list[int]
+
+
+class MoverRequest(BaseModel):
+    """Move um item para logo depois de `depois_de` (None = primeiro da lista)"""
+    depois_de: int | None = None
@@ -0,0 +1,74 @@
+"""
+Schemas Pydantic: Sugestoes de alocacao
+"""
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from .alocacao import FuncaoAlocacao
+from .projeto_planejamento import StatusProjeto
+
+
+class CandidatoSugerido(BaseModel):
+    """Candidato ranqueado para uma funcao do projeto"""
+    colaborador_id: int
+    nome: str
+    cargo: str
+    setor: str
+    pontuacao: float  # 0-1 (maior = mais indicado)
+    aderencia: float  # 0-1: cargo compativel + historico na funcao
+    alocacoes_na_funcao: int
+    horas_livres_media: float  # Horas/semana livres na janela do projeto
+    horas_livres_minima: float  # Semana mais apertada da janela
+    percentual_livre: float
+    projetos_ativos: int
+    limite_projetos: Optional[int]  # None = cargo nao mensurado
+    dentro_limite: bool
+    elegivel: bool  # Dentro do limite, com capacidade livre e cargo/historico compativel
+
+
+class SugestoesProjeto(BaseModel):
+    """Ranking de candidatos para uma funcao de um projeto"""
+    projeto_id: int
+    codigo: str
+    funcao: FuncaoAlocacao
+    data_inicio: datetime  # Janela considerada
+    data_fim: datetime
+    candidatos: List[CandidatoSugerido]
+
+
+class SugestaoLoteRequest(BaseModel):
+    """Projetos a preencher; sem projeto_ids usa os projetos com status informado"""
+    projeto_ids: Optional[List[int]] = Field(None, min_length=1, max_length=500)
+    empresa: Optional[str] = None
+    status: List[StatusProjeto] = Field(
+        default_factory=lambda: [StatusProjeto.PLANEJADO, StatusProjeto.EM_ANDAMENTO]
+    )
+    horas_semanais: float = Field(44.0, ge=1, le=60)
+
+
+class AlocacaoSugerida(BaseModel):
+    """Alocacao proposta (campos compativeis com POST /alocacoes/lote/)"""
+    projeto_id: int
+    codigo_projeto: str
+    funcao: FuncaoAlocacao
+    colaborador_id: int
+    nome: str
+    cargo: str
+    data_inicio: datetime
+    data_fim: datetime
+    horas_semanais: float
+    pontuacao: float
+
+
+class VagaNaoPreenchida(BaseModel):
+    projeto_id: int
+    codigo: str
+    funcao: FuncaoAlocacao
+
+
+class SugestaoLoteResponse(BaseModel):
+    """Proposta de equipe completa para varios projetos"""
+    alocacoes: List[AlocacaoSugerida]
+    nao_preenchidas: List[VagaNaoPreenchida]
+    total_vagas: int
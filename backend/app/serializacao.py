@@ -0,0 +1,82 @@
+"""
+Serializacao JSON rapida para respostas grandes
+
+Caminho padrao do FastAPI para uma lista com response_model: o endpoint
+monta os modelos Pydantic (1a validacao), o FastAPI valida de novo contra o
+response_model (2a), converte para tipos JSON em Python e o json.dumps gera
+o texto. Em listas de milhares de linhas isso custa mais CPU que a query.
+
+SerializadorJSON gera o JSON direto de dicts/linhas do banco, no formato do
+schema, pelo serializador do pydantic-core (TypeAdapter), sem validar nem
+instanciar modelos. Os BaseModel do schema viram TypedDict equivalentes
+(mesmos campos e tipos), entao a saida e a mesma do caminho padrao.
+
+Uso no endpoint (o response_model continua documentando a resposta; como o
+endpoint devolve um Response, o FastAPI nao valida de novo):
+
+    _lista_json = SerializadorJSON(list[AlocacaoComDetalhes])
+
+    @router.get("/", response_model=list[AlocacaoComDetalhes])
+    def list_alocacoes(...):
+        return _lista_json.resposta(db.execute(stmt).all())
+
+As demais respostas usam ORJSONResponse (default_response_class do app).
+"""
+import types
+from functools import lru_cache
+from typing import Any, Union, get_args, get_origin
+
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.engine import Row
+from typing_extensions import TypedDict
+
+
+@lru_cache(maxsize=None)
+def _typed_dict(modelo: type[BaseModel]) -> type:
+    """TypedDict com os campos (ja convertidos) de um BaseModel"""
+    campos = {nome: _sem_modelos(campo.annotation) for nome, campo in modelo.model_fields.items()}
+    return TypedDict(f"{modelo.__name__}Dict", campos)
+
+
+def _sem_modelos(tipo: Any) -> Any:
+    """Troca BaseModel por TypedDict em qualquer ponto da anotacao"""
+    if isinstance(tipo, type) and issubclass(tipo, BaseModel):
+        return _typed_dict(tipo)
+    origem = get_origin(tipo)
+    if origem is None:
+        return tipo
+    args = tuple(_sem_modelos(a) for a in get_args(tipo))
+    if origem in (Union, types.UnionType):
+        return Union[args]
+    return origem[args]
+
+
+def _como_dict(item: Any) -> Any:
+    return item._asdict() if isinstance(item, Row) else item
+
+
+class SerializadorJSON:
+    """Serializa dados ja no formato de `tipo` (ex: list[Schema]) sem validacao"""
+
+    def __init__(self, tipo: Any):
+        self.tipo = tipo
+        self._adapter: TypeAdapter | None = None
+
+    @property
+    def adapter(self) -> TypeAdapter:
+        # Montado no primeiro uso: nao pesa no import do app
+        if self._adapter is None:
+            self._adapter = TypeAdapter(_sem_modelos(self.tipo))
+        return self._adapter
+
+    def dumps(self, dados: Any) -> bytes:
+        """dados: dict, lista de dicts ou lista de Row (colunas com os nomes dos campos)"""
+        if isinstance(dados, list):
+            dados = [_como_dict(item) for item in dados]
+        else:
+            dados = _como_dict(dados)
+        return self.adapter.dump_json(dados)
+
+    def resposta(self, dados: Any, status_code: int = 200) -> Response:
+        return Response(self.dumps(dados), status_code=status_code, media_type="application/json")
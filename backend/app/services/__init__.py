@@ -0,0 +1,6 @@
+"""
+Servicos de dominio - AZ TECH
+
+Motores de calculo compartilhados pelos routers (analises de dashboard,
+capacidade, simulacoes). Nao dependem de FastAPI.
+"""
@@ -0,0 +1,96 @@
+"""
+Fatos mensais de alocacao (tabela alocacao_mes, migracao 019)
+
+Uma linha por (alocacao, mes coberto) com colaborador, projeto, status e
+horas semanais, mantida por triggers em alocacoes: criar, editar ou remover
+uma alocacao toca so os meses dela. Os dashboards mensais agregam com GROUP
+BY no indice por mes em vez de recalcular os meses de cada alocacao.
+
+Mes coberto: do mes de data_inicio ao mes de data_fim, inclusive. Alocacoes
+sem fim vao ate o horizonte (alocacao_mes_horizonte.ate); periodos alem dele
+usam agregar_direto, o mesmo calculo feito sobre as alocacoes. O script
+scripts/verificar_alocacao_mes.py compara os dois.
+"""
+from datetime import date, datetime
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import Date, Float, Integer, text
+
+from .timeline import acumular_intervalos, indice_mes, indices_mes
+
+HORIZONTE_STATEMENT = text(
+    "SELECT ate FROM alocacao_mes_horizonte WHERE id = 1"
+).columns(ate=Date)
+
+# Horizonte e agregados na mesma query (sempre devolve ao menos uma linha)
+MESES_STATEMENT = text("""
+    SELECT h.ate AS horizonte, m.mes, m.total_alocacoes, m.total_pessoas, m.horas
+    FROM alocacao_mes_horizonte h
+    LEFT JOIN LATERAL (
+        SELECT mes,
+               count(*) AS total_alocacoes,
+               count(DISTINCT colaborador_id) AS total_pessoas,
+               sum(horas_semanais) AS horas
+        FROM alocacao_mes
+        WHERE mes BETWEEN :inicio AND :fim
+        GROUP BY mes
+    ) m ON TRUE
+    WHERE h.id = 1
+    ORDER BY m.mes
+""").columns(horizonte=Date, mes=Date, total_alocacoes=Integer, total_pessoas=Integer, horas=Float)
+
+ESTENDER_STATEMENT = text("SELECT alocacao_mes_estender(:ate)")
+
+
+class AgregadoMes(NamedTuple):
+    total_alocacoes: int
+    total_pessoas: int
+    horas: float
+
+
+def agregados(linhas: Iterable) -> dict[date, AgregadoMes]:
+    """Linhas de MESES_STATEMENT por mes (meses sem alocacao ficam de fora)"""
+    return {
+        linha.mes: AgregadoMes(linha.total_alocacoes, linha.total_pessoas, linha.horas or 0.0)
+        for linha in linhas
+        if linha.mes is not None
+    }
+
+
+def agregar_direto(
+    alocacoes: Iterable, inicio: date, n_meses: int
+) -> dict[date, AgregadoMes]:
+    """
+    Mesmos agregados calculados direto das alocacoes (colaborador_id,
+    data_inicio, data_fim, horas_semanais), para n_meses a partir de `inicio`.
+    """
+    alocacoes = list(alocacoes)
+    if not alocacoes:
+        return {}
+    m0 = indice_mes(inicio)
+    inicios = indices_mes(a.data_inicio for a in alocacoes) - m0
+    fins = indices_mes(a.data_fim for a in alocacoes) - m0
+    colaboradores, grupos = np.unique(
+        np.fromiter((a.colaborador_id for a in alocacoes), dtype=np.int64), return_inverse=True
+    )
+    horas = np.fromiter((a.horas_semanais for a in alocacoes), dtype=np.float64)
+
+    unicos = np.zeros(len(alocacoes), dtype=np.int64)
+    totais = acumular_intervalos(unicos, 1, inicios, fins, np.ones(len(alocacoes)), n_meses)[0]
+    somas = acumular_intervalos(unicos, 1, inicios, fins, horas, n_meses)[0]
+    por_pessoa = acumular_intervalos(grupos, len(colaboradores), inicios, fins, np.ones(len(alocacoes)), n_meses)
+    pessoas = (por_pessoa > 0.5).sum(axis=0)
+
+    resultado = {}
+    for i in range(n_meses):
+        total = int(round(totais[i]))
+        if total:
+            mes = date((m0 + i) // 12, (m0 + i) % 12 + 1, 1)
+            resultado[mes] = AgregadoMes(total, int(pessoas[i]), float(somas[i]))
+    return resultado
+
+
+def cobre(horizonte: Optional[date], fim: date | datetime) -> bool:
+    """Os fatos cobrem ate o mes de `fim`?"""
+    return horizonte is not None and indice_mes(horizonte) >= indice_mes(fim)
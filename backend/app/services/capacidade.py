@@ -0,0 +1,174 @@
+"""
+Capacidade de projetos simultaneos por cargo
+
+O limite de um colaborador vem do seu cargo (cargos.capacidade_projetos);
+cargos com nao_mensurar_capacidade nao tem limite. Colaboradores sem
+cargo_id caem no limite padrao do setor.
+
+Os limites de cargos e setores vem do cache de dados de referencia
+(services/referencia.py): o lookup em memoria e refeito quando a versao dos
+dados de referencia muda, em qualquer worker.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.alocacao import Alocacao, StatusAlocacao
+from .referencia import referencia
+
+# Limite padrao por setor para colaboradores sem cargo cadastrado
+LIMITE_PROJETOS_POR_SETOR = {
+    "Comercial": 10,
+    "Engenharia": 3,
+    "Suprimentos": 10,  # "Compras"
+    # Setores tipo "Assistentes" (Staff, RH, P&D, Manutencao, etc.)
+    "default": 8
+}
+
+
+@dataclass(frozen=True)
+class CargoCapacidade:
+    id: int
+    nome: str
+    capacidade_projetos: int
+    nao_mensurar_capacidade: bool
+
+
+@dataclass(frozen=True)
+class LimiteProjetos:
+    """Limite resolvido para um colaborador (limite=None: nao mensurado)"""
+    limite: Optional[int]
+    origem: str  # "cargo" | "setor"
+    descricao: str  # Nome do cargo ou do setor que definiu o limite
+
+
+class CapacidadeLookup:
+    """Snapshot imutavel dos limites de cargos e setores"""
+
+    def __init__(self, cargos, setores):
+        """cargos e setores: dicts no formato de CargoResponse e SetorResponse"""
+        self.cargos = {
+            c["id"]: CargoCapacidade(c["id"], c["nome"], c["capacidade_projetos"], c["nao_mensurar_capacidade"])
+            for c in cargos
+        }
+        self.setores = {}
+        for s in setores:
+            # Nome normalizado (case-insensitive e sem espacos)
+            limite = LIMITE_PROJETOS_POR_SETOR.get(
+                s["nome"].strip().title(), LIMITE_PROJETOS_POR_SETOR["default"]
+            )
+            self.setores[s["id"]] = (s["nome"], limite)
+
+    def resolver(self, cargo_id: Optional[int], setor_id: Optional[int]) -> LimiteProjetos:
+        cargo = self.cargos.get(cargo_id) if cargo_id is not None else None
+        if cargo is not None:
+            limite = None if cargo.nao_mensurar_capacidade else cargo.capacidade_projetos
+            return LimiteProjetos(limite, "cargo", cargo.nome)
+
+        nome_setor, limite = self.setores.get(setor_id, ("", LIMITE_PROJETOS_POR_SETOR["default"]))
+        return LimiteProjetos(limite, "setor", nome_setor)
+
+
+class CapacidadeResolver:
+    """CapacidadeLookup da versao atual dos dados de referencia"""
+
+    def __init__(self):
+        # (versao dos dados de referencia, lookup); trocado por atribuicao
+        self._atual: Optional[tuple[int, CapacidadeLookup]] = None
+
+    def _da_versao(self, dados) -> CapacidadeLookup:
+        atual = self._atual
+        if atual is None or atual[0] != dados.versao:
+            atual = (dados.versao, CapacidadeLookup(dados.cargos.values(), dados.setores.values()))
+            self._atual = atual
+        return atual[1]
+
+    def lookup(self, db: Session) -> CapacidadeLookup:
+        return self._da_versao(referencia.obter(db))
+
+    async def lookup_async(self, db: AsyncSession) -> CapacidadeLookup:
+        """Versao async de lookup (queries no event loop, sem run_sync)"""
+        return self._da_versao(await referencia.obter_async(db))
+
+
+resolver = CapacidadeResolver()
+
+
+def projetos_ativos_statement(colaborador_ids: Optional[list[int]] = None):
+    """Quantidade de projetos distintos com alocacao ativa, por colaborador"""
+    stmt = (
+        select(
+            Alocacao.colaborador_id,
+            func.count(func.distinct(Alocacao.projeto_id)).label("projetos_ativos"),
+        )
+        .where(Alocacao.status == StatusAlocacao.ATIVA)
+        .group_by(Alocacao.colaborador_id)
+    )
+    if colaborador_ids is not None:
+        stmt = stmt.where(Alocacao.colaborador_id.in_(colaborador_ids))
+    return stmt
+
+
+def percentual_utilizacao(projetos_ativos: int, limite: Optional[int]) -> Optional[float]:
+    if not limite:
+        return None
+    return round(projetos_ativos / limite * 100, 1)
+
+
+def montar_dashboard(lookup: CapacidadeLookup, colaboradores: list, ativos_por_colab: dict) -> dict:
+    """
+    Formato de CapacidadeDashboard: utilizacao por colaborador e agregada por
+    cargo (cargos nao mensurados nao entram nos totais). So calculo em
+    memoria, sem sessao: roda em thread, fora do event loop.
+    """
+    por_colaborador = []
+    por_cargo: dict[Optional[int], dict] = {}
+    for c in colaboradores:
+        limite = lookup.resolver(c.cargo_id, c.setor_id)
+        projetos_ativos = ativos_por_colab.get(c.id, 0)
+        cargo = lookup.cargos.get(c.cargo_id)
+
+        por_colaborador.append({
+            "colaborador_id": c.id,
+            "nome": c.nome,
+            "cargo_id": cargo.id if cargo else None,
+            "cargo": cargo.nome if cargo else c.cargo,
+            "setor": c.setor_nome,
+            "limite_projetos": limite.limite,
+            "origem_limite": limite.origem,
+            "projetos_ativos": projetos_ativos,
+            "percentual_utilizacao": percentual_utilizacao(projetos_ativos, limite.limite),
+            "sobrecarregado": limite.limite is not None and projetos_ativos > limite.limite,
+        })
+
+        chave = cargo.id if cargo else None
+        agregado = por_cargo.setdefault(chave, {
+            "cargo_id": chave,
+            "cargo": cargo.nome if cargo else "Sem cargo cadastrado",
+            "capacidade_projetos": cargo.capacidade_projetos if cargo else None,
+            "nao_mensurar_capacidade": cargo.nao_mensurar_capacidade if cargo else False,
+            "total_colaboradores": 0,
+            "capacidade_total": 0,
+            "projetos_ativos": 0,
+        })
+        agregado["total_colaboradores"] += 1
+        if limite.limite is not None:
+            agregado["capacidade_total"] += limite.limite
+            agregado["projetos_ativos"] += projetos_ativos
+
+    cargos = []
+    for agregado in por_cargo.values():
+        agregado["percentual_utilizacao"] = percentual_utilizacao(
+            agregado["projetos_ativos"], agregado["capacidade_total"]
+        )
+        cargos.append(agregado)
+
+    return {
+        "colaboradores": sorted(
+            por_colaborador, key=lambda x: x["percentual_utilizacao"] or 0, reverse=True
+        ),
+        "cargos": sorted(cargos, key=lambda x: x["percentual_utilizacao"] or 0, reverse=True),
+    }
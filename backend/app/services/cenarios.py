@@ -0,0 +1,462 @@
+"""
+Simulador de cenarios (what-if) de alocacoes
+
+Um cenario carrega o conjunto atual de alocacoes uma unica vez em arrays
+NumPy compactos e aplica operacoes hipoteticas (adicionar/remover/editar
+alocacoes, desalocar colaborador, adicionar projetos que ainda nao existem)
+sem escrever em `alocacoes`. Cada operacao altera os arrays em O(1)/O(n) e
+os indicadores sao recalculados de forma vetorizada, com a mesma semantica
+dos endpoints de dashboard:
+
+- sobrecarga temporal: todas as alocacoes (qualquer status) que cobrem o mes;
+- disponibilidade: alocacoes ativas, sem considerar datas;
+- violacoes de limite: projetos ativos distintos acima do limite do cargo.
+
+Ids hipoteticos sao negativos (projetos e alocacoes novas). O cenario guarda
+o watermark dos dados de origem para que o commit possa recusar a aplicacao
+se o banco mudou depois da carga.
+"""
+import time
+import uuid
+from calendar import monthrange
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from ..models.alocacao import Alocacao, StatusAlocacao
+from ..models.colaborador import Colaborador
+from ..models.projeto_planejamento import ProjetoPlanejamento
+from ..models.setor import Setor
+from .capacidade import CapacidadeLookup
+from .timeline import HORAS_SEMANA_CHEIA, MESES
+
+# Status codificados como int8 (indice em StatusAlocacao)
+STATUS = list(StatusAlocacao)
+STATUS_CODIGO = {s.value: i for i, s in enumerate(STATUS)}
+ATIVA = STATUS_CODIGO[StatusAlocacao.ATIVA.value]
+
+# data_fim em aberto
+SEM_FIM = np.datetime64("9999-12-31T00:00:00", "s")
+
+# Cenarios expiram apos este tempo sem uso
+TTL_CENARIO = timedelta(hours=2)
+MAX_CENARIOS = 50
+
+
+class CenarioErro(ValueError):
+    """Operacao invalida no cenario (mapeada para HTTP 400)"""
+
+
+def _ts(d: Optional[datetime]) -> np.datetime64:
+    if d is None:
+        return SEM_FIM
+    if d.tzinfo is not None:
+        d = d.replace(tzinfo=None)
+    return np.datetime64(d, "s")
+
+
+def _valor(v):
+    """Enum -> valor string (payloads de schema e de model usam enums distintos)"""
+    return getattr(v, "value", v)
+
+
+# ============ STATEMENTS DE CARGA ============
+
+def alocacoes_statement():
+    return select(
+        Alocacao.id,
+        Alocacao.colaborador_id,
+        Alocacao.projeto_id,
+        Alocacao.data_inicio,
+        Alocacao.data_fim,
+        Alocacao.horas_semanais,
+        Alocacao.status,
+    )
+
+
+def colaboradores_statement():
+    return (
+        select(
+            Colaborador.id,
+            Colaborador.nome,
+            Colaborador.cargo,
+            Colaborador.cargo_id,
+            Colaborador.setor_id,
+            Setor.nome.label("setor_nome"),
+        )
+        .outerjoin(Setor, Colaborador.setor_id == Setor.id)
+    )
+
+
+def projetos_statement():
+    return select(ProjetoPlanejamento.id, ProjetoPlanejamento.codigo, ProjetoPlanejamento.categoria)
+
+
+# ============ CENARIO ============
+
+@dataclass
+class Cenario:
+    """Estado em memoria de um cenario"""
+    id: str
+    nome: Optional[str]
+    ano: int
+    watermark: tuple
+    criado_em: datetime
+    expira_em: datetime
+
+    # Colaboradores (indexados por posicao)
+    colab_ids: np.ndarray
+    colab_idx: dict
+    colab_info: list  # linhas de colaboradores_statement
+    limites: np.ndarray  # float; inf = nao mensurado
+    limites_desc: list
+
+    # Projetos: id -> (codigo, categoria); hipoteticos tem id negativo
+    projetos: dict
+
+    # Alocacoes (uma linha por alocacao carregada ou adicionada)
+    ids: np.ndarray
+    colab: np.ndarray
+    projeto: np.ndarray
+    inicio: np.ndarray
+    fim: np.ndarray
+    horas: np.ndarray
+    status: np.ndarray
+    vivo: np.ndarray
+    linha: dict  # alocacao_id -> indice
+
+    # Alteracoes pendentes (para o commit)
+    operacoes: list = field(default_factory=list)
+    projetos_hipoteticos: dict = field(default_factory=dict)  # id negativo -> dados
+    novas: dict = field(default_factory=dict)  # id negativo -> payload
+    editadas: dict = field(default_factory=dict)  # id real -> campos
+    removidas: set = field(default_factory=set)
+    seq_novas: int = 0  # Nunca reaproveita ids negativos, nem apos rollback
+    lock: Lock = field(default_factory=Lock, repr=False)
+
+    # ---------- carga ----------
+
+    @classmethod
+    def carregar(
+        cls,
+        alocacoes: list,
+        colaboradores: list,
+        projetos: list,
+        lookup: CapacidadeLookup,
+        watermark: tuple,
+        ano: int,
+        nome: Optional[str] = None,
+    ) -> "Cenario":
+        colab_ids = np.array([c.id for c in colaboradores], dtype=np.int64)
+        colab_idx = {int(cid): i for i, cid in enumerate(colab_ids)}
+
+        limites = np.empty(len(colaboradores), dtype=np.float64)
+        limites_desc = []
+        for i, c in enumerate(colaboradores):
+            limite = lookup.resolver(c.cargo_id, c.setor_id)
+            limites[i] = np.inf if limite.limite is None else limite.limite
+            limites_desc.append(limite.descricao)
+
+        n = len(alocacoes)
+        ids = np.fromiter((a.id for a in alocacoes), dtype=np.int64, count=n)
+        agora = datetime.utcnow()
+        return cls(
+            id=uuid.uuid4().hex,
+            nome=nome,
+            ano=ano,
+            watermark=watermark,
+            criado_em=agora,
+            expira_em=agora + TTL_CENARIO,
+            colab_ids=colab_ids,
+            colab_idx=colab_idx,
+            colab_info=list(colaboradores),
+            limites=limites,
+            limites_desc=limites_desc,
+            projetos={p.id: (p.codigo, p.categoria) for p in projetos},
+            ids=ids,
+            colab=np.fromiter((colab_idx[a.colaborador_id] for a in alocacoes), dtype=np.int64, count=n),
+            projeto=np.fromiter((a.projeto_id for a in alocacoes), dtype=np.int64, count=n),
+            inicio=np.array([_ts(a.data_inicio) for a in alocacoes], dtype="datetime64[s]"),
+            fim=np.array([_ts(a.data_fim) for a in alocacoes], dtype="datetime64[s]"),
+            horas=np.fromiter((a.horas_semanais for a in alocacoes), dtype=np.float64, count=n),
+            status=np.fromiter((STATUS_CODIGO[_valor(a.status)] for a in alocacoes), dtype=np.int8, count=n),
+            vivo=np.ones(n, dtype=bool),
+            linha={int(i): k for k, i in enumerate(ids)},
+        )
+
+    # ---------- operacoes ----------
+
+    def aplicar(self, operacoes: list) -> None:
+        """Aplica um lote de operacoes em ordem; se alguma falhar, nada e aplicado"""
+        snapshot = self._snapshot()
+        try:
+            for op in operacoes:
+                getattr(self, f"_op_{op.tipo}")(op)
+        except CenarioErro:
+            self._restaurar(snapshot)
+            raise
+        self.operacoes.extend(operacoes)
+
+    def _snapshot(self) -> tuple:
+        return (
+            self.ids, self.colab, self.projeto, self.inicio.copy(), self.fim.copy(), self.horas.copy(),
+            self.status.copy(), self.vivo.copy(), dict(self.linha), dict(self.projetos),
+            dict(self.projetos_hipoteticos), {k: dict(v) for k, v in self.novas.items()},
+            {k: dict(v) for k, v in self.editadas.items()}, set(self.removidas),
+        )
+
+    def _restaurar(self, s: tuple) -> None:
+        (
+            self.ids, self.colab, self.projeto, self.inicio, self.fim, self.horas,
+            self.status, self.vivo, self.linha, self.projetos,
+            self.projetos_hipoteticos, self.novas, self.editadas, self.removidas,
+        ) = s
+
+    def _linha_viva(self, alocacao_id: int) -> int:
+        k = self.linha.get(alocacao_id)
+        if k is None or not self.vivo[k]:
+            raise CenarioErro(f"Alocacao {alocacao_id} nao encontrada no cenario")
+        return k
+
+    def _op_adicionar_projeto(self, op) -> None:
+        codigos = {codigo for codigo, _ in self.projetos.values()}
+        if op.projeto.codigo in codigos:
+            raise CenarioErro(f"Ja existe projeto com codigo '{op.projeto.codigo}'")
+        projeto_id = -(len(self.projetos_hipoteticos) + 1)
+        self.projetos_hipoteticos[projeto_id] = op.projeto.model_dump()
+        self.projetos[projeto_id] = (op.projeto.codigo, op.projeto.categoria)
+
+    def _op_adicionar(self, op) -> None:
+        a = op.alocacao
+        if a.colaborador_id not in self.colab_idx:
+            raise CenarioErro(f"Colaborador {a.colaborador_id} nao encontrado")
+        if a.projeto_id not in self.projetos:
+            raise CenarioErro(f"Projeto {a.projeto_id} nao encontrado")
+
+        self.seq_novas += 1
+        alocacao_id = -self.seq_novas
+        self.novas[alocacao_id] = a.model_dump()
+        self.linha[alocacao_id] = len(self.ids)
+        self.ids = np.append(self.ids, alocacao_id)
+        self.colab = np.append(self.colab, self.colab_idx[a.colaborador_id])
+        self.projeto = np.append(self.projeto, a.projeto_id)
+        self.inicio = np.append(self.inicio, _ts(a.data_inicio))
+        self.fim = np.append(self.fim, _ts(a.data_fim))
+        self.horas = np.append(self.horas, a.horas_semanais)
+        self.status = np.append(self.status, np.int8(STATUS_CODIGO[_valor(a.status)]))
+        self.vivo = np.append(self.vivo, True)
+
+    def _remover_linha(self, alocacao_id: int, k: int) -> None:
+        self.vivo[k] = False
+        if alocacao_id < 0:
+            del self.novas[alocacao_id]
+        else:
+            self.removidas.add(alocacao_id)
+            self.editadas.pop(alocacao_id, None)
+
+    def _op_remover(self, op) -> None:
+        self._remover_linha(op.alocacao_id, self._linha_viva(op.alocacao_id))
+
+    def _op_editar(self, op) -> None:
+        k = self._linha_viva(op.alocacao_id)
+        campos = op.campos.model_dump(exclude_unset=True)
+        if "data_inicio" in campos:
+            if campos["data_inicio"] is None:
+                raise CenarioErro("data_inicio nao pode ser nula")
+            self.inicio[k] = _ts(campos["data_inicio"])
+        if "data_fim" in campos:
+            self.fim[k] = _ts(campos["data_fim"])
+        if campos.get("horas_semanais") is not None:
+            self.horas[k] = campos["horas_semanais"]
+        if campos.get("status") is not None:
+            self.status[k] = STATUS_CODIGO[_valor(campos["status"])]
+
+        if op.alocacao_id < 0:
+            self.novas[op.alocacao_id].update(campos)
+        else:
+            self.editadas.setdefault(op.alocacao_id, {}).update(campos)
+
+    def _op_desalocar(self, op) -> None:
+        c = self.colab_idx.get(op.colaborador_id)
+        if c is None:
+            raise CenarioErro(f"Colaborador {op.colaborador_id} nao encontrado")
+        mask = self.vivo & (self.colab == c)
+        if op.projeto_id is not None:
+            mask &= self.projeto == op.projeto_id
+        for k in np.flatnonzero(mask):
+            if op.categoria is not None:
+                _, categoria = self.projetos.get(int(self.projeto[k]), (None, None))
+                if (categoria or "").upper() != op.categoria.upper():
+                    continue
+            self._remover_linha(int(self.ids[k]), int(k))
+
+    # ---------- indicadores ----------
+
+    def sobrecarga(self, ano: int) -> list[dict]:
+        """Mesma metrica de /dashboard/sobrecarga-temporal/, em memoria"""
+        inicios_mes = np.array([datetime(ano, m, 1) for m in range(1, 13)], dtype="datetime64[s]")
+        fins_mes = np.array(
+            [datetime(ano, m, monthrange(ano, m)[1]) for m in range(1, 13)], dtype="datetime64[s]"
+        )
+        v = self.vivo
+        colab = self.colab[v]
+        horas = self.horas[v]
+        cobre = (self.inicio[v][:, None] <= fins_mes[None, :]) & (self.fim[v][:, None] >= inicios_mes[None, :])
+
+        total_colaboradores = len(self.colab_ids)
+        ocupacao = (cobre * (horas / HORAS_SEMANA_CHEIA * 100)[:, None]).sum(axis=0)
+        result = []
+        for m in range(12):
+            no_mes = cobre[:, m]
+            pessoas = int(np.count_nonzero(np.bincount(colab[no_mes], minlength=1)))
+            percentual = float(ocupacao[m]) / total_colaboradores if total_colaboradores else 0.0
+            result.append({
+                "mes": m + 1,
+                "nome_mes": MESES[m],
+                "total_alocacoes": int(np.count_nonzero(no_mes)),
+                "total_pessoas": pessoas,
+                "percentual_ocupacao": round(percentual, 1),
+                "sobrecarga": percentual > 100,
+            })
+        return result
+
+    def _ativas(self) -> np.ndarray:
+        return self.vivo & (self.status == ATIVA)
+
+    def disponibilidade(self) -> list[dict]:
+        """Mesma metrica de /dashboard/disponibilidade/, em memoria"""
+        ativas = self._ativas()
+        n = len(self.colab_ids)
+        percentual = np.bincount(
+            self.colab[ativas], weights=self.horas[ativas] / HORAS_SEMANA_CHEIA * 100, minlength=n
+        )
+        projetos = np.bincount(self.colab[ativas], minlength=n)
+
+        result = []
+        for i, c in enumerate(self.colab_info):
+            if c.setor_nome is None:
+                continue  # Mesmo criterio do endpoint (JOIN com setor)
+            total = float(percentual[i])
+            result.append({
+                "colaborador_id": c.id,
+                "nome": c.nome,
+                "cargo": c.cargo,
+                "setor": c.setor_nome,
+                "percentual_ocupado": min(total, 100),
+                "projetos_ativos": int(projetos[i]),
+                "disponivel": total < 100,
+            })
+        return sorted(result, key=lambda x: x["percentual_ocupado"], reverse=True)
+
+    def projetos_ativos(self) -> np.ndarray:
+        """Projetos ativos distintos por colaborador (indexado por posicao)"""
+        ativas = self._ativas()
+        pares = np.unique(np.stack([self.colab[ativas], self.projeto[ativas]], axis=1), axis=0)
+        return np.bincount(pares[:, 0], minlength=len(self.colab_ids)) if len(pares) else np.zeros(
+            len(self.colab_ids), dtype=np.int64
+        )
+
+    def violacoes(self, colaborador_ids: Optional[set] = None) -> list[dict]:
+        """Colaboradores com mais projetos ativos que o limite do cargo"""
+        projetos = self.projetos_ativos()
+        result = []
+        for i in np.flatnonzero(projetos > self.limites):
+            c = self.colab_info[i]
+            if colaborador_ids is not None and c.id not in colaborador_ids:
+                continue
+            result.append({
+                "colaborador_id": c.id,
+                "nome": c.nome,
+                "limite_descricao": self.limites_desc[i],
+                "limite": int(self.limites[i]),
+                "projetos_ativos": int(projetos[i]),
+            })
+        return sorted(result, key=lambda x: x["projetos_ativos"] - x["limite"], reverse=True)
+
+    def duplicidades(self, colaborador_ids: set) -> list[tuple[int, int]]:
+        """Pares (colaborador, projeto) com mais de uma alocacao ativa"""
+        ativas = self._ativas()
+        pares, contagem = np.unique(
+            np.stack([self.colab[ativas], self.projeto[ativas]], axis=1), axis=0, return_counts=True
+        )
+        return [
+            (int(self.colab_ids[c]), int(p))
+            for c, p in pares[contagem > 1]
+            if int(self.colab_ids[c]) in colaborador_ids
+        ]
+
+    def resultado(self, ano: Optional[int] = None) -> dict:
+        ano = ano or self.ano
+        t0 = time.perf_counter()
+        result = {
+            "ano": ano,
+            "total_alocacoes": int(np.count_nonzero(self.vivo)),
+            "sobrecarga": self.sobrecarga(ano),
+            "disponibilidade": self.disponibilidade(),
+            "violacoes_limite": self.violacoes(),
+        }
+        result["tempo_calculo_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        return result
+
+    # ---------- commit ----------
+
+    def colaboradores_afetados(self) -> set[int]:
+        """Colaboradores cujas alocacoes ativas podem ter aumentado no cenario"""
+        ids = {a["colaborador_id"] for a in self.novas.values()}
+        for alocacao_id in self.editadas:
+            ids.add(int(self.colab_ids[self.colab[self.linha[alocacao_id]]]))
+        return ids
+
+    def resumo(self) -> dict:
+        return {
+            "id": self.id,
+            "nome": self.nome,
+            "criado_em": self.criado_em,
+            "expira_em": self.expira_em,
+            "total_operacoes": len(self.operacoes),
+            "projetos_hipoteticos": {k: v["codigo"] for k, v in self.projetos_hipoteticos.items()},
+        }
+
+
+# ============ STORE ============
+
+class CenarioStore:
+    """Cenarios em memoria do processo, com expiracao por inatividade"""
+
+    def __init__(self, ttl: timedelta = TTL_CENARIO, maxsize: int = MAX_CENARIOS):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._cenarios: dict[str, Cenario] = {}
+        self._lock = Lock()
+
+    def _expirar(self, agora: datetime) -> None:
+        for cid in [cid for cid, c in self._cenarios.items() if c.expira_em <= agora]:
+            del self._cenarios[cid]
+
+    def adicionar(self, cenario: Cenario) -> None:
+        with self._lock:
+            self._expirar(datetime.utcnow())
+            while len(self._cenarios) >= self.maxsize:
+                mais_antigo = min(self._cenarios.values(), key=lambda c: c.expira_em)
+                del self._cenarios[mais_antigo.id]
+            self._cenarios[cenario.id] = cenario
+
+    def obter(self, cenario_id: str) -> Optional[Cenario]:
+        with self._lock:
+            agora = datetime.utcnow()
+            self._expirar(agora)
+            cenario = self._cenarios.get(cenario_id)
+            if cenario is not None:
+                cenario.expira_em = agora + self.ttl
+            return cenario
+
+    def remover(self, cenario_id: str) -> Optional[Cenario]:
+        with self._lock:
+            return self._cenarios.pop(cenario_id, None)
+
+
+store = CenarioStore()
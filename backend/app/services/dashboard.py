@@ -0,0 +1,255 @@
+"""
+Dashboard combinado: varios widgets a partir de uma carga compartilhada
+
+A pagina do dashboard pedia resumo-geral, resumo-empresas, timeline,
+disponibilidade e sobrecarga-temporal em 5 requisicoes, cada uma com sua
+sessao e relendo projetos e alocacoes. GET /alocacoes/dashboard/ le uma vez
+so o que os widgets pedidos precisam (uma sessao, um snapshot REPEATABLE
+READ) e monta cada widget aqui, em memoria, no formato do schema da rota
+individual:
+
+- projetos: uma linha por projeto (contagens, carteira, timeline);
+- alocacoes ativas: uma unica varredura agregada com GROUPING SETS, por
+  colaborador (horas e quantidade), por projeto (quantidade), por empresa e
+  no total (pessoas distintas);
+- colaboradores: linhas com setor (disponibilidade) ou so o total;
+- sobrecarga: fatos mensais (alocacao_mes), como na rota individual.
+"""
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import Float, Integer, String, func, select, text
+
+from ..models.colaborador import Colaborador
+from ..models.projeto_planejamento import ProjetoPlanejamento, StatusProjeto
+from ..models.setor import Setor
+from .alocacao_mes import AgregadoMes
+from .timeline import HORAS_SEMANA_CHEIA, MESES
+
+RESUMO_GERAL = "resumo-geral"
+RESUMO_EMPRESAS = "resumo-empresas"
+TIMELINE = "timeline"
+DISPONIBILIDADE = "disponibilidade"
+SOBRECARGA_TEMPORAL = "sobrecarga-temporal"
+
+WIDGETS = (RESUMO_GERAL, RESUMO_EMPRESAS, TIMELINE, DISPONIBILIDADE, SOBRECARGA_TEMPORAL)
+
+# O que cada widget precisa da carga compartilhada
+PRECISA_PROJETOS = {RESUMO_GERAL, RESUMO_EMPRESAS, TIMELINE}
+PRECISA_ALOCACOES = {RESUMO_GERAL, RESUMO_EMPRESAS, TIMELINE, DISPONIBILIDADE}
+PRECISA_TOTAL_COLABORADORES = {RESUMO_GERAL, SOBRECARGA_TEMPORAL}
+
+# GROUPING(colaborador_id, projeto_id, empresa): bit 1 = coluna fora do grupo
+_POR_COLABORADOR = 0b011
+_POR_PROJETO = 0b101
+_POR_EMPRESA = 0b110
+_TOTAL = 0b111
+
+ALOCACOES_STATEMENT = text("""
+    SELECT a.colaborador_id, a.projeto_id, p.empresa,
+           GROUPING(a.colaborador_id, a.projeto_id, p.empresa) AS grupo,
+           count(*) AS total,
+           sum(a.horas_semanais) AS horas,
+           count(DISTINCT a.colaborador_id) AS pessoas
+    FROM alocacoes a
+    JOIN projetos_planejamento p ON p.id = a.projeto_id
+    WHERE a.status = 'ATIVA'
+    GROUP BY GROUPING SETS ((a.colaborador_id), (a.projeto_id), (p.empresa), ())
+""").columns(
+    colaborador_id=Integer, projeto_id=Integer, empresa=String, grupo=Integer,
+    total=Integer, horas=Float, pessoas=Integer,
+)
+
+
+def widgets_pedidos(widgets: Optional[str]) -> list[str]:
+    """Widgets de `widgets` (separados por virgula; vazio = todos), na ordem de WIDGETS"""
+    if not widgets:
+        return list(WIDGETS)
+    pedidos = {w.strip() for w in widgets.split(",") if w.strip()}
+    desconhecidos = pedidos - set(WIDGETS)
+    if desconhecidos:
+        raise ValueError(
+            f"Widget(s) desconhecido(s): {', '.join(sorted(desconhecidos))}. "
+            f"Disponiveis: {', '.join(WIDGETS)}"
+        )
+    return [w for w in WIDGETS if w in pedidos]
+
+
+def projetos_statement():
+    return select(
+        ProjetoPlanejamento.id,
+        ProjetoPlanejamento.codigo,
+        ProjetoPlanejamento.nome,
+        ProjetoPlanejamento.empresa,
+        ProjetoPlanejamento.categoria,
+        ProjetoPlanejamento.data_inicio_prevista,
+        ProjetoPlanejamento.data_fim_prevista,
+        ProjetoPlanejamento.status,
+        ProjetoPlanejamento.percentual_conclusao,
+        ProjetoPlanejamento.valor_estimado,
+    ).order_by(ProjetoPlanejamento.data_inicio_prevista, ProjetoPlanejamento.id)
+
+
+def colaboradores_statement():
+    return select(
+        Colaborador.id,
+        Colaborador.nome,
+        Colaborador.cargo,
+        Colaborador.setor_id,
+        Setor.nome.label("setor_nome"),
+    ).join(Setor, Colaborador.setor_id == Setor.id)
+
+
+def total_colaboradores_statement():
+    return select(func.count()).select_from(Colaborador)
+
+
+class AlocacoesAtivas:
+    """Agregados das alocacoes ativas (linhas de ALOCACOES_STATEMENT)"""
+
+    def __init__(self, linhas: Iterable):
+        self.por_colaborador: dict[int, tuple[int, float]] = {}
+        self.por_projeto: dict[int, int] = {}
+        self.pessoas_por_empresa: dict[str, int] = {}
+        self.pessoas = 0
+        for linha in linhas:
+            if linha.grupo == _POR_COLABORADOR:
+                self.por_colaborador[linha.colaborador_id] = (linha.total, linha.horas)
+            elif linha.grupo == _POR_PROJETO:
+                self.por_projeto[linha.projeto_id] = linha.total
+            elif linha.grupo == _POR_EMPRESA:
+                self.pessoas_por_empresa[linha.empresa] = linha.pessoas
+            elif linha.grupo == _TOTAL:
+                self.pessoas = linha.pessoas
+
+
+def _contagens(projetos: Iterable) -> dict:
+    """Total, por status e valor da carteira (mesmas contagens de _contagens_projetos)"""
+    contagem = {"total": 0, "em_andamento": 0, "planejados": 0, "concluidos": 0, "valor": 0.0}
+    for p in projetos:
+        contagem["total"] += 1
+        if p.status == StatusProjeto.EM_ANDAMENTO:
+            contagem["em_andamento"] += 1
+        elif p.status == StatusProjeto.PLANEJADO:
+            contagem["planejados"] += 1
+        elif p.status == StatusProjeto.CONCLUIDO:
+            contagem["concluidos"] += 1
+        if p.valor_estimado is not None:
+            contagem["valor"] += p.valor_estimado
+    return contagem
+
+
+def resumo_geral(projetos: list, alocacoes: AlocacoesAtivas, total_colaboradores: int) -> dict:
+    """Formato de ResumoGeralDashboard"""
+    contagem = _contagens(projetos)
+    alocados = alocacoes.pessoas
+    percentual = (alocados / total_colaboradores * 100) if total_colaboradores > 0 else 0
+    return {
+        "total_projetos": contagem["total"],
+        "projetos_em_andamento": contagem["em_andamento"],
+        "projetos_planejados": contagem["planejados"],
+        "projetos_concluidos": contagem["concluidos"],
+        "valor_total_carteira": contagem["valor"],
+        "total_colaboradores_alocados": alocados,
+        "percentual_equipe_alocada": round(percentual, 1),
+    }
+
+
+def resumo_empresas(projetos: list, alocacoes: AlocacoesAtivas) -> list[dict]:
+    """Formato de list[ResumoEmpresaDashboard], em ordem de empresa"""
+    por_empresa: dict[str, list] = {}
+    for p in projetos:
+        por_empresa.setdefault(p.empresa, []).append(p)
+    result = []
+    for empresa in sorted(por_empresa):
+        contagem = _contagens(por_empresa[empresa])
+        result.append({
+            "empresa": empresa,
+            "total_projetos": contagem["total"],
+            "projetos_em_andamento": contagem["em_andamento"],
+            "projetos_concluidos": contagem["concluidos"],
+            "valor_total": contagem["valor"],
+            "colaboradores_alocados": alocacoes.pessoas_por_empresa.get(empresa, 0),
+        })
+    return result
+
+
+def _no_ano(p, inicio_ano: datetime, fim_ano: datetime) -> bool:
+    """Filtro de ano da rota de timeline (comparacao com NULL = falso, como no SQL)"""
+    inicio, fim = p.data_inicio_prevista, p.data_fim_prevista
+    return (
+        (inicio is not None and inicio >= inicio_ano)
+        or (fim is not None and fim <= fim_ano)
+        or (inicio is not None and fim is not None and inicio < inicio_ano and fim > fim_ano)
+    )
+
+
+def timeline(
+    projetos: list, alocacoes: AlocacoesAtivas, ano: Optional[int] = None, empresa: Optional[str] = None
+) -> list[dict]:
+    """Formato de list[TimelineItemDashboard] (projetos ja em ordem de data de inicio)"""
+    if empresa:
+        projetos = [p for p in projetos if p.empresa == empresa]
+    if ano:
+        inicio_ano = datetime(ano, 1, 1)
+        fim_ano = datetime(ano, 12, 31, 23, 59, 59)
+        projetos = [p for p in projetos if _no_ano(p, inicio_ano, fim_ano)]
+    return [
+        {
+            "projeto_id": p.id,
+            "codigo": p.codigo,
+            "nome": p.nome,
+            "empresa": p.empresa,
+            "categoria": p.categoria,
+            "data_inicio": p.data_inicio_prevista,
+            "data_fim": p.data_fim_prevista,
+            "status": p.status.value,
+            "percentual_conclusao": p.percentual_conclusao,
+            "total_alocados": alocacoes.por_projeto.get(p.id, 0),
+        }
+        for p in projetos
+    ]
+
+
+def disponibilidade(
+    colaboradores: list, alocacoes: AlocacoesAtivas, setor_id: Optional[int] = None
+) -> list[dict]:
+    """Formato de list[DisponibilidadeColaborador], do mais ocupado ao menos"""
+    result = []
+    for c in colaboradores:
+        if setor_id and c.setor_id != setor_id:
+            continue
+        projetos_ativos, horas = alocacoes.por_colaborador.get(c.id, (0, 0.0))
+        percentual_total = horas / HORAS_SEMANA_CHEIA * 100
+        result.append({
+            "colaborador_id": c.id,
+            "nome": c.nome,
+            "cargo": c.cargo,
+            "setor": c.setor_nome,
+            "percentual_ocupado": min(percentual_total, 100),
+            "projetos_ativos": projetos_ativos,
+            "disponivel": percentual_total < 100,
+        })
+    return sorted(result, key=lambda x: x["percentual_ocupado"], reverse=True)
+
+
+def sobrecarga_mensal(ano: int, por_mes: dict[date, AgregadoMes], total_colaboradores: int) -> list[dict]:
+    """Formato de list[SobrecargaMensal], a partir dos agregados do ano por mes"""
+    result = []
+    for mes in range(1, 13):
+        agregado = por_mes.get(date(ano, mes, 1))
+        horas = agregado.horas if agregado else 0.0
+        if total_colaboradores > 0:
+            percentual_ocupacao = (horas / HORAS_SEMANA_CHEIA) * 100 / total_colaboradores
+        else:
+            percentual_ocupacao = 0.0
+
+        result.append({
+            "mes": mes,
+            "nome_mes": MESES[mes - 1],
+            "total_alocacoes": agregado.total_alocacoes if agregado else 0,
+            "total_pessoas": agregado.total_pessoas if agregado else 0,
+            "percentual_ocupacao": round(percentual_ocupacao, 1),
+            "sobrecarga": percentual_ocupacao > 100,
+        })
+    return result
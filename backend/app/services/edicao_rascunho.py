@@ -0,0 +1,170 @@
+"""
+Edicao de rascunhos do organograma
+
+Snapshot oficial, diff contra o rascunho e o estado em memoria de um
+rascunho em edicao colaborativa (ver app/rascunhos.py). SessaoRascunho e a
+copia autoritativa do snapshot de uma versao: aplica operacoes pequenas
+(mover um colaborador na hierarquia, editar campos de um colaborador),
+valida cada uma contra o estado atual e numera as aceitas (seq). Nao faz
+I/O; quem persiste e transmite e o gerenciador.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Colaborador
+from ..schemas import ColaboradorSnapshot, OperacaoRascunhoEditar, OperacaoRascunhoMover
+
+# Colunas do snapshot, na ordem de ColaboradorSnapshot (linhas, sem ORM)
+COLUNAS_SNAPSHOT = [
+    func.coalesce(Colaborador.permissoes, literal([], JSONB)).label("permissoes")
+    if campo == "permissoes" else getattr(Colaborador, campo)
+    for campo in ColaboradorSnapshot.model_fields
+]
+
+# Campos que a operacao editar pode alterar (hierarquia so via mover)
+CAMPOS_EDITAVEIS = frozenset(ColaboradorSnapshot.model_fields) - {"id", "superior_id"}
+
+
+class RascunhoErro(ValueError):
+    """Operacao invalida no rascunho (devolvida ao editor, sem derrubar a conexao)"""
+
+
+async def get_current_snapshot(db: AsyncSession) -> list[dict]:
+    """Gera snapshot atual dos colaboradores do banco"""
+    return [linha._asdict() for linha in (await db.execute(select(*COLUNAS_SNAPSHOT))).all()]
+
+
+def calculate_changes(official: list[dict], draft: list[dict]) -> dict:
+    """Calcula diferencas entre snapshot oficial e rascunho"""
+    official_map = {c["id"]: c for c in official}
+    draft_map = {c["id"]: c for c in draft}
+
+    hierarchy_changes = []
+    data_changes = []
+
+    # Verificar mudancas em colaboradores existentes
+    for colab_id, draft_colab in draft_map.items():
+        if colab_id in official_map:
+            official_colab = official_map[colab_id]
+
+            # Mudanca de hierarquia
+            if draft_colab.get("superior_id") != official_colab.get("superior_id"):
+                hierarchy_changes.append({
+                    "colaborador_id": colab_id,
+                    "colaborador_nome": draft_colab.get("nome", ""),
+                    "change_type": "hierarchy",
+                    "field": "superior_id",
+                    "old_value": official_colab.get("superior_id"),
+                    "new_value": draft_colab.get("superior_id"),
+                })
+
+            # Mudancas de dados
+            for field in ["nome", "cargo", "setor_id", "nivel_id"]:
+                if draft_colab.get(field) != official_colab.get(field):
+                    data_changes.append({
+                        "colaborador_id": colab_id,
+                        "colaborador_nome": draft_colab.get("nome", ""),
+                        "change_type": "data",
+                        "field": field,
+                        "old_value": official_colab.get(field),
+                        "new_value": draft_colab.get(field),
+                    })
+
+    return {
+        "total_changes": len(hierarchy_changes) + len(data_changes),
+        "hierarchy_changes": hierarchy_changes,
+        "data_changes": data_changes,
+    }
+
+
+class SessaoRascunho:
+    """Estado autoritativo de um rascunho em edicao"""
+
+    def __init__(self, version_id: int, snapshot: list[dict], updated_at: Optional[datetime]):
+        self.version_id = version_id
+        self.colaboradores: dict[int, dict] = {}
+        self.seq = 0
+        # Seq ja gravado no banco e operacoes aceitas depois dele
+        self.seq_salvo = 0
+        self.pendentes: list[tuple[int, OperacaoRascunhoMover | OperacaoRascunhoEditar]] = []
+        # Marcador otimista: updated_at da versao quando o estado foi lido/gravado
+        self.updated_at = updated_at
+        self.recarregar(snapshot, updated_at)
+
+    def recarregar(self, snapshot: list[dict], updated_at: Optional[datetime]) -> None:
+        """Troca a base pelo snapshot do banco; operacoes pendentes precisam ser reaplicadas"""
+        self.colaboradores = {c["id"]: dict(c) for c in snapshot}
+        self.updated_at = updated_at
+
+    @property
+    def snapshot(self) -> list[dict]:
+        return list(self.colaboradores.values())
+
+    def aplicar(self, op: OperacaoRascunhoMover | OperacaoRascunhoEditar) -> int:
+        """Valida e aplica a operacao; devolve o seq atribuido"""
+        if op.op == "mover":
+            self._mover(op)
+        else:
+            self._editar(op)
+        self.seq += 1
+        self.pendentes.append((self.seq, op))
+        return self.seq
+
+    def _colaborador(self, colaborador_id: int) -> dict:
+        colaborador = self.colaboradores.get(colaborador_id)
+        if colaborador is None:
+            raise RascunhoErro(f"Colaborador {colaborador_id} nao esta no rascunho")
+        return colaborador
+
+    def _mover(self, op: OperacaoRascunhoMover) -> None:
+        colaborador = self._colaborador(op.colaborador_id)
+        if op.superior_id is not None:
+            self._colaborador(op.superior_id)
+            # Sobe a cadeia do novo superior: passar pelo colaborador seria um ciclo
+            atual, vistos = op.superior_id, set()
+            while atual is not None and atual not in vistos:
+                if atual == op.colaborador_id:
+                    raise RascunhoErro("Movimento criaria ciclo na hierarquia")
+                vistos.add(atual)
+                atual = self.colaboradores.get(atual, {}).get("superior_id")
+        colaborador["superior_id"] = op.superior_id
+
+    def _editar(self, op: OperacaoRascunhoEditar) -> None:
+        colaborador = self._colaborador(op.colaborador_id)
+        invalidos = set(op.campos) - CAMPOS_EDITAVEIS
+        if invalidos:
+            raise RascunhoErro(f"Campos nao editaveis: {', '.join(sorted(invalidos))}")
+        try:
+            novo = ColaboradorSnapshot.model_validate({**colaborador, **op.campos}).model_dump()
+        except ValueError as e:
+            raise RascunhoErro(f"Valores invalidos: {e}") from None
+        # Campos normalizados pelo schema (o delta transmitido usa estes)
+        op.campos = {campo: novo[campo] for campo in op.campos}
+        colaborador.update(op.campos)
+
+    def confirmar_gravacao(self, seq: int, updated_at: datetime) -> None:
+        """Estado ate seq gravado com o novo marcador"""
+        self.seq_salvo = seq
+        self.pendentes = [(s, op) for s, op in self.pendentes if s > seq]
+        self.updated_at = updated_at
+
+    def rebase(self, snapshot: list[dict], updated_at: Optional[datetime]) -> int:
+        """
+        Outra escrita mudou a versao: parte do snapshot do banco e reaplica as
+        operacoes ainda nao gravadas. Devolve quantas deixaram de valer.
+        """
+        pendentes = [op for s, op in self.pendentes if s > self.seq_salvo]
+        self.recarregar(snapshot, updated_at)
+        self.pendentes = []
+        self.seq_salvo = self.seq
+        descartadas = 0
+        for op in pendentes:
+            try:
+                self.aplicar(op)
+            except RascunhoErro:
+                descartadas += 1
+        return descartadas
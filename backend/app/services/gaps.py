@@ -0,0 +1,140 @@
+"""
+Analise de gaps de alocacao (projeto x funcao)
+
+Para cada projeto e cada FuncaoAlocacao indica se a funcao e necessaria
+(nao consta em funcoes_nao_necessarias) e se esta coberta por alguma
+alocacao ativa dentro da janela prevista do projeto.
+
+A cobertura e calculada de forma set-based: uma unica query agrega as
+alocacoes ativas por (projeto_id, funcao) e a matriz e montada em memoria.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, func, or_, select
+
+from ..models.alocacao import Alocacao, FuncaoAlocacao, StatusAlocacao
+from ..models.projeto_planejamento import ProjetoPlanejamento, StatusProjeto
+
+
+def _filtros_projeto(empresa: Optional[str], status: Optional[StatusProjeto]) -> list:
+    filtros = []
+    if empresa:
+        filtros.append(ProjetoPlanejamento.empresa == empresa)
+    if status:
+        filtros.append(ProjetoPlanejamento.status == status)
+    return filtros
+
+
+def projetos_statement(empresa: Optional[str] = None, status: Optional[StatusProjeto] = None):
+    """Projetos considerados na analise"""
+    return (
+        select(
+            ProjetoPlanejamento.id,
+            ProjetoPlanejamento.codigo,
+            ProjetoPlanejamento.nome,
+            ProjetoPlanejamento.empresa,
+            ProjetoPlanejamento.status,
+            ProjetoPlanejamento.data_inicio_prevista,
+            ProjetoPlanejamento.data_fim_prevista,
+            ProjetoPlanejamento.funcoes_nao_necessarias,
+        )
+        .where(*_filtros_projeto(empresa, status))
+        .order_by(ProjetoPlanejamento.data_inicio_prevista, ProjetoPlanejamento.id)
+    )
+
+
+def cobertura_statement(empresa: Optional[str] = None, status: Optional[StatusProjeto] = None):
+    """
+    Agrega alocacoes ativas por (projeto, funcao) que se sobrepoem a janela
+    prevista do projeto. Projetos sem data de inicio/fim tem janela aberta.
+    """
+    sobrepoe_janela = and_(
+        or_(
+            ProjetoPlanejamento.data_fim_prevista.is_(None),
+            Alocacao.data_inicio <= ProjetoPlanejamento.data_fim_prevista,
+        ),
+        or_(
+            ProjetoPlanejamento.data_inicio_prevista.is_(None),
+            Alocacao.data_fim.is_(None),
+            Alocacao.data_fim >= ProjetoPlanejamento.data_inicio_prevista,
+        ),
+    )
+    return (
+        select(
+            Alocacao.projeto_id,
+            Alocacao.funcao,
+            func.count(func.distinct(Alocacao.colaborador_id)).label("total_alocados"),
+            func.min(Alocacao.data_inicio).label("menor_inicio"),
+            func.max(Alocacao.data_fim).label("maior_fim"),
+            func.bool_or(Alocacao.data_fim.is_(None)).label("sem_fim"),
+        )
+        .join(ProjetoPlanejamento, Alocacao.projeto_id == ProjetoPlanejamento.id)
+        .where(
+            Alocacao.status == StatusAlocacao.ATIVA,
+            sobrepoe_janela,
+            *_filtros_projeto(empresa, status),
+        )
+        .group_by(Alocacao.projeto_id, Alocacao.funcao)
+    )
+
+
+def _cobre_janela_inteira(
+    inicio: Optional[datetime],
+    fim: Optional[datetime],
+    menor_inicio: datetime,
+    maior_fim: Optional[datetime],
+    sem_fim: bool,
+) -> bool:
+    """Verifica se as alocacoes vao do inicio ao fim previsto do projeto"""
+    cobre_inicio = inicio is None or menor_inicio <= inicio
+    cobre_fim = sem_fim or fim is None or (maior_fim is not None and maior_fim >= fim)
+    return cobre_inicio and cobre_fim
+
+
+def calcular_gaps(projetos: list, cobertura: list) -> list[dict]:
+    """
+    Monta a matriz projeto x funcao a partir das linhas das duas queries.
+
+    Retorna uma lista de dicts no formato de GapProjetoDashboard.
+    """
+    cobertura_por_chave = {(c.projeto_id, FuncaoAlocacao(c.funcao)): c for c in cobertura}
+
+    result = []
+    for p in projetos:
+        nao_necessarias = set(p.funcoes_nao_necessarias or [])
+        funcoes = []
+        total_gaps = 0
+        for funcao in FuncaoAlocacao:
+            necessaria = funcao.value not in nao_necessarias
+            c = cobertura_por_chave.get((p.id, funcao))
+            coberta = c is not None
+            cobertura_integral = coberta and _cobre_janela_inteira(
+                p.data_inicio_prevista, p.data_fim_prevista,
+                c.menor_inicio, c.maior_fim, c.sem_fim,
+            )
+            gap = necessaria and not coberta
+            if gap:
+                total_gaps += 1
+            funcoes.append({
+                "funcao": funcao.value,
+                "necessaria": necessaria,
+                "coberta": coberta,
+                "cobertura_integral": cobertura_integral,
+                "total_alocados": c.total_alocados if coberta else 0,
+                "gap": gap,
+            })
+
+        result.append({
+            "projeto_id": p.id,
+            "codigo": p.codigo,
+            "nome": p.nome,
+            "empresa": p.empresa,
+            "status": p.status.value,
+            "data_inicio": p.data_inicio_prevista,
+            "data_fim": p.data_fim_prevista,
+            "total_gaps": total_gaps,
+            "funcoes": funcoes,
+        })
+
+    return result
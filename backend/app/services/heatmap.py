@@ -0,0 +1,106 @@
+"""
+Mapa de calor de carga: horas semanais comprometidas por pessoa x semana
+
+Uma busca das alocacoes ativas que tocam a janela e uma matriz (pessoas,
+semanas) montada com arrays de diferenca por pessoa (timeline vetorizada):
+sem laco Python por semana nem por celula. Uma alocacao conta inteira em
+toda semana que toca, da semana de data_inicio a semana de data_fim, como
+na grade de capacidade das sugestoes.
+
+A resposta e colunar: colunas dos colaboradores (id, nome, setor) e a
+matriz de horas na mesma ordem das linhas, com as semanas em comum.
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import Date, cast, func, or_, select
+
+from ..models.alocacao import Alocacao, StatusAlocacao
+from ..models.colaborador import Colaborador
+from .timeline import HORAS_SEMANA_CHEIA, acumular_intervalos
+
+
+def colaboradores_statement(setor_id: Optional[int] = None):
+    """Linhas do mapa: colaboradores (do setor), em ordem de nome"""
+    query = select(Colaborador.id, Colaborador.nome, Colaborador.setor_id)
+    if setor_id:
+        query = query.where(Colaborador.setor_id == setor_id)
+    return query.order_by(Colaborador.nome, Colaborador.id)
+
+
+def alocacoes_statement(origem: date, n_semanas: int, setor_id: Optional[int] = None):
+    """
+    Alocacoes ativas (de colaboradores do setor) que tocam as semanas da
+    janela, com inicio e fim em dias desde `origem` (calculados no banco:
+    nenhum datetime montado por linha). Sem fim = fim da janela.
+    """
+    inicio = datetime.combine(origem, datetime.min.time())
+    fim = inicio + timedelta(weeks=n_semanas)
+    query = select(
+        Alocacao.colaborador_id,
+        (cast(Alocacao.data_inicio, Date) - origem).label("dia_inicio"),
+        func.coalesce(cast(Alocacao.data_fim, Date) - origem, n_semanas * 7).label("dia_fim"),
+        Alocacao.horas_semanais,
+    ).where(
+        Alocacao.status == StatusAlocacao.ATIVA,
+        Alocacao.data_inicio < fim,
+        or_(Alocacao.data_fim.is_(None), Alocacao.data_fim >= inicio),
+    )
+    if setor_id:
+        query = query.join(Colaborador, Alocacao.colaborador_id == Colaborador.id).where(
+            Colaborador.setor_id == setor_id
+        )
+    return query
+
+
+def matriz_horas(ids: np.ndarray, alocacoes: list, n_semanas: int) -> np.ndarray:
+    """
+    Horas comprometidas (ids x semanas) das linhas de alocacoes_statement.
+    Alocacoes de colaboradores fora de `ids` sao ignoradas.
+    """
+    if len(alocacoes) == 0 or len(ids) == 0:
+        return np.zeros((len(ids), n_semanas), dtype=np.float64)
+
+    # Transposta em uma passada (zip em C): acesso por atributo em cada Row
+    # custa mais que o calculo todo em dezenas de milhares de linhas
+    colaborador_id, dia_inicio, dia_fim, horas = zip(*alocacoes)
+    colaboradores = np.array(colaborador_id, dtype=np.int64)
+    dia_inicio = np.array(dia_inicio, dtype=np.int64)
+    dia_fim = np.array(dia_fim, dtype=np.int64)
+
+    # Linha de cada alocacao: busca binaria nos ids ordenados (sem dict por item)
+    ordem = np.argsort(ids, kind="stable")
+    ids_ordenados = ids[ordem]
+    posicoes = np.minimum(np.searchsorted(ids_ordenados, colaboradores), len(ids) - 1)
+    # Periodo invertido (data_fim antes do inicio) nao cobre nada, como o
+    # periodo vazio da migracao 016; checado em dias, antes de virar semana
+    validas = (ids_ordenados[posicoes] == colaboradores) & (dia_inicio <= dia_fim)
+
+    # Dias desde a origem -> semana (divisao inteira arredonda para baixo: dias
+    # antes da origem caem em semanas negativas, recortadas na janela)
+    return acumular_intervalos(
+        ordem[posicoes[validas]],
+        len(ids),
+        dia_inicio[validas] // 7,
+        dia_fim[validas] // 7,
+        np.array(horas, dtype=np.float64)[validas],
+        n_semanas,
+    )
+
+
+def montar(colaboradores: list, alocacoes: list, origem: date, n_semanas: int) -> dict:
+    """Resposta colunar do mapa (formato de HeatmapDashboard); `origem` e uma segunda-feira"""
+    ids = np.fromiter((c.id for c in colaboradores), dtype=np.int64, count=len(colaboradores))
+    horas = matriz_horas(ids, alocacoes, n_semanas)
+    return {
+        "inicio": origem,
+        "semanas": [origem + timedelta(weeks=s) for s in range(n_semanas)],
+        "horas_semana_cheia": HORAS_SEMANA_CHEIA,
+        "colaboradores": {
+            "id": ids.tolist(),
+            "nome": [c.nome for c in colaboradores],
+            "setor_id": [c.setor_id for c in colaboradores],
+        },
+        "horas": np.round(horas, 1).tolist(),
+    }
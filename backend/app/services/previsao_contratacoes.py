@@ -0,0 +1,169 @@
+"""
+Previsao de contratacoes a partir de tipos_servico.equipe_minima
+
+Para cada mes do horizonte:
+- demanda: soma de equipe_minima[funcao] dos servicos ativos/planejados
+  que cobrem o mes;
+- capacidade disponivel: colaboradores cujo cargo exerce a funcao
+  (cargos.funcoes_servico), descontadas as horas ja comprometidas em
+  alocacoes ativas no mes (44h/semana = 1 pessoa);
+- gap: demanda - capacidade; contratacoes = gap arredondado para cima.
+
+Colaborador habilitado para N funcoes contribui com 1/N de sua
+disponibilidade em cada uma, para nao ser contado varias vezes.
+"""
+from datetime import date, datetime
+
+import numpy as np
+from sqlalchemy import or_, select
+
+from ..models.alocacao import Alocacao, StatusAlocacao
+from ..models.cargo import Cargo
+from ..models.colaborador import Colaborador
+from ..models.servico import FUNCOES_SERVICO, STATUS_SERVICO_ATIVOS, Servico, TipoServico
+from .timeline import (
+    HORAS_SEMANA_CHEIA,
+    MESES,
+    SEM_FIM,
+    acumular_intervalos,
+    indice_mes,
+    indices_mes,
+    mes_do_indice,
+)
+
+
+def servicos_statement():
+    """Servicos que ainda demandam equipe, com a equipe minima do tipo"""
+    return (
+        select(
+            Servico.id,
+            Servico.data_inicio,
+            Servico.data_fim_prevista,
+            TipoServico.equipe_minima,
+        )
+        .join(TipoServico, Servico.tipo_servico_id == TipoServico.id)
+        .where(Servico.status.in_(STATUS_SERVICO_ATIVOS))
+    )
+
+
+def colaboradores_statement():
+    """Colaboradores com as funcoes de servico do seu cargo"""
+    return (
+        select(Colaborador.id, Cargo.funcoes_servico)
+        .join(Cargo, Colaborador.cargo_id == Cargo.id)
+    )
+
+
+def alocacoes_statement(inicio: datetime, fim: datetime):
+    """Alocacoes ativas que se sobrepoem ao horizonte [inicio, fim)"""
+    return (
+        select(
+            Alocacao.colaborador_id,
+            Alocacao.data_inicio,
+            Alocacao.data_fim,
+            Alocacao.horas_semanais,
+        )
+        .where(
+            Alocacao.status == StatusAlocacao.ATIVA,
+            Alocacao.data_inicio < fim,
+            or_(Alocacao.data_fim.is_(None), Alocacao.data_fim >= inicio),
+        )
+    )
+
+
+def limites_horizonte(mes_inicial: date, meses: int) -> tuple[datetime, datetime]:
+    """Datas [inicio, fim) do horizonte de previsao"""
+    fim = mes_do_indice(indice_mes(mes_inicial) + meses)
+    return (
+        datetime(mes_inicial.year, mes_inicial.month, 1),
+        datetime(fim.year, fim.month, 1),
+    )
+
+
+def calcular_previsao(
+    servicos: list,
+    colaboradores: list,
+    alocacoes: list,
+    mes_inicial: date,
+    meses: int,
+) -> list[dict]:
+    """
+    Calcula demanda, capacidade e gap por funcao para cada mes do horizonte.
+
+    Retorna uma lista de dicts no formato de PrevisaoContratacaoMensal.
+    """
+    m0 = indice_mes(mes_inicial)
+
+    # Funcoes conhecidas + qualquer chave extra configurada em equipe_minima
+    funcoes = list(FUNCOES_SERVICO)
+    for s in servicos:
+        for funcao in (s.equipe_minima or {}):
+            if funcao not in funcoes:
+                funcoes.append(funcao)
+    funcao_idx = {f: i for i, f in enumerate(funcoes)}
+
+    # ---- Demanda (funcao x mes) ----
+    d_grupos, d_ini, d_fim, d_qtd = [], [], [], []
+    for s in servicos:
+        ini = indice_mes(s.data_inicio) - m0 if s.data_inicio else 0
+        fim = indice_mes(s.data_fim_prevista) - m0 if s.data_fim_prevista else SEM_FIM
+        for funcao, quantidade in (s.equipe_minima or {}).items():
+            if quantidade:
+                d_grupos.append(funcao_idx[funcao])
+                d_ini.append(ini)
+                d_fim.append(fim)
+                d_qtd.append(float(quantidade))
+
+    demanda = acumular_intervalos(
+        np.array(d_grupos, dtype=np.int64), len(funcoes),
+        np.array(d_ini, dtype=np.int64), np.array(d_fim, dtype=np.int64),
+        np.array(d_qtd, dtype=np.float64), meses,
+    )
+
+    # ---- Capacidade (funcao x mes) ----
+    habilitados = [c for c in colaboradores if c.funcoes_servico]
+    pessoa_idx = {c.id: i for i, c in enumerate(habilitados)}
+
+    pesos = np.zeros((len(funcoes), len(habilitados)), dtype=np.float64)
+    for c in habilitados:
+        funcoes_colab = [f for f in c.funcoes_servico if f in funcao_idx]
+        for f in funcoes_colab:
+            pesos[funcao_idx[f], pessoa_idx[c.id]] = 1.0 / len(funcoes_colab)
+
+    alocacoes = [a for a in alocacoes if a.colaborador_id in pessoa_idx]
+    horas = acumular_intervalos(
+        np.array([pessoa_idx[a.colaborador_id] for a in alocacoes], dtype=np.int64),
+        len(habilitados),
+        indices_mes(a.data_inicio for a in alocacoes) - m0,
+        indices_mes(a.data_fim for a in alocacoes) - m0,
+        np.array([a.horas_semanais for a in alocacoes], dtype=np.float64),
+        meses,
+    )
+    disponivel = np.clip(1.0 - horas / HORAS_SEMANA_CHEIA, 0.0, 1.0)
+    capacidade = pesos @ disponivel
+
+    gap = demanda - capacidade
+    contratacoes = np.ceil(np.clip(gap, 0.0, None) - 1e-9)
+
+    result = []
+    for m in range(meses):
+        mes = mes_do_indice(m0 + m)
+        linhas = [
+            {
+                "funcao": funcao,
+                "demanda": round(float(demanda[i, m]), 2),
+                "capacidade_disponivel": round(float(capacidade[i, m]), 2),
+                "gap": round(float(gap[i, m]), 2),
+                "contratacoes": int(contratacoes[i, m]),
+            }
+            for i, funcao in enumerate(funcoes)
+        ]
+        result.append({
+            "ano": mes.year,
+            "mes": mes.month,
+            "nome_mes": MESES[mes.month - 1],
+            "funcoes": linhas,
+            "total_contratacoes": sum(l["contratacoes"] for l in linhas),
+        })
+
+    return result
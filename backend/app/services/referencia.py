@@ -0,0 +1,124 @@
+"""
+Cache em memoria dos dados de referencia (setores, niveis, subniveis, cargos)
+
+Essas tabelas mudam raramente e sao lidas o tempo todo: listas do
+organograma, validacoes de colaboradores, limites de capacidade. Cada worker
+guarda um snapshot imutavel (DadosReferencia) com dicts por id, no formato
+dos schemas de resposta, e o JSON das listas ja serializado (com as variantes
+comprimidas, ver app/compressao.py).
+
+Invalidacao versionada: triggers de statement (migracao 014) gravam um novo
+valor de sequence em referencia_versao.versao a cada escrita nessas tabelas,
+na mesma transacao da escrita. A cada uso o cache le a versao (1 SELECT por
+PK) e, se mudou, recarrega tudo em uma unica query. Assim uma escrita feita
+por qualquer worker, ou direto no banco, invalida o cache de todos; como a
+versao vem de sequence, um numero de transacao desfeita nunca e reutilizado.
+"""
+from collections import defaultdict
+from typing import Any, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, BigInteger, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..compressao import PayloadJSON, RespostaPayload
+from ..schemas import CargoResponse, NivelResponse, SetorResponse, SubnivelResponse, SubsetorResponse
+from ..serializacao import SerializadorJSON
+
+VERSAO_STATEMENT = text("SELECT versao FROM referencia_versao WHERE id = 1")
+
+# Versao e dados na mesma query: o snapshot lido e consistente com a versao
+CARGA_STATEMENT = text("""
+    SELECT
+        (SELECT versao FROM referencia_versao WHERE id = 1) AS versao,
+        (SELECT coalesce(json_agg(t ORDER BY t.id), '[]') FROM setores t) AS setores,
+        (SELECT coalesce(json_agg(t ORDER BY t.id), '[]') FROM subsetores t) AS subsetores,
+        (SELECT coalesce(json_agg(t ORDER BY t.ordem, t.id), '[]') FROM niveis_hierarquicos t) AS niveis,
+        (SELECT coalesce(json_agg(t ORDER BY t.ordem, t.id), '[]') FROM subniveis t) AS subniveis,
+        (SELECT coalesce(json_agg(t ORDER BY t.ordem, t.id), '[]') FROM cargos t) AS cargos
+""").columns(versao=BigInteger, setores=JSON, subsetores=JSON, niveis=JSON, subniveis=JSON, cargos=JSON)
+
+_setores_json = SerializadorJSON(list[SetorResponse])
+_niveis_json = SerializadorJSON(list[NivelResponse])
+_cargos_json = SerializadorJSON(list[CargoResponse])
+
+
+def _campos(modelo: type[BaseModel], linha: dict) -> dict:
+    """Campos do schema presentes na linha, na ordem do schema"""
+    return {campo: linha[campo] for campo in modelo.model_fields if campo in linha}
+
+
+class DadosReferencia:
+    """Snapshot imutavel de uma versao dos dados de referencia"""
+
+    def __init__(self, versao: int, setores: list, subsetores: list, niveis: list, subniveis: list, cargos: list):
+        self.versao = versao
+        self.subsetores = {s["id"]: _campos(SubsetorResponse, s) for s in subsetores}
+        self.subniveis = {s["id"]: _campos(SubnivelResponse, s) for s in subniveis}
+
+        subsetores_por_setor = defaultdict(list)
+        for subsetor in self.subsetores.values():
+            subsetores_por_setor[subsetor["setor_id"]].append(subsetor)
+        subniveis_por_nivel = defaultdict(list)
+        for subnivel in self.subniveis.values():
+            subniveis_por_nivel[subnivel["nivel_id"]].append(subnivel)
+
+        # Dicts na ordem das listas: setores por id, niveis e cargos por ordem
+        self.setores = {
+            s["id"]: {**_campos(SetorResponse, s), "subsetores": subsetores_por_setor[s["id"]]} for s in setores
+        }
+        self.niveis = {
+            n["id"]: {**_campos(NivelResponse, n), "subniveis": subniveis_por_nivel[n["id"]]} for n in niveis
+        }
+        self.cargos = {c["id"]: _campos(CargoResponse, c) for c in cargos}
+
+        self.setores_json = PayloadJSON(_setores_json.dumps(list(self.setores.values())))
+        self.niveis_json = PayloadJSON(_niveis_json.dumps(list(self.niveis.values())))
+        self.cargos_json = PayloadJSON(_cargos_json.dumps(list(self.cargos.values())))
+
+    def lista_setores(self) -> RespostaPayload:
+        return self.setores_json.resposta()
+
+    def lista_niveis(self) -> RespostaPayload:
+        return self.niveis_json.resposta()
+
+    def lista_cargos(self) -> RespostaPayload:
+        return self.cargos_json.resposta()
+
+
+class ReferenciaCache:
+    """
+    Mantem o DadosReferencia da versao atual do banco.
+
+    Sem lock: o snapshot e imutavel e a troca e uma atribuicao; dois
+    requests que encontram a versao nova ao mesmo tempo apenas carregam
+    em dobro.
+    """
+
+    def __init__(self):
+        self._dados: Optional[DadosReferencia] = None
+
+    def _vigente(self, versao: int) -> Optional[DadosReferencia]:
+        # Versao lida da replica pode estar atras da que o cache ja tem (lida
+        # do primario): o snapshot mais novo serve, sem recarregar o antigo
+        dados = self._dados
+        return dados if dados is not None and dados.versao >= versao else None
+
+    def _guardar(self, linha: Any) -> DadosReferencia:
+        dados = DadosReferencia(**linha._asdict())
+        self._dados = dados
+        return dados
+
+    def obter(self, db: Session) -> DadosReferencia:
+        """Dados da versao atual: 1 query se o cache vale, 2 se recarregou"""
+        versao = db.execute(VERSAO_STATEMENT).scalar_one()
+        return self._vigente(versao) or self._guardar(db.execute(CARGA_STATEMENT).one())
+
+    async def obter_async(self, db: AsyncSession) -> DadosReferencia:
+        """Versao async de obter"""
+        versao = (await db.execute(VERSAO_STATEMENT)).scalar_one()
+        return self._vigente(versao) or self._guardar((await db.execute(CARGA_STATEMENT)).one())
+
+
+referencia = ReferenciaCache()
@@ -0,0 +1,100 @@
+"""
+Reordenacao de tabelas de referencia com coluna `ordem` (niveis, cargos,
+setores, tipos de projeto)
+
+- reordenar: aplica uma ordem nova em um unico UPDATE ... FROM (VALUES
+  ...), sem carregar as linhas: os ids da lista na sequencia recebida e,
+  depois deles, os que ficaram de fora, na ordem atual (a tabela inteira e
+  renumerada, senao ordens antigas como 1, 2, 3... passariam na frente).
+  Ids inexistentes sao detectados pelo RETURNING.
+- mover: ordem com espacamento (ESPACAMENTO entre vizinhos), mover um item
+  grava so a linha dele no ponto medio entre os novos vizinhos. Sem espaco
+  livre (ordens consecutivas ou empatadas, como as antigas 1, 2, 3...), a
+  tabela inteira e renumerada com reordenar.
+
+Nenhuma das duas faz commit nem rollback: fica com o router, como nas
+demais escritas.
+"""
+from typing import Optional
+
+from sqlalchemy import Integer, column, func, select, update, values
+from sqlalchemy.orm import Session
+
+ESPACAMENTO = 1000
+
+
+def reordenar(db: Session, model, ordered_ids: list[int]) -> None:
+    """
+    Renumera a tabela (espacada): ids da lista na sequencia recebida, depois
+    os demais na ordem atual. ValueError se houver duplicados ou ids
+    inexistentes; o UPDATE ja executado fica para o rollback do router.
+    """
+    if len(ordered_ids) != len(set(ordered_ids)):
+        raise ValueError("IDs duplicados na lista de reordenacao")
+    if not ordered_ids:
+        return
+
+    nova = values(column("id", Integer), column("posicao", Integer), name="nova_ordem").data(
+        list(zip(ordered_ids, range(len(ordered_ids))))
+    )
+    final = (
+        select(
+            model.id,
+            (func.row_number().over(
+                order_by=(nova.c.posicao.asc().nulls_last(), model.ordem, model.id)
+            ) * ESPACAMENTO).label("ordem"),
+            nova.c.posicao.is_not(None).label("listado"),
+        )
+        .outerjoin(nova, nova.c.id == model.id)
+        .subquery("ordem_final")
+    )
+    linhas = db.execute(
+        update(model)
+        .where(model.id == final.c.id)
+        .values(ordem=final.c.ordem)
+        .returning(model.id, final.c.listado)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    encontrados = {linha.id for linha in linhas if linha.listado}
+    if len(encontrados) != len(ordered_ids):
+        faltando = sorted(set(ordered_ids) - encontrados)
+        raise ValueError(f"IDs nao encontrados: {', '.join(map(str, faltando))}")
+
+
+def mover(db: Session, model, item_id: int, depois_de: Optional[int]) -> None:
+    """
+    Move `item_id` para logo depois de `depois_de` (None = primeiro).
+    LookupError se o item nao existe; ValueError se `depois_de` nao existe
+    ou e o proprio item.
+    """
+    if depois_de == item_id:
+        raise ValueError("Um item nao pode ser movido para depois dele mesmo")
+
+    linhas = db.execute(select(model.id, model.ordem).order_by(model.ordem, model.id)).all()
+    if not any(linha.id == item_id for linha in linhas):
+        raise LookupError(item_id)
+    outros = [linha for linha in linhas if linha.id != item_id]
+
+    if depois_de is None:
+        posicao = 0
+    else:
+        posicao = next((i + 1 for i, linha in enumerate(outros) if linha.id == depois_de), None)
+        if posicao is None:
+            raise ValueError(f"ID {depois_de} nao encontrado")
+
+    anterior = outros[posicao - 1].ordem if posicao > 0 else 0
+    seguinte = outros[posicao].ordem if posicao < len(outros) else anterior + 2 * ESPACAMENTO
+    if seguinte - anterior > 1:
+        db.execute(
+            update(model)
+            .where(model.id == item_id)
+            .values(ordem=(anterior + seguinte) // 2)
+            .execution_options(synchronize_session=False)
+        )
+        return
+
+    # Sem espaco entre os vizinhos: renumera tudo ja com o item na posicao nova
+    ids = [linha.id for linha in outros]
+    ids.insert(posicao, item_id)
+    reordenar(db, model, ids)
@@ -0,0 +1,370 @@
+"""
+Sugestao de colaboradores para funcoes em aberto nos projetos
+
+Cada candidato recebe uma pontuacao combinando:
+- capacidade livre: horas livres por semana (44h - horas de alocacoes
+  ativas) na janela prevista do projeto, calculadas para todas as pessoas
+  de uma vez com a timeline vetorizada;
+- folga de limite: projetos ativos distintos x limite do cargo (ou setor);
+- aderencia a funcao: palavras-chave do cargo e historico de alocacoes
+  do colaborador na mesma funcao.
+
+O modo em lote preenche os gaps de varios projetos com um otimizador
+guloso: a cada passo escolhe o melhor par (vaga, colaborador) e desconta
+as horas e o projeto da capacidade da pessoa antes do proximo passo.
+"""
+import unicodedata
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, or_, select
+
+from ..models.alocacao import Alocacao, FuncaoAlocacao, StatusAlocacao
+from ..models.colaborador import Colaborador
+from ..models.setor import Setor
+from .capacidade import CapacidadeLookup
+from .timeline import HORAS_SEMANA_CHEIA, acumular_intervalos, indices_semana, inicio_da_semana
+
+FUNCOES = list(FuncaoAlocacao)
+
+# Palavras (sem acento, minusculas) do cargo que indicam aptidao para a funcao
+PALAVRAS_FUNCAO = {
+    FuncaoAlocacao.GERENTE_PROJETO: ("gerente", "diretor"),
+    FuncaoAlocacao.COORDENADOR: ("coordenador", "supervisor", "diretor"),
+    FuncaoAlocacao.ENGENHEIRO: ("engenheiro", "eng."),
+    FuncaoAlocacao.TECNICO: ("tecnico",),
+    FuncaoAlocacao.ENCARREGADO: ("encarregado", "supervisor", "mestre"),
+    FuncaoAlocacao.AUXILIAR: ("auxiliar", "assistente", "estagiario", "servicos gerais"),
+    FuncaoAlocacao.FISCAL: ("fiscal", "engenheiro"),
+    FuncaoAlocacao.COMPRADOR: ("compras", "comprador", "suprimentos"),
+}
+
+# Pesos da pontuacao (somam 1)
+PESO_ADERENCIA = 0.40
+PESO_CAPACIDADE = 0.45
+PESO_FOLGA_LIMITE = 0.15
+
+# Janela usada quando o projeto nao tem fim previsto
+SEMANAS_PADRAO = 26
+MAX_SEMANAS = 520
+
+# Elegivel: dentro do limite, aderencia > 0 e ao menos estas horas livres medias
+HORAS_LIVRES_MINIMAS = 1.0
+
+
+def _combinar(aderencia, horas_livres, folga):
+    """Pontuacao final a partir dos componentes (escalares ou arrays)"""
+    return (
+        PESO_ADERENCIA * aderencia
+        + PESO_CAPACIDADE * horas_livres / HORAS_SEMANA_CHEIA
+        + PESO_FOLGA_LIMITE * folga
+    )
+
+
+def _normalizar(texto: str) -> str:
+    texto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(ch for ch in texto if not unicodedata.combining(ch)).lower()
+
+
+def janela_projeto(inicio: Optional[datetime], fim: Optional[datetime]) -> tuple[date, date]:
+    """Janela [inicio, fim] da sugestao; datas ausentes usam hoje / +26 semanas"""
+    ini = inicio.date() if inicio else date.today()
+    fim_d = fim.date() if fim else ini + timedelta(weeks=SEMANAS_PADRAO)
+    return ini, max(ini, fim_d)
+
+
+# ============ STATEMENTS ============
+
+def colaboradores_statement():
+    return (
+        select(
+            Colaborador.id,
+            Colaborador.nome,
+            Colaborador.cargo,
+            Colaborador.cargo_id,
+            Colaborador.setor_id,
+            Setor.nome.label("setor_nome"),
+        )
+        .join(Setor, Colaborador.setor_id == Setor.id)
+        .order_by(Colaborador.id)
+    )
+
+
+def alocacoes_statement(inicio: date, fim: date):
+    """Alocacoes ativas que se sobrepoem a [inicio, fim]"""
+    return (
+        select(
+            Alocacao.colaborador_id,
+            Alocacao.data_inicio,
+            Alocacao.data_fim,
+            Alocacao.horas_semanais,
+        )
+        .where(
+            Alocacao.status == StatusAlocacao.ATIVA,
+            Alocacao.data_inicio < datetime.combine(fim + timedelta(days=1), datetime.min.time()),
+            or_(Alocacao.data_fim.is_(None), Alocacao.data_fim >= datetime.combine(inicio, datetime.min.time())),
+        )
+    )
+
+
+def historico_statement():
+    """Quantidade de alocacoes (qualquer status) por colaborador e funcao"""
+    return (
+        select(Alocacao.colaborador_id, Alocacao.funcao, func.count().label("total"))
+        .group_by(Alocacao.colaborador_id, Alocacao.funcao)
+    )
+
+
+def alocados_statement(projeto_ids: list[int]):
+    """Pares (projeto, colaborador) que ja tem alocacao ativa nos projetos"""
+    return (
+        select(Alocacao.projeto_id, Alocacao.colaborador_id)
+        .where(Alocacao.projeto_id.in_(projeto_ids), Alocacao.status == StatusAlocacao.ATIVA)
+        .distinct()
+    )
+
+
+# ============ GRADE DE CAPACIDADE ============
+
+class GradeCapacidade:
+    """
+    Capacidade de todas as pessoas em uma grade semanal (pessoa x semana).
+
+    `livre[p, s]` sao as horas livres da pessoa p na semana s, a partir da
+    segunda-feira `origem`.
+    """
+
+    def __init__(
+        self,
+        colaboradores: list,
+        alocacoes: list,
+        historico: list,
+        projetos_ativos: dict,
+        lookup: CapacidadeLookup,
+        inicio: date,
+        fim: date,
+    ):
+        self.colaboradores = list(colaboradores)
+        self.idx = {c.id: i for i, c in enumerate(self.colaboradores)}
+        n = len(self.colaboradores)
+
+        self.origem = inicio_da_semana(inicio)
+        self.n_semanas = min((fim - self.origem).days // 7 + 1, MAX_SEMANAS)
+
+        alocacoes = [a for a in alocacoes if a.colaborador_id in self.idx]
+        horas = acumular_intervalos(
+            np.fromiter((self.idx[a.colaborador_id] for a in alocacoes), dtype=np.int64, count=len(alocacoes)),
+            n,
+            indices_semana((a.data_inicio for a in alocacoes), self.origem),
+            indices_semana((a.data_fim for a in alocacoes), self.origem),
+            np.fromiter((a.horas_semanais for a in alocacoes), dtype=np.float64, count=len(alocacoes)),
+            self.n_semanas,
+        )
+        self.livre = np.clip(HORAS_SEMANA_CHEIA - horas, 0.0, HORAS_SEMANA_CHEIA)
+
+        # Limite de projetos simultaneos (inf = nao mensurado)
+        self.ativos = np.array([projetos_ativos.get(c.id, 0) for c in self.colaboradores], dtype=np.float64)
+        self.limites = np.array(
+            [
+                np.inf if (l := lookup.resolver(c.cargo_id, c.setor_id).limite) is None else l
+                for c in self.colaboradores
+            ],
+            dtype=np.float64,
+        )
+
+        # Aderencia: palavras do cargo (0/1) e fracao do historico na funcao
+        self.nomes_cargo = []
+        cargo_match = np.zeros((n, len(FUNCOES)), dtype=np.float64)
+        for i, c in enumerate(self.colaboradores):
+            cargo = lookup.cargos.get(c.cargo_id)
+            nome_cargo = cargo.nome if cargo else c.cargo
+            self.nomes_cargo.append(nome_cargo)
+            texto = _normalizar(f"{c.cargo} {nome_cargo}")
+            for f, funcao in enumerate(FUNCOES):
+                if any(p in texto for p in PALAVRAS_FUNCAO[funcao]):
+                    cargo_match[i, f] = 1.0
+
+        self.historico = np.zeros((n, len(FUNCOES)), dtype=np.float64)
+        funcao_idx = {funcao.value: f for f, funcao in enumerate(FUNCOES)}
+        for h in historico:
+            i = self.idx.get(h.colaborador_id)
+            if i is not None:
+                self.historico[i, funcao_idx[getattr(h.funcao, "value", h.funcao)]] += h.total
+        total = self.historico.sum(axis=1, keepdims=True)
+        fracao = np.divide(self.historico, total, out=np.zeros_like(self.historico), where=total > 0)
+        self.aderencia = 0.5 * cargo_match + 0.5 * fracao
+
+    def semanas(self, inicio: date, fim: date) -> tuple[int, int]:
+        """Indices [a, b] de semana da janela, recortados na grade"""
+        a = max((inicio - self.origem).days // 7, 0)
+        b = min((fim - self.origem).days // 7, self.n_semanas - 1)
+        return a, max(a, b)
+
+    def livre_janela(self, a: int, b: int) -> tuple[np.ndarray, np.ndarray]:
+        """Horas livres media e minima por semana de cada pessoa em [a, b]"""
+        janela = self.livre[:, a:b + 1]
+        return janela.mean(axis=1), janela.min(axis=1)
+
+    def folga(self) -> np.ndarray:
+        """Fracao livre do limite de projetos (1 para nao mensurados)"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            folga = np.clip((self.limites - self.ativos) / self.limites, 0.0, 1.0)
+        return np.where(np.isinf(self.limites), 1.0, np.nan_to_num(folga))
+
+    def pontuar(
+        self, funcao: FuncaoAlocacao, a: int, b: int, excluidos: Optional[set] = None
+    ) -> dict[str, np.ndarray]:
+        """Pontuacao e componentes de todas as pessoas para uma vaga"""
+        f = FUNCOES.index(funcao)
+        media, minima = self.livre_janela(a, b)
+        aderencia = self.aderencia[:, f]
+        pontuacao = _combinar(aderencia, media, self.folga())
+
+        dentro_limite = self.ativos < self.limites
+        elegivel = dentro_limite & (media >= HORAS_LIVRES_MINIMAS) & (aderencia > 0)
+        if excluidos:
+            elegivel[[self.idx[c] for c in excluidos if c in self.idx]] = False
+
+        return {
+            "pontuacao": pontuacao,
+            "aderencia": aderencia,
+            "media": media,
+            "minima": minima,
+            "dentro_limite": dentro_limite,
+            "elegivel": elegivel,
+        }
+
+    def reservar(self, i: int, a: int, b: int, horas: float, projeto_novo: bool) -> None:
+        """Desconta uma alocacao sugerida da capacidade da pessoa i"""
+        self.livre[i, a:b + 1] = np.clip(self.livre[i, a:b + 1] - horas, 0.0, None)
+        if projeto_novo:
+            self.ativos[i] += 1
+
+
+# ============ SUGESTOES ============
+
+def ranquear_candidatos(
+    grade: GradeCapacidade,
+    funcao: FuncaoAlocacao,
+    inicio: date,
+    fim: date,
+    alocados: set[int],
+    limite: int,
+    incluir_indisponiveis: bool = False,
+) -> list[dict]:
+    """Candidatos para uma funcao do projeto, do mais para o menos indicado"""
+    a, b = grade.semanas(inicio, fim)
+    r = grade.pontuar(funcao, a, b, excluidos=alocados)
+    f = FUNCOES.index(funcao)
+
+    candidatos = np.flatnonzero(r["elegivel"]) if not incluir_indisponiveis else np.array(
+        [i for i, c in enumerate(grade.colaboradores) if c.id not in alocados], dtype=np.int64
+    )
+    # Elegiveis primeiro, depois pontuacao decrescente
+    ordem = np.lexsort((-r["pontuacao"][candidatos], ~r["elegivel"][candidatos]))
+
+    result = []
+    for i in candidatos[ordem][:limite]:
+        c = grade.colaboradores[i]
+        result.append({
+            "colaborador_id": c.id,
+            "nome": c.nome,
+            "cargo": grade.nomes_cargo[i],
+            "setor": c.setor_nome,
+            "pontuacao": round(float(r["pontuacao"][i]), 4),
+            "aderencia": round(float(r["aderencia"][i]), 4),
+            "alocacoes_na_funcao": int(grade.historico[i, f]),
+            "horas_livres_media": round(float(r["media"][i]), 1),
+            "horas_livres_minima": round(float(r["minima"][i]), 1),
+            "percentual_livre": round(float(r["media"][i]) / HORAS_SEMANA_CHEIA * 100, 1),
+            "projetos_ativos": int(grade.ativos[i]),
+            "limite_projetos": None if np.isinf(grade.limites[i]) else int(grade.limites[i]),
+            "dentro_limite": bool(r["dentro_limite"][i]),
+            "elegivel": bool(r["elegivel"][i]),
+        })
+    return result
+
+
+def preencher_gaps(
+    grade: GradeCapacidade,
+    vagas: list[dict],
+    alocados: dict[int, set[int]],
+    horas_semanais: float,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Otimizador guloso para varias vagas (projeto x funcao).
+
+    `vagas`: dicts com projeto_id, codigo, funcao, inicio, fim.
+    Retorna (alocacoes sugeridas, vagas nao preenchidas).
+    """
+    n_vagas = len(vagas)
+    n_pessoas = len(grade.colaboradores)
+    if n_vagas == 0 or n_pessoas == 0:
+        return [], list(vagas)
+
+    janelas = [grade.semanas(v["inicio"], v["fim"]) for v in vagas]
+    funcoes_idx = np.array([FUNCOES.index(v["funcao"]) for v in vagas], dtype=np.int64)
+    alocados = {p: set(c) for p, c in alocados.items()}
+
+    def linha(s: int) -> np.ndarray:
+        v = vagas[s]
+        r = grade.pontuar(v["funcao"], *janelas[s], excluidos=alocados.get(v["projeto_id"]))
+        return np.where(r["elegivel"], r["pontuacao"], -np.inf)
+
+    def celula(s: int, i: int) -> float:
+        """Pontuacao da pessoa i na vaga s (mesmos criterios de `linha`)"""
+        if grade.colaboradores[i].id in alocados.get(vagas[s]["projeto_id"], ()):
+            return -np.inf
+        if grade.ativos[i] >= grade.limites[i]:
+            return -np.inf
+        a, b = janelas[s]
+        media = grade.livre[i, a:b + 1].mean()
+        aderencia = grade.aderencia[i, funcoes_idx[s]]
+        if media < HORAS_LIVRES_MINIMAS or aderencia <= 0:
+            return -np.inf
+        folga = 1.0 if np.isinf(grade.limites[i]) else max(
+            (grade.limites[i] - grade.ativos[i]) / grade.limites[i], 0.0
+        )
+        return float(_combinar(aderencia, media, folga))
+
+    pontuacoes = np.vstack([linha(s) for s in range(n_vagas)])
+    pendentes = np.ones(n_vagas, dtype=bool)
+
+    sugeridas = []
+    while pendentes.any():
+        s, i = np.unravel_index(np.argmax(pontuacoes), pontuacoes.shape)
+        if not np.isfinite(pontuacoes[s, i]):
+            break  # Nenhum candidato elegivel para as vagas restantes
+
+        v = vagas[s]
+        c = grade.colaboradores[i]
+        a, b = janelas[s]
+        media = float(grade.livre[i, a:b + 1].mean())
+        horas = min(horas_semanais, media)
+        sugeridas.append({
+            "projeto_id": v["projeto_id"],
+            "codigo_projeto": v["codigo"],
+            "funcao": v["funcao"].value,
+            "colaborador_id": c.id,
+            "nome": c.nome,
+            "cargo": grade.nomes_cargo[i],
+            "data_inicio": datetime.combine(v["inicio"], datetime.min.time()),
+            "data_fim": datetime.combine(v["fim"], datetime.min.time()),
+            "horas_semanais": round(max(horas, 1.0), 1),
+            "pontuacao": round(float(pontuacoes[s, i]), 4),
+        })
+
+        projeto_alocados = alocados.setdefault(v["projeto_id"], set())
+        projeto_novo = c.id not in projeto_alocados
+        projeto_alocados.add(c.id)
+        grade.reservar(i, a, b, horas, projeto_novo)
+
+        pendentes[s] = False
+        pontuacoes[s, :] = -np.inf
+        # So a coluna da pessoa i muda (capacidade e projetos ativos)
+        for t in np.flatnonzero(pendentes):
+            pontuacoes[t, i] = celula(t, i)
+
+    nao_preenchidas = [v for s, v in enumerate(vagas) if pendentes[s]]
+    return sugeridas, nao_preenchidas
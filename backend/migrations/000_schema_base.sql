@@ -0,0 +1,199 @@
+-- Migração: Schema base
+-- Data: 2026-10-19
+-- Descrição: Tabelas e tipos que eram criados por Base.metadata.create_all na
+-- importação do app, no formato anterior às migrações 001+ (colunas adicionadas
+-- depois ficam nas próprias migrações). Tabelas de serviços vêm da 002/009.
+-- Idempotente: roda em banco novo (após init.sql) ou em bancos já criados pelo
+-- create_all.
+
+-- ============ 1. TIPOS ENUM ============
+DO $$ BEGIN
+    CREATE TYPE statusprojeto AS ENUM ('PLANEJADO', 'EM_ANDAMENTO', 'CONCLUIDO', 'CANCELADO', 'PAUSADO');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+DO $$ BEGIN
+    CREATE TYPE funcaoalocacao AS ENUM ('GERENTE_PROJETO', 'COORDENADOR', 'ENGENHEIRO', 'TECNICO', 'ENCARREGADO', 'AUXILIAR', 'FISCAL', 'COMPRADOR');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+DO $$ BEGIN
+    CREATE TYPE statusalocacao AS ENUM ('ATIVA', 'CONCLUIDA', 'SUSPENSA', 'CANCELADA');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- ============ 2. TABELAS ============
+CREATE TABLE IF NOT EXISTS niveis_hierarquicos (
+    id SERIAL NOT NULL,
+    nivel INTEGER NOT NULL,
+    nome VARCHAR(100) NOT NULL,
+    descricao VARCHAR(500),
+    cor VARCHAR(20) NOT NULL,
+    cor_texto VARCHAR(20) NOT NULL,
+    ordem INTEGER NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_niveis_hierarquicos_id ON niveis_hierarquicos (id);
+
+CREATE TABLE IF NOT EXISTS subniveis (
+    id SERIAL NOT NULL,
+    nivel_id INTEGER NOT NULL,
+    nome VARCHAR(100) NOT NULL,
+    abreviacao VARCHAR(10),
+    ordem INTEGER NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id),
+    FOREIGN KEY(nivel_id) REFERENCES niveis_hierarquicos (id)
+);
+CREATE INDEX IF NOT EXISTS ix_subniveis_id ON subniveis (id);
+
+CREATE TABLE IF NOT EXISTS setores (
+    id SERIAL NOT NULL,
+    codigo VARCHAR(10) NOT NULL,
+    nome VARCHAR(100) NOT NULL,
+    nome_completo VARCHAR(200),
+    cor VARCHAR(20) NOT NULL,
+    cor_texto VARCHAR(20) NOT NULL,
+    icone VARCHAR(50),
+    diretor_id INTEGER,
+    ordem INTEGER NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_setores_id ON setores (id);
+
+CREATE TABLE IF NOT EXISTS subsetores (
+    id SERIAL NOT NULL,
+    setor_id INTEGER NOT NULL,
+    nome VARCHAR(100) NOT NULL,
+    cor VARCHAR(20),
+    cor_texto VARCHAR(20),
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id),
+    FOREIGN KEY(setor_id) REFERENCES setores (id)
+);
+CREATE INDEX IF NOT EXISTS ix_subsetores_id ON subsetores (id);
+
+CREATE TABLE IF NOT EXISTS cargos (
+    id SERIAL NOT NULL,
+    codigo VARCHAR(20) NOT NULL,
+    nome VARCHAR(100) NOT NULL,
+    descricao VARCHAR(500),
+    nivel_id INTEGER,
+    setor_id INTEGER,
+    ordem INTEGER NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id),
+    UNIQUE (codigo),
+    FOREIGN KEY(nivel_id) REFERENCES niveis_hierarquicos (id),
+    FOREIGN KEY(setor_id) REFERENCES setores (id)
+);
+CREATE INDEX IF NOT EXISTS ix_cargos_id ON cargos (id);
+
+CREATE TABLE IF NOT EXISTS colaboradores (
+    id SERIAL NOT NULL,
+    nome VARCHAR(200) NOT NULL,
+    cargo VARCHAR(200) NOT NULL,
+    setor_id INTEGER NOT NULL,
+    subsetor_id INTEGER,
+    nivel_id INTEGER NOT NULL,
+    subnivel_id INTEGER,
+    superior_id INTEGER,
+    permissoes JSONB,
+    foto_url VARCHAR(500),
+    email VARCHAR(200),
+    telefone VARCHAR(50),
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id),
+    FOREIGN KEY(setor_id) REFERENCES setores (id),
+    FOREIGN KEY(subsetor_id) REFERENCES subsetores (id),
+    FOREIGN KEY(nivel_id) REFERENCES niveis_hierarquicos (id),
+    FOREIGN KEY(subnivel_id) REFERENCES subniveis (id),
+    FOREIGN KEY(superior_id) REFERENCES colaboradores (id)
+);
+CREATE INDEX IF NOT EXISTS ix_colaboradores_id ON colaboradores (id);
+
+CREATE TABLE IF NOT EXISTS tipos_projeto (
+    id SERIAL NOT NULL,
+    codigo VARCHAR(20) NOT NULL,
+    nome VARCHAR(100) NOT NULL,
+    descricao VARCHAR(500),
+    icone VARCHAR(50),
+    cor VARCHAR(20),
+    cor_texto VARCHAR(20),
+    ordem INTEGER NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id),
+    UNIQUE (codigo)
+);
+CREATE INDEX IF NOT EXISTS ix_tipos_projeto_id ON tipos_projeto (id);
+
+CREATE TABLE IF NOT EXISTS organo_versions (
+    id SERIAL NOT NULL,
+    nome VARCHAR(200) NOT NULL,
+    descricao TEXT,
+    status VARCHAR(50) NOT NULL,
+    snapshot JSONB NOT NULL,
+    changes_summary JSONB,
+    created_at TIMESTAMP WITHOUT TIME ZONE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE,
+    approved_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_organo_versions_id ON organo_versions (id);
+
+CREATE TABLE IF NOT EXISTS projetos_planejamento (
+    id SERIAL NOT NULL,
+    codigo VARCHAR(50) NOT NULL,
+    nome VARCHAR(200) NOT NULL,
+    descricao TEXT,
+    empresa VARCHAR(100) NOT NULL,
+    cliente VARCHAR(100) NOT NULL,
+    categoria VARCHAR(100) NOT NULL,
+    subcategoria VARCHAR(100),
+    tipo VARCHAR(200),
+    valor_estimado FLOAT,
+    data_inicio_prevista TIMESTAMP WITHOUT TIME ZONE,
+    data_fim_prevista TIMESTAMP WITHOUT TIME ZONE,
+    data_inicio_real TIMESTAMP WITHOUT TIME ZONE,
+    data_fim_real TIMESTAMP WITHOUT TIME ZONE,
+    status statusprojeto NOT NULL,
+    percentual_conclusao INTEGER NOT NULL,
+    funcoes_nao_necessarias JSON NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_projetos_planejamento_codigo ON projetos_planejamento (codigo);
+CREATE INDEX IF NOT EXISTS ix_projetos_planejamento_id ON projetos_planejamento (id);
+
+CREATE TABLE IF NOT EXISTS alocacoes (
+    id SERIAL NOT NULL,
+    colaborador_id INTEGER NOT NULL,
+    projeto_id INTEGER NOT NULL,
+    funcao funcaoalocacao NOT NULL,
+    data_inicio TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    data_fim TIMESTAMP WITHOUT TIME ZONE,
+    horas_semanais FLOAT NOT NULL,
+    status statusalocacao NOT NULL,
+    observacoes VARCHAR(500),
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(colaborador_id) REFERENCES colaboradores (id),
+    FOREIGN KEY(projeto_id) REFERENCES projetos_planejamento (id)
+);
+CREATE INDEX IF NOT EXISTS ix_alocacoes_id ON alocacoes (id);
+
+-- ============ 3. FK CIRCULAR (setores.diretor_id -> colaboradores) ============
+DO $$ BEGIN
+    ALTER TABLE setores ADD CONSTRAINT setores_diretor_id_fkey
+        FOREIGN KEY (diretor_id) REFERENCES colaboradores (id) ON DELETE SET NULL;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
@@ -0,0 +1,9 @@
+-- Migração: Adicionar coluna ativo em niveis_hierarquicos
+-- Data: 2026-10-19
+-- Descrição: O model NivelHierarquico já declara `ativo`, mas a coluna só existia
+-- em bancos criados pelo create_all; bancos criados pelo init.sql não a tinham.
+
+ALTER TABLE niveis_hierarquicos
+ADD COLUMN IF NOT EXISTS ativo INTEGER NOT NULL DEFAULT 1;
+
+COMMENT ON COLUMN niveis_hierarquicos.ativo IS '1 = ativo, 0 = inativo';
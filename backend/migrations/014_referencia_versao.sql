@@ -0,0 +1,52 @@
+-- Migração: Versão dos dados de referência (setores, níveis, subníveis, cargos)
+-- Data: 2026-10-19
+-- Descrição: Versão trocada por triggers de statement em qualquer escrita nas
+-- tabelas de referência, na mesma transação da escrita. O cache em memória de
+-- cada worker (app/services/referencia.py) compara a versão a cada uso e
+-- recarrega quando ela muda, então uma escrita feita por qualquer worker (ou
+-- direto no banco) invalida o cache de todos. O valor vem de uma sequence:
+-- o número de uma transação desfeita nunca é reutilizado.
+
+CREATE SEQUENCE IF NOT EXISTS referencia_versao_seq;
+
+CREATE TABLE IF NOT EXISTS referencia_versao (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    versao BIGINT NOT NULL DEFAULT nextval('referencia_versao_seq'),
+    alterado_em TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO referencia_versao (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION incrementar_referencia_versao() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE referencia_versao SET versao = nextval('referencia_versao_seq'), alterado_em = NOW() WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_referencia_versao ON setores;
+CREATE TRIGGER trg_referencia_versao
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON setores
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_referencia_versao();
+
+DROP TRIGGER IF EXISTS trg_referencia_versao ON subsetores;
+CREATE TRIGGER trg_referencia_versao
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON subsetores
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_referencia_versao();
+
+DROP TRIGGER IF EXISTS trg_referencia_versao ON niveis_hierarquicos;
+CREATE TRIGGER trg_referencia_versao
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON niveis_hierarquicos
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_referencia_versao();
+
+DROP TRIGGER IF EXISTS trg_referencia_versao ON subniveis;
+CREATE TRIGGER trg_referencia_versao
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON subniveis
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_referencia_versao();
+
+DROP TRIGGER IF EXISTS trg_referencia_versao ON cargos;
+CREATE TRIGGER trg_referencia_versao
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cargos
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_referencia_versao();
+
+COMMENT ON TABLE referencia_versao IS 'Versão dos dados de referência; invalida os caches em memória dos workers';
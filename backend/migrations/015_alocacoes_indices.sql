@@ -0,0 +1,28 @@
+-- Migração: Índices de alocacoes para os dashboards
+-- Data: 2026-10-19
+-- Descrição: alocacoes só tinha a chave primária indexada, mas os dashboards,
+-- validações e listas filtram por (colaborador_id, status), (projeto_id, status)
+-- e por período. Criados com CONCURRENTLY para não bloquear escritas em bases
+-- grandes. Planos conferidos com scripts/verificar_planos.py.
+-- migrate: no-transaction
+
+-- Alocações de um colaborador (lista filtrada, limite de projetos, exclusão)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alocacoes_colaborador_status
+    ON alocacoes (colaborador_id, status);
+
+-- Alocações de um projeto (lista filtrada, sugestões, exclusão de projeto)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alocacoes_projeto_status
+    ON alocacoes (projeto_id, status);
+
+-- Projetos ativos por colaborador (capacidade, disponibilidade): index-only
+-- scan sobre as ativas, que são a minoria numa base com histórico
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alocacoes_ativas_colaborador_projeto
+    ON alocacoes (colaborador_id, projeto_id) WHERE status = 'ATIVA';
+
+-- Períodos: início dentro de uma janela e alocações ainda não encerradas
+-- (data_fim nula ou depois do início da janela)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alocacoes_data_inicio
+    ON alocacoes (data_inicio);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alocacoes_data_fim
+    ON alocacoes (data_fim);
@@ -0,0 +1,45 @@
+-- Migração: Alocações ativas sem sobreposição garantidas pelo banco
+-- Data: 2026-10-19
+-- Descrição: A checagem "colaborador já possui alocação ativa neste projeto"
+-- era um SELECT antes do INSERT: dois planejadores salvando ao mesmo tempo
+-- passavam ambos pela checagem e gravavam duplicatas ativas. Agora o período
+-- vira uma coluna gerada (tsrange) e uma constraint de exclusão GiST impede
+-- duas alocações ATIVA do mesmo colaborador no mesmo projeto com períodos
+-- sobrepostos. A violação vira 400 no handler de IntegrityError (app/main.py).
+--
+-- Igualdade de colaborador/projeto via int4range de um ponto (&&): dispensa a
+-- extensão btree_gist, que nem todo servidor disponibiliza.
+
+-- Período fechado nas duas pontas (as comparações de período do app usam
+-- <= e >=); data_fim nula = sem fim. Período invertido (data_fim antes do
+-- início) vira range vazio, que não sobrepõe nada, em vez de erro no INSERT.
+ALTER TABLE alocacoes ADD COLUMN IF NOT EXISTS periodo TSRANGE
+    GENERATED ALWAYS AS (
+        CASE WHEN data_fim < data_inicio THEN 'empty'::tsrange
+             ELSE tsrange(data_inicio, data_fim, '[]') END
+    ) STORED;
+
+-- Duplicatas já gravadas: mantém a mais antiga ativa e suspende as demais
+-- (reversível pela tela de alocações)
+UPDATE alocacoes a
+SET status = 'SUSPENSA', updated_at = NOW()
+WHERE a.status = 'ATIVA'
+  AND EXISTS (
+      SELECT 1 FROM alocacoes b
+      WHERE b.status = 'ATIVA'
+        AND b.colaborador_id = a.colaborador_id
+        AND b.projeto_id = a.projeto_id
+        AND b.id < a.id
+        AND b.periodo && a.periodo
+  );
+
+ALTER TABLE alocacoes DROP CONSTRAINT IF EXISTS ex_alocacoes_ativa_periodo;
+ALTER TABLE alocacoes ADD CONSTRAINT ex_alocacoes_ativa_periodo EXCLUDE USING gist (
+    int4range(colaborador_id, colaborador_id, '[]') WITH &&,
+    int4range(projeto_id, projeto_id, '[]') WITH &&,
+    periodo WITH &&
+) WHERE (status = 'ATIVA');
+
+COMMENT ON COLUMN alocacoes.periodo IS 'Período da alocação (gerado de data_inicio/data_fim, fechado)';
+COMMENT ON CONSTRAINT ex_alocacoes_ativa_periodo ON alocacoes IS
+    'Impede alocações ativas sobrepostas do mesmo colaborador no mesmo projeto';
@@ -0,0 +1,11 @@
+-- Migração: Sequence dos eventos de mudança (SSE)
+-- Data: 2026-10-19
+-- Descrição: As rotas de escrita publicam eventos (entidade, id, watermark)
+-- com pg_notify na mesma transação da escrita; cada worker escuta o canal com
+-- LISTEN e repassa aos clientes conectados em /api/v1/eventos/ (app/eventos.py).
+-- O watermark de cada evento vem desta sequence: crescente e único entre
+-- workers, serve de id do evento SSE (Last-Event-ID na reconexão).
+
+CREATE SEQUENCE IF NOT EXISTS eventos_seq;
+
+COMMENT ON SEQUENCE eventos_seq IS 'Watermark dos eventos de mudança publicados via pg_notify (canal aztech_eventos)';
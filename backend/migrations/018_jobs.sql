@@ -0,0 +1,33 @@
+-- Migração: Jobs em segundo plano para operações pesadas
+-- Data: 2026-10-19
+-- Descrição: Aprovação de versão, criação de alocações em lote, sugestão de
+-- equipes e commit de cenário podem rodar fora da requisição (?async=true):
+-- a rota grava um job, responde 202 com o id e um pool de threads do worker
+-- executa (app/jobs.py). Esta tabela guarda estado, progresso, resultado e o
+-- pedido de cancelamento, para que GET /api/v1/jobs/{id} e o cancelamento
+-- funcionem em qualquer worker.
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY,
+    tipo VARCHAR(100) NOT NULL,
+    -- pendente | executando | concluido | falhou | cancelado
+    status VARCHAR(20) NOT NULL DEFAULT 'pendente',
+    parametros JSONB NOT NULL DEFAULT '{}'::jsonb,
+    progresso FLOAT NOT NULL DEFAULT 0 CHECK (progresso BETWEEN 0 AND 1),
+    mensagem TEXT,
+    resultado JSONB,
+    -- {"status_code": ..., "detail": ...}, no formato das respostas de erro da API
+    erro JSONB,
+    cancelamento_solicitado BOOLEAN NOT NULL DEFAULT FALSE,
+    -- host:pid do processo que executa (o pool é local ao worker)
+    worker VARCHAR(200),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP
+);
+
+-- Limpeza de jobs terminados antigos e listagem dos ativos
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+
+COMMENT ON TABLE jobs IS 'Operações pesadas executadas fora da requisição (app/jobs.py)';
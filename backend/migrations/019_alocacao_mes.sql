@@ -0,0 +1,178 @@
+-- Migração: Fatos mensais de alocação mantidos incrementalmente
+-- Data: 2026-10-19
+-- Descrição: Os dashboards mensais (sobrecarga temporal) recalculavam os meses
+-- de cada alocação a partir de alocacoes a cada chamada. alocacao_mes guarda
+-- uma linha por (alocação, mês coberto) com colaborador, projeto, status e
+-- horas semanais; os dashboards viram GROUP BY indexado por mês.
+--
+-- Mantida por triggers de statement (com transition tables) em alocacoes, na
+-- mesma transação da escrita e para qualquer caminho de escrita (API, jobs,
+-- cenários, COPY dos scripts):
+-- - INSERT: insere os meses das alocações novas;
+-- - UPDATE: só alocações cujas colunas dos fatos mudaram; remove os meses que
+--   saíram do período e grava só os meses novos ou com valores diferentes;
+-- - DELETE / TRUNCATE: remove os fatos das alocações apagadas.
+--
+-- Mês coberto: do mês de data_inicio ao mês de data_fim, inclusive. Alocações
+-- sem fim (e fins muito distantes) vão até o horizonte em
+-- alocacao_mes_horizonte; consultas além dele usam o cálculo direto. O
+-- horizonte é estendido com alocacao_mes_estender(data). Conferência contra o
+-- cálculo direto: scripts/verificar_alocacao_mes.py.
+
+-- Bloqueia escritas em alocacoes até o fim da migração (transacional): uma
+-- alocação gravada entre a carga inicial e a criação dos triggers ficaria sem
+-- fatos. Leituras seguem liberadas.
+LOCK TABLE alocacoes IN SHARE MODE;
+
+CREATE TABLE IF NOT EXISTS alocacao_mes_horizonte (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    ate DATE NOT NULL
+);
+
+-- Dezembro do terceiro ano após o atual
+INSERT INTO alocacao_mes_horizonte (id, ate)
+VALUES (1, (date_trunc('year', NOW()) + INTERVAL '4 years' - INTERVAL '1 month')::date)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS alocacao_mes (
+    alocacao_id INTEGER NOT NULL,
+    mes DATE NOT NULL,
+    colaborador_id INTEGER NOT NULL,
+    projeto_id INTEGER NOT NULL,
+    status statusalocacao NOT NULL,
+    horas_semanais FLOAT NOT NULL,
+    PRIMARY KEY (alocacao_id, mes)
+);
+
+-- Meses cobertos por um período, limitados ao horizonte
+CREATE OR REPLACE FUNCTION alocacao_mes_meses(inicio TIMESTAMP, fim TIMESTAMP, ate DATE)
+RETURNS SETOF DATE AS $$
+    SELECT m::date
+    FROM generate_series(date_trunc('month', inicio), LEAST(date_trunc('month', fim), ate), INTERVAL '1 month') AS m
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION alocacao_mes_inserir() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO alocacao_mes (alocacao_id, mes, colaborador_id, projeto_id, status, horas_semanais)
+    SELECT n.id, m.mes, n.colaborador_id, n.projeto_id, n.status, n.horas_semanais
+    FROM novas n
+    CROSS JOIN alocacao_mes_horizonte h
+    CROSS JOIN LATERAL alocacao_mes_meses(n.data_inicio, n.data_fim, h.ate) AS m(mes);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION alocacao_mes_atualizar() RETURNS TRIGGER AS $$
+BEGIN
+    WITH mudadas AS (
+        SELECT n.*
+        FROM novas n
+        JOIN antigas o ON o.id = n.id
+        WHERE (n.colaborador_id, n.projeto_id, n.status, n.horas_semanais, n.data_inicio, n.data_fim)
+              IS DISTINCT FROM
+              (o.colaborador_id, o.projeto_id, o.status, o.horas_semanais, o.data_inicio, o.data_fim)
+    ),
+    fora_do_periodo AS (
+        DELETE FROM alocacao_mes am
+        USING mudadas n, alocacao_mes_horizonte h
+        WHERE am.alocacao_id = n.id
+          AND (am.mes < date_trunc('month', n.data_inicio)
+               OR am.mes > LEAST(date_trunc('month', n.data_fim), h.ate))
+    )
+    INSERT INTO alocacao_mes (alocacao_id, mes, colaborador_id, projeto_id, status, horas_semanais)
+    SELECT n.id, m.mes, n.colaborador_id, n.projeto_id, n.status, n.horas_semanais
+    FROM mudadas n
+    CROSS JOIN alocacao_mes_horizonte h
+    CROSS JOIN LATERAL alocacao_mes_meses(n.data_inicio, n.data_fim, h.ate) AS m(mes)
+    ON CONFLICT (alocacao_id, mes) DO UPDATE SET
+        colaborador_id = EXCLUDED.colaborador_id,
+        projeto_id = EXCLUDED.projeto_id,
+        status = EXCLUDED.status,
+        horas_semanais = EXCLUDED.horas_semanais
+    WHERE (alocacao_mes.colaborador_id, alocacao_mes.projeto_id, alocacao_mes.status, alocacao_mes.horas_semanais)
+          IS DISTINCT FROM
+          (EXCLUDED.colaborador_id, EXCLUDED.projeto_id, EXCLUDED.status, EXCLUDED.horas_semanais);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION alocacao_mes_remover() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM alocacao_mes am USING antigas o WHERE am.alocacao_id = o.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION alocacao_mes_truncar() RETURNS TRIGGER AS $$
+BEGIN
+    TRUNCATE alocacao_mes;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Estende o horizonte (não reduz). Bloqueia escritas em alocacoes durante a
+-- extensão: uma escrita concorrente gravaria os meses com o horizonte antigo.
+CREATE OR REPLACE FUNCTION alocacao_mes_estender(novo_ate DATE) RETURNS BIGINT AS $$
+DECLARE
+    antigo DATE;
+    inseridas BIGINT;
+BEGIN
+    LOCK TABLE alocacoes IN SHARE MODE;
+    novo_ate := date_trunc('month', novo_ate)::date;
+    SELECT ate INTO antigo FROM alocacao_mes_horizonte WHERE id = 1 FOR UPDATE;
+    IF novo_ate <= antigo THEN
+        RETURN 0;
+    END IF;
+
+    INSERT INTO alocacao_mes (alocacao_id, mes, colaborador_id, projeto_id, status, horas_semanais)
+    SELECT a.id, m.mes, a.colaborador_id, a.projeto_id, a.status, a.horas_semanais
+    FROM alocacoes a
+    CROSS JOIN LATERAL alocacao_mes_meses(
+        GREATEST(a.data_inicio, antigo + INTERVAL '1 month'), a.data_fim, novo_ate
+    ) AS m(mes)
+    WHERE a.data_fim IS NULL OR a.data_fim >= antigo + INTERVAL '1 month';
+    GET DIAGNOSTICS inseridas = ROW_COUNT;
+
+    UPDATE alocacao_mes_horizonte SET ate = novo_ate WHERE id = 1;
+    RETURN inseridas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Carga inicial (índices secundários depois: mais rápido em bases grandes)
+TRUNCATE alocacao_mes;
+INSERT INTO alocacao_mes (alocacao_id, mes, colaborador_id, projeto_id, status, horas_semanais)
+SELECT a.id, m.mes, a.colaborador_id, a.projeto_id, a.status, a.horas_semanais
+FROM alocacoes a
+CROSS JOIN alocacao_mes_horizonte h
+CROSS JOIN LATERAL alocacao_mes_meses(a.data_inicio, a.data_fim, h.ate) AS m(mes);
+
+-- Agregados por mês (sobrecarga temporal): index-only scan já ordenado por
+-- (mes, colaborador_id), sem sort para o count(DISTINCT colaborador_id)
+CREATE INDEX IF NOT EXISTS idx_alocacao_mes_mes
+    ON alocacao_mes (mes, colaborador_id) INCLUDE (horas_semanais, status);
+
+-- Meses de um colaborador
+CREATE INDEX IF NOT EXISTS idx_alocacao_mes_colaborador
+    ON alocacao_mes (colaborador_id, mes) INCLUDE (horas_semanais, status);
+
+DROP TRIGGER IF EXISTS trg_alocacao_mes_insert ON alocacoes;
+CREATE TRIGGER trg_alocacao_mes_insert
+    AFTER INSERT ON alocacoes REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION alocacao_mes_inserir();
+
+DROP TRIGGER IF EXISTS trg_alocacao_mes_update ON alocacoes;
+CREATE TRIGGER trg_alocacao_mes_update
+    AFTER UPDATE ON alocacoes REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION alocacao_mes_atualizar();
+
+DROP TRIGGER IF EXISTS trg_alocacao_mes_delete ON alocacoes;
+CREATE TRIGGER trg_alocacao_mes_delete
+    AFTER DELETE ON alocacoes REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION alocacao_mes_remover();
+
+DROP TRIGGER IF EXISTS trg_alocacao_mes_truncate ON alocacoes;
+CREATE TRIGGER trg_alocacao_mes_truncate
+    AFTER TRUNCATE ON alocacoes
+    FOR EACH STATEMENT EXECUTE FUNCTION alocacao_mes_truncar();
+
+COMMENT ON TABLE alocacao_mes IS 'Uma linha por alocação e mês coberto (até alocacao_mes_horizonte), mantida por triggers';
@@ -0,0 +1,95 @@
+"""
+Benchmark de compressao das respostas grandes: CPU gasta x bytes economizados.
+
+Gera os mesmos corpos JSON que a API devolve (snapshot de versao, lista de
+alocacoes, lista de colaboradores) e, para cada codificacao disponivel em
+app.compressao e cada nivel, mede a mediana do tempo de compressao e de
+descompressao, a taxa e os bytes economizados. A coluna "total" soma
+compressao + transferencia do corpo comprimido no link informado +
+descompressao, para comparar com o envio sem compressao ("sem").
+
+Os niveis marcados com * sao os usados pelo app (d = por requisicao no
+middleware, c = payloads cacheados, comprimidos uma vez).
+
+Uso (a partir de backend/):
+    python scripts/benchmark_compressao.py --linhas 10000 --link-mbps 10
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_serializacao import linhas_alocacoes, linhas_colaboradores, versao  # noqa: E402
+
+from app.compressao import CODIFICACOES, brotli, zstandard  # noqa: E402
+from app.schemas import AlocacaoComDetalhes, ColaboradorResponse, OrganoVersionResponse  # noqa: E402
+from app.serializacao import SerializadorJSON  # noqa: E402
+
+# Sem os niveis maximos (zstd 19, br 11): segundos por MB, inviaveis aqui
+NIVEIS = {
+    "zstd": [1, 3, 6, 10, 15],
+    "br": [1, 4, 6, 9],
+    "gzip": [1, 5, 6, 9],
+}
+
+
+def descompressor(nome: str):
+    if nome == "zstd":
+        return zstandard.ZstdDecompressor().decompress
+    if nome == "br":
+        return brotli.decompress
+    return gzip.decompress
+
+
+def mediana(funcao, dado, repeticoes: int) -> tuple[float, bytes]:
+    resultado = funcao(dado)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(dado)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=10_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--link-mbps", type=float, default=10.0, help="Banda do link do cliente remoto")
+    args = parser.parse_args()
+
+    corpos = [
+        ("versao com snapshot", SerializadorJSON(OrganoVersionResponse).dumps(versao(args.linhas))),
+        ("alocacoes", SerializadorJSON(list[AlocacaoComDetalhes]).dumps(linhas_alocacoes(args.linhas))),
+        ("colaboradores", SerializadorJSON(list[ColaboradorResponse]).dumps(linhas_colaboradores(args.linhas))),
+    ]
+    bytes_por_ms = args.link_mbps * 1_000_000 / 8 / 1000
+
+    for nome_corpo, corpo in corpos:
+        sem = len(corpo) / bytes_por_ms
+        print(f"\n{nome_corpo}: {len(corpo) / 1024:.0f} KiB; sem compressao {sem:.0f} ms a {args.link_mbps:g} Mbit/s")
+        print(f"{'':10} {'nivel':>6} {'comp ms':>9} {'desc ms':>9} {'KiB':>8} {'taxa':>7} {'economia':>9} {'total ms':>9}")
+        for codificacao in CODIFICACOES.values():
+            descomprimir = descompressor(codificacao.nome)
+            for nivel in NIVEIS[codificacao.nome]:
+                tempo_comp, comprimido = mediana(lambda c: codificacao.comprimir(c, nivel), corpo, args.repeticoes)
+                tempo_desc, original = mediana(descomprimir, comprimido, args.repeticoes)
+                if original != corpo:
+                    sys.exit(f"{codificacao.nome} nivel {nivel}: descompressao divergente")
+                total = tempo_comp * 1000 + len(comprimido) / bytes_por_ms + tempo_desc * 1000
+                marca = "".join(
+                    m for m, n in (("d", codificacao.nivel_dinamico), ("c", codificacao.nivel_cacheado)) if n == nivel
+                )
+                print(
+                    f"{codificacao.nome:10} {nivel:>4}{('*' + marca) if marca else '':3}"
+                    f"{tempo_comp * 1000:8.1f} {tempo_desc * 1000:9.1f} {len(comprimido) / 1024:8.0f} "
+                    f"{len(corpo) / len(comprimido):6.1f}x {(len(corpo) - len(comprimido)) / 1024:8.0f}K {total:9.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark de throughput: stack sync (threadpool) x async (AsyncSession).
+
+Sobe um app de benchmark com uvicorn (processo separado) e dispara N clientes concorrentes
+(padrao: 200) contra a mesma consulta servida pelos dois stacks:
+
+- /sync/<cenario>:  `def` + Session (psycopg2), roda no threadpool do Starlette
+- /async/<cenario>: `async def` + AsyncSession (asyncpg), roda no event loop
+
+Cenarios:
+- colaboradores:  SELECT de todos os colaboradores (leitura real)
+- disponibilidade: as 2 queries do dashboard de disponibilidade
+- latencia:       SELECT pg_sleep(--latencia-ms), simula query lenta / banco remoto
+
+Os dois engines usam o mesmo tamanho de pool (--pool), para que a
+diferenca medida venha do modelo de concorrencia e nao do pool.
+
+Com --url, mede rotas de um servidor ja rodando (ex: a API real):
+    python scripts/benchmark_concorrencia.py --url http://localhost:8000 \\
+        --rotas /api/v1/alocacoes/dashboard/disponibilidade/ /api/v1/colaboradores/
+
+Uso (a partir de backend/):
+    python scripts/benchmark_concorrencia.py --clientes 200 --duracao 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import subprocess
+import time
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings  # noqa: E402
+from app.models.alocacao import Alocacao, StatusAlocacao  # noqa: E402
+from app.models.colaborador import Colaborador  # noqa: E402
+from app.models.setor import Setor  # noqa: E402
+
+CENARIOS = ["colaboradores", "disponibilidade", "latencia"]
+
+
+# ============ APP DE BENCHMARK ============
+
+def criar_app(pool: int, latencia_ms: int) -> FastAPI:
+    settings = get_settings()
+    engine = create_engine(settings.database_url, pool_size=pool, max_overflow=0)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    async_engine = create_async_engine(settings.async_url, pool_size=pool, max_overflow=0)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    colaboradores_stmt = select(Colaborador.id, Colaborador.nome, Colaborador.cargo)
+    disponibilidade_stmts = (
+        select(Colaborador.id, Colaborador.nome, Setor.nome).join(Setor, Colaborador.setor_id == Setor.id),
+        select(Alocacao.colaborador_id, Alocacao.horas_semanais).where(Alocacao.status == StatusAlocacao.ATIVA),
+    )
+    latencia_stmt = text(f"SELECT pg_sleep({latencia_ms / 1000.0})")
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return "ok"
+
+    @app.get("/sync/colaboradores")
+    def sync_colaboradores(db: Session = Depends(get_db)):
+        return len(db.execute(colaboradores_stmt).all())
+
+    @app.get("/async/colaboradores")
+    async def async_colaboradores(db: AsyncSession = Depends(get_async_db)):
+        return len((await db.execute(colaboradores_stmt)).all())
+
+    @app.get("/sync/disponibilidade")
+    def sync_disponibilidade(db: Session = Depends(get_db)):
+        return sum(len(db.execute(stmt).all()) for stmt in disponibilidade_stmts)
+
+    @app.get("/async/disponibilidade")
+    async def async_disponibilidade(db: AsyncSession = Depends(get_async_db)):
+        total = 0
+        for stmt in disponibilidade_stmts:
+            total += len((await db.execute(stmt)).all())
+        return total
+
+    @app.get("/sync/latencia")
+    def sync_latencia(db: Session = Depends(get_db)):
+        db.execute(latencia_stmt)
+        return 1
+
+    @app.get("/async/latencia")
+    async def async_latencia(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(latencia_stmt)
+        return 1
+
+    return app
+
+
+class ServidorProcesso:
+    """
+    App de benchmark em um processo separado, para que o gerador de carga
+    nao dispute a GIL com o servidor.
+    """
+
+    def __init__(self, porta: int, pool: int, latencia_ms: int):
+        self.porta = porta
+        self.cmd = [
+            sys.executable, os.path.abspath(__file__), "--servir",
+            "--porta", str(porta), "--pool", str(pool), "--latencia-ms", str(latencia_ms),
+        ]
+        self.proc = None
+
+    def __enter__(self):
+        self.proc = subprocess.Popen(self.cmd)
+        limite = time.perf_counter() + 30
+        while time.perf_counter() < limite:
+            try:
+                httpx.get(f"http://127.0.0.1:{self.porta}/ping", timeout=1.0)
+                return self
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError("servidor de benchmark nao respondeu")
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        self.proc.wait(timeout=10)
+
+
+# ============ GERADOR DE CARGA ============
+
+async def medir(base_url: str, rota: str, clientes: int, duracao: float) -> dict:
+    """Dispara `clientes` loops concorrentes por `duracao` segundos"""
+    latencias: list[float] = []
+    erros = 0
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=60.0) as client:
+        # Aquecimento (abre conexoes do pool)
+        await asyncio.gather(*(client.get(rota) for _ in range(min(clientes, 20))))
+
+        fim = time.perf_counter() + duracao
+
+        async def cliente():
+            nonlocal erros
+            while time.perf_counter() < fim:
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(rota)
+                    if r.status_code >= 400:
+                        erros += 1
+                except httpx.HTTPError:
+                    erros += 1
+                latencias.append(time.perf_counter() - t0)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente() for _ in range(clientes)))
+        decorrido = time.perf_counter() - inicio
+
+    latencias.sort()
+
+    def pct(p: float) -> float:
+        return latencias[min(int(len(latencias) * p), len(latencias) - 1)] * 1000 if latencias else 0.0
+
+    return {
+        "rota": rota,
+        "requisicoes": len(latencias),
+        "erros": erros,
+        "req_s": len(latencias) / decorrido if decorrido else 0.0,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "media_ms": statistics.fmean(latencias) * 1000 if latencias else 0.0,
+    }
+
+
+def imprimir(resultados: list[dict]) -> None:
+    print(f"{'rota':<52} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erros':>6}")
+    for r in resultados:
+        print(
+            f"{r['rota']:<52} {r['req_s']:>9.1f} {r['p50_ms']:>9.1f} "
+            f"{r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['erros']:>6}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos por rota")
+    parser.add_argument("--pool", type=int, default=50, help="conexoes por engine (sync e async)")
+    parser.add_argument("--latencia-ms", type=int, default=20, help="duracao do pg_sleep no cenario latencia")
+    parser.add_argument("--cenarios", nargs="+", choices=CENARIOS, default=CENARIOS)
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--url", help="mede rotas de um servidor ja rodando em vez do app de benchmark")
+    parser.add_argument("--rotas", nargs="+", default=[], help="rotas medidas com --url")
+    parser.add_argument("--servir", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.servir:
+        uvicorn.run(
+            criar_app(args.pool, args.latencia_ms),
+            host="127.0.0.1", port=args.porta, log_level="warning", access_log=False,
+        )
+        return
+
+    if args.url:
+        rotas, base_url, servidor = args.rotas, args.url, None
+        if not rotas:
+            parser.error("--url exige --rotas")
+    else:
+        rotas = [f"/{stack}/{c}" for c in args.cenarios for stack in ("sync", "async")]
+        base_url = f"http://127.0.0.1:{args.porta}"
+        servidor = ServidorProcesso(args.porta, args.pool, args.latencia_ms)
+
+    print(f"{args.clientes} clientes concorrentes, {args.duracao:.0f}s por rota")
+    if servidor:
+        print(f"pool de {args.pool} conexoes por engine; threadpool padrao do Starlette (40 threads)")
+
+    resultados = []
+    if servidor:
+        servidor.__enter__()
+    try:
+        for rota in rotas:
+            resultados.append(asyncio.run(medir(base_url, rota, args.clientes, args.duracao)))
+    finally:
+        if servidor:
+            servidor.__exit__()
+
+    imprimir(resultados)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark de serializacao das listas grandes (CPU apenas, sem banco).
+
+Para cada formato de resposta, gera N linhas sinteticas como o banco
+devolveria e mede o tempo de ida ate os bytes do corpo, por 10 mil linhas:
+
+- padrao:  caminho antigo - modelos Pydantic (ou objetos ORM) validados
+           pelo response_model do FastAPI e JSONResponse (json.dumps);
+- orjson:  mesmo caminho, com ORJSONResponse (default_response_class atual);
+- rapido:  app.serializacao.SerializadorJSON direto das linhas (TypeAdapter,
+           sem validacao), como em list_alocacoes, list_colaboradores e
+           versions.
+
+Confere tambem que os tres caminhos geram o mesmo JSON.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_serializacao.py --linhas 10000 --repeticoes 7
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.models.alocacao import FuncaoAlocacao, StatusAlocacao  # noqa: E402
+from app.schemas import AlocacaoComDetalhes, ColaboradorResponse, OrganoVersionResponse  # noqa: E402
+from app.serializacao import SerializadorJSON  # noqa: E402
+
+
+def linhas_alocacoes(n: int) -> list[dict]:
+    base = datetime(2026, 1, 1, 8, 30)
+    funcoes, status = list(FuncaoAlocacao), list(StatusAlocacao)
+    return [
+        {
+            "id": i,
+            "colaborador_id": i % 500 + 1,
+            "projeto_id": i % 300 + 1,
+            "funcao": funcoes[i % len(funcoes)],
+            "data_inicio": base + timedelta(days=i % 365),
+            "data_fim": None if i % 10 == 0 else base + timedelta(days=i % 365 + 120),
+            "horas_semanais": 44.0,
+            "status": status[i % len(status)],
+            "observacoes": None if i % 3 else "Observação da alocação",
+            "created_at": base,
+            "updated_at": base,
+            "colaborador_nome": f"Colaborador {i % 500 + 1}",
+            "colaborador_cargo": "Engenheiro Civil",
+            "projeto_codigo": f"PRJ-{i % 300 + 1:05d}",
+            "projeto_nome": f"Projeto {i % 300 + 1}",
+            "projeto_empresa": "AZ TECH",
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def linhas_colaboradores(n: int) -> list[dict]:
+    base = datetime(2026, 1, 1, 8, 30)
+    return [
+        {
+            "nome": f"Colaborador {i}",
+            "cargo": "Técnico de Manutenção",
+            "setor_id": i % 9 + 1,
+            "subsetor_id": None,
+            "nivel_id": i % 5 + 1,
+            "subnivel_id": None,
+            "superior_id": i // 4 or None,
+            "permissoes": ["leitura"],
+            "foto_url": None,
+            "email": f"colaborador{i}@aztech.com.br",
+            "telefone": None,
+            "id": i,
+            "created_at": base,
+            "updated_at": base,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def versao(n: int) -> dict:
+    snapshot = [
+        {k: v for k, v in c.items() if k not in ("created_at", "updated_at")}
+        for c in linhas_colaboradores(n)
+    ]
+    agora = datetime(2026, 1, 1, 8, 30)
+    return {
+        "id": 1, "nome": "Rascunho", "descricao": None, "status": "draft", "snapshot": snapshot,
+        "changes_summary": {"total_changes": 0, "hierarchy_changes": [], "data_changes": []},
+        "created_at": agora, "updated_at": agora, "approved_at": None,
+    }
+
+
+def caminho_padrao(tipo, classe_resposta, montar):
+    """Endpoint monta o conteudo; FastAPI valida pelo response_model e renderiza"""
+    campo = create_response_field(name="resposta", type_=tipo, mode="serialization")
+
+    def executar(dados) -> bytes:
+        conteudo = asyncio.run(serialize_response(field=campo, response_content=montar(dados)))
+        return classe_resposta(conteudo).body
+
+    return executar
+
+
+def cronometrar(funcao, dados, repeticoes: int) -> tuple[float, bytes]:
+    corpo = funcao(dados)  # aquecimento (e monta os TypeAdapters)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(dados)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), corpo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=10_000)
+    parser.add_argument("--repeticoes", type=int, default=7)
+    args = parser.parse_args()
+
+    casos = [
+        (
+            "alocacoes (list_alocacoes)",
+            linhas_alocacoes(args.linhas),
+            list[AlocacaoComDetalhes],
+            # Antes: o endpoint instanciava AlocacaoComDetalhes por linha
+            lambda linhas: [AlocacaoComDetalhes(**linha) for linha in linhas],
+        ),
+        (
+            "colaboradores (list_colaboradores)",
+            linhas_colaboradores(args.linhas),
+            list[ColaboradorResponse],
+            # Antes: objetos ORM lidos pelo response_model (from_attributes)
+            lambda linhas: [SimpleNamespace(**linha) for linha in linhas],
+        ),
+        (
+            "versao com snapshot (get_version)",
+            versao(args.linhas),
+            OrganoVersionResponse,
+            # Antes: o objeto ORM da versao
+            lambda dados: SimpleNamespace(**dados),
+        ),
+    ]
+
+    escala = 10_000 / args.linhas
+    print(f"{args.linhas} linhas, mediana de {args.repeticoes} rodadas; tempos em ms por 10 mil linhas\n")
+    print(f"{'':38} {'padrao':>9} {'orjson':>9} {'rapido':>9} {'ganho':>7}")
+    divergentes = []
+    for nome, dados, tipo, montar in casos:
+        padrao, corpo_padrao = cronometrar(caminho_padrao(tipo, JSONResponse, montar), dados, args.repeticoes)
+        orjson, corpo_orjson = cronometrar(caminho_padrao(tipo, ORJSONResponse, montar), dados, args.repeticoes)
+        rapido, corpo_rapido = cronometrar(SerializadorJSON(tipo).dumps, dados, args.repeticoes)
+        print(
+            f"{nome:38} {padrao * 1000 * escala:9.1f} {orjson * 1000 * escala:9.1f} "
+            f"{rapido * 1000 * escala:9.1f} {padrao / rapido:6.1f}x"
+        )
+        if not (json.loads(corpo_padrao) == json.loads(corpo_orjson) == json.loads(corpo_rapido)):
+            divergentes.append(nome)
+
+    if divergentes:
+        print(f"\nJSON DIVERGENTE: {', '.join(divergentes)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Orcamento de cold start da API.
+
+Mede, em processos novos (sem cache de import quente do processo atual):
+- import: tempo de `import app.main`;
+- primeira resposta: do spawn do uvicorn ate o primeiro 200 em /health;
+- DDL no startup: comandos SQL executados entre o import e o fim do
+  lifespan (deve ser zero DDL; o schema e responsabilidade de app.migrate).
+
+Sai com codigo 1 se alguma rodada estourar o orcamento ou se houver DDL.
+Uma rodada tambem roda na suite de testes (tests/test_cold_start.py).
+
+Uso (a partir de backend/):
+    python scripts/cold_start.py --rodadas 5 --orcamento-import 2.5 --orcamento-resposta 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orcamentos padrao, em segundos
+ORCAMENTO_IMPORT = 2.5
+ORCAMENTO_RESPOSTA = 5.0
+
+# Roda em um processo novo: importa o app e executa o lifespan, contando os
+# comandos SQL enviados ao banco nesse intervalo
+SONDA_IMPORT = """
+import json, re, time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+comandos = []
+event.listen(Engine, "before_cursor_execute", lambda conn, cur, stmt, *a: comandos.append(stmt))
+
+inicio = time.perf_counter()
+import app.main
+import_s = time.perf_counter() - inicio
+
+from fastapi.testclient import TestClient
+with TestClient(app.main.app):
+    pass
+
+ddl = [c for c in comandos if re.match(r"\\s*(CREATE|ALTER|DROP)\\b", c, re.IGNORECASE)]
+print(json.dumps({"import_s": import_s, "comandos": len(comandos), "ddl": ddl}))
+"""
+
+
+def medir_import() -> dict:
+    saida = subprocess.run(
+        [sys.executable, "-c", SONDA_IMPORT],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def medir_primeira_resposta(porta: int, limite: float) -> float | None:
+    inicio = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - inicio < limite:
+            try:
+                if httpx.get(f"http://127.0.0.1:{porta}/health", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - inicio
+            except httpx.HTTPError:
+                pass
+            if proc.poll() is not None:
+                return None
+            time.sleep(0.02)
+        return None
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def medir_rodada(porta: int, orcamento_import: float, orcamento_resposta: float) -> tuple[dict, float | None, list[str]]:
+    """Uma rodada: (sonda do import, primeira resposta ou None, falhas)"""
+    sonda = medir_import()
+    resposta = medir_primeira_resposta(porta, limite=orcamento_resposta * 3)
+    falhas = []
+    if sonda["ddl"]:
+        falhas.append(f"DDL no startup: {sonda['ddl'][0][:80]}...")
+    if sonda["import_s"] > orcamento_import:
+        falhas.append(f"import {sonda['import_s']:.2f}s > {orcamento_import}s")
+    if resposta is None or resposta > orcamento_resposta:
+        falhas.append(f"primeira resposta fora do orcamento de {orcamento_resposta}s")
+    return sonda, resposta, falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument("--orcamento-import", type=float, default=ORCAMENTO_IMPORT, help="segundos")
+    parser.add_argument(
+        "--orcamento-resposta", type=float, default=ORCAMENTO_RESPOSTA, help="segundos ate o primeiro 200 em /health",
+    )
+    parser.add_argument("--porta", type=int, default=8766)
+    args = parser.parse_args()
+
+    falhas = []
+    imports, respostas = [], []
+    for rodada in range(1, args.rodadas + 1):
+        sonda, resposta, falhas_rodada = medir_rodada(args.porta, args.orcamento_import, args.orcamento_resposta)
+        imports.append(sonda["import_s"])
+        respostas.append(resposta)
+        print(
+            f"rodada {rodada}: import {sonda['import_s'] * 1000:7.1f} ms | "
+            f"primeira resposta {resposta * 1000 if resposta is not None else float('nan'):7.1f} ms | "
+            f"SQL no startup {sonda['comandos']} (DDL {len(sonda['ddl'])})"
+        )
+        falhas.extend(f"rodada {rodada}: {falha}" for falha in falhas_rodada)
+
+    print(
+        f"\npior import {max(imports) * 1000:.1f} ms (orcamento {args.orcamento_import * 1000:.0f} ms); "
+        f"pior primeira resposta "
+        f"{max((r for r in respostas if r is not None), default=float('nan')) * 1000:.1f} ms "
+        f"(orcamento {args.orcamento_resposta * 1000:.0f} ms)"
+    )
+    if falhas:
+        print("\nFORA DO ORCAMENTO:")
+        for falha in falhas:
+            print(f"  - {falha}")
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
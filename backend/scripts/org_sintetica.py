@@ -0,0 +1,720 @@
+"""
+Empresa sintetica parametrizada para benchmarks e testes de carga.
+
+Gera direto no banco (sem passar pela API) uma organizacao com a mesma forma
+da real: setores, niveis hierarquicos, cargos, uma arvore de colaboradores
+(diretor por setor, equipes de tamanho configuravel ate o operacional),
+projetos com janelas de datas em torno de uma data de referencia, alocacoes
+e versoes do organograma com snapshot completo.
+
+Tabelas pequenas vao por insert em lote do Core; colaboradores, projetos e
+alocacoes vao por COPY, com as linhas geradas sob demanda (sem montar a
+lista inteira em memoria). O COPY de alocacoes roda sem indices, constraints
+nem o trigger de alocacao_mes; depois os indices e constraints sao recriados
+e os fatos mensais (migracao 019) carregados em um unico INSERT ... SELECT.
+
+O tempo de cada fase e impresso. Com o segundo exemplo de uso abaixo (1M
+alocacoes, ~15M fatos mensais) a carga leva ~135s em uma maquina de 1 CPU:
+~8s no COPY de alocacoes (geracao das linhas incluida), ~65s recriando a
+constraint de exclusao GiST de alocacoes (migracao 016) e ~50s nos fatos
+mensais e seus indices.
+
+A escala 1 corresponde ao tamanho real atual (ESCALA_REAL); as demais
+multiplicam colaboradores, projetos e alocacoes. Mesma semente, tamanhos,
+distribuicoes e referencia geram exatamente os mesmos dados.
+
+ATENCAO: a geracao apaga (TRUNCATE ... CASCADE) as tabelas da organizacao
+antes de inserir (reset idempotente). Use apenas em bancos descartaveis.
+
+Uso (a partir de backend/):
+    python scripts/org_sintetica.py --reset --escala 10
+    python scripts/org_sintetica.py --reset --colaboradores 50000 --projetos 20000 \\
+        --alocacoes 1000000 --equipe 3 10 --duracao 30 720 --sobrecarga 0.15
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+import sys
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from datetime import date, datetime, timedelta
+from enum import Enum
+from itertools import accumulate
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+
+from app.models import (  # noqa: E402
+    Cargo,
+    FuncaoAlocacao,
+    NivelHierarquico,
+    OrganoVersion,
+    Setor,
+    StatusAlocacao,
+    StatusProjeto,
+    TipoProjeto,
+)
+from app.services.edicao_rascunho import calculate_changes  # noqa: E402
+
+
+@dataclass(frozen=True)
+class Tamanhos:
+    setores: int
+    colaboradores: int
+    projetos: int
+    alocacoes: int
+    versoes: int = 3
+
+    @classmethod
+    def para_escala(cls, escala: float) -> "Tamanhos":
+        """Setores crescem com a raiz da escala; pessoas, projetos e alocacoes, linearmente"""
+        return cls(
+            setores=max(1, round(ESCALA_REAL.setores * math.sqrt(escala))),
+            colaboradores=max(2, round(ESCALA_REAL.colaboradores * escala)),
+            projetos=max(1, round(ESCALA_REAL.projetos * escala)),
+            alocacoes=max(1, round(ESCALA_REAL.alocacoes * escala)),
+            versoes=ESCALA_REAL.versoes,
+        )
+
+
+@dataclass(frozen=True)
+class Distribuicoes:
+    """Formato dos dados gerados (intervalos fechados, em dias quando datas)"""
+    equipe: tuple[int, int] = (2, 6)  # Subordinados diretos por chefe
+    inicio_projeto: tuple[int, int] = (-180, 240)  # Inicio relativo a referencia
+    duracao_projeto: tuple[int, int] = (60, 540)
+    # Fracao dos colaboradores sobrecarregados: recebem `peso_sobrecarga`
+    # vezes mais alocacoes que os demais (mais projetos ativos que o cargo permite)
+    sobrecarga: float = 0.1
+    peso_sobrecarga: float = 6.0
+    sem_fim: float = 0.1  # Alocacoes sem data de fim
+    horas_semanais: tuple[float, ...] = (10.0, 20.0, 22.0, 44.0)
+
+
+# Tamanho atual da base de producao (init.sql + planilha PREVISAO 2026)
+ESCALA_REAL = Tamanhos(setores=9, colaboradores=25, projetos=17, alocacoes=36)
+
+# Memoria para recriar indices e constraints no fim da carga (o padrao de
+# 64MB ordena os indices de alocacao_mes em disco)
+MEMORIA_INDICES = "1GB"
+
+# Tabelas recriadas a cada geracao (CASCADE alcanca as que apontam para elas)
+TABELAS = (
+    "alocacoes",
+    "organo_versions",
+    "projetos_planejamento",
+    "colaboradores",
+    "cargos",
+    "subniveis",
+    "niveis_hierarquicos",
+    "subsetores",
+    "setores",
+    "tipos_projeto",
+)
+
+NOMES_SETORES = (
+    "Comercial", "Financeiro", "RH/DP", "Suprimentos", "Engenharia Civil",
+    "Staff", "P&D/Integração", "Manutenção", "Engenharia Mecânica",
+)
+
+# (nivel, nome, tipo do organograma); nivel 1 = diretoria
+NIVEIS = (
+    (1, "Diretoria", "administrativo"),
+    (2, "Gerência", "administrativo"),
+    (3, "Coordenação", "administrativo"),
+    (4, "Técnico/Analista", "administrativo"),
+    (5, "Operacional", "operacional"),
+)
+NIVEL_OPERACIONAL = NIVEIS[-1][0]
+
+EMPRESAS = ("AZ TECH", "AZ MAQ")
+CLIENTES = ("NGD", "ULT", "CPE", "BRK", "VLE", "PTB")
+CATEGORIAS = ("CIVIL", "MECANICA", "ELETRICA", "MANUTENCAO")
+PESO_FUNCOES = {
+    FuncaoAlocacao.GERENTE_PROJETO: 1,
+    FuncaoAlocacao.COORDENADOR: 1,
+    FuncaoAlocacao.ENGENHEIRO: 3,
+    FuncaoAlocacao.TECNICO: 3,
+    FuncaoAlocacao.ENCARREGADO: 2,
+    FuncaoAlocacao.AUXILIAR: 3,
+    FuncaoAlocacao.FISCAL: 1,
+    FuncaoAlocacao.COMPRADOR: 1,
+}
+
+COLUNAS_COLABORADORES = (
+    "id", "nome", "cargo", "cargo_id", "setor_id", "nivel_id", "superior_id",
+    "permissoes", "email", "created_at", "updated_at",
+)
+COLUNAS_PROJETOS = (
+    "id", "codigo", "nome", "empresa", "cliente", "categoria", "valor_estimado",
+    "data_inicio_prevista", "data_fim_prevista", "data_inicio_real", "status",
+    "percentual_conclusao", "funcoes_nao_necessarias", "created_at", "updated_at",
+)
+COLUNAS_ALOCACOES = (
+    "id", "colaborador_id", "projeto_id", "funcao", "data_inicio", "data_fim",
+    "horas_semanais", "status", "created_at", "updated_at",
+)
+
+
+# ============ COPY ============
+
+_ESCAPE_COPY = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _valor_copy(valor) -> str:
+    """Valor no formato texto do COPY (enums pelo NOME, como o SQLEnum grava)"""
+    if valor is None:
+        return "\\N"
+    if isinstance(valor, Enum):
+        return valor.name
+    if isinstance(valor, bool):
+        return "t" if valor else "f"
+    if isinstance(valor, (list, dict)):
+        return json.dumps(valor, ensure_ascii=False).translate(_ESCAPE_COPY)
+    if isinstance(valor, str):
+        return valor.translate(_ESCAPE_COPY)
+    return str(valor)
+
+
+class _LeitorCopy(io.TextIOBase):
+    """
+    Arquivo de leitura sobre um iterador de linhas, consumido pelo COPY em
+    blocos. Cada linha e uma tupla de valores ou uma string ja formatada.
+    """
+
+    def __init__(self, linhas):
+        self._linhas = iter(linhas)
+        self._resto = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, n: int = -1) -> str:
+        partes, tamanho = [self._resto], len(self._resto)
+        while n < 0 or tamanho < n:
+            linha = next(self._linhas, None)
+            if linha is None:
+                break
+            texto = linha if isinstance(linha, str) else "\t".join(map(_valor_copy, linha)) + "\n"
+            partes.append(texto)
+            tamanho += len(texto)
+        bloco = "".join(partes)
+        if n < 0:
+            self._resto = ""
+            return bloco
+        self._resto = bloco[n:]
+        return bloco[:n]
+
+
+def copiar(conn, tabela: str, colunas: tuple[str, ...], linhas) -> None:
+    """COPY FROM STDIN na transacao da conexao SQLAlchemy (psycopg2)"""
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN",
+            _LeitorCopy(linhas),
+            size=1 << 16,
+        )
+    finally:
+        cursor.close()
+
+
+def remover_restricoes(conn, tabela: str, chave_primaria: bool = False) -> list[str]:
+    """
+    Remove FKs, constraints de exclusao e indices secundarios da tabela (e a
+    chave primaria, se pedido) antes de uma carga; devolve os comandos que os
+    recriam, na ordem (receita de "Populating a Database" da documentacao do
+    Postgres): validar/indexar uma vez em lote e bem mais rapido que linha a
+    linha durante o COPY.
+    """
+    tipos = "('f', 'x', 'p')" if chave_primaria else "('f', 'x')"
+    constraints = conn.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        f"WHERE conrelid = CAST(:tabela AS regclass) AND contype IN {tipos}"
+    ), {"tabela": tabela}).all()
+    indices = conn.execute(text(
+        "SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "WHERE i.indrelid = CAST(:tabela AS regclass) AND NOT i.indisprimary "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)"
+    ), {"tabela": tabela}).all()
+    for nome, _ in constraints:
+        conn.execute(text(f'ALTER TABLE {tabela} DROP CONSTRAINT "{nome}"'))
+    for nome, _ in indices:
+        conn.execute(text(f"DROP INDEX {nome}"))
+    return [definicao for _, definicao in indices] + [
+        f'ALTER TABLE {tabela} ADD CONSTRAINT "{nome}" {definicao}' for nome, definicao in constraints
+    ]
+
+
+def recriar(conn, comandos: list[str]) -> None:
+    for comando in comandos:
+        conn.execute(text(comando))
+
+
+# ============ GERACAO ============
+
+def limpar(conn) -> None:
+    conn.execute(text(f"TRUNCATE {', '.join(TABELAS)} RESTART IDENTITY CASCADE"))
+
+
+def _ajustar_sequencias(conn) -> None:
+    """Os ids sao gerados aqui; alinha as sequences para inserts posteriores"""
+    for tabela in TABELAS:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), "
+            f"coalesce((SELECT max(id) FROM {tabela}), 0) + 1, false)"
+        ))
+
+
+def _repartir(rng: random.Random, total: int, partes: int) -> list[int]:
+    """Divide `total` em `partes` (todas >= 1) com pesos aleatorios"""
+    pesos = [rng.uniform(0.5, 2.0) for _ in range(partes)]
+    soma = sum(pesos)
+    cotas = [max(1, int(total * p / soma)) for p in pesos]
+    for i in range(total - sum(cotas)):
+        cotas[i % partes] += 1
+    while sum(cotas) > total:
+        maior = cotas.index(max(cotas))
+        cotas[maior] -= 1
+    return cotas
+
+
+def _setores(n: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "codigo": str(i),
+            "nome": NOMES_SETORES[i - 1] if i <= len(NOMES_SETORES) else f"Setor {i}",
+            "nome_completo": f"Departamento {i}",
+            "ordem": i,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def _cargos(setores: list[dict], rng: random.Random) -> dict[tuple[int, int], dict]:
+    cargos = {}
+    for setor in setores:
+        for nivel, nome_nivel, _ in NIVEIS:
+            cargos[(setor["id"], nivel)] = {
+                "id": len(cargos) + 1,
+                "codigo": f"B{setor['id']:03d}-{nivel}",
+                "nome": f"{nome_nivel} {setor['nome']}",
+                "nivel_id": nivel,
+                "setor_id": setor["id"],
+                "ordem": nivel,
+                "funcoes_servico": [],
+                "capacidade_projetos": rng.randint(2, 5),
+                "nao_mensurar_capacidade": nivel == 1,
+            }
+    return cargos
+
+
+def _colaboradores(
+    tamanhos: Tamanhos, dist: Distribuicoes, setores: list[dict], cargos: dict, rng: random.Random
+) -> list[dict]:
+    """
+    Arvore: diretor do setor 1 no topo e demais diretores abaixo dele. Em cada
+    setor, a arvore cresce em largura: cada chefe recebe `dist.equipe`
+    subordinados diretos no nivel seguinte, ate completar a cota do setor.
+    No nivel operacional, encarregados chefiam pessoas do mesmo nivel.
+    """
+    colaboradores: list[dict] = []
+
+    def novo(setor_id: int, nivel: int, superior_id: int | None) -> dict:
+        cargo = cargos[(setor_id, nivel)]
+        numero = len(colaboradores) + 1
+        colaborador = {
+            "id": numero,
+            "nome": f"Colaborador {numero:06d}",
+            "cargo": cargo["nome"],
+            "cargo_id": cargo["id"],
+            "setor_id": setor_id,
+            "nivel_id": nivel,
+            "superior_id": superior_id,
+            "email": f"colaborador{numero}@bench.local",
+        }
+        colaboradores.append(colaborador)
+        return colaborador
+
+    cotas = _repartir(rng, tamanhos.colaboradores, len(setores))
+    presidente = None
+    for setor, cota in zip(setores, cotas):
+        diretor = novo(setor["id"], 1, presidente["id"] if presidente else None)
+        presidente = presidente or diretor
+        setor["diretor_id"] = diretor["id"]
+
+        restantes = cota - 1
+        fila = [diretor]
+        while restantes > 0:
+            proxima = []
+            for chefe in fila:
+                nivel = min(chefe["nivel_id"] + 1, NIVEL_OPERACIONAL)
+                for _ in range(min(restantes, rng.randint(*dist.equipe))):
+                    proxima.append(novo(setor["id"], nivel, chefe["id"]))
+                    restantes -= 1
+                if restantes == 0:
+                    break
+            fila = proxima or fila
+    return colaboradores
+
+
+def _projetos(n: int, dist: Distribuicoes, referencia: datetime, agora: datetime, rng: random.Random):
+    """Linhas de COPY (COLUNAS_PROJETOS)"""
+    funcoes = [f.value for f in FuncaoAlocacao]
+    for i in range(1, n + 1):
+        inicio = referencia + timedelta(days=rng.randint(*dist.inicio_projeto))
+        fim = inicio + timedelta(days=rng.randint(*dist.duracao_projeto))
+        if rng.random() < 0.05:
+            status = rng.choice((StatusProjeto.CANCELADO, StatusProjeto.PAUSADO))
+        elif fim < referencia:
+            status = StatusProjeto.CONCLUIDO
+        elif inicio <= referencia:
+            status = StatusProjeto.EM_ANDAMENTO
+        else:
+            status = StatusProjeto.PLANEJADO
+        duracao = max(1, (fim - inicio).days)
+        percentual = min(100, max(0, (referencia - inicio).days * 100 // duracao))
+        yield (
+            i,
+            f"BENCH-{i:07d}",
+            f"Projeto sintetico {i}",
+            rng.choice(EMPRESAS),
+            rng.choice(CLIENTES),
+            rng.choice(CATEGORIAS),
+            round(rng.uniform(50_000, 5_000_000), 2),
+            inicio,
+            fim,
+            inicio if status != StatusProjeto.PLANEJADO else None,
+            status,
+            100 if status == StatusProjeto.CONCLUIDO else percentual,
+            rng.sample(funcoes, rng.randint(0, 2)),
+            agora,
+            agora,
+        )
+
+
+def _alocacoes(
+    n: int, dist: Distribuicoes, colaboradores: list[dict], janelas: list[tuple], agora: datetime,
+    rng: random.Random,
+):
+    """
+    Linhas de COPY (COLUNAS_ALOCACOES) ja formatadas: e a tabela de milhoes
+    de linhas, entao datas, enums e horas vem de textos pre-calculados.
+    """
+    # Diretores quase nao sao alocados em projetos
+    elegiveis = [c["id"] for c in colaboradores if c["nivel_id"] > 1] or [c["id"] for c in colaboradores]
+    sobrecarregados = set(rng.sample(elegiveis, int(len(elegiveis) * dist.sobrecarga)))
+    acumulado_pessoas = list(accumulate(
+        dist.peso_sobrecarga if c in sobrecarregados else 1.0 for c in elegiveis
+    ))
+    funcoes = [f.name for f in PESO_FUNCOES]
+    acumulado_funcoes = list(accumulate(PESO_FUNCOES.values()))
+    elegiveis = [str(c) for c in elegiveis]
+    horas = [str(h) for h in dist.horas_semanais]
+    # Inicio da alocacao = inicio do projeto + 0..30 dias
+    textos_janelas = [
+        ([str(inicio + timedelta(days=d)) for d in range(31)], str(fim), concluido)
+        for inicio, fim, concluido in janelas
+    ]
+    carimbo = str(agora)
+    ativa, suspensa, concluida = (s.name for s in (
+        StatusAlocacao.ATIVA, StatusAlocacao.SUSPENSA, StatusAlocacao.CONCLUIDA
+    ))
+
+    # Sorteio com pesos por bisect sobre pesos acumulados (rng.choices item a
+    # item refaz o acumulado a cada chamada); uniformes por indice sobre
+    # rng.random (randint custa ~40% da geracao da linha)
+    total_pessoas, total_funcoes = acumulado_pessoas[-1], acumulado_funcoes[-1]
+    aleatorio = rng.random
+    n_projetos, n_horas = len(janelas), len(horas)
+    # Periodos de um projeto sempre se sobrepoem: uma ativa por pessoa e
+    # projeto (constraint ex_alocacoes_ativa_periodo, migracao 016)
+    pares_ativos = set()
+    for i in range(1, n + 1):
+        projeto = int(aleatorio() * n_projetos) + 1
+        pessoa = elegiveis[bisect_right(acumulado_pessoas, aleatorio() * total_pessoas)]
+        inicios, fim, concluido = textos_janelas[projeto - 1]
+        if concluido:
+            status = concluida
+        elif aleatorio() < 0.03 or (pessoa, projeto) in pares_ativos:
+            status = suspensa
+        else:
+            status = ativa
+            pares_ativos.add((pessoa, projeto))
+        yield "\t".join((
+            str(i),
+            pessoa,
+            str(projeto),
+            funcoes[bisect_right(acumulado_funcoes, aleatorio() * total_funcoes)],
+            inicios[int(aleatorio() * 31)],
+            "\\N" if aleatorio() < dist.sem_fim else fim,
+            horas[int(aleatorio() * n_horas)],
+            status,
+            carimbo,
+            carimbo,
+        )) + "\n"
+
+
+def _snapshot(colaboradores: list[dict]) -> list[dict]:
+    """Mesmo formato de edicao_rascunho.get_current_snapshot"""
+    return [
+        {
+            "id": c["id"],
+            "nome": c["nome"],
+            "cargo": c["cargo"],
+            "setor_id": c["setor_id"],
+            "subsetor_id": None,
+            "nivel_id": c["nivel_id"],
+            "subnivel_id": None,
+            "superior_id": c["superior_id"],
+            "permissoes": [],
+            "foto_url": None,
+            "email": c["email"],
+            "telefone": None,
+        }
+        for c in colaboradores
+    ]
+
+
+def _versoes(n: int, colaboradores: list[dict], referencia: datetime, rng: random.Random) -> list[dict]:
+    """Uma versao aprovada (estado atual) e rascunhos com ~2% de remanejamentos"""
+    oficial = _snapshot(colaboradores)
+    versoes = [{
+        "id": 1,
+        "nome": "Organograma oficial",
+        "status": "approved",
+        "snapshot": oficial,
+        "changes_summary": calculate_changes(oficial, oficial),
+        "approved_at": referencia - timedelta(days=30),
+    }]
+    chefes_por_nivel: dict[int, list[int]] = {}
+    for c in oficial:
+        if c["nivel_id"] < NIVEL_OPERACIONAL:
+            chefes_por_nivel.setdefault(c["nivel_id"], []).append(c["id"])
+    for i in range(2, n + 1):
+        rascunho = [dict(c) for c in oficial]
+        for c in rng.sample(rascunho[1:], min(len(rascunho) - 1, max(1, len(rascunho) // 50))):
+            # Novo chefe no nivel imediatamente acima (nunca o proprio nem um subordinado)
+            candidatos = chefes_por_nivel.get(c["nivel_id"] - 1)
+            if candidatos:
+                c["superior_id"] = rng.choice(candidatos)
+        versoes.append({
+            "id": i,
+            "nome": f"Rascunho {i - 1}",
+            "status": "draft",
+            "snapshot": rascunho,
+            "changes_summary": calculate_changes(oficial, rascunho),
+            "approved_at": None,
+        })
+    return versoes
+
+
+# Mesma carga inicial da migracao 019: fatos mensais em um INSERT ... SELECT
+FATOS_STATEMENT = text("""
+    INSERT INTO alocacao_mes (alocacao_id, mes, colaborador_id, projeto_id, status, horas_semanais)
+    SELECT a.id, m.mes, a.colaborador_id, a.projeto_id, a.status, a.horas_semanais
+    FROM alocacoes a
+    CROSS JOIN alocacao_mes_horizonte h
+    CROSS JOIN LATERAL alocacao_mes_meses(a.data_inicio, a.data_fim, h.ate) AS m(mes)
+""")
+
+
+def gerar(
+    engine,
+    tamanhos: Tamanhos,
+    semente: int = 42,
+    referencia: date | None = None,
+    distribuicoes: Distribuicoes | None = None,
+    relatar: Callable[[str, float], None] | None = None,
+) -> dict:
+    """
+    Recria a organizacao sintetica no banco do engine (reset + carga em uma
+    transacao: ou a base fica inteira, ou como estava).
+
+    Retorna tamanhos, parametros, ids de exemplo (para rotas com path) e o
+    tempo de cada fase em segundos ("fases"); `relatar(fase, segundos)` e
+    chamado ao fim de cada uma.
+    """
+    referencia = referencia or date.today().replace(day=1)
+    dist = distribuicoes or Distribuicoes()
+    rng = random.Random(semente)
+    base = datetime.combine(referencia, datetime.min.time())
+    # Timestamps fixos: mesma semente gera linhas identicas
+    agora = base
+    fases: dict[str, float] = {}
+
+    @contextmanager
+    def fase(nome: str):
+        inicio = time.perf_counter()
+        yield
+        fases[nome] = round(time.perf_counter() - inicio, 2)
+        if relatar:
+            relatar(nome, fases[nome])
+
+    with fase("organizacao em memoria"):
+        setores = _setores(tamanhos.setores)
+        cargos = _cargos(setores, rng)
+        colaboradores = _colaboradores(tamanhos, dist, setores, cargos, rng)
+        versoes = _versoes(tamanhos.versoes, colaboradores, base, rng)
+        tipos = [
+            {"id": i, "codigo": categoria, "nome": categoria.title(), "ordem": i}
+            for i, categoria in enumerate(CATEGORIAS, start=1)
+        ]
+
+    # Janelas (inicio, fim, concluido) guardadas durante o COPY de projetos
+    # para datar as alocacoes sem reler o banco
+    janelas: list[tuple] = []
+
+    def projetos():
+        for linha in _projetos(tamanhos.projetos, dist, base, agora, rng):
+            janelas.append((linha[7], linha[8], linha[10] == StatusProjeto.CONCLUIDO))
+            yield linha
+
+    with engine.begin() as conn:
+        conn.execute(text(f"SET LOCAL maintenance_work_mem = '{MEMORIA_INDICES}'"))
+        with fase("reset e cadastros"):
+            limpar(conn)
+            conn.execute(insert(Setor), [{k: v for k, v in s.items() if k != "diretor_id"} for s in setores])
+            conn.execute(insert(NivelHierarquico), [
+                {"id": nivel, "nivel": nivel, "nome": nome, "ordem": nivel} for nivel, nome, _ in NIVEIS
+            ])
+            conn.execute(
+                text("UPDATE niveis_hierarquicos SET tipo = :tipo WHERE id = :id"),
+                [{"id": nivel, "tipo": tipo} for nivel, _, tipo in NIVEIS],
+            )
+            conn.execute(insert(Cargo), list(cargos.values()))
+        with fase("colaboradores (COPY)"):
+            # Ordem dos ids garante que o superior ja existe (FK auto-referente)
+            copiar(conn, "colaboradores", COLUNAS_COLABORADORES, (
+                (c["id"], c["nome"], c["cargo"], c["cargo_id"], c["setor_id"], c["nivel_id"],
+                 c["superior_id"], [], c["email"], agora, agora)
+                for c in colaboradores
+            ))
+            conn.execute(
+                text("UPDATE setores SET diretor_id = :diretor_id WHERE id = :id"),
+                [{"id": s["id"], "diretor_id": s["diretor_id"]} for s in setores],
+            )
+        with fase("projetos (COPY)"):
+            conn.execute(insert(TipoProjeto), tipos)
+            copiar(conn, "projetos_planejamento", COLUNAS_PROJETOS, projetos())
+
+        # O trigger de insert de alocacao_mes (migracao 019) recalcularia os
+        # fatos de todas as linhas do COPY de uma vez, com os indices de
+        # alocacao_mes no lugar; os fatos sao recriados em lote depois.
+        # (O TRUNCATE do reset ja esvaziou alocacao_mes pelo trigger de truncate.)
+        conn.execute(text("ALTER TABLE alocacoes DISABLE TRIGGER trg_alocacao_mes_insert"))
+        restricoes_alocacoes = remover_restricoes(conn, "alocacoes")
+        restricoes_fatos = remover_restricoes(conn, "alocacao_mes", chave_primaria=True)
+        with fase("alocacoes (COPY)"):
+            copiar(conn, "alocacoes", COLUNAS_ALOCACOES, _alocacoes(
+                tamanhos.alocacoes, dist, colaboradores, janelas, agora, rng
+            ))
+        with fase("alocacoes: indices e constraints"):
+            recriar(conn, restricoes_alocacoes)
+        with fase("alocacao_mes (fatos e indices)"):
+            conn.execute(FATOS_STATEMENT)
+            recriar(conn, restricoes_fatos)
+        conn.execute(text("ALTER TABLE alocacoes ENABLE TRIGGER trg_alocacao_mes_insert"))
+
+        with fase("versoes do organograma"):
+            conn.execute(insert(OrganoVersion), versoes)
+            _ajustar_sequencias(conn)
+    with fase("ANALYZE"), engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+
+    chefe = next((c for c in colaboradores if c["nivel_id"] == 2), colaboradores[0])
+    return {
+        "tamanhos": asdict(tamanhos),
+        "distribuicoes": asdict(dist),
+        "referencia": referencia.isoformat(),
+        "semente": semente,
+        "fases": fases,
+        "exemplos": {
+            "setor_id": setores[0]["id"],
+            "nivel_id": 1,
+            "colaborador_id": chefe["id"],
+            "cargo_id": 1,
+            "version_id": versoes[-1]["id"],
+            "projeto_id": 1,
+            "alocacao_id": 1,
+            "tipo_id": tipos[0]["id"],
+        },
+    }
+
+
+def main():
+    from app.config import get_settings
+
+    padrao = Distribuicoes()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=get_settings().database_url)
+    parser.add_argument(
+        "--reset", action="store_true",
+        help="obrigatorio: confirma que as tabelas da organizacao serao apagadas e recriadas",
+    )
+    parser.add_argument("--escala", type=float, default=1.0, help="1 = tamanho real atual")
+    parser.add_argument("--setores", type=int, help="sobrescreve o valor da escala")
+    parser.add_argument("--colaboradores", type=int, help="sobrescreve o valor da escala")
+    parser.add_argument("--projetos", type=int, help="sobrescreve o valor da escala")
+    parser.add_argument("--alocacoes", type=int, help="sobrescreve o valor da escala")
+    parser.add_argument("--versoes", type=int, help="sobrescreve o valor da escala")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--referencia", type=date.fromisoformat, help="AAAA-MM-DD; padrao: 1o dia do mes atual")
+    parser.add_argument("--equipe", type=int, nargs=2, default=padrao.equipe, metavar=("MIN", "MAX"),
+                        help="subordinados diretos por chefe")
+    parser.add_argument("--inicio", type=int, nargs=2, default=padrao.inicio_projeto, metavar=("MIN", "MAX"),
+                        help="inicio dos projetos, em dias relativos a referencia")
+    parser.add_argument("--duracao", type=int, nargs=2, default=padrao.duracao_projeto, metavar=("MIN", "MAX"),
+                        help="duracao dos projetos, em dias")
+    parser.add_argument("--sobrecarga", type=float, default=padrao.sobrecarga,
+                        help="fracao de colaboradores sobrecarregados")
+    parser.add_argument("--peso-sobrecarga", type=float, default=padrao.peso_sobrecarga,
+                        help="quantas vezes mais alocacoes um sobrecarregado recebe")
+    parser.add_argument("--sem-fim", type=float, default=padrao.sem_fim,
+                        help="fracao de alocacoes sem data de fim")
+    args = parser.parse_args()
+
+    if not args.reset:
+        parser.error("--reset e obrigatorio (a geracao apaga as tabelas da organizacao)")
+    if args.equipe[0] < 1 or args.equipe[0] > args.equipe[1]:
+        parser.error("--equipe MIN MAX com 1 <= MIN <= MAX")
+
+    tamanhos = Tamanhos.para_escala(args.escala)
+    tamanhos = replace(tamanhos, **{
+        campo: getattr(args, campo)
+        for campo in ("setores", "colaboradores", "projetos", "alocacoes", "versoes")
+        if getattr(args, campo) is not None
+    })
+    if tamanhos.colaboradores < tamanhos.setores:
+        parser.error("precisa de pelo menos um colaborador (o diretor) por setor")
+    distribuicoes = Distribuicoes(
+        equipe=tuple(args.equipe),
+        inicio_projeto=tuple(args.inicio),
+        duracao_projeto=tuple(args.duracao),
+        sobrecarga=args.sobrecarga,
+        peso_sobrecarga=args.peso_sobrecarga,
+        sem_fim=args.sem_fim,
+    )
+
+    url = make_url(args.database_url)
+    print(f"Recriando a organizacao em {url.host}/{url.database}: {asdict(tamanhos)}")
+    engine = create_engine(args.database_url)
+    inicio = time.perf_counter()
+    gerar(
+        engine, tamanhos, semente=args.semente, referencia=args.referencia, distribuicoes=distribuicoes,
+        relatar=lambda fase, segundos: print(f"  {fase:<36} {segundos:7.1f}s", flush=True),
+    )
+    print(f"ok em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Soak test do stream de eventos (SSE): milhares de conexoes ociosas.
+
+Sobe a API com uvicorn (processo separado; ou usa --url de um servidor ja
+rodando) e abre --conexoes clientes em GET /api/v1/eventos/, com sockets
+crus (asyncio), para que o custo medido seja o do servidor. Com todas
+abertas:
+
+1. fica --duracao segundos ocioso: nenhuma conexao pode cair e cada cliente
+   deve receber os comentarios de batimento (`: ping`);
+2. publica --eventos eventos de teste (entidade `soak`) com pg_notify, pelo
+   mesmo caminho das rotas de escrita, e mede a latencia de fan-out: do
+   commit ate cada cliente receber. Todos os clientes devem receber todos.
+
+Reporta o RSS do servidor antes e depois de conectar (memoria por conexao),
+a latencia p50/p95/max e falha (codigo 1) se alguma conexao caiu, falhou ao
+abrir ou perdeu evento.
+
+Com 1000 conexoes o limite de arquivos abertos (ulimit -n) do servidor e
+deste script precisa passar de ~1100; o script sobe o proprio limite soft
+ate o hard.
+
+Uso (a partir de backend/):
+    python scripts/soak_eventos.py --conexoes 1000 --duracao 60 --batimento 5
+    python scripts/soak_eventos.py --url http://localhost:8000 --conexoes 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlparse
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine  # noqa: E402
+from app.eventos import ATUALIZADO, publicar  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROTA = "/api/v1/eventos/"
+ENTIDADE = "soak"
+
+
+class Cliente:
+    """Uma conexao SSE crua: conta batimentos e guarda a chegada dos eventos de teste"""
+
+    def __init__(self):
+        self.aberta = False
+        self.caiu = False
+        self.erro: str | None = None
+        self.pings = 0
+        self.chegadas: dict[int, float] = {}
+
+    async def rodar(self, host: str, porta: int, conectadas: asyncio.Semaphore):
+        try:
+            leitor, escritor = await asyncio.open_connection(host, porta)
+            escritor.write(
+                f"GET {ROTA} HTTP/1.1\r\nHost: {host}:{porta}\r\nAccept: text/event-stream\r\n\r\n".encode()
+            )
+            await escritor.drain()
+            status = await leitor.readline()
+            if b" 200 " not in status:
+                raise RuntimeError(status.decode(errors="replace").strip())
+            while (await leitor.readline()) not in (b"\r\n", b""):
+                pass  # headers
+            self.aberta = True
+        except Exception as e:
+            self.erro = f"{type(e).__name__}: {e}"
+            return
+        finally:
+            conectadas.release()
+
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    self.caiu = True
+                    return
+                if linha.startswith(b": ping"):
+                    self.pings += 1
+                elif linha.startswith(b"data: "):
+                    evento = json.loads(linha[6:])
+                    if evento.get("entidade") == ENTIDADE:
+                        self.chegadas[evento["id"]] = time.perf_counter()
+        except asyncio.CancelledError:
+            escritor.close()
+            raise
+        except Exception as e:
+            self.caiu = True
+            self.erro = f"{type(e).__name__}: {e}"
+
+
+def rss_kib(pid: int | None) -> int | None:
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def subir_limite_arquivos(necessario: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < necessario:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        if hard < necessario:
+            print(f"aviso: ulimit -n {hard} < {necessario}; conexoes vao falhar")
+
+
+def publicar_teste(evento_id: int) -> None:
+    with engine.begin() as conn:
+        publicar(conn, (ENTIDADE, ATUALIZADO, evento_id))
+
+
+def percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+async def soak(args, base_url: str, pid: int | None) -> list[str]:
+    url = urlparse(base_url)
+    host, porta = url.hostname, url.port or 80
+    falhas = []
+
+    rss_inicial = rss_kib(pid)
+    clientes = [Cliente() for _ in range(args.conexoes)]
+    # Abre em levas de --leva para nao estourar o backlog de accept
+    conectadas = asyncio.Semaphore(args.leva)
+    tarefas = []
+    inicio = time.perf_counter()
+    for cliente in clientes:
+        await conectadas.acquire()
+        tarefas.append(asyncio.create_task(cliente.rodar(host, porta, conectadas)))
+    for _ in range(args.leva):
+        await conectadas.acquire()
+    abertura = time.perf_counter() - inicio
+
+    abertas = sum(c.aberta for c in clientes)
+    rss_conectado = rss_kib(pid)
+    print(f"{abertas}/{args.conexoes} conexoes abertas em {abertura:.1f} s")
+    if rss_inicial is not None and rss_conectado is not None:
+        print(
+            f"RSS do servidor: {rss_inicial / 1024:.0f} MiB -> {rss_conectado / 1024:.0f} MiB "
+            f"({(rss_conectado - rss_inicial) / max(abertas, 1):.1f} KiB por conexao)"
+        )
+    erros = [c.erro for c in clientes if not c.aberta]
+    if erros:
+        falhas.append(f"{len(erros)} conexoes nao abriram (ex: {erros[0]})")
+
+    print(f"ocioso por {args.duracao:g} s...")
+    await asyncio.sleep(args.duracao)
+    caidas = sum(c.caiu for c in clientes)
+    sem_ping = sum(c.aberta and c.pings == 0 for c in clientes)
+    pings = [c.pings for c in clientes if c.aberta]
+    print(f"batimentos por conexao: min {min(pings, default=0)} max {max(pings, default=0)}; caidas: {caidas}")
+    if caidas:
+        falhas.append(f"{caidas} conexoes cairam no periodo ocioso")
+    if sem_ping and args.duracao > args.batimento:
+        falhas.append(f"{sem_ping} conexoes sem batimento")
+
+    latencias = []
+    for evento_id in range(1, args.eventos + 1):
+        publicado = time.perf_counter()
+        await asyncio.to_thread(publicar_teste, evento_id)
+        limite = time.perf_counter() + args.espera_evento
+        while time.perf_counter() < limite:
+            if all(evento_id in c.chegadas for c in clientes if c.aberta and not c.caiu):
+                break
+            await asyncio.sleep(0.01)
+        recebidos = [c.chegadas[evento_id] - publicado for c in clientes if evento_id in c.chegadas]
+        perdidos = sum(c.aberta and not c.caiu and evento_id not in c.chegadas for c in clientes)
+        latencias.extend(recebidos)
+        print(
+            f"evento {evento_id}: {len(recebidos)} recebidos, {perdidos} perdidos, "
+            f"fan-out max {max(recebidos, default=0) * 1000:.0f} ms"
+        )
+        if perdidos:
+            falhas.append(f"evento {evento_id}: {perdidos} clientes nao receberam em {args.espera_evento:g} s")
+
+    if latencias:
+        print(
+            f"latencia commit -> cliente: p50 {statistics.median(latencias) * 1000:.1f} ms | "
+            f"p95 {percentil(latencias, 0.95) * 1000:.1f} ms | max {max(latencias) * 1000:.1f} ms"
+        )
+    rss_final = rss_kib(pid)
+    if rss_final is not None:
+        print(f"RSS do servidor no fim: {rss_final / 1024:.0f} MiB")
+
+    for tarefa in tarefas:
+        tarefa.cancel()
+    await asyncio.gather(*tarefas, return_exceptions=True)
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Servidor ja rodando (sem RSS, a menos que --pid)")
+    parser.add_argument("--pid", type=int, help="PID do servidor de --url, para medir RSS")
+    parser.add_argument("--porta", type=int, default=8767)
+    parser.add_argument("--conexoes", type=int, default=1000)
+    parser.add_argument("--leva", type=int, default=100, help="Conexoes abrindo ao mesmo tempo")
+    parser.add_argument("--duracao", type=float, default=30.0, help="Segundos ociosos com tudo conectado")
+    parser.add_argument(
+        "--batimento", type=float, default=5.0,
+        help="EVENTOS_BATIMENTO_SEGUNDOS do servidor (aplicado ao servidor subido aqui)",
+    )
+    parser.add_argument("--eventos", type=int, default=5)
+    parser.add_argument("--espera-evento", type=float, default=10.0, help="Segundos para todos receberem")
+    args = parser.parse_args()
+
+    subir_limite_arquivos(args.conexoes + 100)
+    proc = None
+    base_url, pid = args.url, args.pid
+    if not base_url:
+        base_url = f"http://127.0.0.1:{args.porta}"
+        env = {**os.environ, "EVENTOS_BATIMENTO_SEGUNDOS": str(args.batimento), "SQL_GUARD": "off"}
+        # Mesmo limite de arquivos para o servidor (herdado)
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.porta),
+             "--log-level", "warning", "--backlog", str(args.conexoes), "--timeout-graceful-shutdown", "1"],
+            cwd=BACKEND_DIR, env=env,
+        )
+        pid = proc.pid
+        limite = time.perf_counter() + 30
+        while True:
+            try:
+                httpx.get(f"{base_url}/", timeout=1.0)
+                break
+            except httpx.HTTPError:
+                if time.perf_counter() > limite or proc.poll() is not None:
+                    sys.exit("servidor nao subiu")
+                time.sleep(0.2)
+
+    try:
+        falhas = asyncio.run(soak(args, base_url, pid))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=15)
+
+    if falhas:
+        print("\nFALHAS:")
+        for falha in falhas:
+            print(f"  - {falha}")
+        sys.exit(1)
+    print("\nok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Verifica a tabela de fatos alocacao_mes contra o calculo direto sobre alocacoes.
+
+Duas conferencias, no mesmo snapshot (transacao REPEATABLE READ, escritas
+concorrentes nao geram falsas divergencias):
+
+- linhas: para cada alocacao, os meses esperados (mes de data_inicio ao mes
+  de data_fim, limitado ao horizonte) com colaborador, projeto, status e
+  horas, contra as linhas gravadas pelos triggers: faltando, sobrando ou com
+  valores diferentes;
+- agregados: total de alocacoes, pessoas distintas e soma de horas por mes
+  (o que os dashboards leem), calculados em Python direto das alocacoes
+  (services.alocacao_mes.agregar_direto) contra o GROUP BY dos fatos.
+
+Falha (codigo 1) se houver qualquer divergencia. Com --corrigir, regrava os
+fatos das alocacoes divergentes (e remove os de alocacoes que nao existem
+mais) e confere de novo. --horizonte AAAA-MM estende o horizonte dos fatos
+antes de verificar (bloqueia escritas em alocacoes durante a extensao).
+
+Uso (a partir de backend/):
+    python scripts/verificar_alocacao_mes.py [--horizonte 2030-12] [--corrigir] [--amostra 20]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.services import alocacao_mes  # noqa: E402
+from app.services.timeline import indice_mes, mes_do_indice  # noqa: E402
+
+ESPERADO = """
+    SELECT a.id AS alocacao_id, m.mes, a.colaborador_id, a.projeto_id, a.status, a.horas_semanais
+    FROM alocacoes a
+    CROSS JOIN alocacao_mes_horizonte h
+    CROSS JOIN LATERAL alocacao_mes_meses(a.data_inicio, a.data_fim, h.ate) AS m(mes)
+"""
+
+DIVERGENCIAS_STATEMENT = text(f"""
+    WITH esperado AS ({ESPERADO})
+    SELECT coalesce(e.alocacao_id, f.alocacao_id) AS alocacao_id,
+           coalesce(e.mes, f.mes) AS mes,
+           CASE WHEN f.alocacao_id IS NULL THEN 'faltando'
+                WHEN e.alocacao_id IS NULL THEN 'sobrando'
+                ELSE 'diferente' END AS tipo
+    FROM esperado e
+    FULL JOIN alocacao_mes f ON f.alocacao_id = e.alocacao_id AND f.mes = e.mes
+    WHERE e.alocacao_id IS NULL
+       OR f.alocacao_id IS NULL
+       OR (e.colaborador_id, e.projeto_id, e.status, e.horas_semanais)
+          IS DISTINCT FROM (f.colaborador_id, f.projeto_id, f.status, f.horas_semanais)
+    ORDER BY 1, 2
+""")
+
+ALOCACOES_STATEMENT = text(
+    "SELECT colaborador_id, data_inicio, data_fim, horas_semanais FROM alocacoes"
+)
+
+REMOVER_STATEMENT = text("DELETE FROM alocacao_mes WHERE alocacao_id = ANY(:ids)")
+
+REGRAVAR_STATEMENT = text(f"""
+    INSERT INTO alocacao_mes (alocacao_id, mes, colaborador_id, projeto_id, status, horas_semanais)
+    SELECT * FROM ({ESPERADO}) e WHERE e.alocacao_id = ANY(:ids)
+""")
+
+
+def _mes(valor: str) -> date:
+    try:
+        ano, mes = valor.split("-")
+        return date(int(ano), int(mes), 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"mes invalido (esperado AAAA-MM): {valor}")
+
+
+def _agregados(conn, horizonte: date, amostra: int) -> list[str]:
+    """Divergencias entre o GROUP BY dos fatos e o calculo direto, por mes"""
+    alocacoes = conn.execute(ALOCACOES_STATEMENT).all()
+    if not alocacoes:
+        inicio = horizonte
+    else:
+        inicio = mes_do_indice(min(indice_mes(a.data_inicio) for a in alocacoes))
+    n_meses = max(indice_mes(horizonte) - indice_mes(inicio) + 1, 0)
+    direto = alocacao_mes.agregar_direto(alocacoes, inicio, n_meses)
+
+    linhas = conn.execute(alocacao_mes.MESES_STATEMENT, {"inicio": inicio, "fim": horizonte}).all()
+    fatos = alocacao_mes.agregados(linhas)
+
+    problemas = []
+    for mes in sorted(set(direto) | set(fatos)):
+        esperado = direto.get(mes, alocacao_mes.AgregadoMes(0, 0, 0.0))
+        obtido = fatos.get(mes, alocacao_mes.AgregadoMes(0, 0, 0.0))
+        if (
+            esperado.total_alocacoes != obtido.total_alocacoes
+            or esperado.total_pessoas != obtido.total_pessoas
+            or not math.isclose(esperado.horas, obtido.horas, rel_tol=1e-9, abs_tol=1e-6)
+        ):
+            problemas.append(f"{mes:%Y-%m}: esperado {tuple(esperado)}, fatos {tuple(obtido)}")
+    print(f"agregados: {n_meses} meses conferidos ({inicio:%Y-%m} a {horizonte:%Y-%m}), "
+          f"{len(problemas)} divergente(s)")
+    for problema in problemas[:amostra]:
+        print(f"  {problema}")
+    return problemas
+
+
+def verificar(amostra: int) -> tuple[set[int], int]:
+    """Retorna (alocacoes com linhas divergentes, meses com agregados divergentes)"""
+    with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+        horizonte = conn.execute(alocacao_mes.HORIZONTE_STATEMENT).scalar_one()
+        print(f"horizonte dos fatos: {horizonte:%Y-%m}")
+
+        t0 = time.perf_counter()
+        divergencias = conn.execute(DIVERGENCIAS_STATEMENT).all()
+        por_tipo: dict[str, int] = {}
+        for d in divergencias:
+            por_tipo[d.tipo] = por_tipo.get(d.tipo, 0) + 1
+        resumo = ", ".join(f"{n} {tipo}" for tipo, n in sorted(por_tipo.items())) or "nenhuma divergencia"
+        print(f"linhas: {resumo} ({time.perf_counter() - t0:.1f}s)")
+        for d in divergencias[:amostra]:
+            print(f"  alocacao {d.alocacao_id} {d.mes:%Y-%m}: {d.tipo}")
+
+        meses = _agregados(conn, horizonte, amostra)
+    return {d.alocacao_id for d in divergencias}, len(meses)
+
+
+def corrigir(ids: set[int]) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("LOCK TABLE alocacoes IN SHARE MODE"))
+        lista = sorted(ids)
+        conn.execute(REMOVER_STATEMENT, {"ids": lista})
+        inseridas = conn.execute(REGRAVAR_STATEMENT, {"ids": lista}).rowcount
+    print(f"corrigido: fatos de {len(ids)} alocacao(oes) regravados ({inseridas} linhas)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confere alocacao_mes contra o calculo direto")
+    parser.add_argument("--horizonte", type=_mes, default=None,
+                        help="Estende o horizonte dos fatos ate o mes AAAA-MM antes de verificar")
+    parser.add_argument("--corrigir", action="store_true",
+                        help="Regrava os fatos das alocacoes divergentes e confere de novo")
+    parser.add_argument("--amostra", type=int, default=20, help="Divergencias listadas por conferencia")
+    args = parser.parse_args()
+
+    if args.horizonte:
+        with engine.begin() as conn:
+            inseridas = conn.execute(alocacao_mes.ESTENDER_STATEMENT, {"ate": args.horizonte}).scalar()
+        print(f"horizonte estendido ate {args.horizonte:%Y-%m}: {inseridas} linhas novas")
+
+    ids, meses = verificar(args.amostra)
+    if (ids or meses) and args.corrigir:
+        if ids:
+            corrigir(ids)
+        ids, meses = verificar(args.amostra)
+
+    if ids or meses:
+        print("FALHOU")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
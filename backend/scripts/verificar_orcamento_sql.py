@@ -0,0 +1,147 @@
+"""
+Verifica os orcamentos de SQL (N+1) de todas as rotas GET da API.
+
+Liga a guarda em modo estrito (SQL_GUARD=strict), chama cada rota GET sem
+parametros de path, e as com parametros que tenham exemplo em EXEMPLOS, e
+falha (codigo 1) se alguma exceder o @orcamento_sql declarado ou repetir o
+mesmo comando SQL SQL_GUARD_REPETICOES vezes ou mais.
+
+Roda contra o banco configurado em DATABASE_URL, que deve ter dados (quanto
+mais linhas, mais evidente um N+1). Rotas de escrita com orcamento sao
+verificadas pelos casos em ESCRITAS, que so reenviam dados ja existentes.
+
+Uso (a partir de backend/):
+    python scripts/verificar_orcamento_sql.py
+
+Tambem roda na suite de testes (tests/test_orcamento_sql.py, `python -m
+pytest`), que falha com as mesmas violacoes.
+"""
+import os
+import re
+import sys
+
+os.environ["SQL_GUARD"] = "strict"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.routing import APIRoute  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.guarda_sql import ATRIBUTO_ORCAMENTO  # noqa: E402
+from app.main import app  # noqa: E402
+
+# Parametro de path -> consulta que devolve um valor de exemplo
+EXEMPLOS = {
+    "setor_id": "SELECT min(id) FROM setores",
+    "nivel_id": "SELECT min(id) FROM niveis_hierarquicos",
+    "colaborador_id": "SELECT superior_id FROM colaboradores WHERE superior_id IS NOT NULL LIMIT 1",
+    "cargo_id": "SELECT min(id) FROM cargos",
+    "version_id": "SELECT min(id) FROM organo_versions",
+    "projeto_id": "SELECT min(id) FROM projetos_planejamento",
+    "alocacao_id": "SELECT min(id) FROM alocacoes",
+    "tipo_id": "SELECT min(id) FROM tipos_projeto",
+    "job_id": "SELECT id::text FROM jobs ORDER BY created_at DESC LIMIT 1",
+}
+
+
+def _exemplos() -> dict:
+    valores = {}
+    with engine.connect() as conn:
+        for nome, sql in EXEMPLOS.items():
+            valor = conn.execute(text(sql)).scalar()
+            if valor is not None:
+                valores[nome] = valor
+    return valores
+
+
+def _colaborador_com_superior(client: TestClient) -> tuple[str, dict] | None:
+    """PUT reenviando o mesmo superior: exercita a checagem de ciclo"""
+    with engine.connect() as conn:
+        row = conn.execute(text(
+            "SELECT id, superior_id FROM colaboradores WHERE superior_id IS NOT NULL ORDER BY id DESC LIMIT 1"
+        )).first()
+    if row is None:
+        return None
+    return f"/api/v1/colaboradores/{row.id}", {"superior_id": row.superior_id}
+
+
+def _reordenacao(prefixo: str, tabela: str):
+    """PATCH /reorder/ com a ordem atual: exercita o UPDATE unico da lista inteira"""
+    def caso(client: TestClient) -> tuple[str, dict] | None:
+        with engine.connect() as conn:
+            ids = conn.execute(text(f"SELECT id FROM {tabela} ORDER BY ordem, id")).scalars().all()
+        if not ids:
+            return None
+        return f"/api/v1/{prefixo}/reorder/", {"ordered_ids": ids}
+    return caso
+
+
+ESCRITAS = [
+    ("PUT", _colaborador_com_superior),
+    ("PATCH", _reordenacao("niveis", "niveis_hierarquicos")),
+    ("PATCH", _reordenacao("cargos", "cargos")),
+    ("PATCH", _reordenacao("setores", "setores")),
+    ("PATCH", _reordenacao("tipos-projeto", "tipos_projeto")),
+]
+
+# Streams sem fim (SSE): nao executam SQL, e a requisicao nao terminaria
+STREAMS = {"/api/v1/eventos/"}
+
+
+def verificar(client: TestClient) -> tuple[list[str], int, list[str]]:
+    """Chama as rotas e os casos de ESCRITAS; retorna (violacoes, verificadas, puladas)"""
+    valores = _exemplos()
+    falhas, verificadas, puladas = [], 0, []
+
+    def chamar(metodo: str, caminho: str, orcamento, **kwargs):
+        nonlocal verificadas
+        r = client.request(metodo, caminho, **kwargs)
+        verificadas += 1
+        comandos = r.headers.get("x-sql-statements", "?")
+        marca = "FALHA" if r.headers.get("x-sql-guard") else "ok"
+        limite = f"/{orcamento}" if orcamento is not None else ""
+        print(f"{marca:<5} {r.status_code} {comandos:>4}{limite:<4} {metodo} {caminho}")
+        if r.headers.get("x-sql-guard"):
+            falhas.append(r.json().get("detail", r.text))
+
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods or route.path in STREAMS:
+            continue
+        orcamento = getattr(route.endpoint, ATRIBUTO_ORCAMENTO, None)
+        parametros = re.findall(r"{(\w+)}", route.path)
+        if any(p not in valores for p in parametros):
+            puladas.append(route.path)
+            continue
+        chamar("GET", route.path.format(**valores), orcamento)
+
+    for metodo, caso in ESCRITAS:
+        montado = caso(client)
+        if montado is None:
+            continue
+        caminho, corpo = montado
+        route = next(
+            r for r in app.routes
+            if isinstance(r, APIRoute) and metodo in r.methods and r.path_regex.match(caminho)
+        )
+        chamar(metodo, caminho, getattr(route.endpoint, ATRIBUTO_ORCAMENTO, None), json=corpo)
+
+    return falhas, verificadas, puladas
+
+
+def main():
+    with TestClient(app) as client:
+        falhas, verificadas, puladas = verificar(client)
+
+    print(f"\n{verificadas} requisicoes verificadas")
+    if puladas:
+        print(f"puladas (sem exemplo para o path): {', '.join(puladas)}")
+    if falhas:
+        print("\nVIOLACOES:")
+        for falha in falhas:
+            print(f"  - {falha}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Verifica os planos de execucao (EXPLAIN) das consultas dos dashboards.
+
+Chama cada rota GET de dashboard (path com /dashboard/) e as demais rotas
+listadas em ROTAS_EXTRAS, captura todo SELECT que a rota envia ao banco (engines
+sync e async) e roda EXPLAIN (FORMAT JSON) com os mesmos parametros, no
+mesmo cursor, antes da execucao real.
+
+Falha (codigo 1) se algum plano tiver Seq Scan seletivo em tabela grande:
+tabela com mais de --limite-linhas linhas (pg_class.reltuples) em que o scan
+devolve menos de --fracao das linhas, ou seja, le a tabela inteira para
+aproveitar uma parte - o caso que um indice resolve. Scans que precisam de
+quase toda a tabela (agregados gerais) sao aceitos: um indice nao ajudaria.
+
+Roda contra o banco de DATABASE_URL, que deve estar populado em escala
+(os planos de tabelas pequenas sempre preferem Seq Scan). Exemplo:
+
+    python scripts/org_sintetica.py --reset --colaboradores 20000 --projetos 4000 --alocacoes 300000
+    python scripts/verificar_planos.py
+
+Antes de verificar roda ANALYZE, para o planner e o limite usarem
+estatisticas atuais.
+
+Uso (a partir de backend/):
+    python scripts/verificar_planos.py [--limite-linhas 10000] [--fracao 0.5] [--verbose]
+
+Tambem roda na suite de testes (tests/test_planos.py, `python -m pytest`),
+com os limites padrao, contra o banco de DATABASE_URL.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from contextvars import ContextVar
+
+os.environ["SQL_GUARD"] = "off"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.routing import APIRoute  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from app.database import async_engine, async_read_engine, engine, read_engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+from verificar_orcamento_sql import _exemplos  # noqa: E402
+
+# Rotas fora de /dashboard/ com consultas de agregacao sobre alocacoes
+ROTAS_EXTRAS = [
+    "/api/v1/alocacoes/",
+    "/api/v1/alocacoes/?colaborador_id={colaborador_id}",
+    "/api/v1/alocacoes/?projeto_id={projeto_id}",
+    "/api/v1/projetos-planejamento/{projeto_id}/sugestoes/?funcao=engenheiro",
+]
+
+# Limites padrao: tabelas ate LIMITE_LINHAS linhas podem ter Seq Scan, e
+# scans que devolvem ao menos FRACAO das linhas sao aceitos
+LIMITE_LINHAS = 10_000
+FRACAO = 0.5
+
+_planos: ContextVar[list | None] = ContextVar("planos", default=None)
+
+
+def _capturar(conn, cursor, statement, parameters, context, executemany):
+    planos = _planos.get()
+    if planos is None or executemany or not re.match(r"\s*(SELECT|WITH)\b", statement, re.IGNORECASE):
+        return
+    cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+    plano = cursor.fetchall()[0][0]
+    planos.append((statement, json.loads(plano) if isinstance(plano, str) else plano))
+
+
+def _nos(plano: dict, divisor: float = 1.0):
+    """(no, divisor): em scans paralelos Plan Rows e por processo; divisor como no planner"""
+    if plano["Node Type"] in ("Gather", "Gather Merge"):
+        workers = plano.get("Workers Planned", 0)
+        divisor = workers + max(0.0, 1.0 - 0.3 * workers)
+    yield plano, divisor if plano.get("Parallel Aware") else 1.0
+    for filho in plano.get("Plans", []):
+        yield from _nos(filho, divisor)
+
+
+def _tamanhos() -> dict[str, float]:
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+        linhas = conn.execute(text(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        )).all()
+    return {nome: tuplas for nome, tuplas in linhas}
+
+
+def _rotas(valores: dict) -> tuple[list[str], list[str]]:
+    rotas, puladas = [], []
+    modelos = [
+        r.path for r in app.routes
+        if isinstance(r, APIRoute) and "GET" in r.methods and "/dashboard/" in r.path
+    ] + ROTAS_EXTRAS
+    for modelo in modelos:
+        parametros = re.findall(r"{(\w+)}", modelo)
+        if any(p not in valores for p in parametros):
+            puladas.append(modelo)
+        else:
+            rotas.append(modelo.format(**valores))
+    return rotas, puladas
+
+
+def verificar(
+    client: TestClient, limite_linhas: int = LIMITE_LINHAS, fracao: float = FRACAO
+) -> tuple[list[tuple], int, list[str]]:
+    """
+    Chama as rotas capturando os planos. Devolve (falhas, rotas verificadas,
+    puladas); cada falha e (rota, tabela, no, linhas, statement, plano).
+    """
+    tamanhos = _tamanhos()
+    rotas, puladas = _rotas(_exemplos())
+    engines = {engine, async_engine.sync_engine, read_engine, async_read_engine.sync_engine}
+    for alvo in engines:
+        event.listen(alvo, "before_cursor_execute", _capturar)
+
+    falhas = []
+    try:
+        for rota in rotas:
+            planos = []
+            token = _planos.set(planos)
+            try:
+                r = client.get(rota)
+            finally:
+                _planos.reset(token)
+
+            scans = []
+            for statement, plano in planos:
+                for no, divisor in _nos(plano[0]["Plan"]):
+                    if no["Node Type"] != "Seq Scan":
+                        continue
+                    tabela = no["Relation Name"]
+                    total = tamanhos.get(tabela, 0)
+                    if total <= limite_linhas:
+                        continue
+                    linhas = no["Plan Rows"] * divisor
+                    scans.append(f"{tabela} ({linhas:.0f}/{total:.0f} linhas)")
+                    if linhas < total * fracao:
+                        falhas.append((rota, tabela, no, linhas, statement, plano))
+
+            marca = "FALHA" if any(f[0] == rota for f in falhas) else "ok"
+            print(
+                f"{marca:<5} {r.status_code} {len(planos):>3} selects  {rota}"
+                + (f"  seq: {', '.join(scans)}" if scans else "")
+            )
+    finally:
+        for alvo in engines:
+            event.remove(alvo, "before_cursor_execute", _capturar)
+    return falhas, len(rotas), puladas
+
+
+def descrever(falha: tuple) -> str:
+    rota, tabela, no, linhas, _, _ = falha
+    return f"{rota}: {tabela} filtro {no.get('Filter', '-')[:200]} ({linhas:.0f} linhas estimadas)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limite-linhas", type=int, default=LIMITE_LINHAS, help="Tabelas menores podem ter Seq Scan")
+    parser.add_argument("--fracao", type=float, default=FRACAO, help="Scan que devolve ao menos essa fracao e aceito")
+    parser.add_argument("--verbose", action="store_true", help="Imprime o plano das consultas com falha")
+    args = parser.parse_args()
+
+    client = TestClient(app).__enter__()
+    falhas, verificadas, puladas = verificar(client, args.limite_linhas, args.fracao)
+
+    print(f"\n{verificadas} rotas verificadas (tabelas grandes: > {args.limite_linhas} linhas)")
+    if puladas:
+        print(f"puladas (sem exemplo para o path): {', '.join(puladas)}")
+    if falhas:
+        print("\nSEQ SCANS SELETIVOS:")
+        for falha in falhas:
+            print(f"  - {descrever(falha)}")
+            if args.verbose:
+                _, _, _, _, statement, plano = falha
+                print("    " + " ".join(statement.split())[:400])
+                print(json.dumps(plano, indent=1)[:4000])
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Fixtures compartilhadas da suite
+
+A app le a configuracao (SQL_GUARD inclusive) no primeiro import de app.*,
+que pode vir de qualquer modulo de teste: a guarda em modo estrito e ligada
+aqui, antes da coleta, para test_orcamento_sql valer em qualquer ordem.
+"""
+import os
+
+os.environ["SQL_GUARD"] = "strict"
+
+import pytest  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    TestClient da app contra o banco de DATABASE_URL (pula sem banco). Um so
+    por sessao: o pool do asyncpg fica preso ao event loop que o criou.
+    """
+    from fastapi.testclient import TestClient
+
+    from app.database import engine
+    from app.main import app
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"banco indisponivel: {type(e).__name__}")
+    with TestClient(app) as client:
+        yield client
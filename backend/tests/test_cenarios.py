@@ -0,0 +1,193 @@
+"""
+Simulador de cenarios (services/cenarios), sem banco
+
+Cada lote de operacoes aplicado ao cenario e conferido contra um cenario
+novo carregado do zero com as mesmas alocacoes ja alteradas: os arrays
+mexidos operacao a operacao tem que dar os mesmos indicadores.
+"""
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.schemas import OperacaoCenario
+from app.services.capacidade import CapacidadeLookup
+from app.services.cenarios import Cenario, CenarioErro
+
+ANO = 2026
+
+_operacoes = TypeAdapter(list[OperacaoCenario])
+
+LOOKUP = CapacidadeLookup(
+    cargos=[
+        {"id": 1, "nome": "Engenheiro", "capacidade_projetos": 2, "nao_mensurar_capacidade": False},
+        {"id": 2, "nome": "Diretor", "capacidade_projetos": 1, "nao_mensurar_capacidade": True},
+    ],
+    setores=[{"id": 1, "nome": "Engenharia"}],
+)
+
+COLABORADORES = [
+    SimpleNamespace(
+        id=10 + i, nome=f"Colaborador {i}", cargo="Cargo", cargo_id=2 if i == 0 else 1,
+        setor_id=None if i == 7 else 1, setor_nome=None if i == 7 else "Engenharia",
+    )
+    for i in range(8)
+]
+PROJETOS = [SimpleNamespace(id=p, codigo=f"P{p}", categoria="CIVIL" if p % 2 else "MECANICA") for p in range(1, 6)]
+
+
+def _alocacoes_base() -> list[dict]:
+    rng = random.Random(7)
+    alocacoes = []
+    for i in range(1, 41):
+        inicio = datetime(ANO - 1, 6, 1) + timedelta(days=rng.randint(0, 365))
+        alocacoes.append({
+            "id": i,
+            "colaborador_id": rng.choice(COLABORADORES).id,
+            "projeto_id": rng.choice(PROJETOS).id,
+            "data_inicio": inicio,
+            "data_fim": None if rng.random() < 0.2 else inicio + timedelta(days=rng.randint(0, 180)),
+            "horas_semanais": rng.choice((10.0, 22.0, 44.0)),
+            "status": rng.choice(("ativa", "ativa", "ativa", "suspensa", "concluida")),
+        })
+    return alocacoes
+
+
+def _carregar(alocacoes: list[dict]) -> Cenario:
+    return Cenario.carregar(
+        [SimpleNamespace(**a) for a in alocacoes], COLABORADORES, PROJETOS, LOOKUP, watermark=(), ano=ANO,
+    )
+
+
+def _indicadores(cenario: Cenario) -> dict:
+    resultado = cenario.resultado(ANO)
+    del resultado["tempo_calculo_ms"]
+    return resultado
+
+
+def _conferir(cenario: Cenario, alocacoes: list[dict]) -> None:
+    assert _indicadores(cenario) == _indicadores(_carregar(alocacoes))
+
+
+@pytest.fixture
+def base():
+    alocacoes = _alocacoes_base()
+    return _carregar(alocacoes), alocacoes
+
+
+def test_adicionar_confere_com_recalculo(base):
+    cenario, alocacoes = base
+    nova = {
+        "colaborador_id": 11, "projeto_id": 3, "data_inicio": datetime(ANO, 2, 10),
+        "data_fim": datetime(ANO, 9, 30), "horas_semanais": 44.0, "status": "ativa",
+    }
+    cenario.aplicar(_operacoes.validate_python([{"tipo": "adicionar", "alocacao": nova}]))
+    alocacoes.append({"id": -1, **nova})
+    _conferir(cenario, alocacoes)
+    assert cenario.novas.keys() == {-1}
+
+
+def test_remover_confere_com_recalculo(base):
+    cenario, alocacoes = base
+    cenario.aplicar(_operacoes.validate_python([
+        {"tipo": "remover", "alocacao_id": 3},
+        {"tipo": "remover", "alocacao_id": 17},
+    ]))
+    alocacoes = [a for a in alocacoes if a["id"] not in (3, 17)]
+    _conferir(cenario, alocacoes)
+    assert cenario.removidas == {3, 17}
+
+
+def test_editar_confere_com_recalculo(base):
+    cenario, alocacoes = base
+    campos = {"data_inicio": datetime(ANO, 4, 1), "data_fim": None, "horas_semanais": 30.0, "status": "suspensa"}
+    cenario.aplicar(_operacoes.validate_python([{"tipo": "editar", "alocacao_id": 5, "campos": campos}]))
+    alocacoes[4].update(campos)
+    _conferir(cenario, alocacoes)
+    assert cenario.editadas[5]["horas_semanais"] == 30.0
+
+
+def test_sequencia_de_lotes_confere_com_recalculo(base):
+    cenario, alocacoes = base
+    rng = random.Random(11)
+    vivas = [a["id"] for a in alocacoes]
+    for _lote in range(10):
+        operacoes = []
+        for _ in range(4):
+            sorteio = rng.random()
+            if sorteio < 0.4:
+                nova = {
+                    "colaborador_id": rng.choice(COLABORADORES).id,
+                    "projeto_id": rng.choice(PROJETOS).id,
+                    "data_inicio": datetime(ANO, rng.randint(1, 12), 1),
+                    "data_fim": None if rng.random() < 0.3 else datetime(ANO + 1, rng.randint(1, 12), 1),
+                    "horas_semanais": float(rng.randint(1, 60)),
+                    "status": "ativa",
+                }
+                operacoes.append({"tipo": "adicionar", "alocacao": nova})
+                # Ids negativos em sequencia, como o cenario atribui
+                novo_id = -(cenario.seq_novas + sum(o["tipo"] == "adicionar" for o in operacoes))
+                alocacoes.append({"id": novo_id, **nova})
+                vivas.append(novo_id)
+            elif sorteio < 0.7:
+                alvo = rng.choice(vivas)
+                vivas.remove(alvo)
+                operacoes.append({"tipo": "remover", "alocacao_id": alvo})
+                alocacoes = [a for a in alocacoes if a["id"] != alvo]
+            else:
+                alvo = rng.choice(vivas)
+                campos = {"horas_semanais": float(rng.randint(1, 60)), "status": rng.choice(("ativa", "suspensa"))}
+                operacoes.append({"tipo": "editar", "alocacao_id": alvo, "campos": campos})
+                next(a for a in alocacoes if a["id"] == alvo).update(campos)
+        cenario.aplicar(_operacoes.validate_python(operacoes))
+        _conferir(cenario, alocacoes)
+
+
+def test_desalocar_por_projeto(base):
+    cenario, alocacoes = base
+    alvo = alocacoes[0]
+    cenario.aplicar(_operacoes.validate_python([
+        {"tipo": "desalocar", "colaborador_id": alvo["colaborador_id"], "projeto_id": alvo["projeto_id"]},
+    ]))
+    alocacoes = [
+        a for a in alocacoes
+        if (a["colaborador_id"], a["projeto_id"]) != (alvo["colaborador_id"], alvo["projeto_id"])
+    ]
+    _conferir(cenario, alocacoes)
+
+
+def test_projeto_hipotetico_e_violacao_de_limite(base):
+    cenario, alocacoes = base
+    projeto = {"codigo": "NOVO", "nome": "Novo", "empresa": "AZ TECH", "cliente": "NGD", "categoria": "CIVIL"}
+    operacoes = [{"tipo": "adicionar_projeto", "projeto": projeto}]
+    # Tres projetos ativos para um engenheiro com limite 2
+    for projeto_id in (-1, 1, 2):
+        operacoes.append({"tipo": "adicionar", "alocacao": {
+            "colaborador_id": 16, "projeto_id": projeto_id, "data_inicio": datetime(ANO, 1, 1),
+        }})
+    cenario.aplicar(_operacoes.validate_python(operacoes))
+    violacoes = {v["colaborador_id"]: v for v in cenario.violacoes()}
+    assert violacoes[16]["limite"] == 2 and violacoes[16]["projetos_ativos"] >= 3
+    # Diretor (nao mensurado) nunca viola
+    assert 10 not in violacoes
+
+
+def test_lote_invalido_nao_aplica_nada(base):
+    cenario, alocacoes = base
+    antes = _indicadores(cenario)
+    with pytest.raises(CenarioErro):
+        cenario.aplicar(_operacoes.validate_python([
+            {"tipo": "remover", "alocacao_id": 1},
+            {"tipo": "remover", "alocacao_id": 999},
+        ]))
+    assert _indicadores(cenario) == antes
+    assert not cenario.removidas and not cenario.operacoes
+    # Remover duas vezes a mesma alocacao tambem falha
+    with pytest.raises(CenarioErro):
+        cenario.aplicar(_operacoes.validate_python([
+            {"tipo": "remover", "alocacao_id": 2},
+            {"tipo": "remover", "alocacao_id": 2},
+        ]))
+    _conferir(cenario, alocacoes)
@@ -0,0 +1,55 @@
+"""
+Orcamento de cold start da API, na suite de testes
+
+Uma rodada de scripts/cold_start.py: import de app.main e lifespan em um
+processo novo sem nenhum DDL, e import e primeira resposta do uvicorn dentro
+dos orcamentos padrao do script. O lifespan e o /health usam o banco de
+DATABASE_URL; sem banco acessivel, o teste e pulado.
+"""
+import importlib.util
+import socket
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+
+_SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "cold_start.py"
+
+
+def _carregar_script():
+    spec = importlib.util.spec_from_file_location("cold_start", _SCRIPT)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+script = _carregar_script()
+
+
+@pytest.fixture(scope="module")
+def banco():
+    engine = create_engine(get_settings().database_url)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"banco indisponivel: {type(e).__name__}")
+    finally:
+        engine.dispose()
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_cold_start(banco):
+    sonda, resposta, falhas = script.medir_rodada(
+        _porta_livre(), script.ORCAMENTO_IMPORT, script.ORCAMENTO_RESPOSTA
+    )
+    assert not sonda["ddl"], "DDL no startup:\n" + "\n".join(sonda["ddl"])
+    assert resposta is not None
+    assert not falhas, "Fora do orcamento de cold start:\n" + "\n".join(falhas)
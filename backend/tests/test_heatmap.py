@@ -0,0 +1,73 @@
+"""
+Matriz do mapa de calor (services/heatmap.matriz_horas), sem banco
+
+Linhas no formato de alocacoes_statement: (colaborador_id, dia_inicio,
+dia_fim, horas), dias relativos a segunda-feira de origem e dia_fim ja
+preenchido com o fim da janela nas alocacoes sem fim. Conferido celula a
+celula contra o calculo direto.
+"""
+import random
+
+import numpy as np
+
+from app.services.heatmap import matriz_horas
+
+SEMANAS = 8
+SEM_FIM = SEMANAS * 7  # coalesce de alocacoes_statement
+
+
+def _direto(ids, alocacoes, n_semanas):
+    """Uma alocacao conta inteira em toda semana que toca; periodo invertido nao conta"""
+    linha = {int(c): i for i, c in enumerate(ids)}
+    matriz = np.zeros((len(ids), n_semanas))
+    for colaborador_id, dia_inicio, dia_fim, horas in alocacoes:
+        if colaborador_id not in linha or dia_fim < dia_inicio:
+            continue
+        for s in range(n_semanas):
+            if s * 7 <= dia_fim and s * 7 + 6 >= dia_inicio:
+                matriz[linha[colaborador_id], s] += horas
+    return matriz
+
+
+def test_inicio_antes_da_janela():
+    ids = np.array([5])
+    horas = matriz_horas(ids, [(5, -20, 17, 10.0)], SEMANAS)
+    assert horas[0].tolist() == [10.0, 10.0, 10.0, 0, 0, 0, 0, 0]
+
+
+def test_sem_fim_vai_ate_o_fim_da_janela():
+    ids = np.array([5])
+    horas = matriz_horas(ids, [(5, 30, SEM_FIM, 22.0), (5, -100, SEM_FIM, 10.0)], SEMANAS)
+    assert horas[0].tolist() == [10.0] * 4 + [32.0] * 4
+
+
+def test_fim_antes_do_inicio_nao_conta():
+    ids = np.array([5, 6])
+    # Invertida na mesma semana e em semanas diferentes
+    horas = matriz_horas(ids, [(5, 12, 9, 44.0), (6, 30, 3, 44.0), (6, 0, 6, 1.0)], SEMANAS)
+    assert not horas[0].any()
+    assert horas[1].tolist() == [1.0] + [0.0] * 7
+
+
+def test_fora_da_janela_e_colaborador_desconhecido():
+    ids = np.array([5])
+    horas = matriz_horas(ids, [(5, -30, -1, 44.0), (5, SEM_FIM, SEM_FIM + 20, 44.0), (99, 0, 10, 44.0)], SEMANAS)
+    assert not horas.any()
+
+
+def test_confere_com_calculo_direto():
+    rng = random.Random(5)
+    # Ids fora de ordem (o mapa ordena por nome)
+    ids = np.array(rng.sample(range(1, 200), 12), dtype=np.int64)
+    alocacoes = []
+    for _ in range(300):
+        inicio = rng.randint(-40, SEM_FIM + 5)
+        fim = SEM_FIM if rng.random() < 0.2 else inicio + rng.randint(-10, 40)
+        alocacoes.append((int(rng.choice(ids)) if rng.random() < 0.9 else 500, inicio, fim, float(rng.randint(1, 44))))
+
+    np.testing.assert_allclose(matriz_horas(ids, alocacoes, SEMANAS), _direto(ids, alocacoes, SEMANAS))
+
+
+def test_vazio():
+    assert matriz_horas(np.array([1, 2]), [], SEMANAS).shape == (2, SEMANAS)
+    assert matriz_horas(np.array([], dtype=np.int64), [(1, 0, 5, 10.0)], SEMANAS).shape == (0, SEMANAS)
@@ -0,0 +1,31 @@
+"""
+Orcamentos de SQL (N+1) de todas as rotas, na suite de testes
+
+Roda as mesmas verificacoes de scripts/verificar_orcamento_sql.py (guarda em
+modo estrito, rotas GET e casos de escrita) contra o banco de DATABASE_URL,
+que precisa estar migrado e com dados. Uma rota que exceda o @orcamento_sql
+ou repita o mesmo comando falha o teste. Sem banco acessivel, o teste e
+pulado (com o motivo no relatorio do pytest).
+"""
+import importlib.util
+from pathlib import Path
+
+_SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "verificar_orcamento_sql.py"
+
+
+def _carregar_script():
+    # O script liga SQL_GUARD=strict antes de importar a app; na suite, o
+    # conftest ja ligou antes da coleta
+    spec = importlib.util.spec_from_file_location("verificar_orcamento_sql", _SCRIPT)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+script = _carregar_script()
+
+
+def test_orcamentos_sql(client):
+    falhas, verificadas, _ = script.verificar(client)
+    assert verificadas > 0
+    assert not falhas, "Orcamento de SQL excedido:\n" + "\n".join(falhas)
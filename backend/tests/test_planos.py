@@ -0,0 +1,33 @@
+"""
+Planos de execucao dos dashboards, na suite de testes
+
+Roda scripts/verificar_planos.py com os limites padrao contra o banco de
+DATABASE_URL: um Seq Scan seletivo em tabela grande falha o teste. So pega
+regressoes com o banco populado em escala (org_sintetica.py); em tabelas
+pequenas todo Seq Scan e aceito. Sem banco acessivel, o teste e pulado.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+
+_SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+
+
+def _carregar_script():
+    # verificar_planos importa de verificar_orcamento_sql, ao lado dele
+    if str(_SCRIPTS) not in sys.path:
+        sys.path.insert(0, str(_SCRIPTS))
+    spec = importlib.util.spec_from_file_location("verificar_planos", _SCRIPTS / "verificar_planos.py")
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+script = _carregar_script()
+
+
+def test_planos(client):
+    falhas, verificadas, _ = script.verificar(client)
+    assert verificadas > 0
+    assert not falhas, "Seq Scan seletivo em tabela grande:\n" + "\n".join(map(script.descrever, falhas))
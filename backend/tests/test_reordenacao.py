@@ -0,0 +1,149 @@
+"""
+Reordenacao de tabelas de referencia (services/reordenacao)
+
+mover sem espaco entre os vizinhos cai em reordenar com a lista inteira:
+conferido sem banco, com reordenar substituido. reordenar e um UPDATE so
+do Postgres (VALUES + row_number): os casos dele rodam no banco de
+DATABASE_URL, em tipos_projeto, dentro de uma transacao desfeita no fim;
+sem banco acessivel, sao pulados.
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.models import TipoProjeto
+from app.services import reordenacao
+from app.services.reordenacao import ESPACAMENTO, mover, reordenar
+
+
+# ============ SEM BANCO ============
+
+class _SessaoFalsa:
+    """Devolve as linhas (id, ordem) no SELECT de mover e guarda os UPDATEs"""
+
+    def __init__(self, ordens: dict[int, int]):
+        self.linhas = [SimpleNamespace(id=i, ordem=o) for i, o in sorted(ordens.items(), key=lambda x: (x[1], x[0]))]
+        self.updates = []
+
+    def execute(self, statement):
+        if statement.is_select:
+            return SimpleNamespace(all=lambda: self.linhas)
+        self.updates.append(statement.compile().params)
+
+
+@pytest.fixture
+def reordenacoes(monkeypatch):
+    chamadas = []
+    monkeypatch.setattr(reordenacao, "reordenar", lambda db, model, ids: chamadas.append(ids))
+    return chamadas
+
+
+def test_mover_sem_espaco_renumera_tudo(reordenacoes):
+    # Ordens antigas consecutivas: nao ha ponto medio entre 1 e 2
+    db = _SessaoFalsa({10: 1, 11: 2, 12: 3, 13: 4})
+    mover(db, TipoProjeto, 13, depois_de=10)
+    assert reordenacoes == [[10, 13, 11, 12]]
+    assert db.updates == []
+
+
+def test_mover_para_o_inicio_sem_espaco(reordenacoes):
+    db = _SessaoFalsa({10: 1, 11: 2, 12: 3})
+    mover(db, TipoProjeto, 12, depois_de=None)
+    assert reordenacoes == [[12, 10, 11]]
+
+
+def test_mover_com_espaco_grava_so_o_item(reordenacoes):
+    db = _SessaoFalsa({10: 1000, 11: 2000, 12: 3000})
+    mover(db, TipoProjeto, 12, depois_de=10)
+    assert reordenacoes == []
+    assert len(db.updates) == 1 and 1500 in db.updates[0].values()
+
+
+def test_mover_para_o_fim(reordenacoes):
+    db = _SessaoFalsa({10: 1000, 11: 2000, 12: 3000})
+    mover(db, TipoProjeto, 10, depois_de=12)
+    assert reordenacoes == [] and 4000 in db.updates[0].values()
+
+
+def test_mover_invalido(reordenacoes):
+    db = _SessaoFalsa({10: 1000, 11: 2000})
+    with pytest.raises(LookupError):
+        mover(db, TipoProjeto, 99, depois_de=None)
+    with pytest.raises(ValueError):
+        mover(db, TipoProjeto, 10, depois_de=10)
+    with pytest.raises(ValueError):
+        mover(db, TipoProjeto, 10, depois_de=99)
+
+
+def test_reordenar_duplicados_antes_do_banco():
+    with pytest.raises(ValueError, match="duplicados"):
+        reordenar(None, TipoProjeto, [1, 2, 1])
+
+
+# ============ NO BANCO ============
+
+@pytest.fixture
+def db():
+    from app.database import engine
+
+    try:
+        conn = engine.connect()
+    except Exception as e:
+        pytest.skip(f"banco indisponivel: {type(e).__name__}")
+    transacao = conn.begin()
+    sessao = Session(bind=conn)
+    # Ordens antigas (1, 2, 3...) e empatadas, como antes do espacamento
+    novos = [TipoProjeto(codigo=f"T-REORD-{i}", nome=f"Tipo {i}", ordem=i // 2) for i in range(5)]
+    sessao.add_all(novos)
+    sessao.flush()
+    try:
+        yield sessao
+    finally:
+        sessao.close()
+        transacao.rollback()
+        conn.close()
+
+
+def _ordem_atual(db) -> list[int]:
+    return list(db.execute(select(TipoProjeto.id).order_by(TipoProjeto.ordem, TipoProjeto.id)).scalars())
+
+
+def _ordens(db) -> list[int]:
+    return list(db.execute(select(TipoProjeto.ordem).order_by(TipoProjeto.ordem)).scalars())
+
+
+def test_reordenar_lista_parcial(db):
+    antes = _ordem_atual(db)
+    parcial = [antes[-1], antes[2]]
+    reordenar(db, TipoProjeto, parcial)
+
+    # Listados na sequencia recebida, depois os demais na ordem de antes
+    assert _ordem_atual(db) == parcial + [i for i in antes if i not in parcial]
+    assert _ordens(db) == [(k + 1) * ESPACAMENTO for k in range(len(antes))]
+
+
+def test_reordenar_lista_completa(db):
+    antes = _ordem_atual(db)
+    reordenar(db, TipoProjeto, antes[::-1])
+    assert _ordem_atual(db) == antes[::-1]
+
+
+def test_reordenar_id_inexistente(db):
+    antes = _ordem_atual(db)
+    inexistente = db.execute(text("SELECT coalesce(max(id), 0) + 1000 FROM tipos_projeto")).scalar()
+    with pytest.raises(ValueError, match=str(inexistente)):
+        reordenar(db, TipoProjeto, [antes[0], inexistente])
+
+
+def test_mover_sem_espaco_no_banco(db):
+    antes = _ordem_atual(db)
+    mover(db, TipoProjeto, antes[-1], depois_de=antes[0])
+
+    assert _ordem_atual(db) == [antes[0], antes[-1]] + antes[1:-1]
+    # Renumerada: o proximo mover ja tem espaco e grava so uma linha
+    assert _ordens(db) == [(k + 1) * ESPACAMENTO for k in range(len(antes))]
+    mover(db, TipoProjeto, antes[1], depois_de=None)
+    assert _ordem_atual(db)[0] == antes[1]
+    assert db.execute(select(TipoProjeto.ordem).where(TipoProjeto.id == antes[1])).scalar() == ESPACAMENTO // 2
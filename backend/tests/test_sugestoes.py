@@ -0,0 +1,169 @@
+"""
+Otimizador guloso de sugestoes (services/sugestoes.preencher_gaps), sem banco
+
+A cada escolha o otimizador desconta horas e projeto da pessoa escolhida e
+so recalcula a coluna dela: os testes conferem que capacidade e limite de
+projetos valem entre escolhas e que o resultado e o mesmo de um guloso que
+recalcula todas as vagas do zero a cada passo.
+"""
+import random
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.models.alocacao import FuncaoAlocacao
+from app.services.capacidade import CapacidadeLookup
+from app.services.sugestoes import GradeCapacidade, preencher_gaps
+from app.services.timeline import HORAS_SEMANA_CHEIA
+
+INICIO = date(2026, 3, 2)  # Segunda-feira
+FIM = date(2026, 8, 31)
+
+LOOKUP = CapacidadeLookup(
+    cargos=[
+        {"id": 1, "nome": "Engenheiro Civil", "capacidade_projetos": 2, "nao_mensurar_capacidade": False},
+        {"id": 2, "nome": "Tecnico de Campo", "capacidade_projetos": 3, "nao_mensurar_capacidade": False},
+    ],
+    setores=[{"id": 1, "nome": "Engenharia"}],
+)
+
+
+def _colaborador(id: int, cargo_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id, nome=f"Colaborador {id}", cargo="", cargo_id=cargo_id, setor_id=1, setor_nome="Engenharia",
+    )
+
+
+def _alocacao(colaborador_id: int, inicio: date, fim: date | None, horas: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        colaborador_id=colaborador_id,
+        data_inicio=datetime.combine(inicio, datetime.min.time()),
+        data_fim=datetime.combine(fim, datetime.min.time()) if fim else None,
+        horas_semanais=horas,
+    )
+
+
+def _grade(colaboradores, alocacoes=(), projetos_ativos=None) -> GradeCapacidade:
+    return GradeCapacidade(colaboradores, list(alocacoes), [], projetos_ativos or {}, LOOKUP, INICIO, FIM)
+
+
+def _vaga(projeto_id: int, funcao: FuncaoAlocacao, inicio: date = INICIO, fim: date = FIM) -> dict:
+    return {"projeto_id": projeto_id, "codigo": f"P{projeto_id}", "funcao": funcao, "inicio": inicio, "fim": fim}
+
+
+def _guloso_do_zero(grade: GradeCapacidade, vagas: list[dict], alocados: dict, horas_semanais: float) -> list:
+    """Referencia: recalcula a pontuacao de todas as vagas pendentes a cada escolha"""
+    alocados = {p: set(c) for p, c in alocados.items()}
+    pendentes = list(range(len(vagas)))
+    escolhas = []
+    while pendentes:
+        melhor = None
+        for s in pendentes:
+            v = vagas[s]
+            a, b = grade.semanas(v["inicio"], v["fim"])
+            r = grade.pontuar(v["funcao"], a, b, excluidos=alocados.get(v["projeto_id"]))
+            linha = np.where(r["elegivel"], r["pontuacao"], -np.inf)
+            i = int(np.argmax(linha))
+            if np.isfinite(linha[i]) and (melhor is None or linha[i] > melhor[0]):
+                melhor = (linha[i], s, i)
+        if melhor is None:
+            break
+        _, s, i = melhor
+        v, c = vagas[s], grade.colaboradores[i]
+        a, b = grade.semanas(v["inicio"], v["fim"])
+        horas = min(horas_semanais, float(grade.livre[i, a:b + 1].mean()))
+        projeto = alocados.setdefault(v["projeto_id"], set())
+        grade.reservar(i, a, b, horas, c.id not in projeto)
+        projeto.add(c.id)
+        pendentes.remove(s)
+        escolhas.append((v["projeto_id"], v["funcao"].value, c.id))
+    return escolhas
+
+
+def test_capacidade_descontada_entre_escolhas():
+    # Uma pessoa com 44h livres (limite de 3 projetos) e tres vagas de 20h no
+    # mesmo periodo: a terceira so recebe o que sobrou
+    colaboradores = [_colaborador(1, 2)]
+    vagas = [_vaga(p, FuncaoAlocacao.TECNICO) for p in (10, 11, 12)]
+    grade = _grade(colaboradores)
+    sugeridas, _ = preencher_gaps(grade, vagas, {}, horas_semanais=20.0)
+
+    assert [s["horas_semanais"] for s in sugeridas] == [20.0, 20.0, 4.0]
+    assert np.all(grade.livre == 0.0)
+
+
+def test_limite_de_projetos_entre_escolhas():
+    # Ja tem 1 projeto ativo e limite 2: so cabe mais um projeto novo
+    colaboradores = [_colaborador(1, 1)]
+    grade = _grade(colaboradores, projetos_ativos={1: 1})
+    # Periodos que nao se sobrepoem: capacidade sobra, o limite e que barra
+    vagas = [
+        _vaga(p, FuncaoAlocacao.ENGENHEIRO, INICIO + timedelta(weeks=8 * k), INICIO + timedelta(weeks=8 * k + 4))
+        for k, p in enumerate((10, 11, 12))
+    ]
+    sugeridas, nao_preenchidas = preencher_gaps(grade, vagas, {}, horas_semanais=10.0)
+
+    assert [s["projeto_id"] for s in sugeridas] == [10]
+    assert [v["projeto_id"] for v in nao_preenchidas] == [11, 12]
+    assert grade.ativos[0] == 2
+
+
+def test_segunda_vaga_no_mesmo_projeto_nao_conta_projeto_novo():
+    colaboradores = [_colaborador(1, 2), _colaborador(2, 2)]
+    vagas = [_vaga(10, FuncaoAlocacao.TECNICO), _vaga(10, FuncaoAlocacao.TECNICO)]
+    grade = _grade(colaboradores)
+    sugeridas, _ = preencher_gaps(grade, vagas, {10: set()}, horas_semanais=10.0)
+
+    # Uma pessoa por projeto: a segunda vaga vai para a outra
+    assert sorted(s["colaborador_id"] for s in sugeridas) == [1, 2]
+    assert list(grade.ativos) == [1, 1]
+
+
+def test_ja_alocados_ficam_de_fora():
+    colaboradores = [_colaborador(1, 1), _colaborador(2, 1)]
+    sugeridas, _ = preencher_gaps(_grade(colaboradores), [_vaga(10, FuncaoAlocacao.ENGENHEIRO)], {10: {1}}, 10.0)
+    assert [s["colaborador_id"] for s in sugeridas] == [2]
+
+
+def test_sem_capacidade_livre_nao_sugere():
+    colaboradores = [_colaborador(1, 1)]
+    cheio = [_alocacao(1, INICIO - timedelta(days=30), None, HORAS_SEMANA_CHEIA)]
+    sugeridas, nao_preenchidas = preencher_gaps(
+        _grade(colaboradores, cheio), [_vaga(10, FuncaoAlocacao.ENGENHEIRO)], {}, 10.0
+    )
+    assert sugeridas == [] and len(nao_preenchidas) == 1
+
+
+def test_mesmo_resultado_que_recalcular_do_zero():
+    rng = random.Random(3)
+    colaboradores = [_colaborador(i, rng.choice((1, 2))) for i in range(1, 16)]
+    alocacoes = [
+        _alocacao(
+            rng.choice(colaboradores).id,
+            INICIO + timedelta(weeks=rng.randint(-4, 20)),
+            None if rng.random() < 0.2 else INICIO + timedelta(weeks=rng.randint(21, 30)),
+            float(rng.choice((10, 22, 44))),
+        )
+        for _ in range(25)
+    ]
+    projetos_ativos = {c.id: rng.randint(0, 2) for c in colaboradores}
+    vagas = [
+        _vaga(
+            100 + k // 2,
+            rng.choice((FuncaoAlocacao.ENGENHEIRO, FuncaoAlocacao.TECNICO)),
+            INICIO + timedelta(weeks=rng.randint(0, 10)),
+            INICIO + timedelta(weeks=rng.randint(11, 25)),
+        )
+        for k in range(20)
+    ]
+    alocados = {100: {colaboradores[0].id}}
+
+    grade = _grade(colaboradores, alocacoes, projetos_ativos)
+    sugeridas, _ = preencher_gaps(grade, vagas, alocados, horas_semanais=20.0)
+    referencia = _guloso_do_zero(_grade(colaboradores, alocacoes, projetos_ativos), vagas, alocados, 20.0)
+
+    assert [(s["projeto_id"], s["funcao"], s["colaborador_id"]) for s in sugeridas] == referencia
+    assert len(sugeridas) > 1
+    # Nenhuma pessoa acima do limite do cargo
+    assert np.all(grade.ativos <= grade.limites)
@@ -12,6 +12,11 @@ interface ApiOptions {
   body?: unknown
 }
 
+// Read-your-writes com réplica de leitura: após uma escrita o backend devolve
+// X-Ler-Primario (segundos); nessa janela as leituras pedem o primário
+const LER_PRIMARIO_HEADER = 'X-Ler-Primario'
+let lerPrimarioAte = 0
+
 async function apiRequest<T>(endpoint: string, options: ApiOptions = {}): Promise<T> {
   const { method = 'GET', body } = options
 
@@ -22,14 +27,26 @@ async function apiRequest<T>(endpoint: string, options: ApiOptions = {}): Promis
     ? endpoint
     : `${endpoint}/`
 
+  const headers: Record<string, string> = {
+    'Content-Type': 'application/json',
+  }
+  if (Date.now() < lerPrimarioAte) {
+    headers[LER_PRIMARIO_HEADER] = '1'
+  }
+
   const response = await fetch(`${API_BASE_URL}${normalizedEndpoint}`, {
     method,
-    headers: {
-      'Content-Type': 'application/json',
-    },
+    headers,
     body: body ? JSON.stringify(body) : undefined,
+    // Envia/guarda o cookie ler_primario (API em outra origem)
+    credentials: 'include',
   })
 
+  const segundosPrimario = Number(response.headers?.get(LER_PRIMARIO_HEADER))
+  if (segundosPrimario > 0) {
+    lerPrimarioAte = Date.now() + segundosPrimario * 1000
+  }
+
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: 'Erro desconhecido' }))
     throw new Error(error.detail || `HTTP ${response.status}`)
@@ -110,6 +127,10 @@ export interface SubnivelAPI {
   ordem: number
 }
 
+// Passo entre ordens vizinhas gravadas pelo reorder do backend
+// (services/reordenacao.ESPACAMENTO): 1000, 2000, 3000...
+export const ESPACAMENTO_ORDEM = 1000
+
 export const niveisApi = {
   list: () => apiRequest<NivelAPI[]>('/niveis/'),
   get: (id: number) => apiRequest<NivelAPI>(`/niveis/${id}/`),
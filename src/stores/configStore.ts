@@ -20,6 +20,7 @@ import {
   apiToNivel,
   apiToCargo,
   apiToTipoProjeto,
+  ESPACAMENTO_ORDEM,
 } from '@/services/api'
 
 // Types (TipoProjeto agora vem de @/types)
@@ -268,16 +269,23 @@ export const useConfigStore = create<ConfigState>()(
         set({ isLoading: true, error: null })
         try {
           await niveisApi.reorder(orderedIds)
-          // Atualizar ordem local após sucesso
-          set((state) => ({
-            niveis: orderedIds
-              .map((id, index) => {
-                const nivel = state.niveis.find((n) => n.id === id)
-                return nivel ? { ...nivel, ordem: index + 1 } : null
-              })
-              .filter((n): n is NivelHierarquico => n !== null),
-            isLoading: false,
-          }))
+          // Atualizar ordem local após sucesso, igual ao servidor: os da lista
+          // na sequência recebida, depois os demais na ordem atual, espaçados
+          set((state) => {
+            const listados = orderedIds
+              .map((id) => state.niveis.find((n) => n.id === id))
+              .filter((n): n is NivelHierarquico => n !== undefined)
+            const demais = state.niveis
+              .filter((n) => !orderedIds.includes(n.id))
+              .sort((a, b) => a.ordem - b.ordem || a.id - b.id)
+            return {
+              niveis: [...listados, ...demais].map((nivel, index) => ({
+                ...nivel,
+                ordem: (index + 1) * ESPACAMENTO_ORDEM,
+              })),
+              isLoading: false,
+            }
+          })
         } catch (error) {
           set({
             error: error instanceof Error ? error.message : 'Erro ao reordenar níveis',